@@ -36,7 +36,6 @@ from cli.utils import (
     select_shallow_thinking_agent,
 )
 from tradingagents.default_config import DEFAULT_CONFIG
-from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.utils.logging_manager import get_logger
 
 # 加载环境变量
@@ -1074,6 +1073,9 @@ def run_analysis():
     # Initialize the graph
     ui.show_progress("正在初始化分析系统...")
     try:
+        # 分析图会加载LLM SDK和数据源依赖，只在真正开始分析时导入，保证 --help 等命令快速启动
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+
         graph = TradingAgentsGraph(
             [analyst.value for analyst in selections["analysts"]], config=config, debug=True
         )
@@ -1181,6 +1183,10 @@ def run_analysis():
         ui.show_step_header(2, "数据验证阶段 | Data Validation Phase")
         ui.show_progress("🔍 验证股票代码并预获取数据...")
 
+        # 本次分析的数据上下文，验证阶段预获取的数据由后续分析师直接复用
+        from tradingagents.dataflows.data_context import AnalysisDataContext
+        data_context = AnalysisDataContext()
+
         try:
             from tradingagents.utils.stock_validator import prepare_stock_data
 
@@ -1213,7 +1219,8 @@ def run_analysis():
                 stock_code=selections["ticker"],
                 market_type=market_type,
                 period_days=30,
-                analysis_date=selections["analysis_date"]
+                analysis_date=selections["analysis_date"],
+                data_context=data_context
             )
 
             if not preparation_result.is_valid:
@@ -1264,7 +1271,7 @@ def run_analysis():
         # 跟踪已完成的分析师，避免重复提示
         completed_analysts = set()
 
-        for chunk in graph.graph.stream(init_agent_state, **args):
+        for chunk in data_context.iterate(graph.graph.stream(init_agent_state, **args)):
             if len(chunk["messages"]) > 0:
                 # Get the last message from the chunk
                 last_message = chunk["messages"][-1]
@@ -1864,6 +1871,62 @@ def data_config(
     logger.info(f"• 环境变量优先级最高 | Environment variables have highest priority")
 
 
+@app.command(
+    name="warm-cache",
+    help="盘前缓存预热 | Pre-market cache warming"
+)
+def warm_cache(
+    china: Optional[str] = typer.Option(None, "--china", help="A股自选股，逗号分隔 | China A-share watchlist"),
+    hk: Optional[str] = typer.Option(None, "--hk", help="港股自选股，逗号分隔 | Hong Kong watchlist"),
+    us: Optional[str] = typer.Option(None, "--us", help="美股自选股，逗号分隔 | US watchlist"),
+    watchlist_file: Optional[str] = typer.Option(None, "--watchlist-file", "-f", help="自选股JSON文件 | Watchlist JSON file"),
+    session_date: Optional[str] = typer.Option(None, "--date", help="预热的交易日 YYYY-MM-DD，默认下一个交易日 | Session date"),
+    service: bool = typer.Option(False, "--service", help="作为服务运行，每个交易日开盘前预热 | Run before every session"),
+    lead_minutes: Optional[int] = typer.Option(None, "--lead-minutes", help="开盘前多少分钟预热 | Minutes before the open")
+):
+    """
+    按自选股预热行情、股票基本信息和财务报表缓存
+    Warm price history, security info and financial statement caches for watchlists
+    """
+    from datetime import date as date_type
+    from tradingagents.dataflows.cache_warmer import CacheWarmer, load_watchlists, warm_lookback_days
+
+    watchlists = load_watchlists(watchlist_file)
+    for market, symbols in (("china", china), ("hk", hk), ("us", us)):
+        if symbols:
+            watchlists[market] = symbols
+    warmer = CacheWarmer(watchlists, lookback_days=warm_lookback_days())
+    if not warmer.markets:
+        logger.error(f"[red]❌ 没有配置自选股 | No watchlist configured[/red]")
+        logger.info(f"[yellow]使用 --china/--hk/--us、--watchlist-file 或 TRADINGAGENTS_WARM_WATCHLIST_* 环境变量[/yellow]")
+        raise typer.Exit(1)
+
+    def show_report(report):
+        table = Table(title=f"🔥 {report.market} ({report.session_date}) - {report.seconds:.1f}s",
+                      show_header=True, header_style="bold magenta")
+        table.add_column("任务 | Task", style="cyan")
+        table.add_column("成功 | Warmed", style="green")
+        table.add_column("失败 | Failed", style="red")
+        table.add_column("请求 | Requests")
+        table.add_column("耗时 | Seconds")
+        table.add_column("说明 | Note")
+        for task in report.tasks:
+            table.add_row(task.name, str(len(task.warmed)), ", ".join(task.failed) or "0",
+                          str(task.requests), f"{task.seconds:.1f}", task.note)
+        console.print(table)
+
+    if service:
+        try:
+            warmer.run_forever(lead_minutes, on_report=show_report)
+        except KeyboardInterrupt:
+            warmer.stop()
+        return
+
+    target = date_type.fromisoformat(session_date) if session_date else None
+    for report in warmer.warm_all(target):
+        show_report(report)
+
+
 @app.command(
     name="examples",
     help="示例程序 | Example programs"
@@ -1985,6 +2048,11 @@ def help_chinese():
         "配置设置 | Configuration",
         "查看和配置LLM提供商、API密钥等设置"
     )
+    commands_table.add_row(
+        "warm-cache",
+        "缓存预热 | Cache Warming",
+        "开盘前按自选股预热行情、股票信息和财务报表缓存"
+    )
     commands_table.add_row(
         "examples",
         "示例程序 | Examples",
@@ -2030,7 +2098,7 @@ def main():
             # 只在退出码为2（typer的未知命令错误）时提供智能建议
             if e.code == 2 and len(sys.argv) > 1:
                 unknown_command = sys.argv[1]
-                available_commands = ['analyze', 'config', 'version', 'data-config', 'examples', 'test', 'help']
+                available_commands = ['analyze', 'config', 'version', 'data-config', 'warm-cache', 'examples', 'test', 'help']
                 
                 # 使用difflib找到最相似的命令
                 suggestions = get_close_matches(unknown_command, available_commands, n=3, cutoff=0.6)
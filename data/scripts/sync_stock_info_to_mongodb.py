@@ -24,7 +24,7 @@ from enhanced_stock_list_fetcher import enhanced_fetch_stock_list
 
 try:
     import pymongo
-    from pymongo import MongoClient
+    from tradingagents.config.connection_registry import get_mongo_client
     MONGODB_AVAILABLE = True
 except ImportError:
     MONGODB_AVAILABLE = False
@@ -93,11 +93,8 @@ class StockInfoSyncer:
                 else:
                     connection_string = f"mongodb://{config['host']}:{config['port']}/"
             
-            # 创建客户端
-            self.mongodb_client = MongoClient(
-                connection_string,
-                serverSelectionTimeoutMS=5000  # 5秒超时
-            )
+            # 使用进程共享的连接池
+            self.mongodb_client = get_mongo_client(connection_string)
             
             # 测试连接
             self.mongodb_client.admin.command('ping')
@@ -321,10 +318,11 @@ class StockInfoSyncer:
             return []
     
     def close(self):
-        """关闭数据库连接"""
+        """释放数据库连接（连接池由连接注册表统一管理，进程退出时关闭）"""
         if self.mongodb_client:
-            self.mongodb_client.close()
-            logger.info(f"🔒 MongoDB连接已关闭")
+            self.mongodb_client = None
+            self.mongodb_db = None
+            logger.info(f"🔒 MongoDB连接已释放")
 
 
 def main():
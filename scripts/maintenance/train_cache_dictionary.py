@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+训练缓存压缩字典
+用文件缓存中的报告文本（基本面、新闻、行情）训练zstd字典，
+之后写入Redis/MongoDB的缓存使用该字典压缩
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('scripts')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="训练Redis/MongoDB缓存压缩使用的zstd字典")
+    parser.add_argument("--cache-dir", default=None, help="文件缓存目录，默认 tradingagents/dataflows/data_cache")
+    parser.add_argument("--max-samples", type=int, default=2000, help="最多使用的样本数")
+    parser.add_argument("--dict-size", type=int, default=112640, help="字典大小（字节）")
+    args = parser.parse_args()
+
+    import zlib
+    from tradingagents.dataflows.cache_manager import StockDataCache
+    from tradingagents.dataflows.payload_codec import encode_payload, train_dictionary
+
+    cache = StockDataCache(args.cache_dir)
+    samples = []
+    for entry in cache.list_cache_entries():
+        path = Path(entry.get('file_path') or '')
+        if path.suffix == '.txt' and path.exists():
+            samples.append(path.read_bytes())
+        if len(samples) >= args.max_samples:
+            break
+
+    logger.info(f"📄 收集到 {len(samples)} 个样本")
+    dict_id = train_dictionary(samples, args.dict_size)
+    if dict_id is None:
+        logger.error("❌ 训练字典失败（需要安装zstandard，并且样本足够多）")
+        return 1
+
+    # 用样本估算压缩率
+    raw_size = sum(len(sample) for sample in samples)
+    encoded_size = sum(len(encode_payload(sample)) for sample in samples)
+    zlib_size = sum(len(zlib.compress(sample)) for sample in samples)
+    logger.info(f"✅ 字典 {dict_id}: 原始 {raw_size / 1024:.1f}KB -> {encoded_size / 1024:.1f}KB "
+                f"(压缩率 {raw_size / max(encoded_size, 1):.1f}x，zlib {raw_size / max(zlib_size, 1):.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,596 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线端到端基准测试框架
+
+在不访问网络的情况下运行完整的 股票验证 -> TradingAgentsGraph.propagate 流程：
+- LLM 由确定性的 StubChatModel 代替
+- 数据接口（Tushare/AKShare/yfinance/Finnhub/新闻等）从录制的夹具文件回放
+- 延迟模型按数据源和token数模拟响应时间，可通过 latency_scale 整体缩放
+
+统计每个图节点的耗时、LLM调用次数和提示词token数、工具耗时、数据接口调用次数以及内存峰值，
+并与保存的基线比较，超出容差即视为性能回归。
+"""
+
+import copy
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from tradingagents.agents.utils.context_builder import estimate_tokens
+
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCHMARK_DIR / "fixtures"
+BASELINE_FILE = BENCHMARK_DIR / "baseline.json"
+
+# 回放的数据接口: (数据集, 模块, 属性路径, 数据源)
+# 数据集名称与 analysis_memoized 使用的名称一致
+DATAFLOW_TARGETS = [
+    ("china_stock_data", "tradingagents.dataflows.interface", "get_china_stock_data_unified", "tushare"),
+    ("china_stock_info", "tradingagents.dataflows.interface", "get_china_stock_info_unified", "tushare"),
+    ("china_financial_metrics", "tradingagents.dataflows.optimized_china_data",
+     "OptimizedChinaDataProvider._get_real_financial_metrics", "akshare"),
+    ("hk_stock_data", "tradingagents.dataflows.interface", "get_hk_stock_data_unified", "akshare"),
+    ("hk_stock_info", "tradingagents.dataflows.interface", "get_hk_stock_info_unified", "akshare"),
+    ("hk_company_name", "tradingagents.dataflows.improved_hk_utils", "get_hk_company_name_improved", "akshare"),
+    ("us_stock_data", "tradingagents.dataflows.interface", "get_YFin_data_online", "yfinance"),
+    ("us_stock_data_cached", "tradingagents.dataflows.optimized_us_data", "get_us_stock_data_cached", "yfinance"),
+    ("stock_indicators", "tradingagents.dataflows.interface", "get_stock_stats_indicators_window", "yfinance"),
+    ("us_fundamentals", "tradingagents.dataflows.interface", "get_fundamentals_openai", "openai"),
+    ("stock_news_openai", "tradingagents.dataflows.interface", "get_stock_news_openai", "openai"),
+    ("global_news_openai", "tradingagents.dataflows.interface", "get_global_news_openai", "openai"),
+    ("google_news", "tradingagents.dataflows.interface", "get_google_news", "google"),
+    ("finnhub_news", "tradingagents.dataflows.interface", "get_finnhub_news", "finnhub"),
+    ("reddit_company_news", "tradingagents.dataflows.interface", "get_reddit_company_news", "reddit"),
+    ("reddit_global_news", "tradingagents.dataflows.interface", "get_reddit_global_news", "reddit"),
+    ("chinese_social_sentiment", "tradingagents.dataflows.interface", "get_chinese_social_sentiment", "akshare"),
+    ("realtime_news", "tradingagents.dataflows.realtime_news_utils", "get_realtime_stock_news", "akshare"),
+]
+
+# 各数据源的模拟延迟（秒）: (基础延迟, 抖动幅度)
+DEFAULT_SOURCE_LATENCY = {
+    "tushare": (0.35, 0.10),
+    "akshare": (0.80, 0.30),
+    "yfinance": (0.60, 0.20),
+    "finnhub": (0.40, 0.10),
+    "openai": (2.00, 0.50),
+    "google": (1.20, 0.40),
+    "reddit": (0.05, 0.01),
+}
+
+# LLM模拟延迟（秒）: 基础延迟 + 每千输入token + 每千输出token
+DEFAULT_LLM_LATENCY = {"base": 0.8, "per_1k_input": 0.15, "per_1k_output": 2.5}
+
+# 回归判定容差
+DEFAULT_TOLERANCES = {
+    "time_ratio": 0.25,     # 耗时允许增加的比例
+    "time_slack": 0.05,     # 耗时允许的绝对波动（秒）
+    "count_ratio": 0.0,     # 调用次数不允许增加
+    "token_ratio": 0.05,    # 提示词token允许增加的比例
+    "memory_ratio": 0.25,   # 内存峰值允许增加的比例
+}
+
+OFFLINE_ERROR = "基准测试离线模式禁止网络访问"
+
+
+class LatencyModel:
+    """可配置的延迟模型，抖动由种子和调用序号决定，结果可复现"""
+
+    def __init__(self, scale: float = 1.0, seed: int = 0,
+                 sources: Optional[Dict[str, Any]] = None, llm: Optional[Dict[str, float]] = None):
+        self.scale = scale
+        self.seed = seed
+        self.sources = dict(DEFAULT_SOURCE_LATENCY)
+        self.sources.update({k: tuple(v) for k, v in (sources or {}).items()})
+        self.llm = dict(DEFAULT_LLM_LATENCY)
+        self.llm.update(llm or {})
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _jitter(self, key: str) -> float:
+        """返回 [-1, 1) 区间内确定的抖动系数"""
+        with self._lock:
+            index = self._counters.get(key, 0)
+            self._counters[key] = index + 1
+        digest = hashlib.md5(f"{self.seed}:{key}:{index}".encode("utf-8")).hexdigest()
+        return int(digest[:8], 16) / 0x80000000 - 1.0
+
+    def source_delay(self, source: str) -> float:
+        if self.scale <= 0:
+            return 0.0
+        base, jitter = self.sources.get(source, (0.0, 0.0))
+        return max(0.0, (base + jitter * self._jitter(source)) * self.scale)
+
+    def llm_delay(self, input_tokens: int, output_tokens: int) -> float:
+        if self.scale <= 0:
+            return 0.0
+        delay = (self.llm["base"]
+                 + self.llm["per_1k_input"] * input_tokens / 1000
+                 + self.llm["per_1k_output"] * output_tokens / 1000)
+        return max(0.0, delay * self.scale)
+
+
+def _resolve_target(module_name: str, attr_path: str):
+    """返回 (属性所属对象, 属性名)"""
+    owner = import_module(module_name)
+    parts = attr_path.split(".")
+    for part in parts[:-1]:
+        owner = getattr(owner, part)
+    return owner, parts[-1]
+
+
+def _is_usable(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return bool(value.strip()) and "❌" not in value[:200]
+    return True
+
+
+class FixtureDataSource:
+    """
+    数据接口回放/录制
+
+    回放模式下把 DATAFLOW_TARGETS 中的数据接口替换为从夹具返回录制结果的函数；
+    录制模式下调用真实接口，并把每个数据集第一次成功的结果写入夹具。
+    """
+
+    def __init__(self, fixture: Dict[str, Any], latency: LatencyModel, record: bool = False):
+        self.fixture = fixture
+        self.responses = fixture.setdefault("responses", {})
+        self.latency = latency
+        self.record = record
+        self.calls: Dict[str, int] = {}
+        self.times: Dict[str, float] = {}
+        self.missing = set()
+        self._lock = threading.Lock()
+
+    def _account(self, dataset: str, elapsed: float):
+        with self._lock:
+            self.calls[dataset] = self.calls.get(dataset, 0) + 1
+            self.times[dataset] = self.times.get(dataset, 0.0) + elapsed
+
+    def _make_replay(self, dataset: str, source: str):
+        def replay(*args, **kwargs):
+            start = time.perf_counter()
+            delay = self.latency.source_delay(source)
+            if delay > 0:
+                time.sleep(delay)
+            if dataset in self.responses:
+                result = copy.deepcopy(self.responses[dataset])
+            else:
+                with self._lock:
+                    self.missing.add(dataset)
+                result = f"❌ 基准测试夹具缺少数据集: {dataset}"
+            self._account(dataset, time.perf_counter() - start)
+            return result
+        return replay
+
+    def _make_recorder(self, dataset: str, original):
+        def recorder(*args, **kwargs):
+            start = time.perf_counter()
+            result = original(*args, **kwargs)
+            self._account(dataset, time.perf_counter() - start)
+            if dataset not in self.responses and _is_usable(result):
+                self.responses[dataset] = result
+            return result
+        return recorder
+
+    @contextmanager
+    def installed(self):
+        """在上下文内替换数据接口"""
+        from tradingagents.dataflows.data_context import analysis_memoized
+
+        patched = []
+        try:
+            for dataset, module_name, attr_path, source in DATAFLOW_TARGETS:
+                try:
+                    owner, attr = _resolve_target(module_name, attr_path)
+                    original = getattr(owner, attr)
+                except (ImportError, AttributeError):
+                    continue
+
+                if self.record:
+                    # 录制时包在最内层，记忆的结果不会重复录制
+                    inner = getattr(original, "__wrapped__", None)
+                    if inner is not None:
+                        replacement = analysis_memoized(dataset)(self._make_recorder(dataset, inner))
+                    else:
+                        replacement = self._make_recorder(dataset, original)
+                else:
+                    replacement = self._make_replay(dataset, source)
+                    if hasattr(original, "__wrapped__"):
+                        # 保持生产环境中的单次分析记忆行为
+                        replacement = analysis_memoized(dataset)(replacement)
+
+                setattr(owner, attr, replacement)
+                patched.append((owner, attr, original))
+            yield self
+        finally:
+            for owner, attr, original in reversed(patched):
+                setattr(owner, attr, original)
+
+
+@contextmanager
+def network_blocked():
+    """离线模式：任何网络连接都立即失败"""
+    original_connect = socket.socket.connect
+    original_connect_ex = socket.socket.connect_ex
+
+    def refuse(self, address):
+        if self.family == getattr(socket, "AF_UNIX", None):
+            return original_connect(self, address)
+        raise OSError(OFFLINE_ERROR)
+
+    def refuse_ex(self, address):
+        if self.family == getattr(socket, "AF_UNIX", None):
+            return original_connect_ex(self, address)
+        raise OSError(OFFLINE_ERROR)
+
+    socket.socket.connect = refuse
+    socket.socket.connect_ex = refuse_ex
+    try:
+        yield
+    finally:
+        socket.socket.connect = original_connect
+        socket.socket.connect_ex = original_connect_ex
+
+
+def _messages_text(messages) -> str:
+    parts = []
+    for message in messages:
+        content = getattr(message, "content", message)
+        if isinstance(content, list):
+            content = "".join(str(item.get("text", "")) if isinstance(item, dict) else str(item)
+                              for item in content)
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+class MetricsCollector(BaseCallbackHandler):
+    """通过LangChain回调统计节点、LLM和工具的耗时与token"""
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.tools: Dict[str, Dict[str, Any]] = {}
+        self._node_runs: Dict[Any, tuple] = {}
+        self._llm_runs: Dict[Any, tuple] = {}
+        self._tool_runs: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _node(self, name: str) -> Dict[str, Any]:
+        return self.nodes.setdefault(name, {
+            "calls": 0, "wall_time": 0.0, "llm_calls": 0, "llm_time": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        })
+
+    # 图节点
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None,
+                       tags=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        if node and kwargs.get("name") == node:
+            with self._lock:
+                self._node_runs[run_id] = (node, time.perf_counter())
+
+    def _finish_chain(self, run_id):
+        with self._lock:
+            run = self._node_runs.pop(run_id, None)
+            if run:
+                node, start = run
+                stats = self._node(node)
+                stats["calls"] += 1
+                stats["wall_time"] += time.perf_counter() - start
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish_chain(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish_chain(run_id)
+
+    # LLM调用
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None,
+                            tags=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node", "<outside-graph>")
+        tokens = sum(estimate_tokens(_messages_text(batch)) for batch in messages)
+        with self._lock:
+            self._llm_runs[run_id] = (node, time.perf_counter(), tokens)
+
+    def _finish_llm(self, run_id, completion_tokens: int = 0):
+        with self._lock:
+            run = self._llm_runs.pop(run_id, None)
+            if run:
+                node, start, prompt_tokens = run
+                stats = self._node(node)
+                stats["llm_calls"] += 1
+                stats["llm_time"] += time.perf_counter() - start
+                stats["prompt_tokens"] += prompt_tokens
+                stats["completion_tokens"] += completion_tokens
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        completion = 0
+        for generations in response.generations:
+            for generation in generations:
+                completion += estimate_tokens(generation.text or "")
+        self._finish_llm(run_id, completion)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish_llm(run_id)
+
+    # 工具调用
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None,
+                      tags=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "unknown")
+        with self._lock:
+            nested = parent_run_id in self._tool_runs
+            self._tool_runs[run_id] = (name, time.perf_counter(), nested)
+
+    def _finish_tool(self, run_id):
+        with self._lock:
+            run = self._tool_runs.pop(run_id, None)
+            if run:
+                name, start, nested = run
+                stats = self.tools.setdefault(name, {"calls": 0, "time": 0.0, "nested_calls": 0})
+                if nested:
+                    stats["nested_calls"] += 1
+                else:
+                    stats["calls"] += 1
+                    stats["time"] += time.perf_counter() - start
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._finish_tool(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._finish_tool(run_id)
+
+
+def load_fixture(path) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fixture(path, fixture: Dict[str, Any]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False, indent=2, default=str)
+
+
+def list_fixtures() -> List[Path]:
+    return sorted(FIXTURES_DIR.glob("*.json"))
+
+
+class BenchmarkHarness:
+    """离线基准测试运行器"""
+
+    def __init__(self, fixture_path, latency_scale: float = 1.0, seed: int = 0,
+                 record: bool = False, track_memory: bool = True,
+                 config_overrides: Optional[Dict[str, Any]] = None):
+        self.fixture_path = Path(fixture_path)
+        self.fixture = load_fixture(self.fixture_path)
+        self.latency_scale = latency_scale
+        self.seed = seed
+        self.record = record
+        self.track_memory = track_memory
+        self.config_overrides = config_overrides or {}
+
+    def _build_config(self) -> Dict[str, Any]:
+        from tradingagents.default_config import DEFAULT_CONFIG
+
+        config = DEFAULT_CONFIG.copy()
+        config.update({
+            "llm_provider": "stub",
+            "deep_think_llm": "stub-deep",
+            "quick_think_llm": "stub-quick",
+            "online_tools": True,
+            "memory_enabled": False,
+            "max_debate_rounds": 1,
+            "max_risk_discuss_rounds": 1,
+        })
+        config.update(self.fixture.get("config", {}))
+        config.update(self.config_overrides)
+        return config
+
+    def run(self) -> Dict[str, Any]:
+        """运行一次完整分析并返回统计结果"""
+        from tests.benchmark.stub_llm import StubChatModel
+        from tradingagents.dataflows.data_context import AnalysisDataContext
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+        from tradingagents.utils.stock_validator import prepare_stock_data
+
+        ticker = self.fixture["ticker"]
+        trade_date = self.fixture["trade_date"]
+        analysts = self.fixture.get("analysts", ["market", "social", "news", "fundamentals"])
+
+        latency_config = self.fixture.get("latency", {})
+        latency = LatencyModel(self.latency_scale, self.seed,
+                               latency_config.get("sources"), latency_config.get("llm"))
+        data_source = FixtureDataSource(self.fixture, latency, record=self.record)
+        collector = MetricsCollector()
+
+        quick_llm = StubChatModel(model_name="stub-quick", ticker=ticker,
+                                  trade_date=trade_date, latency_model=latency)
+        deep_llm = StubChatModel(model_name="stub-deep", ticker=ticker,
+                                 trade_date=trade_date, latency_model=latency)
+
+        previous_cwd = os.getcwd()
+        work_dir = tempfile.mkdtemp(prefix="ta_benchmark_")
+        offline = network_blocked() if not self.record else _null_context()
+
+        if self.track_memory:
+            tracemalloc.start()
+        try:
+            os.chdir(work_dir)  # full_states_log等运行产物写入临时目录
+            with offline, data_source.installed():
+                setup_start = time.perf_counter()
+                graph = TradingAgentsGraph(analysts, config=self._build_config(),
+                                           deep_thinking_llm=deep_llm, quick_thinking_llm=quick_llm)
+                setup_time = time.perf_counter() - setup_start
+
+                data_context = AnalysisDataContext(f"benchmark_{self.fixture_path.stem}")
+
+                validation_start = time.perf_counter()
+                preparation = prepare_stock_data(ticker, self.fixture.get("market_type", "auto"), 30,
+                                                 trade_date, data_context=data_context)
+                validation_time = time.perf_counter() - validation_start
+
+                propagate_start = time.perf_counter()
+                final_state, decision = graph.propagate(ticker, trade_date, data_context=data_context,
+                                                        callbacks=[collector])
+                propagate_time = time.perf_counter() - propagate_start
+
+            memory_peak = tracemalloc.get_traced_memory()[1] if self.track_memory else 0
+        finally:
+            if self.track_memory:
+                tracemalloc.stop()
+            os.chdir(previous_cwd)
+
+        if self.record:
+            self.fixture["recorded_at"] = datetime.now().isoformat(timespec="seconds")
+            save_fixture(self.fixture_path, self.fixture)
+
+        return self._summarize(collector, data_source, data_context, {
+            "setup_time": setup_time,
+            "validation_time": validation_time,
+            "propagate_time": propagate_time,
+            "memory_peak_mb": memory_peak / 1024 / 1024,
+            "validation_ok": bool(preparation.is_valid),
+            "decision": decision.get("action") if isinstance(decision, dict) else str(decision),
+            "final_decision_length": len(final_state.get("final_trade_decision", "")),
+        })
+
+    def _summarize(self, collector: MetricsCollector, data_source: FixtureDataSource,
+                   data_context, extra: Dict[str, Any]) -> Dict[str, Any]:
+        nodes = {name: dict(stats) for name, stats in sorted(collector.nodes.items())}
+        tools = {name: dict(stats) for name, stats in sorted(collector.tools.items())}
+        dataflow = {
+            name: {"calls": data_source.calls[name], "time": data_source.times.get(name, 0.0)}
+            for name in sorted(data_source.calls)
+        }
+        totals = {
+            "wall_time": extra["validation_time"] + extra["propagate_time"],
+            "llm_calls": sum(n["llm_calls"] for n in nodes.values()),
+            "llm_time": sum(n["llm_time"] for n in nodes.values()),
+            "prompt_tokens": sum(n["prompt_tokens"] for n in nodes.values()),
+            "completion_tokens": sum(n["completion_tokens"] for n in nodes.values()),
+            "tool_calls": sum(t["calls"] for t in tools.values()),
+            "tool_time": sum(t["time"] for t in tools.values()),
+            "dataflow_calls": sum(d["calls"] for d in dataflow.values()),
+            "dataflow_time": sum(d["time"] for d in dataflow.values()),
+        }
+        return {
+            "scenario": self.fixture_path.stem,
+            "latency_scale": self.latency_scale,
+            "totals": totals,
+            "nodes": nodes,
+            "tools": tools,
+            "dataflow": dataflow,
+            "missing_datasets": sorted(data_source.missing),
+            "data_context": data_context.stats(),
+            **extra,
+        }
+
+
+@contextmanager
+def _null_context():
+    yield
+
+
+def load_baseline(path=BASELINE_FILE) -> Dict[str, Any]:
+    if not Path(path).exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: List[Dict[str, Any]], path=BASELINE_FILE):
+    baseline = load_baseline(path)
+    for result in results:
+        baseline[result["scenario"]] = result
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any],
+                          tolerances: Optional[Dict[str, float]] = None,
+                          check_timing: bool = True) -> List[str]:
+    """
+    与基线比较，返回回归说明列表（为空表示没有回归）
+
+    调用次数和token数是确定的，总是比较；耗时和内存只有在延迟缩放系数与基线一致时才比较。
+    """
+    tol = dict(DEFAULT_TOLERANCES)
+    tol.update(tolerances or {})
+    regressions = []
+
+    def check(label, current, previous, ratio, slack=0.0):
+        if previous is None or current is None:
+            return
+        limit = previous * (1 + ratio) + slack
+        if current > limit:
+            regressions.append(f"{label}: {current:.4g} > 基线 {previous:.4g} (上限 {limit:.4g})")
+
+    totals, base_totals = result["totals"], baseline.get("totals", {})
+    for key in ("llm_calls", "tool_calls", "dataflow_calls"):
+        check(f"总计.{key}", totals.get(key), base_totals.get(key), tol["count_ratio"])
+    check("总计.prompt_tokens", totals.get("prompt_tokens"), base_totals.get("prompt_tokens"),
+          tol["token_ratio"])
+
+    base_nodes = baseline.get("nodes", {})
+    for name, stats in result["nodes"].items():
+        previous = base_nodes.get(name)
+        if previous is None:
+            continue
+        check(f"节点[{name}].llm_calls", stats["llm_calls"], previous.get("llm_calls"), tol["count_ratio"])
+        check(f"节点[{name}].prompt_tokens", stats["prompt_tokens"], previous.get("prompt_tokens"),
+              tol["token_ratio"])
+
+    base_dataflow = baseline.get("dataflow", {})
+    for name, stats in result["dataflow"].items():
+        previous = base_dataflow.get(name, {}).get("calls", 0)
+        check(f"数据集[{name}].calls", stats["calls"], previous, tol["count_ratio"])
+
+    timing_comparable = baseline.get("latency_scale") == result.get("latency_scale")
+    if check_timing and timing_comparable:
+        check("总计.wall_time", totals["wall_time"], base_totals.get("wall_time"),
+              tol["time_ratio"], tol["time_slack"])
+        check("总计.tool_time", totals["tool_time"], base_totals.get("tool_time"),
+              tol["time_ratio"], tol["time_slack"])
+        for name, stats in result["nodes"].items():
+            previous = base_nodes.get(name, {}).get("wall_time")
+            check(f"节点[{name}].wall_time", stats["wall_time"], previous, tol["time_ratio"], tol["time_slack"])
+        if result.get("memory_peak_mb") and baseline.get("memory_peak_mb"):
+            check("memory_peak_mb", result["memory_peak_mb"], baseline["memory_peak_mb"], tol["memory_ratio"])
+
+    return regressions
+
+
+def format_report(result: Dict[str, Any]) -> str:
+    """格式化单个场景的统计结果"""
+    totals = result["totals"]
+    lines = [
+        f"== 场景 {result['scenario']} (延迟缩放 {result['latency_scale']}) ==",
+        f"总耗时 {totals['wall_time']:.3f}s | 验证 {result['validation_time']:.3f}s | "
+        f"图执行 {result['propagate_time']:.3f}s | 内存峰值 {result['memory_peak_mb']:.1f}MB",
+        f"LLM {totals['llm_calls']} 次 / {totals['llm_time']:.3f}s / 提示词 {totals['prompt_tokens']} tokens | "
+        f"工具 {totals['tool_calls']} 次 / {totals['tool_time']:.3f}s | "
+        f"数据接口 {totals['dataflow_calls']} 次 / {totals['dataflow_time']:.3f}s",
+        f"{'节点':<24}{'次数':>6}{'耗时(s)':>10}{'LLM':>6}{'提示词tokens':>14}",
+    ]
+    for name, stats in result["nodes"].items():
+        lines.append(f"{name:<24}{stats['calls']:>6}{stats['wall_time']:>10.3f}"
+                     f"{stats['llm_calls']:>6}{stats['prompt_tokens']:>14}")
+    if result["missing_datasets"]:
+        lines.append(f"⚠️ 夹具缺少数据集: {', '.join(result['missing_datasets'])}")
+    lines.append(f"最终决策: {result['decision']}")
+    return "\n".join(lines)
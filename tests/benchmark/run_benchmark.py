@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线基准测试命令行入口
+
+用法（在项目根目录运行）:
+    python -m tests.benchmark.run_benchmark                     # 运行全部场景并与基线比较
+    python -m tests.benchmark.run_benchmark --latency-scale 0   # 只比较调用次数和token，不模拟延迟
+    python -m tests.benchmark.run_benchmark --update-baseline   # 用本次结果更新基线
+    python -m tests.benchmark.run_benchmark --record            # 访问真实数据源重新录制夹具
+
+存在性能回归时以退出码1结束。
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from tests.benchmark.harness import (
+    BenchmarkHarness,
+    compare_with_baseline,
+    format_report,
+    list_fixtures,
+    load_baseline,
+    save_baseline,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="TradingAgents 离线基准测试")
+    parser.add_argument("--fixture", action="append",
+                        help="夹具文件路径，可重复指定；默认运行fixtures目录下全部场景")
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="延迟模型缩放系数，0表示不模拟延迟（默认1.0）")
+    parser.add_argument("--seed", type=int, default=0, help="延迟抖动随机种子")
+    parser.add_argument("--record", action="store_true", help="访问真实数据源录制夹具（需要网络和API密钥）")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果更新基线")
+    parser.add_argument("--no-timing", action="store_true", help="只比较调用次数和token，不比较耗时")
+    parser.add_argument("--output", help="把完整结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    fixtures = [Path(p) for p in args.fixture] if args.fixture else list_fixtures()
+    if not fixtures:
+        print("❌ 没有找到基准测试夹具")
+        return 1
+
+    baseline = load_baseline()
+    results = []
+    failed = False
+
+    for fixture in fixtures:
+        harness = BenchmarkHarness(fixture, latency_scale=args.latency_scale,
+                                   seed=args.seed, record=args.record)
+        result = harness.run()
+        results.append(result)
+        print(format_report(result))
+
+        if args.update_baseline or args.record:
+            continue
+
+        previous = baseline.get(result["scenario"])
+        if previous is None:
+            print(f"⚠️ 场景 {result['scenario']} 没有基线，使用 --update-baseline 生成")
+            continue
+
+        regressions = compare_with_baseline(result, previous, check_timing=not args.no_timing)
+        if regressions:
+            failed = True
+            print(f"❌ 场景 {result['scenario']} 存在性能回归:")
+            for item in regressions:
+                print(f"   - {item}")
+        else:
+            print(f"✅ 场景 {result['scenario']} 未发现性能回归")
+        print()
+
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"✅ 已更新 {len(results)} 个场景的基线")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
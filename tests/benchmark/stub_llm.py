@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基准测试用的确定性桩模型
+
+StubChatModel 不访问任何LLM服务，按固定规则生成回复：
+- 绑定了工具且当前对话中还没有工具结果时，为第一个工具生成一次工具调用
+- 系统提示要求JSON时（信号处理器），返回结构化决策
+- 其余情况返回固定模板的中文分析报告，包含最终交易建议
+
+回复只取决于输入消息，同样的输入总是得到同样的输出，
+配合延迟模型可以模拟真实LLM的响应时间。
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from tradingagents.agents.utils.context_builder import estimate_tokens
+
+
+_REPORT_TEMPLATE = """# {title}
+
+## 核心观点
+基于{ticker}截至{trade_date}的数据，价格在近期均线附近震荡，成交量保持平稳，
+RSI处于中性区间，MACD未出现明显背离。估值处于行业中枢附近，短期利好与利空因素大致平衡。
+
+## 关键数据
+- 参考价格: ¥{price}
+- 支撑位: ¥{support}，阻力位: ¥{resistance}
+- 风险评分: 0.5，置信度: 0.7
+
+## 风险提示
+宏观环境和行业政策变化可能导致股价波动加大，需关注成交量变化。
+
+最终交易建议: **持有**
+目标价 ¥{target}
+"""
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for item in content:
+            if isinstance(item, dict):
+                parts.append(str(item.get("text", "")))
+            else:
+                parts.append(str(item))
+        return "".join(parts)
+    return str(content)
+
+
+class StubChatModel(BaseChatModel):
+    """确定性的桩聊天模型"""
+
+    model_name: str = "stub-model"
+    ticker: str = "000001"
+    trade_date: str = "2025-06-02"
+    latency_model: Optional[Any] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model_name": self.model_name}
+
+    def bind_tools(self, tools, **kwargs):
+        """绑定工具，工具描述以OpenAI格式传给_generate"""
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        return self.bind(tools=formatted, **kwargs)
+
+    def _tool_args(self, tool: Dict[str, Any]) -> Dict[str, Any]:
+        """根据工具参数名生成调用参数"""
+        end = datetime.strptime(self.trade_date, "%Y-%m-%d")
+        start = (end - timedelta(days=30)).strftime("%Y-%m-%d")
+        properties = tool.get("function", {}).get("parameters", {}).get("properties", {})
+
+        args = {}
+        for name, schema in properties.items():
+            lowered = name.lower()
+            if any(key in lowered for key in ("ticker", "symbol", "stock_code", "code", "query", "company")):
+                args[name] = self.ticker
+            elif lowered == "start_date":
+                args[name] = start
+            elif "date" in lowered:
+                args[name] = self.trade_date
+            elif schema.get("type") == "integer":
+                args[name] = schema.get("default", 30) or 30
+            elif "indicator" in lowered:
+                args[name] = "rsi"
+            elif "default" in schema:
+                args[name] = schema["default"]
+            else:
+                args[name] = ""
+        return args
+
+    def _report(self, messages: List[BaseMessage]) -> str:
+        system = next((m for m in messages if isinstance(m, SystemMessage)), None)
+        title_source = _message_text(system or messages[0])[:40].strip().splitlines()
+        title = title_source[0] if title_source else "分析报告"
+        price = 10.0 + int(hashlib.md5(self.ticker.encode("utf-8")).hexdigest()[:4], 16) % 1000 / 100
+        return _REPORT_TEMPLATE.format(
+            title=title,
+            ticker=self.ticker,
+            trade_date=self.trade_date,
+            price=f"{price:.2f}",
+            support=f"{price * 0.95:.2f}",
+            resistance=f"{price * 1.05:.2f}",
+            target=f"{price * 1.03:.2f}",
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        prompt_text = "\n".join(_message_text(m) for m in messages)
+        has_tool_results = any(isinstance(m, ToolMessage) for m in messages)
+
+        if tools and not has_tool_results:
+            tool = tools[0]
+            name = tool["function"]["name"]
+            call_id = "call_" + hashlib.md5(f"{name}:{prompt_text}".encode("utf-8")).hexdigest()[:12]
+            message = AIMessage(
+                content="",
+                tool_calls=[{"name": name, "args": self._tool_args(tool), "id": call_id}],
+            )
+        elif "JSON" in prompt_text and "target_price" in prompt_text:
+            decision = {
+                "action": "持有",
+                "target_price": 12.5,
+                "confidence": 0.7,
+                "risk_score": 0.5,
+                "reasoning": "基准测试桩模型的固定决策",
+            }
+            message = AIMessage(content=json.dumps(decision, ensure_ascii=False))
+        else:
+            message = AIMessage(content=self._report(messages))
+
+        input_tokens = estimate_tokens(prompt_text)
+        output_tokens = estimate_tokens(_message_text(message))
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+        if self.latency_model is not None:
+            delay = self.latency_model.llm_delay(input_tokens, output_tokens)
+            if delay > 0:
+                time.sleep(delay)
+
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析检查点测试
+使用桩模型和录制夹具离线运行分析，让Research Manager第一次调用失败，
+验证resume(analysis_id)只重新运行失败的节点及之后的部分，检查点后端的选择和降级，
+以及重启后由持久化的分析ID、股票代码和日期找到原来的检查点
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tests.benchmark.harness import BenchmarkHarness, FixtureDataSource, LatencyModel, list_fixtures, network_blocked
+from tests.benchmark.stub_llm import StubChatModel
+from tradingagents.graph import checkpointing
+from tradingagents.graph.checkpointing import (
+    checkpoint_exists, checkpoint_thread_id, create_checkpointer, is_transient_error,
+)
+
+
+CALLS = {"quick": 0, "deep": 0}
+FAIL_AT_DEEP_CALL = {"value": None}
+
+
+class _CountingModel(StubChatModel):
+    """记录调用次数，可在指定的深度模型调用上失败一次"""
+
+    role: str = "quick"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        CALLS[self.role] += 1
+        if self.role == "deep" and CALLS["deep"] == FAIL_AT_DEEP_CALL["value"]:
+            FAIL_AT_DEEP_CALL["value"] = None
+            raise RuntimeError("模拟LLM服务中断")
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+
+class TestAnalysisCheckpoint(unittest.TestCase):
+    """分析检查点测试类"""
+
+    def setUp(self):
+        CALLS.update(quick=0, deep=0)
+        self.harness = BenchmarkHarness(list_fixtures()[0], latency_scale=0, track_memory=False,
+                                        config_overrides={"checkpoint_backend": "memory"})
+        self.fixture = self.harness.fixture
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.work_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+        self.work_dir.cleanup()
+
+    def _graph(self):
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+        ticker, trade_date = self.fixture["ticker"], self.fixture["trade_date"]
+        quick = _CountingModel(role="quick", ticker=ticker, trade_date=trade_date)
+        deep = _CountingModel(role="deep", ticker=ticker, trade_date=trade_date)
+        return TradingAgentsGraph(["market"], config=self.harness._build_config(),
+                                  deep_thinking_llm=deep, quick_thinking_llm=quick)
+
+    def test_resume_reruns_only_failed_node(self):
+        """测试Research Manager失败后恢复，不重新运行分析师和多空辩论"""
+        ticker, trade_date = self.fixture["ticker"], self.fixture["trade_date"]
+
+        with network_blocked(), FixtureDataSource(self.fixture, LatencyModel(scale=0)).installed():
+            # 先完整运行一次，得到一次分析的调用次数
+            self._graph().propagate(ticker, trade_date)
+            expected = dict(CALLS)
+            CALLS.update(quick=0, deep=0)
+
+            # 深度模型第一次调用来自Research Manager
+            FAIL_AT_DEEP_CALL["value"] = 1
+            graph = self._graph()
+            with self.assertRaises(RuntimeError):
+                graph.propagate(ticker, trade_date, analysis_id="analysis_test")
+            self.assertTrue(graph.has_checkpoint("analysis_test"))
+
+            final_state, decision = graph.resume("analysis_test")
+
+        self.assertTrue(final_state["final_trade_decision"])
+        self.assertIn(decision["action"], ("买入", "持有", "卖出"))
+        # 快速模型调用总数与一次完整分析相同，深度模型只多了失败的那一次
+        self.assertEqual(CALLS["quick"], expected["quick"])
+        self.assertEqual(CALLS["deep"], expected["deep"] + 1)
+        # 分析完成后检查点被清理
+        self.assertFalse(graph.has_checkpoint("analysis_test"))
+
+    def test_resume_without_checkpoint(self):
+        """测试没有检查点时resume报错"""
+        with network_blocked(), FixtureDataSource(self.fixture, LatencyModel(scale=0)).installed():
+            graph = self._graph()
+        with self.assertRaises(ValueError):
+            graph.resume("analysis_missing")
+
+    def test_backend_selection(self):
+        """测试未启用时不创建检查点，持久化后端不可用时退回内存"""
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        self.assertIsNone(create_checkpointer({"checkpoint_backend": ""}))
+        self.assertIsNone(create_checkpointer({"checkpoint_backend": "unknown"}))
+        with patch.dict("tradingagents.graph.checkpointing._FACTORIES",
+                        {"sqlite": lambda config: (_ for _ in ()).throw(ImportError("no sqlite saver"))}):
+            self.assertIsInstance(create_checkpointer({"checkpoint_backend": "auto"}), InMemorySaver)
+
+    def test_thread_id_stable_across_restarts(self):
+        """测试检查点线程ID由分析ID、股票代码和日期决定，无需构建分析图即可判断能否继续"""
+        thread_id = checkpoint_thread_id("analysis_1a2b", " aapl", "2025-06-02")
+        self.assertEqual(thread_id, checkpoint_thread_id("analysis_1a2b", "AAPL", "2025-06-02"))
+        self.assertNotEqual(thread_id, checkpoint_thread_id("analysis_1a2b", "AAPL", "2025-06-03"))
+
+        class _PersistentSaver:
+            threads = {thread_id}
+
+            def get_tuple(self, config):
+                return object() if config["configurable"]["thread_id"] in self.threads else None
+
+        with patch.dict("tradingagents.graph.checkpointing._FACTORIES", {"sqlite": lambda config: _PersistentSaver()}):
+            self.assertTrue(checkpoint_exists({"checkpoint_backend": "sqlite"}, thread_id))
+            self.assertFalse(checkpoint_exists({"checkpoint_backend": "sqlite"}, "analysis_other:AAPL:2025-06-02"))
+        # 内存检查点随分析图一起丢失，不能用于重启后继续
+        self.assertFalse(checkpoint_exists({"checkpoint_backend": "memory"}, thread_id))
+
+    def test_sqlite_connection_shared_per_path(self):
+        """测试同一SQLite文件在进程内只打开一个连接，退出时统一关闭"""
+        import sqlite3
+        import types
+
+        class _SqliteSaver:
+            def __init__(self, conn):
+                self.conn = conn
+
+        module = types.ModuleType("langgraph.checkpoint.sqlite")
+        module.SqliteSaver = _SqliteSaver
+        config = {"checkpoint_backend": "sqlite",
+                  "checkpoint_db_path": os.path.join(self.work_dir.name, "checkpoints.sqlite")}
+        with patch.dict(sys.modules, {"langgraph.checkpoint.sqlite": module}), \
+                patch.dict(checkpointing._sqlite_savers, clear=True):
+            first = create_checkpointer(config)
+            self.assertIs(create_checkpointer(dict(config)), first)
+            checkpointing.close_sqlite_checkpointers()
+            self.assertEqual(checkpointing._sqlite_savers, {})
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.conn.execute("select 1")
+
+    def test_transient_errors(self):
+        """测试只有网络、超时和限流中断才从检查点重试"""
+
+        class RateLimitError(Exception):
+            pass
+
+        class _HTTPError(Exception):
+            status_code = 503
+
+        self.assertTrue(is_transient_error(TimeoutError("timed out")))
+        self.assertTrue(is_transient_error(ConnectionResetError("reset")))
+        self.assertTrue(is_transient_error(RateLimitError("429")))
+        self.assertTrue(is_transient_error(_HTTPError()))
+        try:
+            try:
+                raise TimeoutError("read timeout")
+            except TimeoutError as e:
+                raise RuntimeError("节点执行失败") from e
+        except RuntimeError as wrapped:
+            self.assertTrue(is_transient_error(wrapped))
+        self.assertFalse(is_transient_error(KeyError("market_report")))
+        self.assertFalse(is_transient_error(RuntimeError("模拟LLM服务中断")))
+
+
+if __name__ == '__main__':
+    unittest.main()
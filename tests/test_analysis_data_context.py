@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单次分析数据上下文测试
+验证数据接口结果在一次分析内只获取一次、失败结果不记忆、并发请求合并以及上下文在图节点线程中可见
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+from typing import TypedDict
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.data_context import (
+    AnalysisDataContext,
+    analysis_memoized,
+    get_current_data_context,
+)
+
+
+class TestAnalysisDataContext(unittest.TestCase):
+    """单次分析数据上下文测试类"""
+
+    def setUp(self):
+        self.calls = []
+
+        @analysis_memoized("stock_data")
+        def fetch_stock_data(symbol, start_date=None, end_date=None):
+            self.calls.append((symbol, start_date, end_date))
+            if symbol == "BAD":
+                return f"❌ 无法获取{symbol}数据"
+            return f"{symbol}:{start_date}:{end_date}"
+
+        self.fetch = fetch_stock_data
+
+    def test_passthrough_without_context(self):
+        """测试没有激活上下文时直接调用"""
+        self.assertIsNone(get_current_data_context())
+        self.fetch("000001", "2025-01-01", "2025-01-31")
+        self.fetch("000001", "2025-01-01", "2025-01-31")
+        self.assertEqual(len(self.calls), 2)
+
+    def test_memoized_within_context(self):
+        """测试同一(股票, 数据集, 区间)在一次分析中只获取一次"""
+        context = AnalysisDataContext("test")
+        with context.activate():
+            first = self.fetch("000001", "2025-01-01", "2025-01-31")
+            second = self.fetch("000001", "2025-01-01", "2025-01-31")
+            self.fetch("000001", "2025-01-01", "2025-02-28")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(context.stats()["hits"], 1)
+        self.assertEqual(context.stats()["misses"], 2)
+
+        # 上下文退出后不再记忆
+        self.fetch("000001", "2025-01-01", "2025-01-31")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_failures_not_memoized(self):
+        """测试失败结果不记入上下文"""
+        context = AnalysisDataContext()
+        with context.activate():
+            self.fetch("BAD")
+            self.fetch("BAD")
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(context.stats()["entries"], 0)
+
+    def test_concurrent_requests_fetch_once(self):
+        """测试并发请求同一数据时只获取一次"""
+        fetch_count = []
+
+        @analysis_memoized("slow_data")
+        def slow_fetch(symbol):
+            fetch_count.append(symbol)
+            time.sleep(0.2)
+            return f"data:{symbol}"
+
+        context = AnalysisDataContext()
+        results = []
+
+        def worker():
+            with context.activate():
+                results.append(slow_fetch("AAPL"))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(fetch_count, ["AAPL"])
+        self.assertEqual(results, ["data:AAPL"] * 5)
+
+    def test_context_visible_in_graph_nodes(self):
+        """测试LangGraph节点中能看到调用方激活的上下文"""
+        from langgraph.graph import END, START, StateGraph
+
+        class State(TypedDict):
+            result: str
+
+        def node(state):
+            return {"result": self.fetch("000001", "2025-01-01", "2025-01-31")}
+
+        builder = StateGraph(State)
+        builder.add_node("first", node)
+        builder.add_node("second", node)
+        builder.add_edge(START, "first")
+        builder.add_edge("first", "second")
+        builder.add_edge("second", END)
+        graph = builder.compile()
+
+        context = AnalysisDataContext()
+        with context.activate():
+            self.fetch("000001", "2025-01-01", "2025-01-31")  # 模拟验证阶段预获取
+        graph_result = list(context.iterate(graph.stream({"result": ""})))
+
+        self.assertTrue(graph_result)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(context.stats()["hits"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
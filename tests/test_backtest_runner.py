@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+时间点回测测试
+验证行情在整个回测中只加载一次、各日期只能看到该日期及之前的数据、
+反思在收益实现后按顺序写入、并发运行以及收益汇总
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.data_context import analysis_memoized
+from tradingagents.dataflows.point_in_time import history_frame
+from tradingagents.graph.backtest import BacktestRunner
+
+
+CLOSES = [10.0, 11.0, 12.1, 10.89, 11.979]
+DATES = ["2025-06-02", "2025-06-03", "2025-06-04", "2025-06-05", "2025-06-06"]
+ACTIONS = {"2025-06-02": "买入", "2025-06-03": "持有", "2025-06-04": "卖出", "2025-06-05": "买入"}
+
+
+class _PriceSource:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, symbol, start_date, end_date):
+        with self.lock:
+            self.calls.append((symbol, start_date, end_date))
+        frame = pd.DataFrame({"trade_date": [d.replace("-", "") for d in DATES], "close": CLOSES})
+        dates = pd.to_datetime(frame["trade_date"])
+        return frame[(dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))]
+
+
+@analysis_memoized("test_news")
+def _news(ticker, curr_date):
+    return f"{ticker} news until {curr_date}"
+
+
+class _FakeGraph:
+    """记录每个日期看到的数据，按预设动作给出决策"""
+
+    def __init__(self, prices, seen, reflections):
+        self.prices = prices
+        self.seen = seen
+        self.reflections = reflections
+
+    def propagate(self, symbol, trade_date, data_context=None):
+        with data_context.activate():
+            frame = history_frame("test_daily", symbol, "2025-05-01", "2025-12-31", self.prices)
+            news = _news(symbol, "2099-01-01")
+        self.seen[trade_date] = (frame["trade_date"].max(), news, list(self.reflections))
+        return {}, {"action": ACTIONS.get(trade_date, "持有")}
+
+    def reflect_and_remember(self, returns_losses):
+        self.reflections.append(round(returns_losses, 4))
+
+
+class TestBacktestRunner(unittest.TestCase):
+    """时间点回测测试类"""
+
+    def _runner(self, reflect=True, max_workers=1):
+        self.prices = _PriceSource()
+        self.seen, self.reflections = {}, []
+        return BacktestRunner(lambda: _FakeGraph(self.prices, self.seen, self.reflections), "000001",
+                              "2025-06-02", "2025-06-05", price_loader=self.prices, price_dataset="test_daily",
+                              lookback_days=60, reflect=reflect, max_workers=max_workers)
+
+    def test_point_in_time_slices_and_single_load(self):
+        """测试各日期只看到当日及之前的数据，行情只加载一次"""
+        report = self._runner().run()
+
+        self.assertEqual([day.trade_date for day in report.days], DATES[:4])
+        for date, (last_bar, news, _) in self.seen.items():
+            self.assertEqual(last_bar, date.replace("-", ""))
+            self.assertEqual(news, f"000001 news until {date}")
+        self.assertEqual(len(self.prices.calls), 1)
+        self.assertEqual(report.summary["data"]["loads"], 1)
+        self.assertEqual(report.summary["data"]["slices"], 4)
+
+    def test_reflection_after_return_realized(self):
+        """测试某日的收益在下一个分析日之前写入记忆"""
+        self._runner().run()
+        self.assertEqual(self.seen["2025-06-02"][2], [])
+        self.assertEqual(self.seen["2025-06-04"][2], [0.1, 0.1])
+
+    def test_performance_summary(self):
+        """测试仓位和收益汇总"""
+        report = self._runner().run()
+        positions = [day.position for day in report.days]
+        self.assertEqual(positions, [1, 1, 0, 1])
+        summary = report.summary
+        self.assertAlmostEqual(summary["cumulative_return"], 1.1 * 1.1 * 1.1 - 1)
+        self.assertAlmostEqual(summary["benchmark_return"], CLOSES[4] / CLOSES[0] - 1)
+        self.assertAlmostEqual(summary["win_rate"], 1.0)
+        self.assertEqual(summary["actions"], {"买入": 2, "持有": 1, "卖出": 1})
+        self.assertEqual(len(report.to_frame()), 4)
+
+    def test_concurrent_dates_without_reflection(self):
+        """测试关闭反思时多线程并发运行，结果与顺序运行一致"""
+        sequential = self._runner(reflect=False).run()
+        concurrent = self._runner(reflect=False, max_workers=3).run()
+        self.assertEqual([d.position for d in concurrent.days], [d.position for d in sequential.days])
+        self.assertEqual(concurrent.summary["cumulative_return"], sequential.summary["cumulative_return"])
+        self.assertEqual(len(self.prices.calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
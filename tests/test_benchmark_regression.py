@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线基准测试回归检查
+使用桩模型和录制夹具运行完整分析流程（不模拟延迟），
+验证流程离线可用，并且LLM调用次数、提示词token和数据接口调用次数不超过基线
+"""
+
+import os
+import sys
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tests.benchmark.harness import (
+    BenchmarkHarness,
+    LatencyModel,
+    compare_with_baseline,
+    list_fixtures,
+    load_baseline,
+)
+
+
+class TestBenchmarkRegression(unittest.TestCase):
+    """离线基准测试回归检查类"""
+
+    def test_latency_model_is_deterministic(self):
+        """测试延迟模型在相同种子下结果可复现"""
+        first = LatencyModel(scale=1.0, seed=7)
+        second = LatencyModel(scale=1.0, seed=7)
+        self.assertEqual(
+            [first.source_delay("tushare") for _ in range(5)],
+            [second.source_delay("tushare") for _ in range(5)],
+        )
+        self.assertEqual(LatencyModel(scale=0).llm_delay(1000, 1000), 0.0)
+
+    def test_scenarios_against_baseline(self):
+        """测试所有场景离线运行且调用量不超过基线"""
+        baseline = load_baseline()
+        fixtures = list_fixtures()
+        self.assertTrue(fixtures, "缺少基准测试夹具")
+
+        for fixture in fixtures:
+            with self.subTest(scenario=fixture.stem):
+                result = BenchmarkHarness(fixture, latency_scale=0, track_memory=False).run()
+
+                self.assertTrue(result["validation_ok"])
+                self.assertEqual(result["missing_datasets"], [])
+                self.assertIn(result["decision"], ("买入", "持有", "卖出"))
+                self.assertIn("Risk Judge", result["nodes"])
+
+                self.assertIn(fixture.stem, baseline)
+                regressions = compare_with_baseline(result, baseline[fixture.stem], check_timing=False)
+                self.assertEqual(regressions, [], "\n".join(regressions))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+盘前缓存预热测试
+验证美股用一次 yf.download、A股按交易日批量调用Tushare daily、港股经统一接口逐只预热行情，
+预热写入的缓存与分析时的缓存键一致，主数据源或健康度排序不同时仍然使用批量获取的行情；
+Tushare批量结果与逐只获取一致，
+股票基本信息从股票列表中查找，以及限速和后台服务的调度
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.cache_manager import StockDataCache
+from tradingagents.dataflows.cache_warmer import (
+    CacheWarmer, RateLimiter, WarmTask, completed_trading_days, split_download,
+)
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.data_types import StockDataResult
+from tradingagents.dataflows.source_health import SourceHealthRegistry
+from tradingagents.dataflows.trading_calendar import get_trading_calendar
+from tradingagents.dataflows.tushare_utils import TushareProvider
+
+SESSION = date(2025, 6, 10)
+
+
+def _bars(start, end, base=100.0):
+    index = pd.bdate_range(start, end)
+    close = [base + i for i in range(len(index))]
+    return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                         "Volume": [1000] * len(index), "Dividends": 0.0, "Stock Splits": 0.0}, index=index)
+
+
+class _FakeTushareApi:
+    """daily 按交易日返回全市场行情，按股票代码返回单只股票的区间行情"""
+
+    def __init__(self, ts_codes, trade_dates):
+        rows = []
+        for i, trade_date in enumerate(trade_dates):
+            for j, ts_code in enumerate(ts_codes):
+                rows.append({"ts_code": ts_code, "trade_date": trade_date, "open": 10.0 + i, "high": 11.0 + i,
+                             "low": 9.0 + i, "close": 10.0 + i + j, "pct_chg": 1.0 + j, "vol": 100.0, "amount": 1000.0})
+        self.rows = pd.DataFrame(rows)
+        self.daily_calls = []
+        self.stock_basic_calls = []
+
+    def daily(self, ts_code=None, trade_date=None, start_date=None, end_date=None):
+        self.daily_calls.append(trade_date or ts_code)
+        if trade_date:
+            return self.rows[self.rows["trade_date"] == trade_date].copy()
+        mask = (self.rows["ts_code"] == ts_code) & (self.rows["trade_date"] >= start_date) & (self.rows["trade_date"] <= end_date)
+        return self.rows[mask].sort_values("trade_date", ascending=False).copy()
+
+    def stock_basic(self, **kwargs):
+        self.stock_basic_calls.append(kwargs)
+        return pd.DataFrame([{"ts_code": "000001.SZ", "symbol": "000001", "name": "平安银行", "area": "深圳",
+                              "industry": "银行", "market": "主板", "list_date": "19910403"}])
+
+
+def _manager(current):
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.default_source = current
+    manager.current_source = current
+    manager.available_sources = [current.value]
+    manager.health = SourceHealthRegistry()
+    manager.hedging = False
+    return manager
+
+
+class TestCacheWarmer(unittest.TestCase):
+    """盘前缓存预热测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = StockDataCache(self.tmp_dir.name)
+
+    def test_split_download(self):
+        """测试把 yf.download 的多只股票结果拆成每只股票的行情表"""
+        frame = pd.concat({"AAPL": _bars("2025-06-02", "2025-06-06"),
+                           "MSFT": _bars("2025-06-04", "2025-06-06")}, axis=1)
+        frames = split_download(frame, ["AAPL", "MSFT", "NVDA"])
+        self.assertEqual(sorted(frames), ["AAPL", "MSFT"])
+        self.assertEqual(len(frames["AAPL"]), 5)
+        # 上市较晚的股票去掉全空的行
+        self.assertEqual(len(frames["MSFT"]), 3)
+        self.assertIn("Close", frames["MSFT"].columns)
+
+    def test_us_bars_warmed_with_one_download(self):
+        """测试美股行情一次 yf.download 获取，按分析请求的窗口写入缓存且不逐只请求"""
+        from tradingagents.dataflows.optimized_us_data import OptimizedUSDataProvider
+
+        provider = OptimizedUSDataProvider()
+        provider.cache = self.cache
+        provider.min_api_interval = 0
+        downloaded = pd.concat({"AAPL": _bars("2025-05-01", "2025-06-10"),
+                                "MSFT": _bars("2025-05-01", "2025-06-10", base=300.0)}, axis=1)
+        warmer = CacheWarmer({"us": ["AAPL", "MSFT"]}, lookback_days=[30], calls_per_minute=0)
+
+        with patch("yfinance.download", return_value=downloaded) as download, \
+                patch("tradingagents.dataflows.optimized_us_data.yfinance_history",
+                      side_effect=AssertionError("不应逐只获取")), \
+                patch.object(provider, "_get_data_from_finnhub", side_effect=AssertionError("不应请求Finnhub")), \
+                patch("tradingagents.dataflows.optimized_us_data.get_optimized_us_data_provider",
+                      return_value=provider):
+            report = warmer.warm_market("us", SESSION)
+
+            # 分析时（先查Finnhub缓存，再查Yahoo Finance缓存）直接命中预热的缓存，不再请求接口
+            start_date = (SESSION - timedelta(days=30)).isoformat()
+            self.assertIn("MSFT", provider.get_stock_data("MSFT", start_date, SESSION.isoformat()))
+
+        self.assertEqual(download.call_count, 1)
+        self.assertEqual(sorted(download.call_args[0][0]), ["AAPL", "MSFT"])
+        bars = report.tasks[0]
+        self.assertEqual((bars.name, bars.warmed, bars.failed, bars.requests), ("bars", ["AAPL", "MSFT"], [], 1))
+
+        cache_key = self.cache.find_cached_stock_data("AAPL", start_date, SESSION.isoformat(), data_source="yfinance",
+                                                      max_age_hours=1)
+        self.assertIsNotNone(cache_key)
+        self.assertIn("AAPL", self.cache.load_stock_data(cache_key))
+
+    def test_china_bars_batched_by_trade_date(self):
+        """测试A股行情按交易日批量获取，经数据源管理器写入结构化结果缓存"""
+        from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+        provider = OptimizedChinaDataProvider()
+        provider.cache = self.cache
+        provider.min_api_interval = 0
+
+        adapter = MagicMock()
+        adapter.get_stock_data.side_effect = AssertionError("不应逐只获取")
+        adapter.get_stock_info.return_value = {"name": "平安银行"}
+
+        def _batch(symbols, trade_dates, throttle=None):
+            for _ in trade_dates:
+                throttle()
+            dates = pd.to_datetime(trade_dates)
+            return {symbol: pd.DataFrame({"trade_date": dates, "close": range(len(dates)), "volume": 100})
+                    for symbol in symbols}
+        adapter.get_stock_data_by_trade_dates.side_effect = _batch
+
+        warmer = CacheWarmer({"china": ["000001", "600036"]}, lookback_days=[30], calls_per_minute=0)
+        with patch("tradingagents.dataflows.data_source_manager.get_data_source_manager",
+                   return_value=_manager(ChinaDataSource.TUSHARE)), \
+                patch("tradingagents.dataflows.tushare_adapter.get_tushare_adapter", return_value=adapter), \
+                patch("tradingagents.dataflows.optimized_china_data.get_optimized_china_data_provider",
+                      return_value=provider), \
+                patch.object(CacheWarmer, "_warm_china_info", return_value=WarmTask("security_info")), \
+                patch.object(CacheWarmer, "_warm_china_financials", return_value=WarmTask("financials")):
+            report = warmer.warm_market("china", SESSION)
+
+        trade_dates = adapter.get_stock_data_by_trade_dates.call_args[0][1]
+        calendar = get_trading_calendar("china")
+        self.assertTrue(all(calendar.is_trading_day(datetime.strptime(d, "%Y%m%d").date()) for d in trade_dates))
+        self.assertLessEqual(max(trade_dates), SESSION.strftime("%Y%m%d"))
+
+        bars = next(task for task in report.tasks if task.name == "bars")
+        self.assertEqual(bars.warmed, ["000001", "600036"])
+        self.assertEqual(bars.requests, len(trade_dates))
+        self.assertEqual([task.name for task in report.tasks], ["security_info", "bars", "financials"])
+
+        start_date = (SESSION - timedelta(days=30)).isoformat()
+        cache_key = self.cache.find_cached_stock_data("600036", start_date, SESSION.isoformat(),
+                                                      data_source=provider.RESULT_CACHE_SOURCE, max_age_hours=1)
+        self.assertIsNotNone(cache_key)
+
+    def test_china_preload_used_when_health_prefers_other_source(self):
+        """测试健康度排序把其他数据源排在Tushare前面时，预加载的股票仍从Tushare切片而不逐只请求"""
+        from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+        provider = OptimizedChinaDataProvider()
+        provider.cache = self.cache
+        provider.min_api_interval = 0
+        manager = _manager(ChinaDataSource.TUSHARE)
+        manager.available_sources = [ChinaDataSource.TUSHARE.value, ChinaDataSource.AKSHARE.value]
+
+        adapter = MagicMock()
+        adapter.get_stock_data.return_value = pd.DataFrame()
+        adapter.get_stock_info.return_value = {"name": "平安银行"}
+        adapter.get_stock_data_by_trade_dates.side_effect = lambda symbols, trade_dates, throttle=None: {
+            "000001": pd.DataFrame({"trade_date": pd.to_datetime(trade_dates), "close": 10.0, "volume": 100})}
+
+        warmer = CacheWarmer({"china": ["000001", "600036"]}, lookback_days=[30], calls_per_minute=0)
+        with patch("tradingagents.dataflows.data_source_manager.get_data_source_manager", return_value=manager), \
+                patch.object(manager, "_ordered_sources",
+                             return_value=[ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE]), \
+                patch.object(DataSourceManager, "_get_akshare_data",
+                             return_value=StockDataResult.failure("600036", "", "", "akshare", "❌ 无数据")) as akshare, \
+                patch("tradingagents.dataflows.tushare_adapter.get_tushare_adapter", return_value=adapter), \
+                patch("tradingagents.dataflows.optimized_china_data.get_optimized_china_data_provider",
+                      return_value=provider), \
+                patch.object(CacheWarmer, "_warm_china_info", return_value=WarmTask("security_info")), \
+                patch.object(CacheWarmer, "_warm_china_financials", return_value=WarmTask("financials")):
+            report = warmer.warm_market("china", SESSION)
+
+        bars = next(task for task in report.tasks if task.name == "bars")
+        self.assertEqual(bars.warmed, ["000001"])
+        # 只有没有预加载的股票按健康度顺序逐只获取（并计入限速）
+        self.assertEqual([call.args[0] for call in akshare.call_args_list], ["600036"])
+        self.assertEqual({call.args[0] for call in adapter.get_stock_data.call_args_list}, {"600036"})
+        self.assertEqual(bars.requests, 1)
+
+        start_date = (SESSION - timedelta(days=30)).isoformat()
+        cached = provider.get_stock_data_result("000001", start_date, SESSION.isoformat())
+        self.assertEqual((cached.ok, cached.source), (True, "tushare"))
+
+    def test_hk_bars_warmed_into_unified_cache(self):
+        """测试港股行情经统一接口逐只预热，分析时直接命中缓存不再请求数据源"""
+        from tradingagents.dataflows import interface
+
+        fetches = []
+
+        def fetch(symbol, start_date, end_date):
+            fetches.append(symbol)
+            return f"# {symbol} 港股数据 {start_date} ~ {end_date}"
+
+        warmer = CacheWarmer({"hk": ["0700.HK", "9988.HK"]}, lookback_days=[30], calls_per_minute=0)
+        with patch("tradingagents.dataflows.cache_manager.get_cache", return_value=self.cache), \
+                patch.object(interface, "_fetch_hk_stock_data", side_effect=fetch):
+            report = warmer.warm_market("hk", SESSION)
+
+            start_date = (SESSION - timedelta(days=30)).isoformat()
+            data = interface.get_hk_stock_data_unified("0700.HK", start_date, SESSION.isoformat())
+
+        self.assertEqual(fetches, ["0700.HK", "9988.HK"])
+        self.assertEqual(data, f"# 0700.HK 港股数据 {start_date} ~ {SESSION.isoformat()}")
+        bars = report.tasks[0]
+        self.assertEqual((bars.name, bars.warmed, bars.failed, bars.requests), ("bars", ["0700.HK", "9988.HK"], [], 2))
+
+    def test_tushare_batch_matches_single_stock(self):
+        """测试按交易日批量获取的日线与逐只获取一致，缺少交易日时放弃批量结果"""
+        trade_dates = ["20250603", "20250604", "20250605", "20250606"]
+        provider = TushareProvider(token=None, enable_cache=False)
+        provider.connected = True
+        provider.api = _FakeTushareApi(["000001.SZ", "600036.SH", "000002.SZ"], trade_dates)
+
+        throttle = MagicMock()
+        frames = provider.get_daily_by_trade_dates(["000001", "600036"], trade_dates, throttle=throttle)
+        self.assertEqual(provider.api.daily_calls, trade_dates)
+        self.assertEqual(throttle.call_count, len(trade_dates))
+        self.assertEqual(sorted(frames), ["000001", "600036"])
+
+        single = provider.get_stock_daily("600036", "2025-06-03", "2025-06-06")
+        pd.testing.assert_frame_equal(frames["600036"].reset_index(drop=True), single.reset_index(drop=True))
+
+        provider.api.daily = MagicMock(side_effect=[provider.api.rows.head(3), Exception("限流")])
+        self.assertEqual(provider.get_daily_by_trade_dates(["000001"], trade_dates[:2]), {})
+
+    def test_stock_info_from_stock_list(self):
+        """测试加载股票列表后，股票基本信息不再逐只调用 stock_basic"""
+        provider = TushareProvider(token=None, enable_cache=False)
+        provider.connected = True
+        provider.api = _FakeTushareApi([], [])
+
+        provider.get_stock_list()
+        info = provider.get_stock_info("000001")
+        self.assertEqual((info["name"], info["industry"], info["ts_code"]), ("平安银行", "银行", "000001.SZ"))
+        self.assertEqual(len(provider.api.stock_basic_calls), 1)
+
+        # 股票列表中没有的股票仍然调用接口
+        provider.get_stock_info("600036")
+        self.assertEqual(len(provider.api.stock_basic_calls), 2)
+
+    def test_rate_limiter_and_completed_days(self):
+        """测试限速间隔，以及只预热已经收盘的交易日"""
+        limiter = RateLimiter(calls_per_minute=600)
+        started = time.monotonic()
+        for _ in range(3):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+        self.assertEqual(limiter.calls, 3)
+
+        calendar = get_trading_calendar("us")
+        # 周三盘前：周一、周二已收盘，周三尚未收盘，周末不是交易日
+        before_open = datetime(2025, 6, 11, 13, 0, tzinfo=timezone.utc)
+        days = completed_trading_days(calendar, date(2025, 6, 7), date(2025, 6, 11), now=before_open)
+        self.assertEqual(days, [date(2025, 6, 9), date(2025, 6, 10)])
+        after_close = datetime(2025, 6, 11, 21, 0, tzinfo=timezone.utc)
+        self.assertEqual(completed_trading_days(calendar, date(2025, 6, 11), date(2025, 6, 11), now=after_close),
+                         [date(2025, 6, 11)])
+
+    def test_session_open_and_service_schedule(self):
+        """测试下一个交易日开盘跳过午间开盘，服务在开盘前预热且每个交易日只预热一次"""
+        calendar = get_trading_calendar("china")
+        lunch = datetime(2025, 6, 10, 12, 0, tzinfo=calendar.tz)
+        self.assertEqual(calendar.next_open(lunch).hour, 13)
+        self.assertEqual(calendar.next_session_open(lunch), datetime(2025, 6, 11, 9, 30, tzinfo=calendar.tz))
+
+        open_at = datetime.now(timezone.utc) + timedelta(minutes=10)
+        fake_calendar = MagicMock()
+        fake_calendar.next_session_open.return_value = open_at
+        warmer = CacheWarmer({"us": ["AAPL"]}, calls_per_minute=0)
+        reports = []
+
+        def _on_report(report):
+            reports.append(report)
+            warmer.stop()
+
+        with patch("tradingagents.dataflows.cache_warmer.get_trading_calendar", return_value=fake_calendar), \
+                patch.object(CacheWarmer, "warm_market", side_effect=lambda market, session: (market, session)) as warm:
+            thread = warmer.start(lead_minutes=30, on_report=_on_report)
+            thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        warm.assert_called_once_with("us", open_at.date())
+        self.assertEqual(reports, [("us", open_at.date())])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+辩论上下文构建器测试
+验证报告摘要缓存、token预算控制和辩论历史截断
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.agents.utils.context_builder import (
+    DebateContextBuilder,
+    HISTORY_OMITTED_NOTE,
+    build_report_digest,
+    estimate_tokens,
+)
+
+
+def _make_report(title, lines=300):
+    """构造一份较长的分析报告"""
+    body = [f"# {title}"]
+    for i in range(lines):
+        if i % 50 == 0:
+            body.append(f"## 第{i // 50 + 1}部分")
+        elif i % 10 == 0:
+            body.append(f"投资建议：第{i}行建议持有，目标价{100 + i}元")
+        else:
+            body.append(f"这是一段普通的描述性文字，用于填充报告内容，编号{i}。")
+    return "\n".join(body)
+
+
+def _make_state():
+    return {
+        "company_of_interest": "000001",
+        "market_report": _make_report("市场分析"),
+        "sentiment_report": _make_report("情绪分析"),
+        "news_report": _make_report("新闻分析"),
+        "fundamentals_report": _make_report("基本面分析"),
+        "report_digests": {},
+    }
+
+
+class TestDebateContextBuilder(unittest.TestCase):
+    """辩论上下文构建器测试类"""
+
+    def setUp(self):
+        self.config = {
+            "debate_context_budget_tokens": 3000,
+            "judge_context_budget_tokens": 6000,
+            "report_digest_tokens": 500,
+            "debate_history_budget_ratio": 0.4,
+        }
+        self.builder = DebateContextBuilder(self.config)
+
+    def test_estimate_tokens(self):
+        """测试token估算"""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("中文"), 2)
+        self.assertEqual(estimate_tokens("abcd"), 1)
+
+    def test_digest_keeps_headings_and_key_lines(self):
+        """测试摘要保留标题和关键结论行"""
+        report = _make_report("市场分析")
+        digest = build_report_digest(report, 300)
+        self.assertLessEqual(estimate_tokens(digest), 300)
+        self.assertIn("# 市场分析", digest)
+        self.assertIn("投资建议", digest)
+
+    def test_context_within_budget(self):
+        """测试组装后的上下文不超过预算"""
+        state = _make_state()
+        history = "\n".join(f"Bull Analyst: 第{i}轮看涨论点" * 20 for i in range(50))
+
+        context = self.builder.build(state, history)
+        used = sum(estimate_tokens(context[field]) for field in
+                   ("market_report", "sentiment_report", "news_report", "fundamentals_report"))
+        used += estimate_tokens(context["history"])
+
+        self.assertLessEqual(used, 3000 + 50)
+        self.assertTrue(context["history"].startswith(HISTORY_OMITTED_NOTE))
+        # 最近的发言必须保留
+        self.assertIn("第49轮看涨论点", context["history"])
+
+    def test_full_reports_when_budget_allows(self):
+        """测试预算足够时使用完整报告"""
+        state = _make_state()
+        state["market_report"] = "短报告"
+        for field in ("sentiment_report", "news_report", "fundamentals_report"):
+            state[field] = ""
+
+        context = self.builder.build(state, "")
+        self.assertEqual(context["market_report"], "短报告")
+
+    def test_digests_cached_in_state(self):
+        """测试摘要缓存在状态中，报告不变时不重复生成"""
+        state = _make_state()
+        digests = self.builder.get_report_digests(state)
+        state["report_digests"] = digests
+
+        with patch(
+            "tradingagents.agents.utils.context_builder.build_report_digest"
+        ) as mock_digest:
+            cached = self.builder.get_report_digests(state)
+            mock_digest.assert_not_called()
+        self.assertEqual(cached, digests)
+
+        # 报告变化后重新生成对应摘要
+        state["news_report"] = "更新后的新闻报告"
+        updated = self.builder.get_report_digests(state)
+        self.assertEqual(updated["news_report"]["digest"], "更新后的新闻报告")
+        self.assertIs(updated["market_report"], digests["market_report"])
+
+    def test_bull_researcher_uses_budgeted_context(self):
+        """测试看涨研究员提示词使用预算内上下文并写回摘要"""
+        from tradingagents.agents.researchers.bull_researcher import create_bull_researcher
+
+        llm = MagicMock()
+        llm.invoke.return_value = MagicMock(content="看涨观点")
+        node = create_bull_researcher(llm, None, self.builder)
+
+        state = _make_state()
+        state["investment_debate_state"] = {"history": "", "current_response": "", "count": 0}
+        result = node(state)
+
+        prompt = llm.invoke.call_args[0][0]
+        full_length = sum(len(state[f]) for f in
+                          ("market_report", "sentiment_report", "news_report", "fundamentals_report"))
+        self.assertLess(len(prompt), full_length)
+        self.assertIn("report_digests", result)
+        self.assertEqual(result["investment_debate_state"]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件缓存容量配额测试
+验证写入时超过配额按LRU/LFU增量淘汰、统计来自索引、索引丢失时扫描目录重建、
+按写入时间清理旧缓存，索引记录相对路径，多个进程写回索引时合并而不互相覆盖、合并后淘汰的条目移出L1，
+以及自适应缓存按索引中的过期时间清理文件
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.cache_index import CacheIndex
+from tradingagents.dataflows.cache_manager import StockDataCache
+
+REPORT = "报告" * 2000  # 约12KB
+
+
+class TestFileCacheQuota(unittest.TestCase):
+    """文件缓存容量配额测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _cache(self, quota_kb, policy="lru"):
+        env = {"TRADINGAGENTS_FILE_CACHE_QUOTA_MB": str(quota_kb / 1024),
+               "TRADINGAGENTS_FILE_CACHE_POLICY": policy}
+        with patch.dict(os.environ, env):
+            return StockDataCache(self.tmp_dir.name)
+
+    def test_lru_eviction_on_write(self):
+        """测试超过配额时淘汰最久未读取的条目，文件一并删除"""
+        cache = self._cache(quota_kb=40)
+        keys = [cache.save_fundamentals_data(symbol, REPORT, "openai") for symbol in ("000001", "000002", "000003")]
+        cache.load_fundamentals_data(keys[0])
+
+        cache.save_fundamentals_data("000004", REPORT, "openai")
+
+        self.assertIsNotNone(cache.load_fundamentals_data(keys[0]))
+        self.assertIsNone(cache.load_fundamentals_data(keys[1]))
+        self.assertFalse(cache._get_metadata_path(keys[1]).exists())
+        stats = cache.get_cache_stats()
+        self.assertEqual((stats['fundamentals_count'], stats['evictions']), (3, 1))
+        self.assertLessEqual(stats['total_size_mb'], stats['quota_mb'])
+
+    def test_lfu_eviction(self):
+        """测试LFU策略淘汰读取次数最少的条目"""
+        cache = self._cache(quota_kb=40, policy="lfu")
+        keys = [cache.save_fundamentals_data(symbol, REPORT, "openai") for symbol in ("000001", "000002", "000003")]
+        for key in (keys[0], keys[0], keys[2]):
+            cache.load_fundamentals_data(key)
+        cache.load_fundamentals_data(keys[1])
+        cache.load_fundamentals_data(keys[2])
+
+        cache.save_fundamentals_data("000004", REPORT, "openai")
+        self.assertIsNone(cache.load_fundamentals_data(keys[1]))
+
+    def test_stats_without_directory_walk(self):
+        """测试统计信息来自索引，不再逐个读取元数据文件"""
+        cache = self._cache(quota_kb=0)
+        cache.save_stock_data("000001", "行情", "2025-06-01", "2025-06-04", "tushare")
+        cache.save_news_data("000001", "新闻", data_source="google")
+
+        with patch("tradingagents.dataflows.cache_manager.json.load", side_effect=AssertionError("不应读取元数据")):
+            stats = cache.get_cache_stats()
+        self.assertEqual((stats['total_files'], stats['stock_data_count'], stats['news_count']), (2, 1, 1))
+        self.assertEqual([entry['symbol'] for entry in cache.list_cache_entries("news")], ["000001"])
+
+    def test_rebuild_and_clear_old_cache(self):
+        """测试索引文件丢失时扫描目录重建，清理旧缓存按写入时间"""
+        cache = self._cache(quota_kb=0)
+        key = cache.save_stock_data("000001", "行情", "2025-06-01", "2025-06-04", "tushare")
+        cache.index.flush()
+        os.remove(cache.index.index_path)
+
+        rebuilt = self._cache(quota_kb=0)
+        self.assertEqual(rebuilt.get_cache_stats()['stock_data_count'], 1)
+        self.assertEqual(rebuilt.clear_old_cache(max_age_days=1), 0)
+
+        with patch("tradingagents.dataflows.cache_manager.datetime") as mock_datetime:
+            from datetime import datetime, timedelta
+            mock_datetime.now.return_value = datetime.now() + timedelta(days=2)
+            self.assertEqual(rebuilt.clear_old_cache(max_age_days=1), 1)
+        self.assertFalse(rebuilt._get_metadata_path(key).exists())
+        self.assertEqual(rebuilt.get_cache_stats()['total_files'], 0)
+
+    def test_index_stores_relative_paths(self):
+        """测试索引文件只记录相对缓存目录的路径，缓存目录移动后条目仍可读取和淘汰"""
+        cache = self._cache(quota_kb=1024)
+        key = cache.save_news_data("000001", REPORT, data_source="google")
+        cache.index.flush()
+        with open(cache.index.index_path, 'r', encoding='utf-8') as f:
+            self.assertNotIn(self.tmp_dir.name, f.read())
+
+        moved_dir = os.path.join(self.tmp_dir.name, "moved")
+        os.makedirs(moved_dir)
+        for name in os.listdir(self.tmp_dir.name):
+            if name != "moved":
+                os.rename(os.path.join(self.tmp_dir.name, name), os.path.join(moved_dir, name))
+        index = CacheIndex(os.path.join(moved_dir, "cache_index.json"))
+        files = [index.resolve_path(path) for path in index.get(key)['files']]
+        self.assertTrue(all(path.exists() for path in files))
+        index.remove(key)
+        self.assertFalse(any(path.exists() for path in files))
+
+        # 旧索引中的绝对路径仍然可以解析
+        self.assertEqual(index.resolve_path(str(files[0])), files[0])
+
+    def test_concurrent_flushes_merge(self):
+        """测试两个进程各自写回索引时合并对方的条目，已删除的条目不会被恢复"""
+        index_path = os.path.join(self.tmp_dir.name, "cache_index.json")
+
+        def write(index, name):
+            path = os.path.join(self.tmp_dir.name, f"{name}.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(name)
+            index.record_write(name, [path], "news")
+
+        first, second = CacheIndex(index_path), CacheIndex(index_path)
+        write(first, "a")
+        write(second, "b")
+        first.flush()
+        second.flush()
+        self.assertEqual(sorted(key for key, _ in CacheIndex(index_path).items()), ["a", "b"])
+
+        # 第三个进程加载了a和b，随后第一个进程删除a
+        third = CacheIndex(index_path)
+        first.remove("a")
+        first.flush()
+        write(third, "c")
+        third.flush()
+        self.assertEqual(sorted(key for key, _ in CacheIndex(index_path).items()), ["b", "c"])
+
+        # 本进程删除的条目不会因为索引文件里还有而恢复
+        second.remove("b")
+        second.flush()
+        self.assertEqual(sorted(key for key, _ in CacheIndex(index_path).items()), ["c"])
+
+    def test_merge_evictions_leave_l1(self):
+        """测试写回索引时合并其他进程的条目后超过配额，被淘汰的条目也从L1移除"""
+        first, second = self._cache(quota_kb=40), self._cache(quota_kb=40)
+        first.index.FLUSH_INTERVAL_SECONDS = 0
+        key = first.save_fundamentals_data("000001", REPORT, "openai")
+        self.assertEqual(first.load_fundamentals_data(key), REPORT)
+        for symbol in ("000002", "000003"):
+            second.save_fundamentals_data(symbol, REPORT, "openai")
+        second.index.flush()
+
+        with patch.object(first.index, "on_evict", wraps=first.index.on_evict) as on_evict:
+            first.save_fundamentals_data("000004", REPORT, "openai")
+        on_evict.assert_called_once_with([key])
+        self.assertIsNone(first.memory_cache.get(key))
+        self.assertIsNone(first.load_fundamentals_data(key))
+
+    def test_skipped_count(self):
+        """测试统计中的跳过次数来自实际跳过的写入"""
+        cache = self._cache(quota_kb=0)
+        with patch.object(cache, "should_skip_cache_for_content", return_value=True):
+            cache.save_fundamentals_data("000001", REPORT, "openai")
+        cache.save_fundamentals_data("000002", REPORT, "openai")
+        stats = cache.get_cache_stats()
+        self.assertEqual((stats['skipped_count'], stats['fundamentals_count']), (1, 1))
+
+    def test_adaptive_clear_uses_index_expiry(self):
+        """测试自适应缓存按索引中的过期时间清理文件，不需要反序列化每个文件"""
+        import logging
+        from pathlib import Path
+        from tradingagents.dataflows.adaptive_cache import AdaptiveCacheSystem
+
+        system = AdaptiveCacheSystem.__new__(AdaptiveCacheSystem)
+        system.logger = logging.getLogger(__name__)
+        system.cache_dir = Path(self.tmp_dir.name)
+        system.cache_config = {"ttl_settings": {}}
+        system.primary_backend = "file"
+        system.fallback_enabled = False
+        system.file_index = CacheIndex(system.cache_dir / "cache_index.json", rebuild=system._scan_files)
+
+        fresh = system.save_data("000001", "行情", data_type="stock_data")
+        expired = system.save_data("000002", "行情", data_type="stock_data")
+        system.file_index.set_expires_at(expired, time.time() - 60)
+
+        with patch("tradingagents.dataflows.adaptive_cache.pickle.load",
+                   side_effect=AssertionError("不应反序列化缓存文件")):
+            system.clear_expired_cache()
+
+        self.assertTrue((system.cache_dir / f"{fresh}.pkl").exists())
+        self.assertFalse((system.cache_dir / f"{expired}.pkl").exists())
+        self.assertEqual(len(system.file_index), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件会话管理器测试
+验证按指纹直接读写、查找会话时不遍历会话目录、过期索引以及后台清理
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import streamlit as st
+
+from web.utils.file_session_manager import FileSessionManager
+
+
+class TestFileSessionManager(unittest.TestCase):
+    """文件会话管理器测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self.tmp_dir.name)
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write_session(self, fingerprint, age_hours):
+        path = self.data_dir / f"{fingerprint}.json"
+        timestamp = time.time() - age_hours * 3600
+        path.write_text(json.dumps({"analysis_id": f"analysis_{fingerprint}", "timestamp": timestamp}))
+        os.utime(path, (timestamp, timestamp))
+        return path
+
+    def test_lookup_does_not_scan_directory(self):
+        """测试保存和加载按指纹直接定位，不遍历会话目录"""
+        for i in range(50):
+            self._write_session(f"session_old{i}", age_hours=2)
+        manager = FileSessionManager(str(self.data_dir), sweep_interval=0)
+
+        with patch.object(Path, "glob", side_effect=AssertionError("不应遍历会话目录")), \
+                patch("os.scandir", side_effect=AssertionError("不应遍历会话目录")):
+            st.session_state.file_session_fingerprint = "session_current"
+            self.assertTrue(manager.save_analysis_state("analysis_1", stock_symbol="000001"))
+            data = manager.load_analysis_state()
+            info = manager.get_debug_info()
+
+        self.assertEqual(data["analysis_id"], "analysis_1")
+        self.assertEqual(info["total_session_files"], 51)
+
+        # 新的浏览器会话沿用最近更新的会话文件
+        del st.session_state["file_session_fingerprint"]
+        self.assertEqual(manager._get_browser_fingerprint(), "session_current")
+
+    def test_expired_sessions_swept(self):
+        """测试启动时和清理时删除过期文件，过期会话不会被加载"""
+        stale = self._write_session("session_stale", age_hours=30)
+        aging = self._write_session("session_aging", age_hours=23.99)
+        fresh = self._write_session("session_fresh", age_hours=1)
+
+        manager = FileSessionManager(str(self.data_dir), sweep_interval=0)
+        self.assertFalse(stale.exists())
+        self.assertTrue(aging.exists())
+
+        self.assertEqual(manager._sweep(now=time.time() + 3600), 1)
+        self.assertFalse(aging.exists())
+        self.assertTrue(fresh.exists())
+        self.assertEqual(manager.get_debug_info()["session_files"], ["session_fresh.json"])
+
+    def test_background_sweeper(self):
+        """测试后台线程按间隔删除过期文件，更新过的会话不被误删"""
+        manager = FileSessionManager(str(self.data_dir), max_age_hours=0.5 / 3600, sweep_interval=0.05)
+        try:
+            st.session_state.file_session_fingerprint = "session_short"
+            manager.save_analysis_state("analysis_short")
+            path = self.data_dir / "session_short.json"
+            self.assertTrue(path.exists())
+
+            deadline = time.time() + 5
+            while path.exists() and time.time() < deadline:
+                time.sleep(0.05)
+            self.assertFalse(path.exists())
+            self.assertIsNone(manager.load_analysis_state())
+        finally:
+            manager.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+财务报表缓存测试
+验证报告期与披露截止日的计算、报表并发获取、同一报告期内不重复获取，
+以及未披露时按间隔重新检查
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, datetime
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.data_context import AnalysisDataContext
+from tradingagents.dataflows.financial_statements import (
+    FinancialStatementStore,
+    current_report_period,
+    disclosure_deadline,
+    latest_disclosed_period,
+    latest_reported_period,
+)
+
+
+def _abstract(*periods):
+    """AKShare主要指标：报告期是列名"""
+    return pd.DataFrame([["常用指标", "营业收入"] + [1.0] * len(periods)], columns=["选项", "指标", *periods])
+
+
+class TestFinancialStatementStore(unittest.TestCase):
+    """财务报表缓存测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = FinancialStatementStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_report_periods(self):
+        """测试报告期、披露截止日和已全部披露的报告期"""
+        self.assertEqual(current_report_period(date(2026, 10, 19)), "20260930")
+        self.assertEqual(current_report_period(date(2026, 3, 1)), "20251231")
+        self.assertEqual(disclosure_deadline("20251231").date(), date(2026, 4, 30))
+        self.assertEqual(latest_disclosed_period(date(2026, 10, 19)), "20260630")
+        self.assertEqual(latest_disclosed_period(date(2026, 3, 1)), "20250930")
+
+        statements = {
+            "main_indicators": _abstract("20260630", "20260331"),
+            "balance_sheet": pd.DataFrame({"REPORT_DATE": ["2026-06-30 00:00:00", "2025-12-31 00:00:00"]}),
+            "cash_flow": [{"end_date": "20250930"}],
+        }
+        self.assertEqual(latest_reported_period(statements), "20260630")
+
+    def test_parallel_fetch_and_single_flight(self):
+        """测试报表并发获取，并发请求同一股票只获取一次"""
+        calls = []
+        barrier = threading.Barrier(4, timeout=5)
+
+        def _fetcher(name):
+            def fetch():
+                calls.append(name)
+                barrier.wait()  # 四张报表必须同时在获取中
+                return _abstract("20260930")
+            return fetch
+
+        fetchers = {name: _fetcher(name) for name in ("main_indicators", "balance_sheet", "income_statement", "cash_flow")}
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.store.get("akshare", "000001", fetchers)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(set(r) == set(fetchers) for r in results))
+
+    def test_fresh_until_next_period(self):
+        """测试已包含当期报告的数据在本报告期内一直有效，且跨实例从磁盘读取"""
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return _abstract("20260930", "20260630")
+
+        self.store.get("akshare", "000001", {"main_indicators": fetch}, today=date(2026, 10, 19))
+        reloaded = FinancialStatementStore(self.tmp_dir.name)
+        result = reloaded.get("akshare", "000001", {"main_indicators": fetch}, today=date(2026, 10, 19))
+        self.assertEqual(len(calls), 1)
+        self.assertIn("main_indicators", result)
+
+        # 新的报告期开始后重新获取
+        reloaded.get("akshare", "000001", {"main_indicators": fetch}, today=date(2027, 1, 2))
+        self.assertEqual(len(calls), 2)
+
+    def test_recheck_before_disclosure(self):
+        """测试当期报告未披露时按间隔重新检查，截止日之后不再检查"""
+        entry = {"period": "20260930", "reported_period": "20260630",
+                 "fetched_at": datetime(2026, 10, 19, 9).timestamp(), "statements": {}}
+        self.assertTrue(self.store.is_fresh(entry, now=datetime(2026, 10, 19, 20).timestamp()))
+        self.assertFalse(self.store.is_fresh(entry, now=datetime(2026, 10, 20, 10).timestamp()))
+
+        entry["fetched_at"] = datetime(2026, 11, 1, 9).timestamp()
+        self.assertTrue(self.store.is_fresh(entry, now=datetime(2026, 12, 30).timestamp()))
+
+    def test_failed_refresh_keeps_old_data(self):
+        """测试重新检查时获取失败返回旧数据"""
+        self.store.get("tushare", "000001.SZ", {"income_statement": lambda: [{"end_date": "20260630"}]},
+                       period="20260930")
+        self.store._entries[("tushare", "000001.SZ", "20260930")]["fetched_at"] = time.time() - 2 * 86400
+
+        def fail():
+            raise ConnectionError("down")
+
+        result = self.store.get("tushare", "000001.SZ", {"income_statement": fail}, period="20260930")
+        self.assertEqual(result["income_statement"], [{"end_date": "20260630"}])
+
+    def test_missing_statement_retried_separately(self):
+        """测试部分报表获取失败时不当作完整数据缓存，缺失的报表按短间隔单独重新获取"""
+        calls = []
+        balance_sheet = {"value": ConnectionError("down")}
+
+        def _fetcher(name, value):
+            def fetch():
+                calls.append(name)
+                value_ = value() if callable(value) else value
+                if isinstance(value_, Exception):
+                    raise value_
+                return value_
+            return fetch
+
+        fetchers = {
+            "main_indicators": _fetcher("main_indicators", _abstract("20260930")),
+            "balance_sheet": _fetcher("balance_sheet", lambda: balance_sheet["value"]),
+        }
+        key = ("akshare", "000001", "20260930")
+        result = self.store.get("akshare", "000001", fetchers, today=date(2026, 10, 19))
+        self.assertEqual(set(result), {"main_indicators"})
+
+        # 重试间隔内直接返回已有报表
+        self.store.get("akshare", "000001", fetchers, today=date(2026, 10, 19))
+        self.assertEqual(calls, ["main_indicators", "balance_sheet"])
+
+        # 到期后只重新获取缺失的报表
+        self.store._entries[key]["fetched_at"] -= self.store.partial_retry_seconds
+        balance_sheet["value"] = pd.DataFrame({"REPORT_DATE": ["2026-09-30 00:00:00"]})
+        result = self.store.get("akshare", "000001", fetchers, today=date(2026, 10, 19))
+        self.assertEqual(set(result), {"main_indicators", "balance_sheet"})
+        self.assertEqual(calls, ["main_indicators", "balance_sheet", "balance_sheet"])
+
+        # 补齐后在本报告期内一直有效
+        self.store.get("akshare", "000001", fetchers, today=date(2026, 10, 19))
+        self.assertEqual(len(calls), 3)
+
+    def test_empty_statement_not_retried(self):
+        """测试数据源返回为空的报表（如新上市公司）与获取失败区分，不按短间隔重试"""
+        calls = []
+
+        def fetch_empty():
+            calls.append("cash_flow")
+            return []
+
+        fetchers = {"income_statement": lambda: [{"end_date": "20260630"}], "cash_flow": fetch_empty}
+        key = ("tushare", "000001.SZ", "20260930")
+        result = self.store.get("tushare", "000001.SZ", fetchers, period="20260930")
+        self.assertEqual(set(result), {"income_statement"})
+        self.assertEqual(self.store._entries[key]["empty"], ["cash_flow"])
+
+        self.store._entries[key]["fetched_at"] -= self.store.partial_retry_seconds
+        self.assertEqual(self.store.missing_statements(self.store._entries[key], fetchers), [])
+        self.store.get("tushare", "000001.SZ", fetchers, period="20260930")
+        self.assertEqual(calls, ["cash_flow"])
+
+        # 所有报表都为空时也缓存，不在每次调用时重新获取
+        calls.clear()
+        self.store.get("tushare", "000002.SZ", {"cash_flow": fetch_empty}, period="20260930")
+        self.store.get("tushare", "000002.SZ", {"cash_flow": fetch_empty}, period="20260930")
+        self.assertEqual(calls, ["cash_flow"])
+
+    def test_backtest_sees_only_disclosed_periods(self):
+        """测试回测中按模拟交易日期取报告期，并去掉当时尚未披露的报告期"""
+        periods = []
+
+        def fetch():
+            return _abstract("20260630", "20260331", "20251231")
+
+        def fetch_records():
+            return [{"end_date": "20260630"}, {"end_date": "20251231"}]
+
+        fetchers = {"main_indicators": fetch, "income_statement": fetch_records}
+        with AnalysisDataContext("backtest", as_of="2026-03-01").activate():
+            result = self.store.get("akshare", "000001", fetchers)
+            periods.extend(key[2] for key in self.store._entries)
+
+        self.assertEqual(periods, ["20251231"])
+        self.assertEqual(list(result["main_indicators"].columns), ["选项", "指标"])
+        self.assertEqual(result["income_statement"], [])
+
+        with AnalysisDataContext("backtest", as_of="2026-05-06").activate():
+            result = self.store.get("akshare", "000001", fetchers)
+        self.assertEqual(list(result["main_indicators"].columns), ["选项", "指标", "20260331", "20251231"])
+        self.assertEqual(result["income_statement"], [{"end_date": "20251231"}])
+
+        # 不在回测中时返回全部报告期
+        result = self.store.get("akshare", "000001", fetchers, today=date(2026, 10, 19))
+        self.assertEqual(latest_reported_period(result), "20260630")
+
+
+if __name__ == '__main__':
+    unittest.main()
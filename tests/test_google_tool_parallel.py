@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google工具调用并行执行测试
+验证多个独立工具并发执行、结果顺序保持以及单工具超时处理
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.agents.utils.google_tool_handler import GoogleToolCallHandler
+
+
+def _make_tool(name, delay, value=None, error=None):
+    """创建一个带延迟的普通函数工具"""
+    def tool(**kwargs):
+        time.sleep(delay)
+        if error:
+            raise error
+        return value if value is not None else f"{name}:{kwargs}"
+    tool.__name__ = name
+    return tool
+
+
+class TestGoogleToolParallel(unittest.TestCase):
+    """Google工具并行执行测试类"""
+
+    def test_parallel_execution_preserves_order(self):
+        """测试并发执行时结果保持原始顺序"""
+        tools = [
+            _make_tool("get_price", 0.3, "price"),
+            _make_tool("get_fundamentals", 0.1, "fundamentals"),
+            _make_tool("get_news", 0.2, "news"),
+        ]
+        tool_calls = [
+            {"name": "get_price", "args": {}, "id": "1"},
+            {"name": "get_fundamentals", "args": {}, "id": "2"},
+            {"name": "get_news", "args": {}, "id": "3"},
+        ]
+
+        start = time.time()
+        results = GoogleToolCallHandler._execute_tool_calls(
+            tool_calls, tools, "测试分析师", max_workers=4, timeout=5
+        )
+        elapsed = time.time() - start
+
+        self.assertEqual(results, ["price", "fundamentals", "news"])
+        # 并行执行总耗时应接近最慢工具，而不是所有工具之和
+        self.assertLess(elapsed, 0.55)
+
+    def test_tool_timeout(self):
+        """测试单个工具超时不阻塞其他工具"""
+        tools = [_make_tool("slow", 0.8, "slow"), _make_tool("fast", 0.0, "fast")]
+        tool_calls = [
+            {"name": "slow", "args": {}, "id": "1"},
+            {"name": "fast", "args": {}, "id": "2"},
+        ]
+
+        start = time.time()
+        results = GoogleToolCallHandler._execute_tool_calls(
+            tool_calls, tools, "测试分析师", max_workers=2, timeout=0.3
+        )
+
+        self.assertLess(time.time() - start, 0.7)
+        self.assertIn("超时", results[0])
+        self.assertEqual(results[1], "fast")
+
+    def test_serial_tool_timeout(self):
+        """测试单个工具或禁用并发时同样受超时限制"""
+        tools = [_make_tool("slow", 0.8, "slow"), _make_tool("fast", 0.0, "fast")]
+        tool_calls = [
+            {"name": "slow", "args": {}, "id": "1"},
+            {"name": "fast", "args": {}, "id": "2"},
+        ]
+
+        start = time.time()
+        results = GoogleToolCallHandler._execute_tool_calls(
+            tool_calls, tools, "测试分析师", max_workers=1, timeout=0.3
+        )
+        self.assertLess(time.time() - start, 0.7)
+        self.assertIn("超时", results[0])
+        self.assertEqual(results[1], "fast")
+
+        single = GoogleToolCallHandler._execute_tool_calls(tool_calls[:1], tools, "测试分析师", timeout=0.2)
+        self.assertIn("超时", single[0])
+
+    def test_missing_and_failing_tools(self):
+        """测试未找到工具和工具异常时返回错误说明"""
+        tools = [_make_tool("broken", 0.0, error=ValueError("boom"))]
+        tool_calls = [
+            {"name": "broken", "args": {}, "id": "1"},
+            {"name": "unknown", "args": {}, "id": "2"},
+        ]
+
+        results = GoogleToolCallHandler._execute_tool_calls(
+            tool_calls, tools, "测试分析师", max_workers=2, timeout=5
+        )
+
+        self.assertIn("工具执行失败", results[0])
+        self.assertIn("未找到工具", results[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析图增量事件流测试
+验证节点开始/结束、报告增量、工具调用和LLM文本片段事件，
+以及使用桩模型和录制夹具离线运行完整分析时的事件顺序
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from tradingagents.graph.streaming import (
+    AnalysisCompleted,
+    GraphEventStream,
+    LLMToken,
+    NodeFinished,
+    NodeStarted,
+    ReportDelta,
+    ToolCall,
+)
+
+
+class _State(MessagesState):
+    market_report: str
+    investment_debate_state: dict
+
+
+def _build_graph():
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="看多 理由")]))
+
+    def analyst(state):
+        message = AIMessage(content="", tool_calls=[{"name": "get_price", "args": {"ticker": "000001"}, "id": "c1"}])
+        return {"messages": [message], "market_report": "技术面报告"}
+
+    def bull(state):
+        reply = llm.invoke(state["messages"])
+        history = state["investment_debate_state"]["bull_history"] + "\n" + reply.content
+        return {"investment_debate_state": {"bull_history": history}}
+
+    graph = StateGraph(_State)
+    graph.add_node("Market Analyst", analyst)
+    graph.add_node("Bull Researcher", bull)
+    graph.add_edge(START, "Market Analyst")
+    graph.add_edge("Market Analyst", "Bull Researcher")
+    graph.add_edge("Bull Researcher", END)
+    return graph.compile()
+
+
+INITIAL_STATE = {
+    "messages": [("human", "000001")],
+    "market_report": "",
+    "investment_debate_state": {"bull_history": "开场"},
+}
+
+
+class TestGraphStreaming(unittest.TestCase):
+    """分析图增量事件流测试类"""
+
+    def test_event_types_and_order(self):
+        """测试事件类型和顺序"""
+        stream = GraphEventStream(_build_graph(), INITIAL_STATE)
+        events = list(stream)
+        kinds = [(event.kind, getattr(event, "node", "")) for event in events]
+
+        self.assertEqual(kinds[0], ("node_started", "Market Analyst"))
+        self.assertIn(("tool_call", "Market Analyst"), kinds)
+        self.assertLess(kinds.index(("llm_token", "Bull Researcher")),
+                        kinds.index(("node_finished", "Bull Researcher")))
+        self.assertEqual(kinds[-1], ("node_finished", "Bull Researcher"))
+
+        tool_call = next(event for event in events if isinstance(event, ToolCall))
+        self.assertEqual((tool_call.name, tool_call.args, tool_call.call_id), ("get_price", {"ticker": "000001"}, "c1"))
+
+        tokens = "".join(event.text for event in events if isinstance(event, LLMToken))
+        self.assertEqual(tokens, "看多 理由")
+        self.assertEqual(stream.final_state["market_report"], "技术面报告")
+
+    def test_report_deltas_only_carry_new_text(self):
+        """测试报告增量只包含新增内容"""
+        events = list(GraphEventStream(_build_graph(), INITIAL_STATE, stream_tokens=False))
+        deltas = {event.section: event for event in events if isinstance(event, ReportDelta)}
+
+        self.assertFalse(any(isinstance(event, LLMToken) for event in events))
+        self.assertEqual(deltas["market_report"].delta, "技术面报告")
+        self.assertEqual(deltas["market_report"].to_dict()["kind"], "report_delta")
+        # 初始状态的内容不会作为增量推送，节点第一次写入视为完整内容
+        bull = deltas["investment_debate_state.bull_history"]
+        self.assertEqual(bull.text, "开场\n看多 理由")
+        self.assertEqual(bull.node, "Bull Researcher")
+
+        # 同一章节再次写入时只推送追加的部分，整体改写时标记replace
+        stream = GraphEventStream(None, {})
+        task = {"id": "t", "name": "Bull Researcher"}
+        list(stream._task_events(dict(task, result={"investment_debate_state": {"bull_history": "第一轮"}})))
+        appended = list(stream._task_events(dict(task, result={"investment_debate_state": {"bull_history": "第一轮\n第二轮"}})))
+        rewritten = list(stream._task_events(dict(task, result={"investment_debate_state": {"bull_history": "改写"}})))
+        self.assertEqual((appended[0].delta, appended[0].replace), ("\n第二轮", False))
+        self.assertEqual((rewritten[0].delta, rewritten[0].replace), ("改写", True))
+
+    def test_stream_events_full_analysis_offline(self):
+        """测试离线运行完整分析时事件流以AnalysisCompleted结束"""
+        from tests.benchmark.harness import BenchmarkHarness, FixtureDataSource, LatencyModel, \
+            list_fixtures, network_blocked
+        from tests.benchmark.stub_llm import StubChatModel
+        from tradingagents.graph.trading_graph import TradingAgentsGraph
+
+        harness = BenchmarkHarness(list_fixtures()[0], latency_scale=0, track_memory=False)
+        fixture = harness.fixture
+        ticker, trade_date = fixture["ticker"], fixture["trade_date"]
+        latency = LatencyModel(scale=0)
+        llm = StubChatModel(ticker=ticker, trade_date=trade_date)
+
+        previous_cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.chdir(work_dir)
+            try:
+                with network_blocked(), FixtureDataSource(fixture, latency).installed():
+                    graph = TradingAgentsGraph(["market", "fundamentals"], config=harness._build_config(),
+                                               deep_thinking_llm=llm, quick_thinking_llm=llm)
+                    events = list(graph.stream_events(ticker, trade_date))
+            finally:
+                os.chdir(previous_cwd)
+
+        self.assertIsInstance(events[-1], AnalysisCompleted)
+        self.assertIn(events[-1].decision["action"], ("买入", "持有", "卖出"))
+        started = [event.node for event in events if isinstance(event, NodeStarted)]
+        finished = [event.node for event in events if isinstance(event, NodeFinished)]
+        self.assertEqual(sorted(started), sorted(finished))
+        self.assertEqual(started[0], "Market Analyst")
+
+        sections = {event.section for event in events if isinstance(event, ReportDelta)}
+        self.assertTrue({"market_report", "fundamentals_report", "final_trade_decision"} <= sections)
+        self.assertTrue(any(isinstance(event, ToolCall) for event in events))
+        self.assertTrue(any(isinstance(event, LLMToken) for event in events))
+
+
+if __name__ == '__main__':
+    unittest.main()
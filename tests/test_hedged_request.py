@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+对冲请求测试
+验证主数据源超过P90耗时后对冲到下一个健康的数据源、取先返回的有效结果，
+额外请求受预算限制，不对冲时不经过线程池，挂起的请求超时放弃，以及A股和港股数据接口的对冲
+"""
+
+import contextvars
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.data_types import StockDataResult
+from tradingagents.dataflows.hedged_request import HedgeBudget, hedged_call
+from tradingagents.dataflows.source_health import SourceHealthRegistry
+
+
+def _slow(value, seconds):
+    def call():
+        time.sleep(seconds)
+        return value
+    return call
+
+
+def _ok(source):
+    frame = pd.DataFrame({"trade_date": ["2025-06-03", "2025-06-04"], "close": [10.0, 11.0]})
+    return StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", source, frame)
+
+
+class TestHedgedRequest(unittest.TestCase):
+    """对冲请求测试类"""
+
+    def test_slow_primary_is_hedged(self):
+        """测试主数据源超过对冲等待时间后，备用数据源先返回的有效结果被采用"""
+        start = time.time()
+        outcome = hedged_call([("primary", _slow("slow", 0.5)), ("backup", _slow("fast", 0.01))],
+                              0.05, bool, HedgeBudget())
+        self.assertEqual((outcome.winner, outcome.result), ("backup", "fast"))
+        self.assertTrue(outcome.hedged)
+        self.assertLess(time.time() - start, 0.4)
+
+    def test_fast_primary_not_hedged(self):
+        """测试主数据源及时返回时不发出额外请求"""
+        backup_calls = []
+        outcome = hedged_call([("primary", _slow("ok", 0.0)), ("backup", lambda: backup_calls.append(1))],
+                              0.5, bool, HedgeBudget())
+        self.assertEqual(outcome.winner, "primary")
+        self.assertEqual(outcome.attempted, ["primary"])
+        self.assertEqual(backup_calls, [])
+
+    def test_budget_caps_extra_requests(self):
+        """测试预算用完后不再对冲，等待主数据源"""
+        budget = HedgeBudget(ratio=0.0, burst=1)
+        first = hedged_call([("primary", _slow("slow", 0.2)), ("backup", _slow("fast", 0.0))], 0.01, bool, budget)
+        self.assertEqual(first.winner, "backup")
+
+        second = hedged_call([("primary", _slow("slow", 0.2)), ("backup", _slow("fast", 0.0))], 0.01, bool, budget)
+        self.assertEqual(second.winner, "primary")
+        self.assertFalse(second.hedged)
+
+    def test_failed_calls_return_primary_result(self):
+        """测试已发出的请求都无效时返回主数据源的结果，由调用方继续降级"""
+        outcome = hedged_call([("primary", _slow("", 0.0)), ("backup", _slow("fast", 0.0))], 1.0, bool,
+                              HedgeBudget())
+        self.assertIsNone(outcome.winner)
+        self.assertEqual(outcome.attempted, ["primary"])
+
+    def test_no_hedge_delay_runs_inline(self):
+        """测试不对冲时直接在调用线程中请求主数据源"""
+        import threading
+
+        threads = []
+        with patch("tradingagents.dataflows.hedged_request._get_executor",
+                   side_effect=AssertionError("不对冲时不应使用线程池")):
+            outcome = hedged_call([("primary", lambda: threads.append(threading.current_thread()) or "ok"),
+                                   ("backup", _slow("fast", 0.0))], None, bool, HedgeBudget())
+        self.assertEqual((outcome.winner, outcome.result, outcome.attempted), ("primary", "ok", ["primary"]))
+        self.assertIs(threads[0], threading.current_thread())
+
+    def test_hung_calls_time_out_per_source(self):
+        """测试请求都挂起时超时放弃，且挂起的请求只占用所属数据源的线程池"""
+        from tradingagents.dataflows import hedged_request
+
+        start = time.time()
+        outcome = hedged_call([("hung_primary", _slow("late", 0.5)), ("hung_backup", _slow("late", 0.5))],
+                              0.01, bool, HedgeBudget(), call_timeout=0.1)
+        self.assertLess(time.time() - start, 0.4)
+        self.assertIsNone(outcome.winner)
+        self.assertEqual(outcome.attempted, ["hung_primary", "hung_backup"])
+        self.assertIsNot(hedged_request._get_executor("hung_primary"), hedged_request._get_executor("other"))
+        time.sleep(0.5)
+
+    def test_calls_see_caller_context(self):
+        """测试对冲请求在调用线程的上下文中执行，ContextVar 可见"""
+        var = contextvars.ContextVar("hedge_test_var", default=None)
+        var.set("analysis-1")
+        outcome = hedged_call([("primary", lambda: time.sleep(0.2) or var.get()), ("backup", var.get)],
+                              0.01, bool, HedgeBudget())
+        self.assertEqual(outcome.result, "analysis-1")
+        self.assertTrue(outcome.hedged)
+
+    def test_china_manager_hedges_slow_primary(self):
+        """测试A股数据源管理器在主数据源变慢时对冲到备用数据源"""
+        manager = DataSourceManager.__new__(DataSourceManager)
+        manager.default_source = manager.current_source = ChinaDataSource.TUSHARE
+        manager.available_sources = [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE]
+        manager.health = SourceHealthRegistry()
+        manager.hedging = True
+        manager.hedge_budget = HedgeBudget()
+        manager.health.record_success(ChinaDataSource.TUSHARE, 0.05)
+
+        def slow_tushare(*args):
+            time.sleep(0.5)
+            return _ok("tushare")
+
+        start = time.time()
+        with patch.object(DataSourceManager, "_get_tushare_data", side_effect=slow_tushare), \
+                patch.object(DataSourceManager, "_get_akshare_data", return_value=_ok("akshare")):
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+            self.assertLess(time.time() - start, 0.4)
+            # 等待被放弃的请求在后台结束
+            time.sleep(0.5)
+        self.assertEqual(result.source, "akshare")
+
+    def test_hk_hedges_to_yfinance(self):
+        """测试港股数据在AKShare变慢时对冲到Yahoo Finance"""
+        from tradingagents.dataflows import interface
+
+        interface._hk_source_health.record_success("AKShare", 0.05)
+        with patch.dict(os.environ, {"TRADINGAGENTS_DATA_SOURCE_HEDGING": "true"}), \
+                patch("tradingagents.dataflows.akshare_utils.get_hk_stock_data_akshare",
+                      side_effect=lambda *args: time.sleep(0.5) or "AKShare数据"), \
+                patch("tradingagents.dataflows.hk_stock_utils.get_hk_stock_data", return_value="Yahoo数据"):
+            result = interface._fetch_hk_stock_data("0700.HK", "2025-06-01", "2025-06-04")
+            time.sleep(0.5)
+        self.assertEqual(result, "Yahoo数据")
+
+
+if __name__ == '__main__':
+    unittest.main()
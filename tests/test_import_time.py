@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时预算测试
+在独立子进程中导入分析图和CLI入口，验证LLM SDK、向量库、行情数据源等重型依赖
+不会在导入阶段加载，并且导入耗时不超过预算（可通过 TA_IMPORT_BUDGET_SECONDS 调整）
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+# 只有实际使用时才应该加载的模块
+HEAVY_MODULES = [
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_google_genai",
+    "langchain.agents",
+    "openai",
+    "chromadb",
+    "dashscope",
+    "yfinance",
+    "stockstats",
+    "pymongo",
+    "redis",
+]
+
+# 导入耗时预算（秒），CI机器较慢时可通过环境变量放宽
+IMPORT_BUDGET_SECONDS = float(os.getenv("TA_IMPORT_BUDGET_SECONDS", "3.0"))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe_import(module):
+    """在干净的子进程中导入模块，返回耗时和已加载的重型模块"""
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"导入 {module} 失败:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """导入耗时预算测试类"""
+
+    def test_trading_graph_import_is_lightweight(self):
+        """测试导入分析图时不加载重型依赖"""
+        probe = _probe_import("tradingagents.graph.trading_graph")
+        self.assertEqual(probe["loaded"], [])
+        self.assertLess(probe["elapsed"], IMPORT_BUDGET_SECONDS)
+
+    def test_cli_import_is_lightweight(self):
+        """测试CLI入口导入时不加载分析图及其依赖"""
+        probe = _probe_import("cli.main")
+        self.assertEqual(probe["loaded"], [])
+        self.assertLess(probe["elapsed"], IMPORT_BUDGET_SECONDS)
+
+    def test_lazy_exports_resolve(self):
+        """测试按需导出的名称仍可正常访问"""
+        import tradingagents.dataflows as dataflows
+        import tradingagents.dataflows.interface as interface
+        import tradingagents.graph as graph
+        import tradingagents.llm_adapters as llm_adapters
+
+        self.assertEqual(graph.Propagator.__name__, "Propagator")
+        self.assertEqual(llm_adapters.ChatDashScopeOpenAI.__name__, "ChatDashScopeOpenAI")
+        self.assertIn("ChatGoogleOpenAI", dir(llm_adapters))
+        self.assertIsInstance(dataflows.STOCKSTATS_AVAILABLE, bool)
+        self.assertTrue(callable(interface.get_chinese_social_sentiment))
+        with self.assertRaises(AttributeError):
+            getattr(graph, "NotExported")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+集成缓存L1内存缓存测试
+验证按字节数的LRU淘汰、TTL与后端条目一致、保存时失效、命中统计，
+数据提供器使用的 cache_manager.get_cache() 同样经过L1，以及自适应后端的查找结果直接进入L1
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows import integrated_cache
+from tradingagents.dataflows.cache_manager import StockDataCache
+from tradingagents.dataflows.integrated_cache import IntegratedCacheManager
+from tradingagents.dataflows.memory_cache import MemoryLRUCache, estimate_size
+
+
+class _FakeAdaptiveCache:
+    """只记录加载次数的自适应缓存"""
+
+    primary_backend = "redis"
+    fallback_enabled = True
+
+    def __init__(self):
+        self.entries = {}
+        self.loads = 0
+
+    def _get_cache_key(self, symbol, start_date="", end_date="", data_source="default", data_type="stock_data"):
+        return f"{symbol}_{start_date}_{end_date}_{data_source}_{data_type}"
+
+    def save_data(self, symbol, data, start_date="", end_date="", data_source="default", data_type="stock_data"):
+        cache_key = self._get_cache_key(symbol, start_date, end_date, data_source, data_type)
+        self.entries[cache_key] = data
+        return cache_key
+
+    def load_entry(self, cache_key):
+        self.loads += 1
+        if cache_key not in self.entries:
+            return None
+        return self.entries[cache_key], 600
+
+
+class TestMemoryLRUCache(unittest.TestCase):
+    """L1内存缓存测试类"""
+
+    def test_byte_bounded_eviction(self):
+        """测试按字节数淘汰最久未使用的条目，超过总容量的条目不写入"""
+        value = "x" * 1000
+        size = estimate_size(value)
+        cache = MemoryLRUCache(max_bytes=size * 2)
+        cache.put("a", value, 60)
+        cache.put("b", value, 60)
+        cache.get("a")
+        cache.put("c", value, 60)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertFalse(cache.put("huge", "x" * (size * 3), 60))
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['evictions']), (2, 1))
+        self.assertLessEqual(stats['size_bytes'], stats['max_bytes'])
+
+    def test_ttl_and_dataframe_copy(self):
+        """测试条目按TTL过期，返回的DataFrame修改后不影响缓存"""
+        cache = MemoryLRUCache()
+        frame = pd.DataFrame({"close": [10.0, 11.0]})
+        cache.put("frame", frame, 10, now=100)
+        loaded = cache.get("frame", now=105)
+        loaded.loc[0, "close"] = 0.0
+        self.assertEqual(cache.get("frame", now=105).loc[0, "close"], 10.0)
+        self.assertIsNone(cache.get("frame", now=111))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+
+class TestIntegratedL1Cache(unittest.TestCase):
+    """集成缓存管理器L1测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_legacy_reads_hit_memory(self):
+        """测试传统文件缓存的重复读取命中L1，保存后失效"""
+        with patch.object(integrated_cache, "ADAPTIVE_CACHE_AVAILABLE", False):
+            manager = IntegratedCacheManager(self.tmp_dir.name)
+        cache_key = manager.save_fundamentals_data("000001", "基本面报告 v1", "openai")
+
+        with patch.object(manager.legacy_cache, "_read_text_file",
+                          wraps=manager.legacy_cache._read_text_file) as load:
+            self.assertEqual(manager.load_fundamentals_data(cache_key), "基本面报告 v1")
+            self.assertEqual(manager.load_fundamentals_data(cache_key), "基本面报告 v1")
+            self.assertEqual(load.call_count, 1)
+
+            manager.save_fundamentals_data("000001", "基本面报告 v2", "openai")
+            self.assertEqual(manager.load_fundamentals_data(cache_key), "基本面报告 v2")
+            self.assertEqual(load.call_count, 2)
+
+        stats = manager.get_cache_stats()['memory_cache']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_provider_cache_reads_hit_memory(self):
+        """测试数据提供器直接使用的文件缓存（cache_manager.get_cache()）重复读取命中L1"""
+        cache = StockDataCache(self.tmp_dir.name)
+        frame = pd.DataFrame({"close": [10.0, 11.0]})
+        cache_key = cache.save_stock_data("AAPL", frame, "2025-06-01", "2025-06-04", "yfinance")
+
+        with patch.object(cache, "get_cache_staleness", return_value=-600), \
+                patch("tradingagents.dataflows.cache_manager.pd.read_csv", wraps=pd.read_csv) as read_csv:
+            first = cache.load_stock_data(cache_key)
+            first.loc[first.index[0], "close"] = 0.0
+            second = cache.load_stock_data(cache_key)
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertEqual(second["close"].tolist(), [10.0, 11.0])
+        self.assertEqual(cache.memory_cache.stats()['hits'], 1)
+
+    def test_legacy_ttl_follows_backend(self):
+        """测试L1条目的有效期与后端条目的剩余有效期一致，过期条目不进入L1"""
+        with patch.object(integrated_cache, "ADAPTIVE_CACHE_AVAILABLE", False):
+            manager = IntegratedCacheManager(self.tmp_dir.name)
+        cache_key = manager.save_news_data("000001", "新闻", "google")
+
+        with patch.object(manager.legacy_cache, "get_cache_staleness", return_value=30):
+            self.assertEqual(manager.load_news_data(cache_key), "新闻")
+        self.assertEqual(manager.memory_cache.stats()['entries'], 0)
+
+        with patch.object(manager.legacy_cache, "get_cache_staleness", return_value=-120), \
+                patch.object(manager.memory_cache, "put", wraps=manager.memory_cache.put) as put:
+            manager.load_news_data(cache_key)
+        put.assert_called_once_with(cache_key, "新闻", 120)
+
+    def test_adaptive_find_then_load_deserializes_once(self):
+        """测试自适应后端查找到的条目直接进入L1，随后的加载不再访问后端"""
+        with patch.object(integrated_cache, "ADAPTIVE_CACHE_AVAILABLE", False):
+            manager = IntegratedCacheManager(self.tmp_dir.name)
+        manager.adaptive_cache = _FakeAdaptiveCache()
+        manager.use_adaptive = True
+
+        frame = pd.DataFrame({"close": [10.0, 11.0]})
+        manager.save_stock_data("AAPL", frame, "2025-06-01", "2025-06-04", "yfinance")
+        cache_key = manager.find_cached_stock_data("AAPL", "2025-06-01", "2025-06-04", "yfinance")
+        for _ in range(3):
+            pd.testing.assert_frame_equal(manager.load_stock_data(cache_key), frame)
+        self.assertEqual(manager.adaptive_cache.loads, 1)
+        self.assertIsNone(manager.find_cached_stock_data("MSFT", "2025-06-01", "2025-06-04", "yfinance"))
+
+
+if __name__ == '__main__':
+    unittest.main()
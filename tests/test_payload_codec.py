@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存内容压缩编码测试
+验证压缩和编解码器标记、训练字典压缩、其他进程新训练的字典可以解压、旧的未压缩条目仍可读取，
+以及数据库缓存管理器和自适应缓存写入Redis/MongoDB的内容被压缩
+"""
+
+import json
+import os
+import pickle
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows import payload_codec
+from tradingagents.dataflows.payload_codec import decode_payload, encode_payload
+
+REPORT = "\n".join(f"## 基本面分析 {i}\n- 市盈率: {10 + i % 7}.5倍\n- 营收增长: {i % 13}%\n" for i in range(200))
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def get(self, key):
+        return self.store.get(key)
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+
+    def find_one(self, query, **kwargs):
+        return self.docs.get(query["_id"])
+
+
+class TestPayloadCodec(unittest.TestCase):
+    """缓存内容压缩编码测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        env = patch.dict(os.environ, {"TRADINGAGENTS_CACHE_DICT_DIR": self.tmp_dir.name})
+        env.start()
+        self.addCleanup(env.stop)
+        payload_codec._dictionaries.reload()
+        self.addCleanup(payload_codec._dictionaries.reload)
+
+    def test_roundtrip_and_codec_tag(self):
+        """测试各编解码器压缩后能还原，标记正确，短内容不压缩"""
+        for codec in ("zstd", "zlib", "none"):
+            with self.subTest(codec=codec):
+                payload = encode_payload(REPORT, codec=codec)
+                self.assertEqual(decode_payload(payload).decode("utf-8"), REPORT)
+                self.assertEqual(payload_codec.payload_codec(payload), "raw" if codec == "none" else codec)
+
+        self.assertLess(len(encode_payload(REPORT, codec="zstd")) * 4, len(REPORT.encode("utf-8")))
+        self.assertEqual(payload_codec.payload_codec(encode_payload("短")), "raw")
+
+    def test_legacy_entries_readable(self):
+        """测试压缩前写入的JSON字符串和pickle原样返回"""
+        legacy_json = json.dumps({"data": "旧数据"}, ensure_ascii=False)
+        self.assertEqual(json.loads(decode_payload(legacy_json)), {"data": "旧数据"})
+        self.assertEqual(json.loads(decode_payload(legacy_json.encode("utf-8"))), {"data": "旧数据"})
+        self.assertEqual(pickle.loads(decode_payload(pickle.dumps({"a": 1}))), {"a": 1})
+        self.assertEqual(payload_codec.payload_codec(legacy_json), "legacy")
+
+    @unittest.skipUnless(payload_codec.ZSTD_AVAILABLE, "需要zstandard")
+    def test_trained_dictionary(self):
+        """测试训练字典后使用字典压缩，解压时按字典id查找"""
+        samples = [f"## {i}号股票基本面分析报告\n- 市盈率: {i % 30}倍\n- 行业: 银行\n- 建议: 持有\n" * 3
+                   for i in range(400)]
+        dict_id = payload_codec.train_dictionary(samples, dict_size=4096)
+        self.assertIsNotNone(dict_id)
+
+        payload = encode_payload(samples[7])
+        self.assertEqual(payload_codec.payload_codec(payload), f"zstd:{dict_id}")
+        self.assertEqual(decode_payload(payload).decode("utf-8"), samples[7])
+        self.assertLess(len(payload), len(encode_payload(samples[7], codec="zlib")))
+
+    @unittest.skipUnless(payload_codec.ZSTD_AVAILABLE, "需要zstandard")
+    def test_dictionary_trained_by_other_process(self):
+        """测试遇到未知字典id时重新扫描一次字典目录"""
+        # 模拟字典训练前就已经加载过字典目录的进程
+        loaded_before = payload_codec._Dictionaries()
+        self.assertIsNone(loaded_before.current())
+
+        samples = [f"## {i}号股票技术分析\n- 均线: 多头排列\n- 成交量: {i % 17}万手\n" * 3 for i in range(400)]
+        dict_id = payload_codec.train_dictionary(samples, dict_size=4096)
+        payload = encode_payload(samples[3])
+
+        with patch.object(payload_codec, "_dictionaries", loaded_before):
+            self.assertEqual(decode_payload(payload).decode("utf-8"), samples[3])
+        self.assertIsNotNone(loaded_before.get(dict_id))
+
+        # 仍然找不到的id只重新扫描一次
+        with patch.object(payload_codec.Path, "glob", wraps=payload_codec.Path.glob, autospec=True) as glob:
+            self.assertIsNone(loaded_before.get(dict_id + 1))
+            self.assertIsNone(loaded_before.get(dict_id + 1))
+        self.assertEqual(glob.call_count, 1)
+
+    def test_db_cache_manager_compresses(self):
+        """测试数据库缓存管理器写入Redis和MongoDB的内容被压缩，旧条目仍可读取"""
+        from tradingagents.dataflows.db_cache_manager import DatabaseCacheManager
+
+        manager = DatabaseCacheManager.__new__(DatabaseCacheManager)
+        manager.redis_client = _FakeRedis()
+        manager.mongodb_db = type("DB", (), {})()
+        manager.mongodb_db.stock_data = _FakeCollection()
+
+        # JSON序列化本身不保留dtype，这里只比较取值
+        frame = pd.DataFrame({"name": ["平安银行"] * 28, "close": [float(c) for c in range(28)]})
+        cache_key = manager.save_stock_data("000001", frame, "2025-06-01", "2025-06-28", "tushare")
+
+        redis_value = manager.redis_client.store[cache_key]
+        self.assertNotEqual(payload_codec.payload_codec(redis_value), "legacy")
+        doc = manager.mongodb_db.stock_data.docs[cache_key]
+        self.assertIsInstance(doc["data"], bytes)
+        pd.testing.assert_frame_equal(manager.load_stock_data(cache_key), frame, check_dtype=False)
+
+        # Redis没有时从MongoDB加载并回填
+        manager.redis_client.store.clear()
+        pd.testing.assert_frame_equal(manager.load_stock_data(cache_key), frame, check_dtype=False)
+        self.assertIn(cache_key, manager.redis_client.store)
+
+        # 压缩前写入的条目
+        manager.redis_client.store["old"] = json.dumps({"data": "旧报告", "data_format": "text"}, ensure_ascii=False)
+        self.assertEqual(manager.load_stock_data("old"), "旧报告")
+        manager.mongodb_db.stock_data.docs["old_doc"] = {"_id": "old_doc", "data": "旧报告", "data_format": "text",
+                                                         "symbol": "000001", "data_source": "tushare",
+                                                         "created_at": datetime.utcnow()}
+        self.assertEqual(manager.load_stock_data("old_doc"), "旧报告")
+
+    def test_adaptive_cache_redis_and_mongodb(self):
+        """测试自适应缓存写入Redis和MongoDB的内容被压缩，旧的hex编码文档仍可读取"""
+        import logging
+        from tradingagents.dataflows.adaptive_cache import AdaptiveCacheSystem
+
+        redis = _FakeRedis()
+        collection = _FakeCollection()
+        client = type("Client", (), {})()
+        client.tradingagents = type("DB", (), {"cache": collection})()
+
+        system = AdaptiveCacheSystem.__new__(AdaptiveCacheSystem)
+        system.logger = logging.getLogger(__name__)
+        system.db_manager = type("Manager", (), {"get_redis_client": lambda self: redis,
+                                                 "get_mongodb_client": lambda self: client})()
+
+        self.assertTrue(system._save_to_redis("key", REPORT, {"symbol": "000001"}, 60))
+        self.assertNotEqual(payload_codec.payload_codec(redis.store["key"]), "legacy")
+        self.assertEqual(system._load_from_redis("key")["data"], REPORT)
+
+        redis.store["old"] = pickle.dumps({"data": "旧", "metadata": {}, "timestamp": datetime.now().isoformat()})
+        self.assertEqual(system._load_from_redis("old")["data"], "旧")
+
+        frame = pd.DataFrame({"close": [10.0, 11.0]})
+        self.assertTrue(system._save_to_mongodb("frame", frame, {"symbol": "000001"}, 60))
+        self.assertIn("codec", collection.docs["frame"])
+        pd.testing.assert_frame_equal(system._load_from_mongodb("frame")["data"], frame, check_dtype=False)
+
+        collection.docs["old"] = {"_id": "old", "data": pickle.dumps(REPORT).hex(), "data_type": "pickle",
+                                  "metadata": {}, "timestamp": datetime.now()}
+        self.assertEqual(system._load_from_mongodb("old")["data"], REPORT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化记忆测试
+验证记忆在重新创建管理器（模拟进程重启）后仍然保留、预热预创建集合、
+导出导入不重新向量化，以及嵌入模型变化时使用独立集合
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.agents.utils.memory import (
+    MEMORY_COLLECTIONS,
+    ChromaDBManager,
+    FinancialSituationMemory,
+    export_memories_to_file,
+    import_memories_from_file,
+    warm_start_memories,
+)
+
+
+SITUATIONS = [
+    ("High inflation with rising rates", "Rotate into consumer staples"),
+    ("Tech selloff on institutional selling", "Trim high-growth exposure"),
+    ("Strong dollar hurting emerging markets", "Hedge currency exposure"),
+]
+
+
+def _fake_embedding(text):
+    """按关键词生成的确定性向量"""
+    keywords = ("inflation", "tech", "dollar", "rates")
+    return [1.0 if word in text.lower() else 0.01 for word in keywords]
+
+
+def _reset_manager():
+    """丢弃单例管理器和ChromaDB的客户端缓存，模拟新进程"""
+    from chromadb.api.client import SharedSystemClient
+
+    ChromaDBManager._instance = None
+    ChromaDBManager._collections = {}
+    SharedSystemClient.clear_system_cache()
+
+
+class TestPersistentMemory(unittest.TestCase):
+    """持久化记忆测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config = {"llm_provider": "openai", "backend_url": "http://localhost:1/v1",
+                       "memory_persist_dir": os.path.join(self.tmp_dir.name, "memory")}
+        _reset_manager()
+        self.env = patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        _reset_manager()
+        self.tmp_dir.cleanup()
+
+    def _memory(self, name="bull_memory", config=None):
+        return FinancialSituationMemory(name, config or self.config)
+
+    @patch.object(FinancialSituationMemory, "get_embedding", side_effect=_fake_embedding)
+    def test_memories_survive_restart(self, _):
+        """测试重新创建管理器后记忆仍可检索，重复写入不产生重复记录"""
+        memory = self._memory()
+        memory.add_situations(SITUATIONS)
+        memory.add_situations(SITUATIONS[:1])
+        self.assertEqual(memory.situation_collection.count(), 3)
+
+        _reset_manager()
+        restarted = self._memory()
+        self.assertEqual(restarted.situation_collection.count(), 3)
+        matches = restarted.get_memories("Tech stocks under selling pressure", n_matches=1)
+        self.assertEqual(matches[0]["recommendation"], "Trim high-growth exposure")
+
+    @patch.object(FinancialSituationMemory, "get_embedding", side_effect=_fake_embedding)
+    def test_warm_start_creates_collections(self, _):
+        """测试预热预先创建全部记忆集合并返回已有数量"""
+        self._memory("trader_memory").add_situations(SITUATIONS)
+        _reset_manager()
+
+        counts = warm_start_memories(self.config)
+        self.assertEqual(set(counts), set(MEMORY_COLLECTIONS))
+        self.assertEqual(counts["trader_memory"], 3)
+        self.assertEqual(counts["bull_memory"], 0)
+        self.assertEqual(set(ChromaDBManager._collections), set(MEMORY_COLLECTIONS))
+
+    @patch.object(FinancialSituationMemory, "get_embedding", side_effect=_fake_embedding)
+    def test_warm_started_collection_records_embedding_model(self, _):
+        """测试预热创建的空集合在第一次使用时写入嵌入模型，之后其他模型不会写入该集合"""
+        warm_start_memories(self.config)
+        memory = self._memory()
+        self.assertEqual(memory.situation_collection.name, "bull_memory")
+        self.assertEqual(memory.situation_collection.metadata["embedding_model"], memory.embedding)
+        memory.add_situations(SITUATIONS)
+        _reset_manager()
+
+        other = self._memory(config=dict(self.config, backend_url="http://localhost:11434/v1"))
+        self.assertNotEqual(other.situation_collection.name, "bull_memory")
+
+    def test_export_import_without_reembedding(self):
+        """测试导出的向量直接导入，不重新调用嵌入接口"""
+        export_path = os.path.join(self.tmp_dir.name, "memories.jsonl")
+        with patch.object(FinancialSituationMemory, "get_embedding", side_effect=_fake_embedding):
+            self._memory("bull_memory").add_situations(SITUATIONS)
+            self._memory("bear_memory").add_situations(SITUATIONS[:2])
+            self.assertEqual(export_memories_to_file(export_path, self.config, ["bull_memory", "bear_memory"]), 5)
+
+        _reset_manager()
+        target = dict(self.config, memory_persist_dir=os.path.join(self.tmp_dir.name, "deployed"))
+        with patch.object(FinancialSituationMemory, "get_embedding",
+                          side_effect=AssertionError("导入时不应重新向量化")):
+            counts = import_memories_from_file(export_path, target)
+            self.assertEqual(counts, {"bull_memory": 3, "bear_memory": 2})
+            # 重复导入是幂等的
+            import_memories_from_file(export_path, target)
+            records = self._memory("bull_memory", target).export_memories()
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual({r["situation"] for r in records}, {s for s, _ in SITUATIONS})
+
+    @patch.object(FinancialSituationMemory, "get_embedding", side_effect=_fake_embedding)
+    def test_embedding_model_change_uses_separate_collection(self, _):
+        """测试嵌入模型变化后不写入原集合（向量维度可能不同）"""
+        self._memory().add_situations(SITUATIONS)
+        _reset_manager()
+
+        # 本地Ollama使用nomic-embed-text
+        other = self._memory(config=dict(self.config, backend_url="http://localhost:11434/v1"))
+        self.assertNotEqual(other.situation_collection.name, "bull_memory")
+        self.assertEqual(other.situation_collection.count(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reddit分区索引测试
+验证按日期分区的索引与逐行扫描原始文件的结果一致，以及原始文件变化后自动重建
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows.reddit_utils import RedditIndex, _scan_top_from_category, fetch_top_from_category
+
+
+def _ts(date, hour=12):
+    return datetime.strptime(date, "%Y-%m-%d").replace(hour=hour, tzinfo=timezone.utc).timestamp()
+
+
+def _post(title, date, ups, selftext="", hour=12):
+    return {"title": title, "selftext": selftext, "url": f"https://reddit.com/{title}",
+            "ups": ups, "created_utc": _ts(date, hour)}
+
+
+class TestRedditIndex(unittest.TestCase):
+    """Reddit分区索引测试类"""
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.data_path = self.work_dir.name
+        self._write("global_news", "worldnews.jsonl", [
+            _post("Markets rally", "2024-05-01", 10),
+            _post("Rates unchanged", "2024-05-01", 50),
+            _post("Oil slips", "2024-05-02", 30),
+            _post("Late night", "2024-05-01", 5, hour=23),
+        ])
+        self._write("global_news", "economics.jsonl", [
+            _post("Inflation cools", "2024-05-01", 20),
+            _post("Jobs report", "2024-05-02", 40),
+        ])
+        self._write("company_news", "stocks.jsonl", [
+            _post("Apple earnings beat", "2024-05-01", 100),
+            _post("Why I sold AAPL", "2024-05-01", 15),
+            _post("Tesla deliveries", "2024-05-01", 80, selftext="TSLA up"),
+            _post("Microsoft cloud", "2024-05-01", 60),
+        ])
+        self._write("company_news", "investing.jsonl", [
+            _post("Thoughts on the market", "2024-05-01", 70, selftext="holding apple long term"),
+            _post("Apple buyback", "2024-05-02", 90),
+        ])
+
+    def tearDown(self):
+        self.work_dir.cleanup()
+
+    def _write(self, category, name, posts):
+        os.makedirs(os.path.join(self.data_path, category), exist_ok=True)
+        with open(os.path.join(self.data_path, category, name), "w", encoding="utf-8") as f:
+            for post in posts:
+                f.write(json.dumps(post) + "\n")
+
+    def test_matches_full_scan(self):
+        """测试索引查询与逐行扫描结果一致（含公司过滤和每个子版块的配额）"""
+        index = RedditIndex(self.data_path)
+        cases = [
+            ("global_news", "2024-05-01", 4, None),
+            ("global_news", "2024-05-02", 10, None),
+            ("global_news", "2024-05-03", 10, None),
+            ("company_news", "2024-05-01", 10, "AAPL"),
+            ("company_news", "2024-05-01", 2, "AAPL"),
+            ("company_news", "2024-05-01", 10, "TSLA"),
+        ]
+        for category, date, limit, query in cases:
+            with self.subTest(category=category, date=date, limit=limit, query=query):
+                expected = _scan_top_from_category(category, date, limit, query, self.data_path)
+                self.assertEqual(index.top_posts(category, date, limit, query), expected)
+
+        titles = [p["title"] for p in index.top_posts("company_news", "2024-05-01", 10, "AAPL")]
+        self.assertEqual(sorted(titles), ["Apple earnings beat", "Thoughts on the market", "Why I sold AAPL"])
+        with self.assertRaises(ValueError):
+            index.top_posts("global_news", "2024-05-01", 1)
+        with self.assertRaises(KeyError):
+            index.top_posts("company_news", "2024-05-01", 10, "ZZZZ")
+
+    def test_reads_only_requested_partition(self):
+        """测试索引建立后每次查询只读取当天的分区文件"""
+        fetch_top_from_category("global_news", "2024-05-01", 10, data_path=self.data_path)
+        partitions = sorted(os.listdir(os.path.join(self.data_path, ".index", "global_news")))
+        self.assertEqual(partitions, ["2024-05-01.json", "2024-05-02.json", "manifest.json"])
+
+        # 分区已经按点赞数排好序
+        with open(os.path.join(self.data_path, ".index", "global_news", "2024-05-01.json"), encoding="utf-8") as f:
+            partition = json.load(f)
+        self.assertEqual([p["upvotes"] for p in partition["worldnews.jsonl"]], [50, 10, 5])
+
+    def test_rebuild_when_source_changes(self):
+        """测试原始文件变化后，新的索引实例会重建分区"""
+        RedditIndex(self.data_path).top_posts("global_news", "2024-05-03", 10)
+        self._write("global_news", "worldnews.jsonl", [_post("New day", "2024-05-03", 7)])
+        os.utime(os.path.join(self.data_path, "global_news", "worldnews.jsonl"), ns=(1, 1))
+
+        posts = RedditIndex(self.data_path).top_posts("global_news", "2024-05-03", 10)
+        self.assertEqual([p["title"] for p in posts], ["New day"])
+
+
+if __name__ == '__main__':
+    unittest.main()
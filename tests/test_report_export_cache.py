@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报告导出缓存测试
+验证渲染结果按内容哈希缓存、并发导出合并为一次渲染、失败不缓存、磁盘缓存跨实例复用以及按配额和保留时间清理
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from web.utils.export_cache import ExportCache, ExportRenderPool, results_fingerprint
+
+
+RESULTS = {
+    "stock_symbol": "000001",
+    "decision": {"action": "持有", "confidence": 0.7},
+    "state": {"market_report": "技术面报告"},
+}
+
+
+class TestReportExportCache(unittest.TestCase):
+    """报告导出缓存测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ExportRenderPool(ExportCache(self.tmp_dir.name), max_workers=2)
+        self.renders = []
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _render(self, data=b"rendered", delay=0.0):
+        def render():
+            self.renders.append(data)
+            time.sleep(delay)
+            return data
+        return render
+
+    def test_fingerprint_depends_on_content_and_format(self):
+        """测试哈希只取决于结果内容和格式"""
+        reordered = {"state": RESULTS["state"], "decision": RESULTS["decision"], "stock_symbol": "000001"}
+        self.assertEqual(results_fingerprint(RESULTS, "pdf"), results_fingerprint(reordered, "pdf"))
+        self.assertNotEqual(results_fingerprint(RESULTS, "pdf"), results_fingerprint(RESULTS, "docx"))
+        changed = dict(RESULTS, stock_symbol="000002")
+        self.assertNotEqual(results_fingerprint(RESULTS, "pdf"), results_fingerprint(changed, "pdf"))
+
+    def test_repeated_export_hits_cache(self):
+        """测试同一内容重复导出只渲染一次"""
+        key = results_fingerprint(RESULTS, "docx")
+        first = self.pool.render(key, "docx", self._render())
+        second = self.pool.render(key, "docx", self._render())
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.renders), 1)
+        self.assertEqual(self.pool.stats()["hits"], 1)
+
+    def test_concurrent_exports_share_render(self):
+        """测试并发导出同一报告合并为一次渲染"""
+        key = results_fingerprint(RESULTS, "pdf")
+        outputs = []
+
+        def worker():
+            outputs.append(self.pool.render(key, "pdf", self._render(delay=0.2)))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(outputs, [b"rendered"] * 4)
+        self.assertEqual(len(self.renders), 1)
+
+    def test_failed_render_not_cached(self):
+        """测试渲染失败时抛出异常且不写入缓存"""
+        key = results_fingerprint(RESULTS, "pdf")
+
+        def failing():
+            raise RuntimeError("pandoc不可用")
+
+        with self.assertRaises(RuntimeError):
+            self.pool.render(key, "pdf", failing)
+        self.assertEqual(self.pool.render(key, "pdf", self._render()), b"rendered")
+        self.assertEqual(self.pool.stats()["failures"], 1)
+
+    def test_disk_cache_survives_new_pool(self):
+        """测试磁盘缓存可被新的渲染池复用（例如进程重启后）"""
+        key = results_fingerprint(RESULTS, "markdown")
+        self.pool.render(key, "markdown", self._render(b"# report"))
+
+        fresh_pool = ExportRenderPool(ExportCache(self.tmp_dir.name), max_workers=1)
+        self.assertEqual(fresh_pool.render(key, "markdown", self._render(b"other")), b"# report")
+        self.assertEqual(self.renders, [b"# report"])
+
+    def test_disk_cache_pruned_on_write(self):
+        """测试磁盘缓存写入时删除过期文件，超过配额时删除最久未使用的文件"""
+        cache = ExportCache(self.tmp_dir.name, quota_bytes=250, max_age_seconds=3600)
+        keys = [results_fingerprint({"n": i}, "markdown") for i in range(4)]
+        for i, key in enumerate(keys[:2]):
+            cache.put(key, "markdown", b"x" * 100)
+            os.utime(cache._path(key, "markdown"), (time.time() - 60 + i, time.time() - 60 + i))
+
+        # 读取过的文件最近使用，超过配额时先删除另一个
+        fresh = ExportCache(self.tmp_dir.name, quota_bytes=250, max_age_seconds=3600)
+        self.assertEqual(fresh.get(keys[0], "markdown"), b"x" * 100)
+        fresh.put(keys[2], "markdown", b"x" * 100)
+        self.assertTrue(cache._path(keys[0], "markdown").exists())
+        self.assertFalse(cache._path(keys[1], "markdown").exists())
+
+        # 超过保留时间的文件即使未超过配额也删除
+        old = time.time() - 7200
+        os.utime(cache._path(keys[0], "markdown"), (old, old))
+        cache.put(keys[3], "markdown", b"y")
+        self.assertFalse(cache._path(keys[0], "markdown").exists())
+        self.assertTrue(cache._path(keys[2], "markdown").exists())
+        self.assertTrue(cache._path(keys[3], "markdown").exists())
+
+    def test_auto_save_settings_render(self):
+        """测试侧边栏自动保存设置使用共享导出器渲染"""
+        from streamlit.testing.v1 import AppTest
+
+        def app():
+            import streamlit as st
+            from web.utils.auto_saver import render_auto_save_settings
+
+            st.session_state.auto_save_formats = ['markdown', 'docx']
+            render_auto_save_settings()
+
+        at = AppTest.from_function(app).run(timeout=30)
+        self.assertEqual(len(at.exception), 0)
+        self.assertTrue(any(checkbox.label == "📝 Word文档" for checkbox in at.checkbox))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据源熔断器和健康度排序测试
+验证熔断器的打开、冷却后半开探测和恢复，熔断中的数据源被快速跳过，
+以及按健康分调整主数据源和备用数据源的顺序
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.data_types import FetchStatus, StockDataResult
+from tradingagents.dataflows.source_health import CircuitState, SourceHealth, SourceHealthRegistry
+
+
+def _ok(source):
+    frame = pd.DataFrame({"trade_date": ["2025-06-03", "2025-06-04"], "close": [10.0, 11.0]})
+    return StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", source, frame)
+
+
+def _manager(current, available):
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.default_source = current
+    manager.current_source = current
+    manager.available_sources = available
+    manager.health = SourceHealthRegistry()
+    manager.hedging = False
+    return manager
+
+
+class TestSourceHealth(unittest.TestCase):
+    """数据源熔断器和健康度测试类"""
+
+    def test_breaker_transitions(self):
+        """测试连续失败打开熔断器，冷却后只放行一个探测请求，探测失败加倍冷却"""
+        health = SourceHealth("tushare", failure_threshold=3, cooldown_seconds=60)
+        for _ in range(3):
+            self.assertTrue(health.allow_request(now=0))
+            health.record_failure(1.0, now=0)
+        self.assertEqual(health.state, CircuitState.OPEN)
+        self.assertFalse(health.allow_request(now=30))
+
+        # 冷却结束：半开，只放行一个探测
+        self.assertTrue(health.allow_request(now=61))
+        self.assertEqual(health.state, CircuitState.HALF_OPEN)
+        self.assertFalse(health.allow_request(now=61))
+
+        # 探测失败：重新打开，冷却时间加倍
+        health.record_failure(1.0, now=61)
+        self.assertEqual(health.state, CircuitState.OPEN)
+        self.assertFalse(health.allow_request(now=61 + 100))
+        self.assertTrue(health.allow_request(now=61 + 121))
+
+        # 探测成功：关闭并恢复冷却时间
+        health.record_success(0.5)
+        self.assertEqual(health.state, CircuitState.CLOSED)
+        self.assertEqual(health.cooldown, 60)
+
+    def test_error_rate_opens_breaker(self):
+        """测试窗口内错误率过高时即使没有连续失败也会熔断"""
+        health = SourceHealth("akshare", failure_threshold=10, error_rate_threshold=0.5, min_calls=4)
+        for ok in (True, False, True, False):
+            health.record_success(0.1) if ok else health.record_failure(0.1, now=0)
+        self.assertEqual(health.state, CircuitState.OPEN)
+
+    def test_open_source_is_skipped(self):
+        """测试熔断中的数据源不再被调用，直接使用备用数据源"""
+        manager = _manager(ChinaDataSource.TUSHARE, [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE])
+        with patch.object(DataSourceManager, "_get_tushare_data", side_effect=RuntimeError("timeout")) as tushare, \
+                patch.object(DataSourceManager, "_get_akshare_data", return_value=_ok("akshare")):
+            for _ in range(3):
+                self.assertEqual(manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04").source,
+                                 "akshare")
+            self.assertEqual(tushare.call_count, 3)
+
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertTrue(result.ok)
+        self.assertEqual(result.source, "akshare")
+        self.assertEqual(tushare.call_count, 3)
+        self.assertEqual(manager.get_source_health()["tushare"]["state"], "open")
+
+    def test_half_open_probe_recovers(self):
+        """测试冷却结束后探测成功，数据源恢复为主数据源"""
+        manager = _manager(ChinaDataSource.TUSHARE, [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE])
+        for _ in range(3):
+            manager.health.record_failure(ChinaDataSource.TUSHARE, 1.0)
+        tushare_health = manager.health._get(ChinaDataSource.TUSHARE)
+        tushare_health.opened_at -= tushare_health.cooldown + 1
+
+        with patch.object(DataSourceManager, "_get_tushare_data", return_value=_ok("tushare")), \
+                patch.object(DataSourceManager, "_get_akshare_data", return_value=_ok("akshare")) as akshare:
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertEqual(result.source, "tushare")
+        self.assertEqual(akshare.call_count, 0)
+        self.assertEqual(tushare_health.state, CircuitState.CLOSED)
+
+    def test_health_ordering(self):
+        """测试健康分明显更高的备用数据源排到前面，样本不足时保持配置顺序"""
+        registry = SourceHealthRegistry(min_calls=5)
+        sources = [ChinaDataSource.TUSHARE, ChinaDataSource.AKSHARE, ChinaDataSource.BAOSTOCK]
+        self.assertEqual(registry.order(sources), sources)
+
+        for _ in range(5):
+            registry.record_success(ChinaDataSource.TUSHARE, 20.0)
+            registry.record_success(ChinaDataSource.AKSHARE, 0.5)
+        self.assertEqual(registry.order(sources)[0], ChinaDataSource.AKSHARE)
+
+    def test_empty_result_not_counted_until_other_source_has_data(self):
+        """测试空数据在其他数据源也为空时不计为失败，其他数据源有数据时才计为失败"""
+        manager = _manager(ChinaDataSource.AKSHARE, [ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE])
+        empty = StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", "akshare", pd.DataFrame())
+        tushare_empty = StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", "tushare", pd.DataFrame())
+
+        with patch.object(DataSourceManager, "_get_akshare_data", return_value=empty), \
+                patch.object(DataSourceManager, "_get_tushare_data", return_value=tushare_empty):
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertEqual(result.status, FetchStatus.EMPTY)
+        self.assertEqual(manager.get_source_health()["akshare"]["consecutive_failures"], 0)
+
+        with patch.object(DataSourceManager, "_get_akshare_data", return_value=empty), \
+                patch.object(DataSourceManager, "_get_tushare_data", return_value=_ok("tushare")):
+            manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertEqual(manager.get_source_health()["akshare"]["consecutive_failures"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
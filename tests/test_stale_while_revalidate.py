@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+过期缓存后台刷新测试
+验证宽限期内直接返回过期数据并在后台刷新、并发请求只触发一次刷新、
+超过宽限期时同步获取
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.background_refresh import BackgroundRefresher
+from tradingagents.dataflows.cache_manager import StockDataCache
+from tradingagents.dataflows.data_types import StockDataResult
+
+
+def _result(close):
+    frame = pd.DataFrame({"trade_date": ["2025-06-03", "2025-06-04"], "close": [10.0, close],
+                          "high": [10.5, close], "low": [9.8, 10.0], "volume": [1000, 1500]})
+    return StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", "tushare", frame, name="平安银行")
+
+
+def _age(cache, cache_key, seconds):
+    """把缓存条目的写入时间提前"""
+    path = cache._get_metadata_path(cache_key)
+    metadata = json.loads(path.read_text(encoding="utf-8"))
+    metadata["cached_at"] = (datetime.now() - timedelta(seconds=seconds)).isoformat()
+    path.write_text(json.dumps(metadata), encoding="utf-8")
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+    """过期缓存后台刷新测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = StockDataCache(self.tmp_dir.name)
+        self.refresher = BackgroundRefresher()
+        # 固定TTL为60秒，不依赖当前是否在交易时段
+        self.ttl = patch("tradingagents.dataflows.cache_manager.calendar_ttl_seconds", return_value=60)
+        self.ttl.start()
+
+    def tearDown(self):
+        self.ttl.stop()
+        self.tmp_dir.cleanup()
+
+    def _china_provider(self, grace_hours=24):
+        from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+        provider = OptimizedChinaDataProvider.__new__(OptimizedChinaDataProvider)
+        provider.cache = self.cache
+        provider.config = {"cache_stale_grace_hours": grace_hours}
+        provider.last_api_call = 0
+        provider.min_api_interval = 0
+        return provider
+
+    def test_refresher_deduplicates(self):
+        """测试同一个键的刷新同时只运行一次"""
+        release = threading.Event()
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            release.wait(5)
+
+        first = self.refresher.submit("key", refresh)
+        self.assertIsNone(self.refresher.submit("key", refresh))
+        release.set()
+        first.result(5)
+        self.assertFalse(self.refresher.in_flight("key"))
+        self.refresher.submit("key", refresh).result(5)
+        self.assertEqual(len(calls), 2)
+
+    def test_china_serves_stale_and_refreshes(self):
+        """测试A股行情过期后立即返回旧数据，后台刷新完成后缓存更新"""
+        provider = self._china_provider()
+        cache_key = self.cache.save_stock_data("000001", _result(11.0).to_json(), "2025-06-01", "2025-06-04",
+                                               provider.RESULT_CACHE_SOURCE)
+        _age(self.cache, cache_key, 120)
+
+        release = threading.Event()
+        fetches = []
+
+        def fetch(symbol, start_date, end_date):
+            fetches.append(symbol)
+            release.wait(5)
+            return _result(12.0)
+
+        with patch("tradingagents.dataflows.data_source_manager.get_china_stock_data_result", side_effect=fetch), \
+                patch("tradingagents.dataflows.optimized_china_data.get_background_refresher",
+                      return_value=self.refresher):
+            first = provider.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+            second = provider.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+            self.assertEqual((first.quote.price, second.quote.price), (11.0, 11.0))
+
+            release.set()
+            deadline = time.time() + 5
+            while self.refresher.in_flight(("china_stock_data", "000001", "2025-06-01", "2025-06-04")) \
+                    and time.time() < deadline:
+                time.sleep(0.01)
+
+            refreshed = provider.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+
+        self.assertEqual(len(fetches), 1)
+        self.assertEqual(refreshed.quote.price, 12.0)
+
+    def test_beyond_grace_fetches_synchronously(self):
+        """测试超过宽限期的缓存不再使用，同步获取"""
+        provider = self._china_provider(grace_hours=1)
+        cache_key = self.cache.save_stock_data("000001", _result(11.0).to_json(), "2025-06-01", "2025-06-04",
+                                               provider.RESULT_CACHE_SOURCE)
+        _age(self.cache, cache_key, 2 * 3600)
+
+        with patch("tradingagents.dataflows.data_source_manager.get_china_stock_data_result",
+                   return_value=_result(12.0)), \
+                patch("tradingagents.dataflows.optimized_china_data.get_background_refresher",
+                      side_effect=AssertionError("超过宽限期不应后台刷新")):
+            result = provider.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertEqual(result.quote.price, 12.0)
+
+    def test_backtest_fundamentals_use_as_of_date(self):
+        """测试回测中A股基本面报告按模拟交易日期生成并单独缓存，不与实时报告混用"""
+        from tradingagents.dataflows.data_context import AnalysisDataContext
+        from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+        provider = self._china_provider()
+        windows = []
+
+        def fetch(symbol, start_date, end_date):
+            windows.append((start_date, end_date))
+            return _result(11.0)
+
+        def report(symbol, stock_data, analysis_date=None):
+            return f"{symbol} 基本面 {analysis_date:%Y-%m-%d}"
+
+        with patch.object(OptimizedChinaDataProvider, "get_stock_data_result", side_effect=fetch), \
+                patch.object(OptimizedChinaDataProvider, "_generate_fundamentals_report", side_effect=report):
+            with AnalysisDataContext("backtest", as_of="2025-06-04").activate():
+                first = provider.get_fundamentals_data("000001")
+                second = provider.get_fundamentals_data("000001")
+            live = provider.get_fundamentals_data("000001")
+
+        self.assertEqual(first, "000001 基本面 2025-06-04")
+        self.assertEqual(second, first)
+        self.assertEqual(windows[0], ("2025-05-05", "2025-06-04"))
+        self.assertEqual(len(windows), 2)
+        self.assertNotEqual(live, first)
+
+    def test_us_serves_stale_and_refreshes(self):
+        """测试美股行情过期后立即返回旧数据并在后台刷新"""
+        from tradingagents.dataflows.optimized_us_data import OptimizedUSDataProvider
+
+        provider = OptimizedUSDataProvider.__new__(OptimizedUSDataProvider)
+        provider.cache = self.cache
+        provider.config = {"cache_stale_grace_hours": 24}
+        cache_key = self.cache.save_stock_data("AAPL", "# AAPL 旧数据", "2025-06-01", "2025-06-04", "yfinance")
+        _age(self.cache, cache_key, 120)
+
+        with patch.object(OptimizedUSDataProvider, "_fetch_stock_data", return_value="# AAPL 新数据") as fetch, \
+                patch("tradingagents.dataflows.optimized_us_data.get_background_refresher",
+                      return_value=self.refresher):
+            data = provider.get_stock_data("AAPL", "2025-06-01", "2025-06-04")
+            self.refresher._executor.shutdown(wait=True)
+
+        self.assertEqual(data, "# AAPL 旧数据")
+        fetch.assert_called_once_with("AAPL", "2025-06-01", "2025-06-04")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分析状态日志测试
+验证按日期追加写入、通过索引随机读取、压缩日志以及索引损坏或落后时的重建
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.graph.state_journal import StateJournal, StateJournalReader
+
+
+def _record(trade_date, decision="持有"):
+    return {"company_of_interest": "000001", "trade_date": trade_date, "final_trade_decision": decision}
+
+
+class TestStateJournal(unittest.TestCase):
+    """分析状态日志测试类"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.tmp_dir.name
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, compress):
+        journal = StateJournal(self.directory, compress=compress)
+        for day in ("2025-06-02", "2025-06-03", "2025-06-04"):
+            journal.append(day, _record(day))
+        journal.append("2025-06-03", _record("2025-06-03", "买入"))
+        return journal
+
+    def test_append_and_random_access(self):
+        """测试追加写入后按日期读取，重复日期以最后一条为准"""
+        journal = self._write(compress=False)
+        with open(journal.path, "rb") as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+
+        reader = StateJournalReader(self.directory)
+        self.assertEqual(reader.dates(), ["2025-06-02", "2025-06-04", "2025-06-03"])
+        self.assertEqual(reader.get("2025-06-03")["final_trade_decision"], "买入")
+        self.assertIsNone(reader.get("2025-07-01"))
+        self.assertEqual(len(list(reader)), 4)
+        self.assertEqual(set(reader.to_dict()), {"2025-06-02", "2025-06-03", "2025-06-04"})
+
+    def test_compressed_journal(self):
+        """测试压缩日志可随机读取，且整个文件是合法的gzip文件"""
+        import gzip
+
+        journal = self._write(compress=True)
+        reader = StateJournalReader(self.directory)
+        self.assertTrue(reader.journal.compress)
+        self.assertEqual(reader.get("2025-06-04")["trade_date"], "2025-06-04")
+        with gzip.open(journal.path, "rt", encoding="utf-8") as f:
+            self.assertEqual(len(f.read().splitlines()), 4)
+
+    def test_rebuild_index_when_missing_or_truncated(self):
+        """测试索引缺失时扫描重建，末尾不完整的记录被忽略"""
+        for compress in (False, True):
+            with self.subTest(compress=compress):
+                directory = os.path.join(self.directory, str(compress))
+                journal = StateJournal(directory, compress=compress)
+                journal.append("2025-06-02", _record("2025-06-02"))
+                journal.append("2025-06-03", _record("2025-06-03"))
+                os.remove(journal.index_path)
+                with open(journal.path, "ab") as f:
+                    f.write(b"\x1f\x8b\x08" if compress else b'{"trade_date": "2025-06-0')
+
+                reader = StateJournalReader(directory, compress=compress)
+                self.assertEqual(reader.dates(), ["2025-06-02", "2025-06-03"])
+                self.assertEqual(reader.get("2025-06-03")["trade_date"], "2025-06-03")
+
+
+if __name__ == '__main__':
+    unittest.main()
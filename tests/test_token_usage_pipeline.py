@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Token使用记录管道测试
+验证track_usage不在调用线程上做存储I/O、后台批量写入、定价/设置快照失效以及今日成本计数
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.config.config_manager import ConfigManager, TokenTracker
+from tradingagents.config.mongodb_storage import MongoDBStorage
+
+
+class TestTokenUsagePipeline(unittest.TestCase):
+    """Token使用记录管道测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        with patch.dict(os.environ, {"USE_MONGODB_STORAGE": "false"}):
+            self.manager = ConfigManager(self.temp_dir)
+        with patch.dict(os.environ, {"TOKEN_USAGE_FLUSH_INTERVAL": "0.1", "TOKEN_USAGE_BATCH_SIZE": "10"}):
+            self.tracker = TokenTracker(self.manager)
+
+    def tearDown(self):
+        self.tracker.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_track_usage_writes_in_background(self):
+        """测试记录由后台线程批量写入"""
+        writer_threads = []
+        original = self.manager.save_usage_records_batch
+
+        def recording_save(records):
+            writer_threads.append((threading.current_thread().name, len(records)))
+            return original(records)
+
+        with patch.object(self.manager, "save_usage_records_batch", side_effect=recording_save):
+            for _ in range(5):
+                record = self.tracker.track_usage("dashscope", "qwen-turbo", 1000, 500, session_id="s1")
+                self.assertAlmostEqual(record.cost, 0.005)
+            self.assertTrue(self.tracker.flush(timeout=5))
+
+        self.assertTrue(writer_threads)
+        self.assertTrue(all(name == "token-usage-writer" for name, _ in writer_threads))
+        self.assertEqual(sum(count for _, count in writer_threads), 5)
+        self.assertEqual(len(self.manager.load_usage_records()), 5)
+
+    def test_session_and_today_counters(self):
+        """测试会话成本和今日成本计数器"""
+        self.tracker.track_usage("dashscope", "qwen-turbo", 1000, 0, session_id="a")
+        self.tracker.track_usage("dashscope", "qwen-turbo", 1000, 0, session_id="b")
+        self.tracker.flush(timeout=5)
+
+        self.assertAlmostEqual(self.tracker.get_session_cost("a"), 0.002)
+        self.assertAlmostEqual(self.tracker.get_today_cost(), 0.004)
+
+    def test_pricing_snapshot_invalidated_on_file_change(self):
+        """测试定价文件修改后快照自动失效"""
+        self.assertAlmostEqual(self.manager.calculate_cost("dashscope", "qwen-turbo", 1000, 0), 0.002)
+
+        with open(self.manager.pricing_file, "r", encoding="utf-8") as f:
+            pricing = json.load(f)
+        for item in pricing:
+            if item["model_name"] == "qwen-turbo":
+                item["input_price_per_1k"] = 0.01
+        time.sleep(0.01)
+        with open(self.manager.pricing_file, "w", encoding="utf-8") as f:
+            json.dump(pricing, f, ensure_ascii=False, indent=2)
+
+        self.assertAlmostEqual(self.manager.calculate_cost("dashscope", "qwen-turbo", 1000, 0), 0.01)
+
+    def test_settings_snapshot_returns_copy(self):
+        """测试设置快照返回副本并在保存后失效"""
+        settings = self.manager.load_settings()
+        settings["cost_alert_threshold"] = 1.0
+        self.assertEqual(self.manager.load_settings()["cost_alert_threshold"], 100.0)
+
+        self.manager.save_settings(settings)
+        self.assertEqual(self.manager.load_settings()["cost_alert_threshold"], 1.0)
+
+    def test_partial_mongodb_failure_falls_back_per_record(self):
+        """测试MongoDB批量写入部分失败时只有失败的记录回退到JSON文件"""
+        from pymongo.errors import BulkWriteError
+
+        storage = MongoDBStorage.__new__(MongoDBStorage)
+        storage._connected = True
+        storage.collection = MagicMock()
+        storage.collection.insert_many.side_effect = BulkWriteError({
+            "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}], "nInserted": 2,
+        })
+        self.manager.mongodb_storage = storage
+
+        records = [
+            self.manager.build_usage_record("dashscope", "qwen-turbo", 1000, 0, f"s{i}") for i in range(3)
+        ]
+        self.assertTrue(self.manager.save_usage_records_batch(records))
+
+        fallback = self.manager.load_usage_records()
+        self.assertEqual([record.session_id for record in fallback], ["s1"])
+
+    def test_cost_tracking_disabled(self):
+        """测试关闭成本跟踪时不记录"""
+        settings = self.manager.load_settings()
+        settings["enable_cost_tracking"] = False
+        self.manager.save_settings(settings)
+
+        self.assertIsNone(self.tracker.track_usage("dashscope", "qwen-turbo", 1000, 500))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+交易日历缓存TTL测试
+验证交易时段和休市日的计算、收盘后数据有效到下一次开盘、周末和节假日不重复获取，
+以及文件缓存按交易日历判断有效期
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date, datetime, time
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from tradingagents.dataflows import trading_calendar
+from tradingagents.dataflows.trading_calendar import ExchangeCalendar, calendar_ttl_seconds, market_of
+
+SHANGHAI = ZoneInfo("Asia/Shanghai")
+
+
+def _china_calendar():
+    # 2026-10-01 ~ 10-07 国庆休市
+    return ExchangeCalendar("china", "Asia/Shanghai",
+                            [(time(9, 30), time(11, 30)), (time(13, 0), time(15, 0))],
+                            holidays=[date(2026, 10, d) for d in range(1, 8)], settle_minutes=60)
+
+
+def _at(*args):
+    return datetime(*args, tzinfo=SHANGHAI)
+
+
+class TestTradingCalendar(unittest.TestCase):
+    """交易日历测试类"""
+
+    def test_market_detection(self):
+        """测试按代码识别市场"""
+        self.assertEqual(market_of("000001"), "china")
+        self.assertEqual(market_of("600519.SH"), "china")
+        self.assertEqual(market_of("0700.HK"), "hk")
+        self.assertEqual(market_of("AAPL"), "us")
+
+    def test_sessions_and_holidays(self):
+        """测试交易时段、午间休市和节假日"""
+        calendar = _china_calendar()
+        self.assertTrue(calendar.is_open(_at(2026, 10, 19, 10)))
+        self.assertFalse(calendar.is_open(_at(2026, 10, 19, 12)))
+        self.assertFalse(calendar.is_open(_at(2026, 10, 2, 10)))
+        self.assertEqual(calendar.next_open(_at(2026, 10, 19, 12)), _at(2026, 10, 19, 13))
+        self.assertEqual(calendar.next_open(_at(2026, 9, 30, 16)), _at(2026, 10, 8, 9, 30))
+        self.assertEqual(calendar.last_close(_at(2026, 10, 8, 9)), _at(2026, 9, 30, 15))
+
+    def test_cache_expiry(self):
+        """测试盘中短TTL、收盘后结算窗口、有效到下一次开盘"""
+        calendar = _china_calendar()
+        self.assertEqual(calendar.cache_expiry(_at(2026, 10, 19, 10), 300), _at(2026, 10, 19, 10, 5))
+        self.assertEqual(calendar.cache_expiry(_at(2026, 10, 19, 15, 20), 300), _at(2026, 10, 19, 16))
+        self.assertEqual(calendar.cache_expiry(_at(2026, 10, 19, 11, 45), 300), _at(2026, 10, 19, 13))
+        # 周五收盘后获取的数据有效到周一开盘
+        self.assertEqual(calendar.cache_expiry(_at(2026, 10, 16, 18), 300), _at(2026, 10, 19, 9, 30))
+        # 长假前获取的数据有效到节后开盘
+        self.assertEqual(calendar.cache_expiry(_at(2026, 9, 30, 20), 300), _at(2026, 10, 8, 9, 30))
+
+    def test_us_holidays(self):
+        """测试美股休市日规则（含周末顺延）"""
+        holidays = trading_calendar._us_holidays(2026, 2026)
+        self.assertIn(date(2026, 7, 3), holidays)     # 独立日是周六，周五休市
+        self.assertIn(date(2026, 11, 26), holidays)   # 感恩节
+        self.assertIn(date(2026, 4, 3), holidays)     # 耶稣受难日
+        self.assertNotIn(date(2026, 10, 12), holidays)
+
+    def test_file_cache_uses_calendar(self):
+        """测试文件缓存在收盘后获取的行情到下一次开盘前一直有效"""
+        from tradingagents.dataflows.cache_manager import StockDataCache
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache = StockDataCache(tmp_dir.name)
+        cache_key = cache.save_stock_data("000001", "行情", "2026-09-01", "2026-10-16", "tushare")
+
+        # 周五晚上获取，周日仍然有效
+        metadata_path = cache._get_metadata_path(cache_key)
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+        metadata["cached_at"] = _at(2026, 10, 16, 18).astimezone().replace(tzinfo=None).isoformat()
+        metadata_path.write_text(json.dumps(metadata), encoding="utf-8")
+
+        with patch.dict(trading_calendar._calendars, {"china": _china_calendar()}):
+            sunday = _at(2026, 10, 18, 12).astimezone().replace(tzinfo=None)
+            ttl = calendar_ttl_seconds("000001", "stock_data", datetime.fromisoformat(metadata["cached_at"]))
+            self.assertEqual(ttl, int((_at(2026, 10, 19, 9, 30) - _at(2026, 10, 16, 18)).total_seconds()))
+
+            with patch("tradingagents.dataflows.cache_manager.datetime") as mock_datetime:
+                mock_datetime.now.return_value = sunday
+                mock_datetime.fromisoformat = datetime.fromisoformat
+                self.assertTrue(cache.is_cache_valid(cache_key))
+                mock_datetime.now.return_value = _at(2026, 10, 19, 9, 31).astimezone().replace(tzinfo=None)
+                self.assertFalse(cache.is_cache_valid(cache_key))
+
+            # 新闻等数据类型仍然使用固定TTL
+            self.assertIsNone(calendar_ttl_seconds("000001", "news"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化数据流结果测试
+验证数据源返回StockDataResult、只在工具边界格式化文本、按状态降级、
+缓存保存结构化结果，以及基本面报告直接使用行情摘要而不是解析文本
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import pandas as pd
+
+from tradingagents.dataflows.data_source_manager import ChinaDataSource, DataSourceManager
+from tradingagents.dataflows.data_types import FetchStatus, StockDataResult, StockQuote
+from tradingagents.dataflows.source_health import SourceHealthRegistry
+
+
+def _tushare_frame():
+    return pd.DataFrame({
+        "trade_date": pd.to_datetime(["2025-06-02", "2025-06-03", "2025-06-04"]),
+        "open": [10.0, 10.2, 10.9],
+        "high": [10.5, 11.2, 11.3],
+        "low": [9.8, 10.1, 10.7],
+        "close": [10.0, 11.0, 11.22],
+        "volume": [1000, 2000, 1500],
+    })
+
+
+def _akshare_frame():
+    return pd.DataFrame({
+        "日期": ["2025-06-02", "2025-06-03", "2025-06-04", "2025-06-05"],
+        "开盘": [10.0, 10.2, 10.9, 11.0],
+        "收盘": [10.0, 11.0, 11.22, 11.5],
+        "最高": [10.5, 11.2, 11.3, 11.6],
+        "最低": [9.8, 10.1, 10.7, 10.9],
+        "成交量": [1000, 2000, 1500, 1200],
+    })
+
+
+class _FakeTushareAdapter:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def get_stock_data(self, symbol, start_date, end_date):
+        return self.frame
+
+    def get_stock_info(self, symbol):
+        return {"symbol": symbol, "name": "平安银行", "industry": "银行"}
+
+
+def _manager(current, available):
+    manager = DataSourceManager.__new__(DataSourceManager)
+    manager.default_source = current
+    manager.current_source = current
+    manager.available_sources = available
+    manager.health = SourceHealthRegistry()
+    manager.hedging = False
+    return manager
+
+
+class TestTypedDataflow(unittest.TestCase):
+    """结构化数据流结果测试类"""
+
+    def test_quote_from_frame(self):
+        """测试行情摘要兼容英文和中文列名"""
+        quote = StockQuote.from_frame(_tushare_frame(), "000001", "平安银行")
+        self.assertEqual(quote.date, "2025-06-04")
+        self.assertAlmostEqual(quote.price, 11.22)
+        self.assertAlmostEqual(quote.change_pct, 2.0)
+        self.assertEqual(quote.volume, 4500)
+
+        quote = StockQuote.from_frame(_akshare_frame(), "000001")
+        self.assertAlmostEqual(quote.period_change, 1.5)
+        self.assertEqual((quote.high, quote.low), (11.6, 9.8))
+
+    def test_tushare_result_and_text_boundary(self):
+        """测试Tushare返回结构化结果，文本格式与原来的报告一致"""
+        manager = _manager(ChinaDataSource.TUSHARE, [ChinaDataSource.TUSHARE])
+        with patch("tradingagents.dataflows.tushare_adapter.get_tushare_adapter",
+                   return_value=_FakeTushareAdapter(_tushare_frame())):
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+
+        self.assertEqual(result.status, FetchStatus.OK)
+        self.assertEqual(result.quote.name, "平安银行")
+        text = result.to_text()
+        self.assertTrue(text.startswith("📊 平安银行(000001) - Tushare数据\n"))
+        self.assertIn("💰 最新价格: ¥11.22\n", text)
+        self.assertIn("📈 涨跌额: +0.22 (+2.00%)\n", text)
+        self.assertIn("   成交量: 4,500股\n", text)
+
+    def test_tushare_wrappers_return_text(self):
+        """测试对外的Tushare接口仍然返回格式化文本，而不是结构化结果"""
+        from tradingagents.dataflows import interface
+
+        manager = _manager(ChinaDataSource.AKSHARE, [ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE])
+        with patch("tradingagents.dataflows.tushare_adapter.get_tushare_adapter",
+                   return_value=_FakeTushareAdapter(_tushare_frame())), \
+                patch("tradingagents.dataflows.data_source_manager.get_data_source_manager", return_value=manager):
+            text = manager.get_china_stock_data_tushare("000001", "2025-06-01", "2025-06-04")
+            via_interface = interface.get_china_stock_data_tushare("000001", "2025-06-01", "2025-06-04")
+
+        self.assertIsInstance(text, str)
+        self.assertTrue(text.startswith("📊 平安银行(000001) - Tushare数据\n"))
+        self.assertEqual(via_interface, text)
+        self.assertEqual(manager.current_source, ChinaDataSource.AKSHARE)
+
+    def test_fallback_by_status(self):
+        """测试当前数据源返回空数据时按状态降级，而不是查找文本中的错误标记"""
+        manager = _manager(ChinaDataSource.AKSHARE, [ChinaDataSource.AKSHARE, ChinaDataSource.TUSHARE])
+        empty = StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", "akshare", pd.DataFrame())
+        with patch.object(DataSourceManager, "_get_akshare_data", return_value=empty), \
+                patch("tradingagents.dataflows.tushare_adapter.get_tushare_adapter",
+                      return_value=_FakeTushareAdapter(_tushare_frame())):
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertEqual(result.source, "tushare")
+        self.assertTrue(result.ok)
+
+        # 所有数据源都失败时返回原始错误
+        with patch.object(DataSourceManager, "_get_akshare_data", return_value=empty), \
+                patch.object(DataSourceManager, "_get_tushare_data", side_effect=RuntimeError("down")):
+            result = manager.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+        self.assertEqual(result.status, FetchStatus.EMPTY)
+        self.assertTrue(result.to_text().startswith("❌"))
+
+    def test_json_roundtrip_keeps_text(self):
+        """测试缓存序列化后重新格式化的文本不变"""
+        for source, frame in (("tushare", _tushare_frame()), ("akshare", _akshare_frame())):
+            with self.subTest(source=source):
+                result = StockDataResult.from_frame("000001", "2025-06-01", "2025-06-05", source, frame, name="平安银行")
+                restored = StockDataResult.from_json(result.to_json())
+                self.assertEqual(restored.to_text(), result.to_text())
+                self.assertEqual(restored.quote, result.quote)
+
+    def test_fundamentals_use_structured_quote(self):
+        """测试基本面报告直接使用行情摘要和结构化股票信息，结构化结果被缓存"""
+        from tradingagents.dataflows.cache_manager import StockDataCache
+        from tradingagents.dataflows.optimized_china_data import OptimizedChinaDataProvider
+
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        provider = OptimizedChinaDataProvider.__new__(OptimizedChinaDataProvider)
+        provider.cache = StockDataCache(tmp_dir.name)
+        provider.config = {}
+        provider.last_api_call = 0
+        provider.min_api_interval = 0
+
+        result = StockDataResult.from_frame("000001", "2025-06-01", "2025-06-04", "tushare", _tushare_frame(),
+                                            name="平安银行")
+        prices = []
+
+        def _real_metrics(symbol, price_value):
+            prices.append(price_value)
+            return None
+
+        with patch("tradingagents.dataflows.data_source_manager.get_china_stock_data_result",
+                   return_value=result) as fetch, \
+                patch("tradingagents.dataflows.data_source_manager.get_china_stock_info_unified",
+                      return_value={"symbol": "000001", "name": "平安银行"}), \
+                patch.object(OptimizedChinaDataProvider, "_get_real_financial_metrics", side_effect=_real_metrics):
+            report = provider._generate_fundamentals_report(
+                "000001", provider.get_stock_data_result("000001", "2025-06-01", "2025-06-04"))
+            cached = provider.get_stock_data_result("000001", "2025-06-01", "2025-06-04")
+
+        self.assertEqual(prices, [11.22])
+        self.assertIn("**股票名称**: 平安银行", report)
+        self.assertIn("**涨跌幅**: +2.00%", report)
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(cached.to_text(), result.to_text())
+
+
+if __name__ == '__main__':
+    unittest.main()
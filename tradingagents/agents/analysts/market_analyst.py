@@ -1,6 +1,4 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.agents import create_react_agent, AgentExecutor
-from langchain import hub
 import time
 import json
 import traceback
@@ -228,7 +226,10 @@ def create_market_analyst_react(llm, toolkit):
 ## 投资建议"""
 
             try:
-                # 创建ReAct Agent
+                # 创建ReAct Agent（langchain.agents较重，只在ReAct模式下导入）
+                from langchain.agents import create_react_agent, AgentExecutor
+                from langchain import hub
+
                 prompt = hub.pull("hwchase17/react")
                 agent = create_react_agent(llm, tools, prompt)
                 agent_executor = AgentExecutor(
@@ -1,12 +1,16 @@
 import time
 import json
 
+from tradingagents.agents.utils.context_builder import DebateContextBuilder
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
-def create_risk_manager(llm, memory):
+def create_risk_manager(llm, memory, context_builder=None):
+    context_builder = context_builder or DebateContextBuilder()
+
     def risk_manager_node(state) -> dict:
 
         company_name = state["company_of_interest"]
@@ -15,7 +19,7 @@ def create_risk_manager(llm, memory):
         risk_debate_state = state["risk_debate_state"]
         market_research_report = state["market_report"]
         news_report = state["news_report"]
-        fundamentals_report = state["news_report"]
+        fundamentals_report = state["fundamentals_report"]
         sentiment_report = state["sentiment_report"]
         trader_plan = state["investment_plan"]
 
@@ -32,6 +36,9 @@ def create_risk_manager(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # 裁判使用更大的token预算组装辩论历史
+        context = context_builder.build(state, history, judge=True)
+
         prompt = f"""作为风险管理委员会主席和辩论主持人，您的目标是评估三位风险分析师——激进、中性和安全/保守——之间的辩论，并确定交易员的最佳行动方案。您的决策必须产生明确的建议：买入、卖出或持有。只有在有具体论据强烈支持时才选择持有，而不是在所有方面都似乎有效时作为后备选择。力求清晰和果断。
 
 决策指导原则：
@@ -47,7 +54,7 @@ def create_risk_manager(llm, memory):
 ---
 
 **分析师辩论历史：**
-{history}
+{context['history']}
 
 ---
 
@@ -121,6 +128,7 @@ def create_risk_manager(llm, memory):
         return {
             "risk_debate_state": new_risk_debate_state,
             "final_trade_decision": response_content,
+            "report_digests": context["report_digests"],
         }
 
     return risk_manager_node
@@ -2,12 +2,16 @@ from langchain_core.messages import AIMessage
 import time
 import json
 
+from tradingagents.agents.utils.context_builder import DebateContextBuilder
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("default")
 
 
-def create_bull_researcher(llm, memory):
+def create_bull_researcher(llm, memory, context_builder=None):
+    context_builder = context_builder or DebateContextBuilder()
+
     def bull_node(state) -> dict:
         logger.debug(f"🐂 [DEBUG] ===== 看涨研究员节点开始 =====")
 
@@ -54,6 +58,9 @@ def create_bull_researcher(llm, memory):
         for i, rec in enumerate(past_memories, 1):
             past_memory_str += rec["recommendation"] + "\n\n"
 
+        # 在token预算内组装报告和辩论历史（报告摘要缓存在状态中）
+        context = context_builder.build(state, history)
+
         prompt = f"""你是一位看涨分析师，负责为股票 {company_name} 的投资建立强有力的论证。
 
 ⚠️ 重要提醒：当前分析的是 {'中国A股' if is_china else '海外股票'}，所有价格和估值请使用 {currency}（{currency_symbol}）作为单位。
@@ -68,11 +75,11 @@ def create_bull_researcher(llm, memory):
 - 参与讨论：以对话风格呈现你的论点，直接回应看跌分析师的观点并进行有效辩论，而不仅仅是列举数据
 
 可用资源：
-市场研究报告：{market_research_report}
-社交媒体情绪报告：{sentiment_report}
-最新世界事务新闻：{news_report}
-公司基本面报告：{fundamentals_report}
-辩论对话历史：{history}
+市场研究报告：{context['market_report']}
+社交媒体情绪报告：{context['sentiment_report']}
+最新世界事务新闻：{context['news_report']}
+公司基本面报告：{context['fundamentals_report']}
+辩论对话历史：{context['history']}
 最后的看跌论点：{current_response}
 类似情况的反思和经验教训：{past_memory_str}
 
@@ -93,6 +100,9 @@ def create_bull_researcher(llm, memory):
             "count": investment_debate_state["count"] + 1,
         }
 
-        return {"investment_debate_state": new_investment_debate_state}
+        return {
+            "investment_debate_state": new_investment_debate_state,
+            "report_digests": context["report_digests"],
+        }
 
     return bull_node
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+辩论上下文构建器
+
+研究员、风险辩论者和两位裁判在每轮辩论中都会把四份分析师报告和不断增长的
+辩论历史完整地放进提示词。本模块为每份报告生成一次摘要并缓存在AgentState
+（report_digests字段）中，然后在可配置的token预算内组装提示词上下文：
+预算足够时使用完整报告，超出时使用摘要，辩论历史只保留最近的部分。
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Optional
+
+from tradingagents.default_config import DEFAULT_CONFIG
+
+# 导入统一日志系统
+from tradingagents.utils.logging_init import get_logger
+logger = get_logger("default")
+
+
+# 参与辩论的分析师报告字段
+REPORT_FIELDS = ("market_report", "sentiment_report", "news_report", "fundamentals_report")
+
+# 摘要中优先保留的关键词
+_DIGEST_KEYWORDS = (
+    "建议", "结论", "总结", "评级", "目标价", "风险", "买入", "卖出", "持有",
+    "趋势", "支撑", "阻力", "估值", "市盈率", "PE", "PB", "ROE", "营收", "利润",
+    "情绪", "利好", "利空", "RSI", "MACD", "均线",
+)
+
+_CJK_PATTERN = re.compile(r"[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]")
+_NUMBER_PATTERN = re.compile(r"\d")
+
+HISTORY_OMITTED_NOTE = "[较早的辩论内容已省略]"
+REPORT_TRUNCATED_NOTE = "[摘要已截断]"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的token数
+
+    中文字符按每字1个token计算，其余字符按每4个字符1个token计算。
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """按token预算截断文本，keep_tail为True时保留文本末尾"""
+    if max_tokens <= 0 or not text:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 二分查找满足预算的最长字符数
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        candidate = text[-mid:] if keep_tail else text[:mid]
+        if estimate_tokens(candidate) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[-low:] if keep_tail else text[:low]
+
+
+def build_report_digest(report: str, max_tokens: int) -> str:
+    """
+    生成报告的抽取式摘要
+
+    按优先级保留标题行、包含关键结论词的行和包含数据的行，并保持原有顺序，
+    不调用LLM，因此同一份报告的摘要是确定的。
+
+    Args:
+        report: 完整报告
+        max_tokens: 摘要的token上限
+
+    Returns:
+        str: 报告摘要
+    """
+    if not report or estimate_tokens(report) <= max_tokens:
+        return report or ""
+
+    lines = [line.rstrip() for line in report.splitlines()]
+    candidates = []
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or set(stripped) <= set("-|:= *"):
+            continue
+        if stripped.startswith("#"):
+            priority = 0
+        elif any(keyword in stripped for keyword in _DIGEST_KEYWORDS):
+            priority = 1
+        elif _NUMBER_PATTERN.search(stripped):
+            priority = 2
+        else:
+            priority = 3
+        candidates.append((priority, index, stripped))
+
+    selected = []
+    used_tokens = 0
+    for priority, index, stripped in sorted(candidates):
+        cost = estimate_tokens(stripped) + 1
+        if used_tokens + cost > max_tokens:
+            if priority >= 2:
+                break
+            continue
+        selected.append((index, stripped))
+        used_tokens += cost
+
+    digest = "\n".join(line for _, line in sorted(selected))
+    if not digest:
+        digest = truncate_to_tokens(report, max_tokens)
+    return digest
+
+
+class DebateContextBuilder:
+    """
+    辩论智能体的上下文构建器
+
+    - 每份报告的摘要只生成一次，缓存在AgentState["report_digests"]中
+    - 完整报告能放进预算时直接使用完整报告，否则使用摘要
+    - 辩论历史只保留预算内最近的发言
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or DEFAULT_CONFIG
+        self.debate_budget = int(config.get(
+            "debate_context_budget_tokens", DEFAULT_CONFIG["debate_context_budget_tokens"]))
+        self.judge_budget = int(config.get(
+            "judge_context_budget_tokens", DEFAULT_CONFIG["judge_context_budget_tokens"]))
+        self.digest_tokens = int(config.get(
+            "report_digest_tokens", DEFAULT_CONFIG["report_digest_tokens"]))
+        self.history_share = float(config.get(
+            "debate_history_budget_ratio", DEFAULT_CONFIG["debate_history_budget_ratio"]))
+
+    @staticmethod
+    def _fingerprint(report: str) -> str:
+        return hashlib.md5((report or "").encode("utf-8")).hexdigest()
+
+    def get_report_digests(self, state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        获取报告摘要，已缓存且报告未变化时直接复用
+
+        Returns:
+            Dict: {报告字段: {"fingerprint", "tokens", "digest"}}，可直接写回状态
+        """
+        cached = state.get("report_digests") or {}
+        digests = {}
+        for field in REPORT_FIELDS:
+            report = state.get(field) or ""
+            fingerprint = self._fingerprint(report)
+            entry = cached.get(field)
+            if entry and entry.get("fingerprint") == fingerprint:
+                digests[field] = entry
+                continue
+
+            digest = build_report_digest(report, self.digest_tokens)
+            digests[field] = {
+                "fingerprint": fingerprint,
+                "tokens": estimate_tokens(report),
+                "digest": digest,
+            }
+            logger.debug(
+                f"📝 [上下文构建] 生成{field}摘要: {digests[field]['tokens']} -> {estimate_tokens(digest)} tokens"
+            )
+        return digests
+
+    def build_reports(self, state: Dict[str, Any], digests: Dict[str, Dict[str, Any]],
+                      budget: int) -> Dict[str, str]:
+        """
+        在预算内为每个报告字段选择完整报告或摘要
+
+        Returns:
+            Dict[str, str]: {报告字段: 放入提示词的文本}
+        """
+        full_tokens = sum(digests[field]["tokens"] for field in REPORT_FIELDS)
+        if full_tokens <= budget:
+            return {field: state.get(field) or "" for field in REPORT_FIELDS}
+
+        reports = {field: digests[field]["digest"] for field in REPORT_FIELDS}
+        digest_tokens = sum(estimate_tokens(text) for text in reports.values())
+        if digest_tokens > budget:
+            # 摘要仍超预算，按比例压缩每份摘要
+            per_report = max(budget // len(REPORT_FIELDS), 1)
+            for field, text in reports.items():
+                if estimate_tokens(text) > per_report:
+                    reports[field] = truncate_to_tokens(text, per_report) + "\n" + REPORT_TRUNCATED_NOTE
+        return reports
+
+    @staticmethod
+    def trim_history(history: str, budget: int) -> str:
+        """保留预算内最近的辩论历史，从整行处截断"""
+        if estimate_tokens(history) <= budget:
+            return history
+        tail = truncate_to_tokens(history, budget, keep_tail=True)
+        newline = tail.find("\n")
+        if newline != -1:
+            tail = tail[newline + 1:]
+        return f"{HISTORY_OMITTED_NOTE}\n{tail}"
+
+    def build(self, state: Dict[str, Any], history: str = "", judge: bool = False) -> Dict[str, Any]:
+        """
+        为一个辩论节点组装上下文
+
+        Args:
+            state: 当前AgentState
+            history: 辩论历史
+            judge: 是否为裁判节点（使用更大的预算）
+
+        Returns:
+            Dict: 包含四个报告字段、"history"以及需写回状态的"report_digests"
+        """
+        budget = self.judge_budget if judge else self.debate_budget
+        digests = self.get_report_digests(state)
+
+        history_budget = int(budget * self.history_share)
+        trimmed_history = self.trim_history(history, history_budget)
+        report_budget = budget - estimate_tokens(trimmed_history)
+
+        context = self.build_reports(state, digests, report_budget)
+        context["history"] = trimmed_history
+        context["report_digests"] = digests
+
+        logger.debug(
+            f"📝 [上下文构建] 预算 {budget} tokens, 实际 "
+            f"{sum(estimate_tokens(context[field]) for field in REPORT_FIELDS) + estimate_tokens(trimmed_history)} tokens"
+        )
+        return context
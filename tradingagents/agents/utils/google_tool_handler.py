@@ -8,12 +8,22 @@ Google模型工具调用统一处理器
 提供统一的工具调用处理逻辑供所有分析师使用。
 """
 
+import contextvars
 import logging
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Any, Dict, List, Optional, Tuple
 from langchain_core.messages import HumanMessage, ToolMessage, AIMessage
 
+from tradingagents.config.env_utils import parse_int_env, parse_float_env
+
 logger = logging.getLogger(__name__)
 
+# 并行工具调用配置：最大并发数和单个工具的超时时间（秒）
+DEFAULT_TOOL_MAX_WORKERS = 4
+DEFAULT_TOOL_TIMEOUT = 120.0
+
 class GoogleToolCallHandler:
     """Google模型工具调用统一处理器"""
     
@@ -130,75 +140,17 @@ class GoogleToolCallHandler:
         try:
             # 执行工具调用
             tool_messages = []
-            tool_results = []
-            
-            logger.info(f"[{analyst_name}] 🔧 开始执行 {len(result.tool_calls)} 个工具调用...")
+            tool_results = GoogleToolCallHandler._execute_tool_calls(
+                result.tool_calls, tools, analyst_name
+            )
             
-            for i, tool_call in enumerate(result.tool_calls):
-                tool_name = tool_call.get('name')
-                tool_args = tool_call.get('args', {})
-                tool_id = tool_call.get('id')
-                
-                logger.info(f"[{analyst_name}] 🛠️ 执行工具 {i+1}/{len(result.tool_calls)}: {tool_name}")
-                logger.info(f"[{analyst_name}] 参数: {tool_args}")
-                logger.debug(f"[{analyst_name}] 🔧 工具调用详情: {tool_call}")
-                
-                # 找到对应的工具并执行
-                tool_result = None
-                available_tools = []
-                
-                for tool in tools:
-                    current_tool_name = GoogleToolCallHandler._get_tool_name(tool)
-                    available_tools.append(current_tool_name)
-                    
-                    if current_tool_name == tool_name:
-                        try:
-                            logger.debug(f"[{analyst_name}] 🔧 找到工具: {tool.__class__.__name__}")
-                            logger.debug(f"[{analyst_name}] 🔧 工具类型检查...")
-                            
-                            # 检查工具类型并相应调用
-                            if hasattr(tool, 'invoke'):
-                                # LangChain工具，使用invoke方法
-                                logger.info(f"[{analyst_name}] 🚀 正在调用LangChain工具.invoke()...")
-                                tool_result = tool.invoke(tool_args)
-                                logger.info(f"[{analyst_name}] ✅ LangChain工具执行成功，结果长度: {len(str(tool_result))} 字符")
-                                logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
-                            elif callable(tool):
-                                # 普通Python函数，直接调用
-                                logger.info(f"[{analyst_name}] 🚀 正在调用Python函数工具...")
-                                tool_result = tool(**tool_args)
-                                logger.info(f"[{analyst_name}] ✅ Python函数工具执行成功，结果长度: {len(str(tool_result))} 字符")
-                                logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
-                            else:
-                                logger.error(f"[{analyst_name}] ❌ 工具类型不支持: {type(tool)}")
-                                tool_result = f"工具类型不支持: {type(tool)}"
-                            break
-                        except Exception as tool_error:
-                            logger.error(f"[{analyst_name}] ❌ 工具执行失败: {tool_error}")
-                            logger.error(f"[{analyst_name}] ❌ 异常类型: {type(tool_error).__name__}")
-                            logger.error(f"[{analyst_name}] ❌ 异常详情: {str(tool_error)}")
-                            
-                            # 记录详细的异常堆栈
-                            import traceback
-                            error_traceback = traceback.format_exc()
-                            logger.error(f"[{analyst_name}] ❌ 工具执行异常堆栈:\n{error_traceback}")
-                            
-                            tool_result = f"工具执行失败: {str(tool_error)}"
-                
-                logger.debug(f"[{analyst_name}] 🔧 可用工具列表: {available_tools}")
-                
-                if tool_result is None:
-                    tool_result = f"未找到工具: {tool_name}"
-                    logger.warning(f"[{analyst_name}] ⚠️ 未找到工具: {tool_name}")
-                    logger.debug(f"[{analyst_name}] ⚠️ 工具名称不匹配，期望: {tool_name}, 可用: {available_tools}")
-                
-                # 创建工具消息
+            # 按原始顺序创建工具消息
+            for tool_call, tool_result in zip(result.tool_calls, tool_results):
                 tool_message = ToolMessage(
                     content=str(tool_result),
-                    tool_call_id=tool_id
+                    tool_call_id=tool_call.get('id')
                 )
                 tool_messages.append(tool_message)
-                tool_results.append(tool_result)
                 logger.debug(f"[{analyst_name}] 🔧 创建工具消息，ID: {tool_message.tool_call_id}")
             
             logger.info(f"[{analyst_name}] 🔧 工具调用完成，成功: {len(tool_results)}, 总计: {len(result.tool_calls)}")
@@ -372,6 +324,154 @@ class GoogleToolCallHandler:
         else:
             return str(tool)
     
+    @staticmethod
+    def _execute_single_tool(tool_call: Dict[str, Any], tools: List[Any], analyst_name: str) -> Any:
+        """
+        执行单个工具调用
+
+        Args:
+            tool_call: 工具调用信息（name/args/id）
+            tools: 可用工具列表
+            analyst_name: 分析师名称
+
+        Returns:
+            Any: 工具执行结果（失败时为错误说明字符串）
+        """
+        tool_name = tool_call.get('name')
+        tool_args = tool_call.get('args', {})
+
+        logger.info(f"[{analyst_name}] 🛠️ 执行工具: {tool_name}")
+        logger.info(f"[{analyst_name}] 参数: {tool_args}")
+        logger.debug(f"[{analyst_name}] 🔧 工具调用详情: {tool_call}")
+
+        available_tools = []
+        for tool in tools:
+            current_tool_name = GoogleToolCallHandler._get_tool_name(tool)
+            available_tools.append(current_tool_name)
+
+            if current_tool_name != tool_name:
+                continue
+
+            try:
+                logger.debug(f"[{analyst_name}] 🔧 找到工具: {tool.__class__.__name__}")
+
+                # 检查工具类型并相应调用
+                if hasattr(tool, 'invoke'):
+                    # LangChain工具，使用invoke方法
+                    logger.info(f"[{analyst_name}] 🚀 正在调用LangChain工具.invoke()...")
+                    tool_result = tool.invoke(tool_args)
+                    logger.info(f"[{analyst_name}] ✅ LangChain工具执行成功，结果长度: {len(str(tool_result))} 字符")
+                elif callable(tool):
+                    # 普通Python函数，直接调用
+                    logger.info(f"[{analyst_name}] 🚀 正在调用Python函数工具...")
+                    tool_result = tool(**tool_args)
+                    logger.info(f"[{analyst_name}] ✅ Python函数工具执行成功，结果长度: {len(str(tool_result))} 字符")
+                else:
+                    logger.error(f"[{analyst_name}] ❌ 工具类型不支持: {type(tool)}")
+                    tool_result = f"工具类型不支持: {type(tool)}"
+                logger.debug(f"[{analyst_name}] 🔧 工具结果类型: {type(tool_result)}")
+            except Exception as tool_error:
+                logger.error(f"[{analyst_name}] ❌ 工具执行失败: {tool_error}")
+                logger.error(f"[{analyst_name}] ❌ 异常类型: {type(tool_error).__name__}")
+                logger.error(f"[{analyst_name}] ❌ 工具执行异常堆栈:\n{traceback.format_exc()}")
+                tool_result = f"工具执行失败: {str(tool_error)}"
+
+            if tool_result is None:
+                tool_result = f"工具 {tool_name} 未返回数据"
+            return tool_result
+
+        logger.warning(f"[{analyst_name}] ⚠️ 未找到工具: {tool_name}")
+        logger.debug(f"[{analyst_name}] ⚠️ 工具名称不匹配，期望: {tool_name}, 可用: {available_tools}")
+        return f"未找到工具: {tool_name}"
+
+    @staticmethod
+    def _execute_tool_calls(
+        tool_calls: List[Dict[str, Any]],
+        tools: List[Any],
+        analyst_name: str,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> List[Any]:
+        """
+        并行执行一组相互独立的工具调用
+
+        工具调用（行情、基本面、新闻等）均为网络IO，使用有界线程池并发执行，
+        整体耗时接近最慢的单个工具。返回结果与tool_calls顺序一致。
+
+        Args:
+            tool_calls: 模型返回的工具调用列表
+            tools: 可用工具列表
+            analyst_name: 分析师名称
+            max_workers: 最大并发数，默认读取GOOGLE_TOOL_MAX_WORKERS
+            timeout: 单个工具超时时间（秒），默认读取GOOGLE_TOOL_TIMEOUT
+
+        Returns:
+            List[Any]: 按原始顺序排列的工具结果
+        """
+        if not tool_calls:
+            return []
+
+        if max_workers is None:
+            max_workers = parse_int_env("GOOGLE_TOOL_MAX_WORKERS", DEFAULT_TOOL_MAX_WORKERS)
+        if timeout is None:
+            timeout = parse_float_env("GOOGLE_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT)
+        max_workers = max(1, min(max_workers, len(tool_calls)))
+
+        logger.info(f"[{analyst_name}] 🔧 开始执行 {len(tool_calls)} 个工具调用 (并发数: {max_workers})...")
+
+        # 单个工具或禁用并发时逐个执行，每个工具同样受超时限制
+        if max_workers == 1:
+            return [
+                GoogleToolCallHandler._execute_with_timeout(tool_call, tools, analyst_name, timeout)
+                for tool_call in tool_calls
+            ]
+
+        start_time = time.time()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="google-tool")
+        try:
+            # 每个任务在调用方上下文的副本中运行，工具可以复用本次分析的数据上下文
+            futures = [
+                executor.submit(contextvars.copy_context().run,
+                                GoogleToolCallHandler._execute_single_tool, tool_call, tools, analyst_name)
+                for tool_call in tool_calls
+            ]
+
+            tool_results = []
+            for i, (tool_call, future) in enumerate(zip(tool_calls, futures)):
+                # 排队的任务要等前面的批次完成，按批次顺延截止时间
+                deadline = start_time + timeout * (i // max_workers + 1)
+                try:
+                    tool_results.append(future.result(timeout=max(0.0, deadline - time.time())))
+                except FutureTimeoutError:
+                    future.cancel()
+                    tool_results.append(GoogleToolCallHandler._timeout_result(tool_call, analyst_name, timeout))
+        finally:
+            # 不等待超时的工具线程，避免阻塞分析流程
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        logger.info(f"[{analyst_name}] ⏱️ 工具并行执行耗时: {time.time() - start_time:.2f}秒")
+        return tool_results
+
+    @staticmethod
+    def _execute_with_timeout(tool_call: Dict[str, Any], tools: List[Any], analyst_name: str, timeout: float) -> Any:
+        """在独立线程中执行单个工具调用，超时后返回超时提示，不等待工具线程结束"""
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="google-tool")
+        try:
+            future = executor.submit(contextvars.copy_context().run,
+                                     GoogleToolCallHandler._execute_single_tool, tool_call, tools, analyst_name)
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                return GoogleToolCallHandler._timeout_result(tool_call, analyst_name, timeout)
+        finally:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _timeout_result(tool_call: Dict[str, Any], analyst_name: str, timeout: float) -> str:
+        tool_name = tool_call.get('name')
+        logger.error(f"[{analyst_name}] ⏰ 工具执行超时 ({timeout:.0f}秒): {tool_name}")
+        return f"工具执行超时: {tool_name} 超过 {timeout:.0f} 秒未返回"
+
     @staticmethod
     def handle_simple_google_response(
         result: AIMessage,
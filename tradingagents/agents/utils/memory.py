@@ -1,27 +1,36 @@
-import chromadb
-from chromadb.config import Settings
-from openai import OpenAI
-import dashscope
-from dashscope import TextEmbedding
 import os
+import re
+import json
 import threading
 import hashlib
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 logger = get_logger("agents.utils.memory")
 
 
+# 分析图使用的记忆集合，预热时预先创建
+MEMORY_COLLECTIONS = ("bull_memory", "bear_memory", "trader_memory", "invest_judge_memory", "risk_manager_memory")
+
+
 class ChromaDBManager:
-    """单例ChromaDB管理器，避免并发创建集合的冲突"""
+    """
+    单例ChromaDB管理器，避免并发创建集合的冲突
+
+    存储方式（由第一次创建管理器时的参数决定）：
+    - server（"host:port"）: 连接ChromaDB服务，多个工作进程共享同一份记忆
+    - persist_directory: 本地持久化目录，进程重启后记忆仍然保留
+      （多个进程使用同一目录时，其他进程新写入的记忆要重启后才能被检索到，多进程部署请使用server）
+    - 都未配置或初始化失败时使用进程内存
+    """
 
     _instance = None
     _lock = threading.Lock()
     _collections: Dict[str, any] = {}
     _client = None
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
@@ -29,8 +38,47 @@ class ChromaDBManager:
                     cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, persist_directory: Optional[str] = None, server: Optional[str] = None):
         if not self._initialized:
+            self.persist_directory = None
+            self.server = None
+            if server or persist_directory:
+                try:
+                    self._client = self._create_persistent_client(persist_directory, server)
+                    self._initialized = True
+                    return
+                except Exception as e:
+                    logger.error(f"❌ [ChromaDB] 持久化存储初始化失败，使用内存存储: {e}")
+                    self.persist_directory = None
+                    self.server = None
+            self._init_memory_client()
+
+    def _create_persistent_client(self, persist_directory: Optional[str], server: Optional[str]):
+        """创建连接ChromaDB服务或本地持久化目录的客户端"""
+        import chromadb
+        from chromadb.config import Settings
+
+        settings = Settings(allow_reset=True, anonymized_telemetry=False)
+        if server:
+            host, _, port = server.partition(":")
+            client = chromadb.HttpClient(host=host, port=int(port or 8000), settings=settings)
+            client.heartbeat()
+            self.server = server
+            logger.info(f"📚 [ChromaDB] 连接记忆服务: {server}")
+        else:
+            os.makedirs(persist_directory, exist_ok=True)
+            client = chromadb.PersistentClient(path=persist_directory, settings=settings)
+            self.persist_directory = persist_directory
+            logger.info(f"📚 [ChromaDB] 使用持久化记忆: {persist_directory}")
+        return client
+
+    def _init_memory_client(self):
+        """创建进程内存客户端（原有的按操作系统选择配置的逻辑）"""
+        if not self._initialized:
+            # chromadb导入较慢，只在第一次创建客户端时导入
+            import chromadb
+            from chromadb.config import Settings
+
             try:
                 # 自动检测操作系统版本并使用最优配置
                 import platform
@@ -77,8 +125,8 @@ class ChromaDBManager:
                     logger.warning(f"⚠️ [ChromaDB] 使用最简配置初始化: {backup_error}")
                 self._initialized = True
 
-    def get_or_create_collection(self, name: str):
-        """线程安全地获取或创建集合"""
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        """线程安全地获取或创建集合（metadata只在创建时写入）"""
         with self._lock:
             if name in self._collections:
                 logger.info(f"📚 [ChromaDB] 使用缓存集合: {name}")
@@ -91,7 +139,7 @@ class ChromaDBManager:
             except Exception:
                 try:
                     # 创建新集合
-                    collection = self._client.create_collection(name=name)
+                    collection = self._client.create_collection(name=name, metadata=metadata)
                     logger.info(f"📚 [ChromaDB] 创建新集合: {name}")
                 except Exception as e:
                     # 可能是并发创建，再次尝试获取
@@ -106,9 +154,30 @@ class ChromaDBManager:
             self._collections[name] = collection
             return collection
 
+    def warm_start(self, names: Iterable[str] = MEMORY_COLLECTIONS) -> Dict[str, int]:
+        """
+        预先创建集合并加载向量索引，避免第一次分析时在请求路径上完成这些工作
+
+        Returns:
+            各集合中的记忆数量
+        """
+        counts = {}
+        for name in names:
+            collection = self.get_or_create_collection(name)
+            counts[name] = collection.count()
+            if counts[name]:
+                # 用一条已有的向量做一次查询，触发持久化索引的加载
+                sample = collection.get(limit=1, include=["embeddings"])
+                if sample.get("embeddings") is not None and len(sample["embeddings"]):
+                    collection.query(query_embeddings=[list(sample["embeddings"][0])], n_results=1)
+        logger.info(f"📚 [ChromaDB] 记忆预热完成: {counts}")
+        return counts
+
 
 class FinancialSituationMemory:
     def __init__(self, name, config):
+        from openai import OpenAI
+
         self.config = config
         self.llm_provider = config.get("llm_provider", "openai").lower()
 
@@ -291,8 +360,31 @@ class FinancialSituationMemory:
                 logger.warning(f"⚠️ 未找到OPENAI_API_KEY，记忆功能已禁用")
 
         # 使用单例ChromaDB管理器
-        self.chroma_manager = ChromaDBManager()
-        self.situation_collection = self.chroma_manager.get_or_create_collection(name)
+        self.chroma_manager = ChromaDBManager(
+            persist_directory=config.get("memory_persist_dir"),
+            server=config.get("memory_server"),
+        )
+        self.situation_collection = self._open_collection(name)
+
+    def _open_collection(self, name):
+        """
+        打开记忆集合
+
+        持久化的集合会保留下来，向量维度由创建集合时的嵌入模型决定；
+        当前嵌入模型与集合记录的模型不同时，使用按模型区分的集合，避免维度冲突。
+        预热等途径创建的空集合没有记录模型，由第一次打开它的嵌入模型写入。
+        """
+        metadata = {"embedding_model": self.embedding}
+        collection = self.chroma_manager.get_or_create_collection(name, metadata=metadata)
+        model = (collection.metadata or {}).get("embedding_model")
+        if model is None and collection.count() == 0:
+            collection.modify(metadata={**(collection.metadata or {}), **metadata})
+            model = self.embedding
+        if model and model != self.embedding:
+            suffix = re.sub(r"[^a-zA-Z0-9._-]", "_", self.embedding).strip("._-")
+            logger.info(f"📚 [ChromaDB] 集合{name}使用嵌入模型{model}，当前模型{self.embedding}使用独立集合")
+            collection = self.chroma_manager.get_or_create_collection(f"{name}_{suffix}", metadata=metadata)
+        return collection
 
     def _smart_text_truncation(self, text, max_length=8192):
         """智能文本截断，保持语义完整性和缓存兼容性"""
@@ -539,28 +631,89 @@ class FinancialSituationMemory:
         """获取最后处理的文本信息"""
         return getattr(self, '_last_text_info', None)
 
+    @staticmethod
+    def _memory_id(situation: str, recommendation: str) -> str:
+        """按内容生成记忆ID，多个进程写入或重复导入同一条记忆时不会产生重复"""
+        return hashlib.md5(f"{situation}\x00{recommendation}".encode("utf-8")).hexdigest()
+
+    def _upsert(self, situations: List[str], advice: List[str], embeddings: List[List[float]]) -> int:
+        """写入记忆，跳过空向量（记忆功能禁用或向量化失败时无法被检索）"""
+        rows = [(s, r, e) for s, r, e in zip(situations, advice, embeddings) if any(x != 0.0 for x in e)]
+        if not rows:
+            return 0
+        self.situation_collection.upsert(
+            documents=[s for s, _, _ in rows],
+            metadatas=[{"recommendation": r} for _, r, _ in rows],
+            embeddings=[list(e) for _, _, e in rows],
+            ids=[self._memory_id(s, r) for s, r, _ in rows],
+        )
+        return len(rows)
+
     def add_situations(self, situations_and_advice):
         """Add financial situations and their corresponding advice. Parameter is a list of tuples (situation, rec)"""
 
         situations = []
         advice = []
-        ids = []
         embeddings = []
 
-        offset = self.situation_collection.count()
-
-        for i, (situation, recommendation) in enumerate(situations_and_advice):
+        for situation, recommendation in situations_and_advice:
             situations.append(situation)
             advice.append(recommendation)
-            ids.append(str(offset + i))
             embeddings.append(self.get_embedding(situation))
 
-        self.situation_collection.add(
-            documents=situations,
-            metadatas=[{"recommendation": rec} for rec in advice],
-            embeddings=embeddings,
-            ids=ids,
-        )
+        self._upsert(situations, advice, embeddings)
+
+    def export_memories(self, batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        导出全部记忆
+
+        Returns:
+            [{"situation", "recommendation", "embedding", "embedding_model"}, ...]
+        """
+        records = []
+        offset = 0
+        while True:
+            batch = self.situation_collection.get(limit=batch_size, offset=offset,
+                                                  include=["documents", "metadatas", "embeddings"])
+            ids = batch.get("ids") or []
+            if not ids:
+                break
+            for i in range(len(ids)):
+                metadata = batch["metadatas"][i] or {}
+                records.append({
+                    "situation": batch["documents"][i],
+                    "recommendation": metadata.get("recommendation", ""),
+                    "embedding": [float(x) for x in batch["embeddings"][i]],
+                    "embedding_model": self.embedding,
+                })
+            offset += len(ids)
+        return records
+
+    def import_memories(self, records: Iterable[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        批量导入记忆
+
+        记录中带有当前嵌入模型生成的向量时直接写入，不重新向量化；
+        没有向量或模型不同的记录重新计算向量。
+
+        Returns:
+            写入的记忆数量
+        """
+        imported = 0
+        situations, advice, embeddings = [], [], []
+        for record in records:
+            embedding = record.get("embedding")
+            if not embedding or record.get("embedding_model", self.embedding) != self.embedding:
+                embedding = self.get_embedding(record["situation"])
+            situations.append(record["situation"])
+            advice.append(record.get("recommendation", ""))
+            embeddings.append(embedding)
+            if len(situations) >= batch_size:
+                imported += self._upsert(situations, advice, embeddings)
+                situations, advice, embeddings = [], [], []
+        imported += self._upsert(situations, advice, embeddings)
+        logger.info(f"📚 [ChromaDB] 导入{imported}条记忆")
+        return imported
 
     def get_memories(self, current_situation, n_matches=1):
         """Find matching recommendations using embeddings with smart truncation handling"""
@@ -638,6 +791,39 @@ class FinancialSituationMemory:
         return info
 
 
+def warm_start_memories(config: Dict[str, Any], names: Iterable[str] = MEMORY_COLLECTIONS) -> Dict[str, int]:
+    """按配置打开记忆存储并预热集合（应用启动时调用）"""
+    manager = ChromaDBManager(
+        persist_directory=config.get("memory_persist_dir"),
+        server=config.get("memory_server"),
+    )
+    return manager.warm_start(names)
+
+
+def export_memories_to_file(path: str, config: Dict[str, Any], names: Iterable[str] = MEMORY_COLLECTIONS) -> int:
+    """把记忆集合导出为JSONL文件，每行一条 {"collection", "situation", "recommendation", "embedding", "embedding_model"}"""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for name in names:
+            for record in FinancialSituationMemory(name, config).export_memories():
+                f.write(json.dumps({"collection": name, **record}, ensure_ascii=False) + "\n")
+                count += 1
+    logger.info(f"📚 [ChromaDB] 导出{count}条记忆到 {path}")
+    return count
+
+
+def import_memories_from_file(path: str, config: Dict[str, Any]) -> Dict[str, int]:
+    """从export_memories_to_file生成的JSONL文件导入记忆，返回各集合导入的数量"""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                grouped.setdefault(record.pop("collection"), []).append(record)
+    return {name: FinancialSituationMemory(name, config).import_memories(records)
+            for name, records in grouped.items()}
+
+
 if __name__ == "__main__":
     # Example usage
     matcher = FinancialSituationMemory()
@@ -4,15 +4,21 @@
 管理API密钥、模型配置、费率设置等
 """
 
+import atexit
 import json
 import os
+import queue
 import re
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, date
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from pathlib import Path
 from dotenv import load_dotenv
 
+from .env_utils import parse_bool_env, parse_int_env, parse_float_env
+
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
 
@@ -20,13 +26,6 @@ from tradingagents.utils.logging_init import get_logger
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
-try:
-    from .mongodb_storage import MongoDBStorage
-    MONGODB_AVAILABLE = True
-except ImportError:
-    MONGODB_AVAILABLE = False
-    MongoDBStorage = None
-
 
 @dataclass
 class ModelConfig:
@@ -75,6 +74,12 @@ class ConfigManager:
         self.usage_file = self.config_dir / "usage.json"
         self.settings_file = self.config_dir / "settings.json"
 
+        # 配置文件的内存快照，文件修改时间变化时失效
+        self._snapshots: Dict[str, Any] = {}
+        self._snapshot_lock = threading.Lock()
+        # 使用记录JSON文件可能被后台写入线程和同步调用同时写入
+        self._usage_file_lock = threading.Lock()
+
         # 加载.env文件（保持向后兼容）
         self._load_env_file()
 
@@ -147,16 +152,45 @@ class ConfigManager:
         
         return True
     
+    def _read_json_snapshot(self, path: Path) -> Any:
+        """
+        读取JSON配置文件，内容按文件修改时间缓存在内存中
+
+        热路径上的重复调用只需一次stat，文件被外部修改后自动重新加载。
+        """
+        stat = path.stat()
+        key = str(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._snapshot_lock:
+            cached = self._snapshots.get(key)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        with self._snapshot_lock:
+            self._snapshots[key] = (version, data)
+        return data
+
+    def _invalidate_snapshot(self, path: Path):
+        """使配置文件的内存快照失效"""
+        with self._snapshot_lock:
+            self._snapshots.pop(str(path), None)
+
     def _init_mongodb_storage(self):
         """初始化MongoDB存储"""
-        if not MONGODB_AVAILABLE:
-            return
-        
         # 检查是否启用MongoDB存储
         use_mongodb = os.getenv("USE_MONGODB_STORAGE", "false").lower() == "true"
         if not use_mongodb:
             return
-        
+
+        # 启用时才导入pymongo；mongodb_storage依赖本模块的UsageRecord，不能在模块顶层导入
+        try:
+            from .mongodb_storage import MongoDBStorage
+        except ImportError as e:
+            logger.warning(f"⚠️ MongoDB存储不可用: {e}")
+            return
+
         try:
             connection_string = os.getenv("MONGODB_CONNECTION_STRING")
             database_name = os.getenv("MONGODB_DATABASE_NAME", "tradingagents")
@@ -329,12 +363,26 @@ class ConfigManager:
     def load_pricing(self) -> List[PricingConfig]:
         """加载定价配置"""
         try:
-            with open(self.pricing_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = self._read_json_snapshot(self.pricing_file)
             return [PricingConfig(**item) for item in data]
         except Exception as e:
             logger.error(f"加载定价配置失败: {e}")
             return []
+
+    def _get_pricing_index(self) -> Dict[tuple, PricingConfig]:
+        """获取 (供应商, 模型) -> 定价 的内存索引，随定价文件快照一起失效"""
+        data = self._read_json_snapshot(self.pricing_file)
+        with self._snapshot_lock:
+            cached = self._snapshots.get("pricing_index")
+            if cached and cached[0] is data:
+                return cached[1]
+        index = {}
+        for item in data:
+            pricing = PricingConfig(**item)
+            index.setdefault((pricing.provider, pricing.model_name), pricing)
+        with self._snapshot_lock:
+            self._snapshots["pricing_index"] = (data, index)
+        return index
     
     def save_pricing(self, pricing: List[PricingConfig]):
         """保存定价配置"""
@@ -344,6 +392,8 @@ class ConfigManager:
                 json.dump(data, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.error(f"保存定价配置失败: {e}")
+        finally:
+            self._invalidate_snapshot(self.pricing_file)
     
     def load_usage_records(self) -> List[UsageRecord]:
         """加载使用记录"""
@@ -366,13 +416,12 @@ class ConfigManager:
         except Exception as e:
             logger.error(f"保存使用记录失败: {e}")
     
-    def add_usage_record(self, provider: str, model_name: str, input_tokens: int,
-                        output_tokens: int, session_id: str, analysis_type: str = "stock_analysis"):
-        """添加使用记录"""
-        # 计算成本
+    def build_usage_record(self, provider: str, model_name: str, input_tokens: int,
+                           output_tokens: int, session_id: str,
+                           analysis_type: str = "stock_analysis") -> UsageRecord:
+        """构建使用记录（只使用内存中的定价快照，不写入存储）"""
         cost = self.calculate_cost(provider, model_name, input_tokens, output_tokens)
-        
-        record = UsageRecord(
+        return UsageRecord(
             timestamp=datetime.now().isoformat(),
             provider=provider,
             model_name=model_name,
@@ -382,44 +431,62 @@ class ConfigManager:
             session_id=session_id,
             analysis_type=analysis_type
         )
-        
-        # 优先使用MongoDB存储
+
+    def save_usage_records_batch(self, new_records: List[UsageRecord]) -> bool:
+        """批量保存使用记录，优先MongoDB，失败时回退到JSON文件"""
+        if not new_records:
+            return True
+
+        # 优先使用MongoDB存储，只有写入失败的记录回退到JSON文件，避免重复记录
         if self.mongodb_storage and self.mongodb_storage.is_connected():
-            success = self.mongodb_storage.save_usage_record(record)
-            if success:
-                return record
-            else:
-                logger.error(f"⚠️ MongoDB保存失败，回退到JSON文件存储")
-        
-        # 回退到JSON文件存储
-        records = self.load_usage_records()
-        records.append(record)
-        
-        # 限制记录数量
+            new_records = self.mongodb_storage.insert_usage_records(new_records)
+            if not new_records:
+                return True
+            logger.error(f"⚠️ MongoDB保存失败，{len(new_records)} 条记录回退到JSON文件存储")
+
+        # 回退到JSON文件存储：一个批次只读写一次文件
         settings = self.load_settings()
         max_records = settings.get("max_usage_records", 10000)
-        if len(records) > max_records:
-            records = records[-max_records:]
-        
-        self.save_usage_records(records)
+        with self._usage_file_lock:
+            records = self.load_usage_records()
+            records.extend(new_records)
+
+            # 限制记录数量
+            if len(records) > max_records:
+                records = records[-max_records:]
+
+            self.save_usage_records(records)
+        return True
+
+    def add_usage_record(self, provider: str, model_name: str, input_tokens: int,
+                        output_tokens: int, session_id: str, analysis_type: str = "stock_analysis"):
+        """添加使用记录（同步写入）"""
+        record = self.build_usage_record(
+            provider, model_name, input_tokens, output_tokens, session_id, analysis_type
+        )
+        self.save_usage_records_batch([record])
         return record
     
     def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
         """计算使用成本"""
-        pricing_configs = self.load_pricing()
+        try:
+            pricing_index = self._get_pricing_index()
+        except Exception as e:
+            logger.error(f"加载定价配置失败: {e}")
+            pricing_index = {}
 
-        for pricing in pricing_configs:
-            if pricing.provider == provider and pricing.model_name == model_name:
-                input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
-                output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
-                total_cost = input_cost + output_cost
-                return round(total_cost, 6)
+        pricing = pricing_index.get((provider, model_name))
+        if pricing:
+            input_cost = (input_tokens / 1000) * pricing.input_price_per_1k
+            output_cost = (output_tokens / 1000) * pricing.output_price_per_1k
+            total_cost = input_cost + output_cost
+            return round(total_cost, 6)
 
         # 只在找不到配置时输出调试信息
         logger.warning(f"⚠️ [calculate_cost] 未找到匹配的定价配置: {provider}/{model_name}")
         logger.debug(f"⚠️ [calculate_cost] 可用的配置:")
-        for pricing in pricing_configs:
-            logger.debug(f"⚠️ [calculate_cost]   - {pricing.provider}/{pricing.model_name}")
+        for provider_name, model in pricing_index:
+            logger.debug(f"⚠️ [calculate_cost]   - {provider_name}/{model}")
 
         return 0.0
     
@@ -427,8 +494,8 @@ class ConfigManager:
         """加载设置，合并.env中的配置"""
         try:
             if self.settings_file.exists():
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
+                # 返回副本，调用方可以安全地修改后再保存
+                settings = dict(self._read_json_snapshot(self.settings_file))
             else:
                 # 如果设置文件不存在，创建默认设置
                 settings = {
@@ -503,6 +570,8 @@ class ConfigManager:
                 json.dump(settings, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.error(f"保存设置失败: {e}")
+        finally:
+            self._invalidate_snapshot(self.settings_file)
     
     def get_enabled_models(self) -> List[ModelConfig]:
         """获取启用的模型"""
@@ -651,26 +720,49 @@ class ConfigManager:
 
 
 class TokenTracker:
-    """Token使用跟踪器"""
+    """
+    Token使用跟踪器
+
+    track_usage 在LLM调用线程上只做内存操作：用定价快照计算成本、更新今日成本
+    和会话成本计数器，然后把记录放入队列。后台线程按批次把记录写入MongoDB或
+    JSON文件，LLM调用延迟不再包含记账I/O。
+    """
 
     def __init__(self, config_manager: ConfigManager):
         self.config_manager = config_manager
 
+        # 异步批量写入配置
+        self.async_enabled = parse_bool_env("TOKEN_USAGE_ASYNC", True)
+        self.batch_size = max(1, parse_int_env("TOKEN_USAGE_BATCH_SIZE", 50))
+        self.flush_interval = max(0.1, parse_float_env("TOKEN_USAGE_FLUSH_INTERVAL", 2.0))
+        queue_size = max(self.batch_size, parse_int_env("TOKEN_USAGE_QUEUE_SIZE", 10000))
+
+        self._queue: "queue.Queue[UsageRecord]" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # 成本计数器：今日累计成本（启动时从存储中补齐一次）和各会话成本
+        self._counter_lock = threading.Lock()
+        self._today = date.today()
+        self._today_cost = 0.0
+        self._today_seeded = False
+        self._session_costs: Dict[str, float] = {}
+
     def track_usage(self, provider: str, model_name: str, input_tokens: int,
                    output_tokens: int, session_id: str = None, analysis_type: str = "stock_analysis"):
         """跟踪Token使用"""
         if session_id is None:
             session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-        # 检查是否启用成本跟踪
+        # 检查是否启用成本跟踪（设置来自内存快照）
         settings = self.config_manager.load_settings()
         cost_tracking_enabled = settings.get("enable_cost_tracking", True)
 
         if not cost_tracking_enabled:
             return None
 
-        # 添加使用记录
-        record = self.config_manager.add_usage_record(
+        record = self.config_manager.build_usage_record(
             provider=provider,
             model_name=model_name,
             input_tokens=input_tokens,
@@ -679,27 +771,160 @@ class TokenTracker:
             analysis_type=analysis_type
         )
 
+        total_today = self._add_to_counters(record)
+        self._enqueue(record)
+
         # 检查成本警告
-        if record:
-            self._check_cost_alert(record.cost)
+        self._check_cost_alert(total_today, settings)
 
         return record
 
-    def _check_cost_alert(self, current_cost: float):
-        """检查成本警告"""
-        settings = self.config_manager.load_settings()
-        threshold = settings.get("cost_alert_threshold", 100.0)
+    def calculate_cost(self, provider: str, model_name: str, input_tokens: int, output_tokens: int) -> float:
+        """计算使用成本"""
+        return self.config_manager.calculate_cost(provider, model_name, input_tokens, output_tokens)
+
+    def _add_to_counters(self, record: UsageRecord) -> float:
+        """更新今日成本和会话成本计数器，返回今日累计成本"""
+        with self._counter_lock:
+            today = date.today()
+            if today != self._today:
+                self._today = today
+                self._today_cost = 0.0
+            self._today_cost += record.cost
+            self._session_costs[record.session_id] = self._session_costs.get(record.session_id, 0.0) + record.cost
+            return self._today_cost
+
+    def _seed_today_cost(self):
+        """从存储中补齐进程启动前的今日成本（在后台线程中执行）"""
+        try:
+            stored_today = self.config_manager.get_usage_statistics(1).get("total_cost", 0.0)
+        except Exception as e:
+            logger.error(f"⚠️ 读取今日成本失败: {e}")
+            stored_today = 0.0
+        with self._counter_lock:
+            self._today_cost += stored_today
+            self._today_seeded = True
+
+    def _enqueue(self, record: UsageRecord):
+        """将记录放入写入队列，未启用异步或队列已满时同步写入"""
+        if not self.async_enabled:
+            if not self._today_seeded:
+                self._seed_today_cost()
+            self.config_manager.save_usage_records_batch([record])
+            return
 
-        # 获取今日总成本
-        today_stats = self.config_manager.get_usage_statistics(1)
-        total_today = today_stats["total_cost"]
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            logger.warning(f"⚠️ Token使用记录队列已满，同步写入")
+            self.config_manager.save_usage_records_batch([record])
+
+    def _ensure_worker(self):
+        """按需启动后台写入线程"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop_event.clear()
+            self._worker = threading.Thread(
+                target=self._run_worker, name="token-usage-writer", daemon=True
+            )
+            self._worker.start()
+
+    def _run_worker(self):
+        """后台线程：按批次或按时间间隔写入使用记录"""
+        if not self._today_seeded:
+            self._seed_today_cost()
+
+        while not self._stop_event.is_set():
+            batch = self._drain(self.flush_interval)
+            if batch:
+                self._write_batch(batch)
+
+    def _drain(self, wait_timeout: float) -> List[UsageRecord]:
+        """从队列中取出一个批次，最多等待wait_timeout秒"""
+        batch = []
+        deadline = time.time() + wait_timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch: List[UsageRecord]):
+        """写入一个批次，失败不影响后续记录"""
+        try:
+            self.config_manager.save_usage_records_batch(batch)
+            logger.debug(f"📊 已批量写入 {len(batch)} 条Token使用记录")
+        except Exception as e:
+            logger.error(f"❌ 批量写入Token使用记录失败: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        将队列中的记录全部写入存储
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            bool: 队列是否已清空
+        """
+        deadline = time.time() + timeout
+        if self._worker is None or not self._worker.is_alive():
+            # 后台线程未运行时在当前线程写入
+            while time.time() < deadline:
+                batch = self._drain(0)
+                if not batch:
+                    break
+                self._write_batch(batch)
+            return self._queue.unfinished_tasks == 0
+
+        while self._queue.unfinished_tasks > 0 and time.time() < deadline:
+            time.sleep(0.05)
+        return self._queue.unfinished_tasks == 0
+
+    def shutdown(self, timeout: float = 10.0):
+        """写入剩余记录并停止后台线程"""
+        self.flush(timeout)
+        self._stop_event.set()
+        if self._worker is not None:
+            self._worker.join(timeout=self.flush_interval + 1)
+
+    def _check_cost_alert(self, total_today: float, settings: Dict[str, Any] = None):
+        """检查成本警告（使用内存中的今日成本计数器）"""
+        if settings is None:
+            settings = self.config_manager.load_settings()
+        threshold = settings.get("cost_alert_threshold", 100.0)
 
         if total_today >= threshold:
             logger.warning(f"⚠️ 成本警告: 今日成本已达到 ¥{total_today:.4f}，超过阈值 ¥{threshold}",
                           extra={'cost': total_today, 'threshold': threshold, 'event_type': 'cost_alert'})
 
+    def get_today_cost(self) -> float:
+        """获取今日累计成本"""
+        with self._counter_lock:
+            if date.today() != self._today:
+                return 0.0
+            return self._today_cost
+
     def get_session_cost(self, session_id: str) -> float:
         """获取会话成本"""
+        with self._counter_lock:
+            if session_id in self._session_costs:
+                return self._session_costs[session_id]
+
+        # 本进程未记录过该会话，从存储中统计
+        self.flush()
         records = self.config_manager.load_usage_records()
         session_cost = sum(record.cost for record in records if record.session_id == session_id)
         return session_cost
@@ -724,3 +949,6 @@ def _get_project_config_dir():
 
 config_manager = ConfigManager(_get_project_config_dir())
 token_tracker = TokenTracker(config_manager)
+
+# 进程退出前写入队列中剩余的使用记录
+atexit.register(token_tracker.shutdown)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+数据库连接注册表
+进程内共享MongoDB和Redis客户端，同一连接地址只创建一个连接池
+
+- 客户端在第一次使用时才真正建立连接（MongoClient connect=False，Redis连接池按需建连）
+- 连接池大小、超时和健康检查间隔可通过环境变量配置
+- fork之后子进程自动丢弃父进程的客户端，重新创建自己的连接池
+"""
+
+import atexit
+import os
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote_plus
+
+from .env_utils import parse_int_env
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def build_mongo_uri(host: str = "localhost", port: int = 27017, username: Optional[str] = None,
+                    password: Optional[str] = None, auth_source: str = "admin") -> str:
+    """根据分离的配置参数构建MongoDB连接字符串"""
+    if username and password:
+        return (f"mongodb://{quote_plus(username)}:{quote_plus(password)}@{host}:{port}/"
+                f"?authSource={auth_source}")
+    return f"mongodb://{host}:{port}/"
+
+
+def build_redis_url(host: str = "localhost", port: int = 6379, password: Optional[str] = None,
+                    db: int = 0) -> str:
+    """根据分离的配置参数构建Redis连接URL"""
+    auth = f":{quote_plus(password)}@" if password else ""
+    return f"redis://{auth}{host}:{port}/{db}"
+
+
+def mongo_uri_from_env() -> str:
+    """从环境变量读取MongoDB连接字符串，未设置MONGODB_CONNECTION_STRING时使用分离参数"""
+    connection_string = os.getenv("MONGODB_CONNECTION_STRING")
+    if connection_string:
+        return connection_string
+    return build_mongo_uri(
+        host=os.getenv("MONGODB_HOST", "localhost"),
+        port=parse_int_env("MONGODB_PORT", 27017),
+        username=os.getenv("MONGODB_USERNAME"),
+        password=os.getenv("MONGODB_PASSWORD"),
+        auth_source=os.getenv("MONGODB_AUTH_SOURCE", "admin"),
+    )
+
+
+def redis_url_from_env() -> str:
+    """从环境变量读取Redis连接URL，未设置REDIS_URL/REDIS_CONNECTION_STRING时使用分离参数"""
+    url = os.getenv("REDIS_URL") or os.getenv("REDIS_CONNECTION_STRING")
+    if url:
+        return url
+    return build_redis_url(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=parse_int_env("REDIS_PORT", 6379),
+        password=os.getenv("REDIS_PASSWORD"),
+        db=parse_int_env("REDIS_DB", 0),
+    )
+
+
+def redact_uri(uri: str) -> str:
+    """隐藏连接字符串中的密码，用于日志和状态报告"""
+    return re.sub(r"(//[^:/@]*:)[^@]*@", r"\1***@", uri)
+
+
+class ConnectionRegistry:
+    """进程级MongoDB/Redis连接注册表"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+        self._mongo_clients: Dict[Tuple, Any] = {}
+        self._redis_clients: Dict[Tuple, Any] = {}
+
+    # ---- 配置 ----
+
+    @staticmethod
+    def _mongo_defaults() -> Dict[str, Any]:
+        return {
+            "maxPoolSize": parse_int_env("MONGODB_MAX_POOL_SIZE", 20),
+            "minPoolSize": parse_int_env("MONGODB_MIN_POOL_SIZE", 0),
+            "serverSelectionTimeoutMS": parse_int_env("MONGODB_SERVER_SELECTION_TIMEOUT_MS", 3000),
+            "connectTimeoutMS": parse_int_env("MONGODB_CONNECT_TIMEOUT_MS", 3000),
+            "heartbeatFrequencyMS": parse_int_env("MONGODB_HEARTBEAT_FREQUENCY_MS", 10000),
+            # 延迟到第一次操作时才建立连接，fork前创建的客户端不会持有socket
+            "connect": False,
+        }
+
+    @staticmethod
+    def _redis_defaults() -> Dict[str, Any]:
+        return {
+            "max_connections": parse_int_env("REDIS_MAX_CONNECTIONS", 50),
+            "socket_timeout": parse_int_env("REDIS_SOCKET_TIMEOUT", 5),
+            "socket_connect_timeout": parse_int_env("REDIS_CONNECT_TIMEOUT", 5),
+            # 连接空闲超过该秒数后，下次使用前先PING检查
+            "health_check_interval": parse_int_env("REDIS_HEALTH_CHECK_INTERVAL", 30),
+        }
+
+    # ---- fork安全 ----
+
+    def _ensure_process(self):
+        """检测到fork后丢弃继承自父进程的客户端（调用方需持有锁）"""
+        pid = os.getpid()
+        if pid != self._pid:
+            # 不能在子进程关闭这些客户端，否则会关掉父进程仍在使用的socket
+            self._mongo_clients = {}
+            self._redis_clients = {}
+            self._pid = pid
+
+    def _after_fork_in_child(self):
+        self._lock = threading.RLock()
+        self._ensure_process()
+
+    # ---- 客户端 ----
+
+    def get_mongo_client(self, uri: Optional[str] = None, **options):
+        """
+        获取共享的MongoClient
+
+        Args:
+            uri: 连接字符串，默认从环境变量读取
+            **options: 额外的MongoClient参数，不同参数会得到不同的客户端
+
+        Raises:
+            ImportError: 未安装pymongo
+        """
+        from pymongo import MongoClient
+
+        uri = uri or mongo_uri_from_env()
+        key = (uri, tuple(sorted(options.items())))
+        with self._lock:
+            self._ensure_process()
+            client = self._mongo_clients.get(key)
+            if client is None:
+                kwargs = self._mongo_defaults()
+                kwargs.update(options)
+                client = MongoClient(uri, **kwargs)
+                self._mongo_clients[key] = client
+                logger.debug(f"🔌 [连接注册表] 创建MongoDB连接池: {redact_uri(uri)} "
+                             f"(maxPoolSize={kwargs['maxPoolSize']})")
+            return client
+
+    def get_redis_client(self, url: Optional[str] = None, db: Optional[int] = None,
+                         decode_responses: bool = False, **options):
+        """
+        获取共享连接池上的Redis客户端
+
+        Args:
+            url: 连接URL，默认从环境变量读取
+            db: 数据库编号，覆盖URL中的编号
+            decode_responses: 是否把返回值解码为字符串
+            **options: 额外的连接池参数，不同参数会得到不同的连接池
+
+        Raises:
+            ImportError: 未安装redis
+        """
+        import redis
+
+        url = url or redis_url_from_env()
+        key = (url, db, decode_responses, tuple(sorted(options.items())))
+        with self._lock:
+            self._ensure_process()
+            client = self._redis_clients.get(key)
+            if client is None:
+                kwargs = self._redis_defaults()
+                kwargs.update(options)
+                pool = redis.ConnectionPool.from_url(url, decode_responses=decode_responses, **kwargs)
+                if db is not None:
+                    # from_url中URL路径里的库号优先于db参数，这里以显式传入的db为准
+                    pool.connection_kwargs["db"] = db
+                client = redis.Redis(connection_pool=pool)
+                self._redis_clients[key] = client
+                logger.debug(f"🔌 [连接注册表] 创建Redis连接池: {redact_uri(url)} "
+                             f"(max_connections={kwargs['max_connections']})")
+            return client
+
+    # ---- 健康检查和统计 ----
+
+    def health_check(self) -> Dict[str, Dict[str, bool]]:
+        """对所有已创建的客户端执行一次PING"""
+        with self._lock:
+            self._ensure_process()
+            mongo_clients = dict(self._mongo_clients)
+            redis_clients = dict(self._redis_clients)
+
+        report = {"mongodb": {}, "redis": {}}
+        for (uri, _), client in mongo_clients.items():
+            try:
+                client.admin.command("ping")
+                report["mongodb"][redact_uri(uri)] = True
+            except Exception as e:
+                logger.warning(f"⚠️ [连接注册表] MongoDB健康检查失败 {redact_uri(uri)}: {e}")
+                report["mongodb"][redact_uri(uri)] = False
+        for (url, db, _, _), client in redis_clients.items():
+            label = redact_uri(url) if db is None else f"{redact_uri(url)} db={db}"
+            try:
+                report["redis"][label] = bool(client.ping())
+            except Exception as e:
+                logger.warning(f"⚠️ [连接注册表] Redis健康检查失败 {label}: {e}")
+                report["redis"][label] = False
+        return report
+
+    def stats(self) -> Dict[str, int]:
+        """返回当前进程持有的连接池数量"""
+        with self._lock:
+            self._ensure_process()
+            return {"mongodb_pools": len(self._mongo_clients), "redis_pools": len(self._redis_clients)}
+
+    def close_all(self):
+        """关闭当前进程创建的全部客户端"""
+        with self._lock:
+            self._ensure_process()
+            mongo_clients, self._mongo_clients = self._mongo_clients, {}
+            redis_clients, self._redis_clients = self._redis_clients, {}
+
+        for client in mongo_clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"关闭MongoDB客户端失败: {e}")
+        for client in redis_clients.values():
+            try:
+                client.connection_pool.disconnect()
+            except Exception as e:
+                logger.debug(f"关闭Redis连接池失败: {e}")
+
+
+# 全局连接注册表实例
+connection_registry = ConnectionRegistry()
+atexit.register(connection_registry.close_all)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=connection_registry._after_fork_in_child)
+
+
+def get_mongo_client(uri: Optional[str] = None, **options):
+    """获取共享的MongoClient"""
+    return connection_registry.get_mongo_client(uri, **options)
+
+
+def get_redis_client(url: Optional[str] = None, db: Optional[int] = None,
+                     decode_responses: bool = False, **options):
+    """获取共享连接池上的Redis客户端"""
+    return connection_registry.get_redis_client(url, db=db, decode_responses=decode_responses, **options)
@@ -78,37 +78,44 @@ class DatabaseManager:
     
 
     
+    def _mongodb_uri(self) -> str:
+        """根据配置构建MongoDB连接字符串"""
+        from .connection_registry import build_mongo_uri
+        return build_mongo_uri(
+            host=self.mongodb_config["host"],
+            port=self.mongodb_config["port"],
+            username=self.mongodb_config["username"],
+            password=self.mongodb_config["password"],
+            auth_source=self.mongodb_config["auth_source"],
+        )
+
+    def _redis_url(self) -> str:
+        """根据配置构建Redis连接URL"""
+        from .connection_registry import build_redis_url
+        return build_redis_url(
+            host=self.redis_config["host"],
+            port=self.redis_config["port"],
+            password=self.redis_config["password"],
+            db=self.redis_config["db"],
+        )
+
     def _detect_mongodb(self) -> Tuple[bool, str]:
-        """检测MongoDB是否可用"""
+        """检测MongoDB是否可用（检测用的客户端来自连接注册表，检测成功后直接复用）"""
         # 首先检查是否启用
         if not self.mongodb_enabled:
             return False, "MongoDB未启用 (MONGODB_ENABLED=false)"
 
         try:
-            import pymongo
-            from pymongo import MongoClient
-
-            # 构建连接参数
-            connect_kwargs = {
-                "host": self.mongodb_config["host"],
-                "port": self.mongodb_config["port"],
-                "serverSelectionTimeoutMS": self.mongodb_config["timeout"],
-                "connectTimeoutMS": self.mongodb_config["timeout"]
-            }
-
-            # 如果有用户名和密码，添加认证
-            if self.mongodb_config["username"] and self.mongodb_config["password"]:
-                connect_kwargs.update({
-                    "username": self.mongodb_config["username"],
-                    "password": self.mongodb_config["password"],
-                    "authSource": self.mongodb_config["auth_source"]
-                })
+            from .connection_registry import get_mongo_client
 
-            client = MongoClient(**connect_kwargs)
+            # 检测使用配置的超时（毫秒），MongoDB不可用时不必等待注册表默认的超时
+            timeout = self.mongodb_config["timeout"]
+            client = get_mongo_client(self._mongodb_uri(), serverSelectionTimeoutMS=timeout,
+                                      connectTimeoutMS=timeout)
 
             # 测试连接
-            client.server_info()
-            client.close()
+            client.admin.command("ping")
+            self.mongodb_client = client
 
             return True, "MongoDB连接成功"
 
@@ -118,31 +125,21 @@ class DatabaseManager:
             return False, f"MongoDB连接失败: {str(e)}"
     
     def _detect_redis(self) -> Tuple[bool, str]:
-        """检测Redis是否可用"""
+        """检测Redis是否可用（检测用的客户端来自连接注册表，检测成功后直接复用）"""
         # 首先检查是否启用
         if not self.redis_enabled:
             return False, "Redis未启用 (REDIS_ENABLED=false)"
 
         try:
-            import redis
+            from .connection_registry import get_redis_client
 
-            # 构建连接参数
-            connect_kwargs = {
-                "host": self.redis_config["host"],
-                "port": self.redis_config["port"],
-                "db": self.redis_config["db"],
-                "socket_timeout": self.redis_config["timeout"],
-                "socket_connect_timeout": self.redis_config["timeout"]
-            }
-
-            # 如果有密码，添加密码
-            if self.redis_config["password"]:
-                connect_kwargs["password"] = self.redis_config["password"]
-
-            client = redis.Redis(**connect_kwargs)
+            # 检测使用配置的超时（秒）
+            timeout = self.redis_config["timeout"]
+            client = get_redis_client(self._redis_url(), socket_timeout=timeout, socket_connect_timeout=timeout)
 
             # 测试连接
             client.ping()
+            self.redis_client = client
 
             return True, "Redis连接成功"
 
@@ -189,55 +186,16 @@ class DatabaseManager:
         self.logger.info(f"主要缓存后端: {self.primary_backend}")
     
     def _initialize_connections(self):
-        """初始化数据库连接"""
-        # 初始化MongoDB连接
-        if self.mongodb_available:
-            try:
-                import pymongo
-
-                # 构建连接参数
-                connect_kwargs = {
-                    "host": self.mongodb_config["host"],
-                    "port": self.mongodb_config["port"],
-                    "serverSelectionTimeoutMS": self.mongodb_config["timeout"]
-                }
-
-                # 如果有用户名和密码，添加认证
-                if self.mongodb_config["username"] and self.mongodb_config["password"]:
-                    connect_kwargs.update({
-                        "username": self.mongodb_config["username"],
-                        "password": self.mongodb_config["password"],
-                        "authSource": self.mongodb_config["auth_source"]
-                    })
-
-                self.mongodb_client = pymongo.MongoClient(**connect_kwargs)
-                self.logger.info("MongoDB客户端初始化成功")
-            except Exception as e:
-                self.logger.error(f"MongoDB客户端初始化失败: {e}")
-                self.mongodb_available = False
-
-        # 初始化Redis连接
-        if self.redis_available:
-            try:
-                import redis
-
-                # 构建连接参数
-                connect_kwargs = {
-                    "host": self.redis_config["host"],
-                    "port": self.redis_config["port"],
-                    "db": self.redis_config["db"],
-                    "socket_timeout": self.redis_config["timeout"]
-                }
-
-                # 如果有密码，添加密码
-                if self.redis_config["password"]:
-                    connect_kwargs["password"] = self.redis_config["password"]
-
-                self.redis_client = redis.Redis(**connect_kwargs)
-                self.logger.info("Redis客户端初始化成功")
-            except Exception as e:
-                self.logger.error(f"Redis客户端初始化失败: {e}")
-                self.redis_available = False
+        """初始化数据库连接（检测阶段已从连接注册表取得共享客户端，这里只做清理）"""
+        if not self.mongodb_available:
+            self.mongodb_client = None
+        elif self.mongodb_client is not None:
+            self.logger.info("MongoDB客户端初始化成功")
+
+        if not self.redis_available:
+            self.redis_client = None
+        elif self.redis_client is not None:
+            self.logger.info("Redis客户端初始化成功")
     
     def get_mongodb_client(self):
         """获取MongoDB客户端"""
@@ -250,6 +208,14 @@ class DatabaseManager:
         if self.redis_available and self.redis_client:
             return self.redis_client
         return None
+
+    @property
+    def mongodb_db(self):
+        """获取配置的MongoDB数据库，MongoDB不可用时返回None"""
+        client = self.get_mongodb_client()
+        if client is None:
+            return None
+        return client[self.mongodb_config["database"]]
     
     def is_mongodb_available(self) -> bool:
         """检查MongoDB是否可用"""
@@ -292,9 +258,15 @@ class DatabaseManager:
                 "port": self.redis_config["port"]
             },
             "cache_backend": self.get_cache_backend(),
+            "connection_pools": self._connection_pool_stats(),
             "fallback_enabled": True  # 总是启用降级
         }
 
+    def _connection_pool_stats(self) -> Dict[str, int]:
+        """进程内共享连接池数量"""
+        from .connection_registry import connection_registry
+        return connection_registry.stats()
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
         stats = {
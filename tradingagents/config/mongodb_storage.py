@@ -9,6 +9,7 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import asdict
 from .config_manager import UsageRecord
+from .connection_registry import get_mongo_client
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -16,7 +17,7 @@ logger = get_logger('agents')
 
 try:
     from pymongo import MongoClient
-    from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+    from pymongo.errors import BulkWriteError, ConnectionFailure, ServerSelectionTimeoutError
     MONGODB_AVAILABLE = True
 except ImportError:
     MONGODB_AVAILABLE = False
@@ -54,10 +55,8 @@ class MongoDBStorage:
     def _connect(self):
         """连接到MongoDB"""
         try:
-            self.client = MongoClient(
-                self.connection_string,
-                serverSelectionTimeoutMS=5000  # 5秒超时
-            )
+            # 使用进程共享的连接池
+            self.client = get_mongo_client(self.connection_string)
             # 测试连接
             self.client.admin.command('ping')
             
@@ -126,6 +125,30 @@ class MongoDBStorage:
             logger.error(f"保存记录到MongoDB失败: {e}")
             return False
     
+    def insert_usage_records(self, records: List[UsageRecord]) -> List[UsageRecord]:
+        """批量保存使用记录到MongoDB，返回未能写入的记录"""
+        if not self._connected or not records:
+            return list(records)
+
+        created_at = datetime.now()
+        documents = []
+        for record in records:
+            record_dict = asdict(record)
+            record_dict['_created_at'] = created_at
+            documents.append(record_dict)
+
+        try:
+            self.collection.insert_many(documents, ordered=False)
+            return []
+        except BulkWriteError as e:
+            # 无序批量写入时其余记录已经写入，只返回写入失败的记录
+            failed = sorted({error['index'] for error in e.details.get('writeErrors', [])})
+            logger.error(f"批量保存记录到MongoDB部分失败: {len(failed)}/{len(records)} 条")
+            return [records[index] for index in failed]
+        except Exception as e:
+            logger.error(f"批量保存记录到MongoDB失败: {e}")
+            return list(records)
+    
     def load_usage_records(self, limit: int = 10000, days: int = None) -> List[UsageRecord]:
         """从MongoDB加载使用记录"""
         if not self._connected:
@@ -283,8 +306,10 @@ class MongoDBStorage:
             return 0
     
     def close(self):
-        """关闭MongoDB连接"""
+        """释放MongoDB连接（连接池由连接注册表统一管理，进程退出时关闭）"""
         if self.client:
-            self.client.close()
+            self.client = None
+            self.db = None
+            self.collection = None
             self._connected = False
-            logger.info(f"MongoDB连接已关闭")
\ No newline at end of file
+            logger.info(f"MongoDB连接已释放")
\ No newline at end of file
@@ -1,28 +1,51 @@
 # 导入基础模块
 from .finnhub_utils import get_data_in_range
-from .googlenews_utils import getNewsData
 from .reddit_utils import fetch_top_from_category
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.lazy_import import lazy_exports
 logger = get_logger('agents')
 
-# 尝试导入yfinance相关模块，如果失败则跳过
-try:
-    from .yfin_utils import YFinanceUtils
-    YFINANCE_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance模块不可用: {e}")
-    YFinanceUtils = None
-    YFINANCE_AVAILABLE = False
+# yfinance、stockstats、googlenews 等依赖较重，在第一次访问时才导入
+_EXPORTS = {
+    "getNewsData": ".googlenews_utils",
+    "YFinanceUtils": ".yfin_utils",
+    "StockstatsUtils": ".stockstats_utils",
+}
+
+# 可选模块: 导出名 -> (可用性标记, 不可用时的日志名称)
+_OPTIONAL = {
+    "YFinanceUtils": ("YFINANCE_AVAILABLE", "yfinance"),
+    "StockstatsUtils": ("STOCKSTATS_AVAILABLE", "stockstats"),
+}
+_OPTIONAL_FLAGS = {flag: export_name for export_name, (flag, _) in _OPTIONAL.items()}
+
+_lazy_getattr = lazy_exports(__name__, globals(), _EXPORTS)
+
+
+def _load_optional(export_name):
+    """导入可选模块，不可用时导出None并记录可用性标记"""
+    flag, label = _OPTIONAL[export_name]
+    try:
+        value = _lazy_getattr(export_name)
+        globals()[flag] = True
+    except ImportError as e:
+        logger.warning(f"⚠️ {label}模块不可用: {e}")
+        value = None
+        globals()[export_name] = None
+        globals()[flag] = False
+    return value
+
+
+def __getattr__(name):
+    if name in _OPTIONAL:
+        return _load_optional(name)
+    if name in _OPTIONAL_FLAGS:
+        _load_optional(_OPTIONAL_FLAGS[name])
+        return globals()[name]
+    return _lazy_getattr(name)
 
-try:
-    from .stockstats_utils import StockstatsUtils
-    STOCKSTATS_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ stockstats模块不可用: {e}")
-    StockstatsUtils = None
-    STOCKSTATS_AVAILABLE = False
 
 from .interface import (
 
@@ -10,11 +10,15 @@ import pickle
 import hashlib
 import logging
 from datetime import datetime, timedelta
+from io import StringIO
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 import pandas as pd
 
 from ..config.database_manager import get_database_manager
+from .cache_index import CacheIndex, file_cache_policy, file_cache_quota_bytes
+from .payload_codec import decode_payload, encode_payload, payload_codec
+from .trading_calendar import calendar_ttl_seconds, market_of
 
 class AdaptiveCacheSystem:
     """自适应缓存系统"""
@@ -28,6 +32,10 @@ class AdaptiveCacheSystem:
         # 设置缓存目录
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # 文件缓存索引：记录大小、过期时间和访问时间，超过容量配额时按LRU淘汰
+        self.file_index = CacheIndex(self.cache_dir / "cache_index.json", file_cache_quota_bytes(),
+                                     file_cache_policy(), rebuild=self._scan_files)
         
         # 获取配置
         self.config = self.db_manager.get_config()
@@ -45,19 +53,36 @@ class AdaptiveCacheSystem:
         key_data = f"{symbol}_{start_date}_{end_date}_{data_source}_{data_type}"
         return hashlib.md5(key_data.encode()).hexdigest()
     
-    def _get_ttl_seconds(self, symbol: str, data_type: str = "stock_data") -> int:
-        """获取TTL秒数"""
+    def _get_ttl_seconds(self, symbol: str, data_type: str = "stock_data",
+                         cached_at: Optional[datetime] = None) -> int:
+        """获取TTL秒数 - 行情和基本面按交易日历计算，其余使用配置的固定TTL"""
+        ttl_seconds = calendar_ttl_seconds(symbol, data_type, cached_at)
+        if ttl_seconds is not None:
+            return ttl_seconds
+
         # 判断市场类型
-        if len(symbol) == 6 and symbol.isdigit():
-            market = "china"
-        else:
-            market = "us"
+        market = "china" if market_of(symbol) == "china" else "us"
         
         # 获取TTL配置
         ttl_key = f"{market}_{data_type}"
         ttl_seconds = self.cache_config["ttl_settings"].get(ttl_key, 7200)
         return ttl_seconds
     
+    def _scan_files(self):
+        """扫描文件缓存目录重建索引（不读取文件内容，过期时间在清理时再确定）"""
+        for cache_file in self.cache_dir.glob("*.pkl"):
+            stat = cache_file.stat()
+            yield cache_file.stem, {
+                'size': stat.st_size,
+                'files': [str(cache_file)],
+                'data_type': 'unknown',
+                'created': stat.st_mtime,
+                'last_access': max(stat.st_mtime, stat.st_atime),
+                'hits': 0,
+                'expires_at': None,
+                'info': {},
+            }
+
     def _is_cache_valid(self, cache_time: datetime, ttl_seconds: int) -> bool:
         """检查缓存是否有效"""
         if cache_time is None:
@@ -79,6 +104,11 @@ class AdaptiveCacheSystem:
             
             with open(cache_file, 'wb') as f:
                 pickle.dump(cache_data, f)
+
+            data_type = metadata.get('data_type', 'stock_data')
+            ttl_seconds = self._get_ttl_seconds(metadata.get('symbol', ''), data_type, cache_data['timestamp'])
+            self.file_index.record_write(cache_key, [str(cache_file)], data_type,
+                                         expires_at=cache_data['timestamp'].timestamp() + ttl_seconds)
             
             self.logger.debug(f"文件缓存保存成功: {cache_key}")
             return True
@@ -96,6 +126,7 @@ class AdaptiveCacheSystem:
             
             with open(cache_file, 'rb') as f:
                 cache_data = pickle.load(f)
+            self.file_index.touch(cache_key)
             
             self.logger.debug(f"文件缓存加载成功: {cache_key}")
             return cache_data
@@ -118,7 +149,7 @@ class AdaptiveCacheSystem:
                 'backend': 'redis'
             }
             
-            serialized_data = pickle.dumps(cache_data)
+            serialized_data = encode_payload(pickle.dumps(cache_data))
             redis_client.setex(cache_key, ttl_seconds, serialized_data)
             
             self.logger.debug(f"Redis缓存保存成功: {cache_key}")
@@ -139,7 +170,8 @@ class AdaptiveCacheSystem:
             if not serialized_data:
                 return None
             
-            cache_data = pickle.loads(serialized_data)
+            # 兼容压缩前写入的未压缩pickle
+            cache_data = pickle.loads(decode_payload(serialized_data))
             
             # 转换时间戳
             if isinstance(cache_data['timestamp'], str):
@@ -162,17 +194,18 @@ class AdaptiveCacheSystem:
             db = mongodb_client.tradingagents
             collection = db.cache
             
-            # 序列化数据
+            # 序列化并压缩数据（二进制保存，不再转成hex字符串）
             if isinstance(data, pd.DataFrame):
-                serialized_data = data.to_json()
+                serialized_data = encode_payload(data.to_json())
                 data_type = 'dataframe'
             else:
-                serialized_data = pickle.dumps(data).hex()
+                serialized_data = encode_payload(pickle.dumps(data))
                 data_type = 'pickle'
             
             cache_doc = {
                 '_id': cache_key,
                 'data': serialized_data,
+                'codec': payload_codec(serialized_data),
                 'data_type': data_type,
                 'metadata': metadata,
                 'timestamp': datetime.now(),
@@ -208,9 +241,15 @@ class AdaptiveCacheSystem:
                 collection.delete_one({'_id': cache_key})
                 return None
             
-            # 反序列化数据
-            if doc['data_type'] == 'dataframe':
-                data = pd.read_json(doc['data'])
+            # 反序列化数据（没有codec字段的是压缩前写入的文档）
+            if doc.get('codec'):
+                raw = decode_payload(doc['data'])
+                if doc['data_type'] == 'dataframe':
+                    data = pd.read_json(StringIO(raw.decode('utf-8')))
+                else:
+                    data = pickle.loads(raw)
+            elif doc['data_type'] == 'dataframe':
+                data = pd.read_json(StringIO(doc['data']))
             else:
                 data = pickle.loads(bytes.fromhex(doc['data']))
             
@@ -270,6 +309,11 @@ class AdaptiveCacheSystem:
     
     def load_data(self, cache_key: str) -> Optional[Any]:
         """从缓存加载数据"""
+        entry = self.load_entry(cache_key)
+        return entry[0] if entry else None
+
+    def load_entry(self, cache_key: str) -> Optional[Tuple[Any, float]]:
+        """从缓存加载数据和剩余有效期（秒），缓存不存在或已过期时返回None"""
         cache_data = None
         
         # 根据主要后端加载
@@ -288,17 +332,17 @@ class AdaptiveCacheSystem:
         if not cache_data:
             return None
         
+        symbol = cache_data['metadata'].get('symbol', '')
+        data_type = cache_data['metadata'].get('data_type', 'stock_data')
+        ttl_seconds = self._get_ttl_seconds(symbol, data_type, cache_data['timestamp'])
+        remaining = (cache_data['timestamp'] + timedelta(seconds=ttl_seconds) - datetime.now()).total_seconds()
+
         # 检查缓存是否有效（仅对文件缓存，数据库缓存有自己的TTL机制）
-        if cache_data.get('backend') == 'file':
-            symbol = cache_data['metadata'].get('symbol', '')
-            data_type = cache_data['metadata'].get('data_type', 'stock_data')
-            ttl_seconds = self._get_ttl_seconds(symbol, data_type)
-            
-            if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
-                self.logger.debug(f"文件缓存已过期: {cache_key}")
-                return None
+        if cache_data.get('backend') == 'file' and remaining <= 0:
+            self.logger.debug(f"文件缓存已过期: {cache_key}")
+            return None
         
-        return cache_data['data']
+        return cache_data['data'], remaining
     
     def find_cached_data(self, symbol: str, start_date: str = "", end_date: str = "", 
                         data_source: str = "default", data_type: str = "stock_data") -> Optional[str]:
@@ -320,7 +364,9 @@ class AdaptiveCacheSystem:
             'mongodb_available': self.db_manager.is_mongodb_available(),
             'redis_available': self.db_manager.is_redis_available(),
             'file_cache_directory': str(self.cache_dir),
-            'file_cache_count': len(list(self.cache_dir.glob("*.pkl"))),
+            'file_cache_count': len(self.file_index),
+            'file_cache_size_mb': round(self.file_index.total_bytes / (1024 * 1024), 2),
+            'file_cache_evictions': self.file_index.evictions,
         }
         
         # Redis统计
@@ -348,23 +394,28 @@ class AdaptiveCacheSystem:
         """清理过期缓存"""
         self.logger.info("开始清理过期缓存...")
         
-        # 清理文件缓存
+        # 清理文件缓存：按索引中的过期时间判断，只有索引重建后还不知道过期时间的文件才需要读取
         cleared_files = 0
-        for cache_file in self.cache_dir.glob("*.pkl"):
+        now = datetime.now().timestamp()
+        for cache_key, entry in self.file_index.items():
             try:
-                with open(cache_file, 'rb') as f:
-                    cache_data = pickle.load(f)
-                
-                symbol = cache_data['metadata'].get('symbol', '')
-                data_type = cache_data['metadata'].get('data_type', 'stock_data')
-                ttl_seconds = self._get_ttl_seconds(symbol, data_type)
+                expires_at = entry.get('expires_at')
+                if expires_at is None:
+                    with open(self.cache_dir / f"{cache_key}.pkl", 'rb') as f:
+                        cache_data = pickle.load(f)
+                    symbol = cache_data['metadata'].get('symbol', '')
+                    data_type = cache_data['metadata'].get('data_type', 'stock_data')
+                    ttl_seconds = self._get_ttl_seconds(symbol, data_type, cache_data['timestamp'])
+                    expires_at = cache_data['timestamp'].timestamp() + ttl_seconds
+                    self.file_index.set_expires_at(cache_key, expires_at)
                 
-                if not self._is_cache_valid(cache_data['timestamp'], ttl_seconds):
-                    cache_file.unlink()
+                if expires_at <= now:
+                    self.file_index.remove(cache_key)
                     cleared_files += 1
                     
             except Exception as e:
-                self.logger.error(f"清理缓存文件失败 {cache_file}: {e}")
+                self.logger.error(f"清理缓存文件失败 {cache_key}: {e}")
+        self.file_index.flush()
         
         self.logger.info(f"文件缓存清理完成，删除 {cleared_files} 个过期文件")
         
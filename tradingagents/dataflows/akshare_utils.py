@@ -341,58 +341,19 @@ class AKShareProvider:
         
         try:
             logger.info(f"🔍 开始获取{symbol}的AKShare财务数据")
-            
-            financial_data = {}
-            
-            # 1. 优先获取主要财务指标
-            try:
-                logger.debug(f"📊 尝试获取{symbol}主要财务指标...")
-                main_indicators = self.ak.stock_financial_abstract(symbol=symbol)
-                if main_indicators is not None and not main_indicators.empty:
-                    financial_data['main_indicators'] = main_indicators
-                    logger.info(f"✅ 成功获取{symbol}主要财务指标: {len(main_indicators)}条记录")
-                    logger.debug(f"主要财务指标列名: {list(main_indicators.columns)}")
-                else:
-                    logger.warning(f"⚠️ {symbol}主要财务指标为空")
-            except Exception as e:
-                logger.warning(f"❌ 获取{symbol}主要财务指标失败: {e}")
-            
-            # 2. 尝试获取资产负债表（可能失败，降级为debug日志）
-            try:
-                logger.debug(f"📊 尝试获取{symbol}资产负债表...")
-                balance_sheet = self.ak.stock_balance_sheet_by_report_em(symbol=symbol)
-                if balance_sheet is not None and not balance_sheet.empty:
-                    financial_data['balance_sheet'] = balance_sheet
-                    logger.debug(f"✅ 成功获取{symbol}资产负债表: {len(balance_sheet)}条记录")
-                else:
-                    logger.debug(f"⚠️ {symbol}资产负债表为空")
-            except Exception as e:
-                logger.debug(f"❌ 获取{symbol}资产负债表失败: {e}")
-            
-            # 3. 尝试获取利润表（可能失败，降级为debug日志）
-            try:
-                logger.debug(f"📊 尝试获取{symbol}利润表...")
-                income_statement = self.ak.stock_profit_sheet_by_report_em(symbol=symbol)
-                if income_statement is not None and not income_statement.empty:
-                    financial_data['income_statement'] = income_statement
-                    logger.debug(f"✅ 成功获取{symbol}利润表: {len(income_statement)}条记录")
-                else:
-                    logger.debug(f"⚠️ {symbol}利润表为空")
-            except Exception as e:
-                logger.debug(f"❌ 获取{symbol}利润表失败: {e}")
-            
-            # 4. 尝试获取现金流量表（可能失败，降级为debug日志）
-            try:
-                logger.debug(f"📊 尝试获取{symbol}现金流量表...")
-                cash_flow = self.ak.stock_cash_flow_sheet_by_report_em(symbol=symbol)
-                if cash_flow is not None and not cash_flow.empty:
-                    financial_data['cash_flow'] = cash_flow
-                    logger.debug(f"✅ 成功获取{symbol}现金流量表: {len(cash_flow)}条记录")
-                else:
-                    logger.debug(f"⚠️ {symbol}现金流量表为空")
-            except Exception as e:
-                logger.debug(f"❌ 获取{symbol}现金流量表失败: {e}")
-            
+
+            # 四张报表并发获取，按报告期缓存到下一次预期披露
+            from .financial_statements import get_financial_statement_store
+
+            financial_data = get_financial_statement_store().get("akshare", symbol, {
+                'main_indicators': lambda: self.ak.stock_financial_abstract(symbol=symbol),
+                'balance_sheet': lambda: self.ak.stock_balance_sheet_by_report_em(symbol=symbol),
+                'income_statement': lambda: self.ak.stock_profit_sheet_by_report_em(symbol=symbol),
+                'cash_flow': lambda: self.ak.stock_cash_flow_sheet_by_report_em(symbol=symbol),
+            })
+            if 'main_indicators' not in financial_data:
+                logger.warning(f"⚠️ {symbol}主要财务指标为空")
+
             # 记录最终结果
             if financial_data:
                 logger.info(f"✅ AKShare财务数据获取完成: {symbol}, 包含{len(financial_data)}个数据集")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+缓存的后台刷新（stale-while-revalidate）
+
+缓存过期后不久的请求直接返回过期数据，同时在后台线程中刷新缓存，
+用户不必等待上游接口。同一个键的刷新同时只会运行一次。
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional, Set
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class BackgroundRefresher:
+    """在后台线程中刷新过期缓存，按键去重"""
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache-refresh")
+        self._in_flight: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def in_flight(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._in_flight
+
+    def submit(self, key: Hashable, refresh: Callable[..., Any], *args, **kwargs) -> Optional[Future]:
+        """
+        提交后台刷新
+
+        Returns:
+            Future；同一个键已经在刷新中时返回None
+        """
+        with self._lock:
+            if key in self._in_flight:
+                logger.debug(f"🔄 后台刷新已在进行: {key}")
+                return None
+            self._in_flight.add(key)
+
+        def _run():
+            try:
+                return refresh(*args, **kwargs)
+            except Exception as e:
+                logger.warning(f"⚠️ 后台刷新失败 {key}: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.discard(key)
+
+        logger.info(f"🔄 后台刷新过期缓存: {key}")
+        return self._executor.submit(_run)
+
+
+_refresher: Optional[BackgroundRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_background_refresher() -> BackgroundRefresher:
+    """获取进程内共享的后台刷新器"""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = BackgroundRefresher()
+        return _refresher
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+文件缓存索引与容量配额
+记录每个缓存条目的大小、写入时间、最近访问时间和访问次数，
+统计信息直接由索引计数得到（不再遍历目录解析元数据），
+写入后总大小超过配额时按LRU（或LFU）增量淘汰条目。
+
+索引保存在缓存目录下的JSON文件中，文件路径相对于缓存目录记录（缓存目录可以整体移动）；
+索引文件不存在或损坏时扫描一次目录重建。多个进程共用一个缓存目录时，写回索引前在文件锁内
+先合并其他进程写入的条目，不会互相覆盖。
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def file_cache_quota_bytes() -> int:
+    """文件缓存容量配额（环境变量 TRADINGAGENTS_FILE_CACHE_QUOTA_MB，0表示不限制）"""
+    return int(float(os.getenv('TRADINGAGENTS_FILE_CACHE_QUOTA_MB', '1024')) * 1024 * 1024)
+
+
+def file_cache_policy() -> str:
+    """淘汰策略：lru（默认）或 lfu（环境变量 TRADINGAGENTS_FILE_CACHE_POLICY）"""
+    policy = os.getenv('TRADINGAGENTS_FILE_CACHE_POLICY', 'lru').lower()
+    return policy if policy in ('lru', 'lfu') else 'lru'
+
+
+def relative_cache_path(path, base_dir: Path) -> str:
+    """base_dir 下的文件返回相对路径，其他文件返回原路径"""
+    try:
+        return Path(path).relative_to(base_dir).as_posix()
+    except ValueError:
+        return str(path)
+
+
+@contextmanager
+def _file_lock(lock_path: Path):
+    """跨进程的排他文件锁"""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CacheIndex:
+    """文件缓存索引（线程安全）"""
+
+    # 内存中的访问时间最多延迟这么久写回索引文件
+    FLUSH_INTERVAL_SECONDS = 5.0
+
+    def __init__(self, index_path: Path, quota_bytes: int = 0, policy: str = "lru",
+                 rebuild: Optional[Callable[[], Iterable[Tuple[str, Dict[str, Any]]]]] = None,
+                 on_evict: Optional[Callable[[List[str]], None]] = None):
+        """
+        Args:
+            index_path: 索引文件路径
+            quota_bytes: 容量配额（字节），0表示不限制
+            policy: 淘汰策略 lru / lfu
+            rebuild: 索引文件不可用时扫描目录，返回 [(缓存键, 条目)]
+            on_evict: 条目被配额淘汰后调用（包括写入时和合并索引文件时的淘汰），参数为被淘汰的缓存键
+        """
+        self.index_path = Path(index_path)
+        self.base_dir = self.index_path.parent
+        self.quota_bytes = quota_bytes
+        self.policy = policy
+        self.on_evict = on_evict
+        # 缓存键 -> {size, files, data_type, created, last_access, hits, expires_at, info}
+        # 按最近访问时间排序，最久未访问的在前
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self._counts: Dict[str, int] = {}
+        self.evictions = 0
+        # 上次读写索引文件后本进程删除的条目和新增的淘汰次数，合并时不把删除的条目恢复回来
+        self._removed = set()
+        self._flushed_evictions = 0
+        self._last_merge_evicted: List[str] = []
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_flush = 0.0
+
+        if not self._load() and rebuild is not None:
+            started = time.time()
+            for cache_key, entry in rebuild():
+                self._add(cache_key, entry)
+            self._entries = OrderedDict(sorted(self._entries.items(), key=lambda item: item[1]['last_access']))
+            self.flush()
+            logger.info(f"🗂️ 已重建缓存索引: {len(self._entries)}个条目, "
+                        f"{self._total_bytes / (1024 * 1024):.2f}MB, 耗时{time.time() - started:.2f}秒")
+
+        # 进程退出时写回内存中的访问时间
+        atexit.register(self._flush_if_dirty)
+
+    # ---- 持久化 ----
+
+    def _load(self) -> bool:
+        if not self.index_path.exists():
+            return False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+            for cache_key, entry in payload.get('entries', []):
+                self._add(cache_key, entry)
+            self.evictions = self._flushed_evictions = payload.get('evictions', 0)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ 缓存索引损坏，重新扫描目录: {e}")
+            self._entries.clear()
+            self._total_bytes = 0
+            self._counts.clear()
+            return False
+
+    def flush(self):
+        """在文件锁内合并索引文件中其他进程的改动，再把索引原子写入文件"""
+        with self._lock:
+            self._dirty = False
+            self._last_flush = time.time()
+            try:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                with _file_lock(self.index_path.with_suffix('.lock')):
+                    self._merge_from_disk()
+                    payload = {'entries': list(self._entries.items()), 'evictions': self.evictions}
+                    tmp_path = self.index_path.with_suffix('.tmp')
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(payload, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.index_path)
+                self._removed.clear()
+                self._flushed_evictions = self.evictions
+            except Exception as e:
+                logger.warning(f"⚠️ 保存缓存索引失败: {e}")
+
+    def _merge_from_disk(self):
+        """
+        合并索引文件中的条目（调用方持有文件锁）：
+        其他进程新写入或重写的条目加入，本进程删除的条目不恢复，
+        索引文件中已没有且文件也已被删除（被其他进程淘汰）的条目移除
+        """
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            payload = {}
+
+        disk_entries = dict(payload.get('entries', []))
+        for cache_key, disk_entry in disk_entries.items():
+            if cache_key in self._removed:
+                continue
+            entry = self._entries.get(cache_key)
+            if entry is None or disk_entry.get('created', 0) > entry.get('created', 0):
+                if entry is not None:
+                    disk_entry['last_access'] = max(disk_entry.get('last_access', 0), entry['last_access'])
+                self._pop(cache_key)
+                self._add(cache_key, disk_entry)
+            else:
+                entry['last_access'] = max(entry['last_access'], disk_entry.get('last_access', 0))
+                entry['hits'] = max(entry.get('hits', 0), disk_entry.get('hits', 0))
+
+        for cache_key in [key for key in self._entries if key not in disk_entries]:
+            if not all(self.resolve_path(path).exists() for path in self._entries[cache_key]['files']):
+                self._pop(cache_key)
+
+        self._entries = OrderedDict(sorted(self._entries.items(), key=lambda item: item[1]['last_access']))
+        self.evictions = payload.get('evictions', 0) + self.evictions - self._flushed_evictions
+        self._last_merge_evicted = self._evict_over_quota()
+
+    def _flush_if_dirty(self):
+        if self._dirty:
+            self.flush()
+
+    def _maybe_flush(self):
+        if self._dirty and time.time() - self._last_flush >= self.FLUSH_INTERVAL_SECONDS:
+            self.flush()
+
+    # ---- 路径 ----
+
+    def relative_path(self, path) -> str:
+        """缓存目录下的文件记录为相对路径，目录外的文件保留原路径"""
+        return relative_cache_path(path, self.base_dir)
+
+    def resolve_path(self, path) -> Path:
+        """把索引中记录的路径还原为实际路径（兼容旧索引中的绝对路径）"""
+        return self.base_dir / path
+
+    # ---- 条目维护 ----
+
+    def _add(self, cache_key: str, entry: Dict[str, Any]):
+        entry['files'] = [self.relative_path(path) for path in entry.get('files', [])]
+        self._entries[cache_key] = entry
+        self._total_bytes += entry.get('size', 0)
+        data_type = entry.get('data_type', 'unknown')
+        self._counts[data_type] = self._counts.get(data_type, 0) + 1
+
+    def _pop(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.pop(cache_key, None)
+        if entry is not None:
+            self._total_bytes -= entry.get('size', 0)
+            data_type = entry.get('data_type', 'unknown')
+            self._counts[data_type] -= 1
+        return entry
+
+    def record_write(self, cache_key: str, files: List[str], data_type: str,
+                     expires_at: Optional[float] = None, info: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        记录写入的缓存条目，超过配额时淘汰其他条目
+
+        Args:
+            files: 条目对应的文件（大小计入配额，淘汰时一起删除）
+            expires_at: 条目的过期时间（时间戳），未知时为None
+
+        Returns:
+            被淘汰的缓存键（包括写回索引文件时合并其他进程的条目后淘汰的）
+        """
+        size = sum(os.path.getsize(path) for path in files if os.path.exists(path))
+        now = time.time()
+        with self._lock:
+            previous = self._pop(cache_key)
+            self._removed.discard(cache_key)
+            self._add(cache_key, {
+                'size': size,
+                'files': list(files),
+                'data_type': data_type,
+                'created': now,
+                'last_access': now,
+                'hits': previous.get('hits', 0) if previous else 0,
+                'expires_at': expires_at,
+                'info': info or {},
+            })
+            evicted = self._evict_over_quota(protect=cache_key)
+            self._dirty = True
+            self._last_merge_evicted = []
+            if evicted:
+                self.flush()
+            else:
+                self._maybe_flush()
+            evicted += self._last_merge_evicted
+        return evicted
+
+    def touch(self, cache_key: str):
+        """记录一次读取"""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return
+            entry['last_access'] = time.time()
+            entry['hits'] = entry.get('hits', 0) + 1
+            self._entries.move_to_end(cache_key)
+            self._dirty = True
+            self._maybe_flush()
+
+    def set_expires_at(self, cache_key: str, expires_at: float):
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                entry['expires_at'] = expires_at
+                self._dirty = True
+
+    def remove(self, cache_key: str, delete_files: bool = True) -> bool:
+        """删除条目（默认同时删除文件）"""
+        with self._lock:
+            entry = self._pop(cache_key)
+            if entry is None:
+                return False
+            self._removed.add(cache_key)
+            self._dirty = True
+        if delete_files:
+            self._delete_files(entry)
+        return True
+
+    def _evict_over_quota(self, protect: Optional[str] = None) -> List[str]:
+        """总大小超过配额时淘汰条目，直到回到配额以内"""
+        evicted = []
+        if not self.quota_bytes:
+            return evicted
+        while self._total_bytes > self.quota_bytes and len(self._entries) > 1:
+            if self.policy == 'lfu':
+                victim = min((key for key in self._entries if key != protect),
+                             key=lambda key: (self._entries[key].get('hits', 0), self._entries[key]['last_access']))
+            else:
+                victim = next(key for key in self._entries if key != protect)
+            self._delete_files(self._pop(victim))
+            self._removed.add(victim)
+            self.evictions += 1
+            evicted.append(victim)
+        if evicted:
+            logger.info(f"🧹 缓存超过配额{self.quota_bytes / (1024 * 1024):.0f}MB，淘汰{len(evicted)}个条目")
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+        return evicted
+
+    def _delete_files(self, entry: Dict[str, Any]):
+        for path in map(self.resolve_path, entry.get('files', [])):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logger.warning(f"⚠️ 删除缓存文件失败 {path}: {e}")
+
+    # ---- 查询 ----
+
+    def get(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            return dict(entry) if entry else None
+
+    def items(self, data_type: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """条目快照（可按数据类型过滤）"""
+        with self._lock:
+            return [(key, dict(entry)) for key, entry in self._entries.items()
+                    if data_type is None or entry.get('data_type') == data_type]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def count(self, data_type: str) -> int:
+        return self._counts.get(data_type, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'total_bytes': self._total_bytes,
+                'quota_bytes': self.quota_bytes,
+                'policy': self.policy,
+                'evictions': self.evictions,
+                'counts': dict(self._counts),
+            }
@@ -13,6 +13,10 @@ from pathlib import Path
 from typing import Optional, Dict, Any, Union, List
 import hashlib
 
+from .cache_index import CacheIndex, file_cache_policy, file_cache_quota_bytes, relative_cache_path
+from .memory_cache import MemoryLRUCache, l1_cache_max_bytes
+from .trading_calendar import calendar_ttl_seconds
+
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
@@ -92,6 +96,17 @@ class StockDataCache:
             'enable_length_check': os.getenv('ENABLE_CACHE_LENGTH_CHECK', 'false').lower() == 'true'  # 文件缓存默认不限制
         }
 
+        # 进程内L1内存缓存（按字节数限制容量），重复读取同一条缓存时不再解析文件
+        self.memory_cache = MemoryLRUCache(l1_cache_max_bytes())
+
+        # 缓存索引：记录条目大小和访问时间，统计直接读计数，超过容量配额时按LRU淘汰（被淘汰的条目同时从L1移除）
+        self.index = CacheIndex(self.cache_dir / "cache_index.json", file_cache_quota_bytes(),
+                                file_cache_policy(), rebuild=self._scan_metadata,
+                                on_evict=self._invalidate_evicted)
+
+        # 本进程中因内容过长而跳过写入的缓存次数
+        self.skipped_count = 0
+
         logger.info(f"📁 缓存管理器初始化完成，缓存目录: {self.cache_dir}")
         logger.info(f"🗄️ 数据库缓存管理器初始化完成")
         logger.info(f"   美股数据: ✅ 已配置")
@@ -216,6 +231,49 @@ class StockDataCache:
         
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+        self.index.record_write(cache_key, [metadata['file_path'], str(metadata_path)],
+                                metadata.get('data_type', 'unknown'), info=self._index_info(metadata))
+        # 新写入的条目从L1移除（被配额淘汰的条目由 _invalidate_evicted 移除）
+        self.memory_cache.invalidate(cache_key)
+
+    def _invalidate_evicted(self, cache_keys: List[str]):
+        """被索引按配额淘汰的条目（包括合并其他进程的索引后淘汰的）从L1移除"""
+        for cache_key in cache_keys:
+            self.memory_cache.invalidate(cache_key)
+
+    def _index_info(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """索引中保存的展示信息（缓存管理页面不必再逐个读取元数据文件）"""
+        info = {key: metadata.get(key) for key in ('symbol', 'data_source', 'start_date', 'end_date', 'cached_at')}
+        file_path = metadata.get('file_path')
+        info['file_path'] = relative_cache_path(file_path, self.cache_dir) if file_path else None
+        return info
+
+    def _scan_metadata(self):
+        """扫描元数据目录重建索引；数据文件已不存在的元数据直接删除"""
+        for metadata_file in self.metadata_dir.glob("*_meta.json"):
+            try:
+                with open(metadata_file, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                data_file = Path(metadata['file_path'])
+                if not data_file.exists():
+                    metadata_file.unlink()
+                    continue
+                cache_key = metadata_file.name[:-len("_meta.json")]
+                files = [data_file, metadata_file]
+                created = datetime.fromisoformat(metadata['cached_at']).timestamp()
+                yield cache_key, {
+                    'size': sum(path.stat().st_size for path in files),
+                    'files': [str(path) for path in files],
+                    'data_type': metadata.get('data_type', 'unknown'),
+                    'created': created,
+                    'last_access': max(created, data_file.stat().st_atime),
+                    'hits': 0,
+                    'expires_at': None,
+                    'info': self._index_info(metadata),
+                }
+            except Exception as e:
+                logger.warning(f"⚠️ 索引缓存文件失败 {metadata_file}: {e}")
     
     def _load_metadata(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """加载元数据"""
@@ -230,36 +288,48 @@ class StockDataCache:
             logger.error(f"⚠️ 加载元数据失败: {e}")
             return None
     
+    def _cache_ttl_seconds(self, metadata: Dict[str, Any], max_age_hours: int = None,
+                           symbol: str = None, data_type: str = None) -> float:
+        """缓存条目的有效期（秒）- 未指定TTL时行情和基本面按交易日历计算，其余按数据类型和市场配置"""
+        if max_age_hours is not None:
+            return max_age_hours * 3600
+
+        symbol = symbol or metadata.get('symbol', '')
+        data_type = data_type or metadata.get('data_type', 'stock_data')
+        cached_at = datetime.fromisoformat(metadata['cached_at'])
+
+        # 优先按交易日历计算（有效到下一个交易时段可能改变数据为止）
+        ttl_seconds = calendar_ttl_seconds(symbol, data_type, cached_at)
+        if ttl_seconds is None:
+            cache_type = f"{self._determine_market_type(symbol)}_{data_type}"
+            ttl_seconds = self.cache_config.get(cache_type, {}).get('ttl_hours', 24) * 3600
+        return ttl_seconds
+
+    def get_cache_staleness(self, cache_key: str, max_age_hours: int = None,
+                            symbol: str = None, data_type: str = None) -> Optional[float]:
+        """缓存已过期的秒数（未过期时为负数），缓存不存在时返回None"""
+        metadata = self._load_metadata(cache_key)
+        if not metadata:
+            return None
+        ttl_seconds = self._cache_ttl_seconds(metadata, max_age_hours, symbol, data_type)
+        age = datetime.now() - datetime.fromisoformat(metadata['cached_at'])
+        return age.total_seconds() - ttl_seconds
+
     def is_cache_valid(self, cache_key: str, max_age_hours: int = None, symbol: str = None, data_type: str = None) -> bool:
-        """检查缓存是否有效 - 支持智能TTL配置"""
+        """检查缓存是否有效 - 支持按交易日历计算TTL"""
         metadata = self._load_metadata(cache_key)
         if not metadata:
             return False
 
-        # 如果没有指定TTL，根据数据类型和市场自动确定
-        if max_age_hours is None:
-            if symbol and data_type:
-                market_type = self._determine_market_type(symbol)
-                cache_type = f"{market_type}_{data_type}"
-                max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
-            else:
-                # 从元数据中获取信息
-                symbol = metadata.get('symbol', '')
-                data_type = metadata.get('data_type', 'stock_data')
-                market_type = self._determine_market_type(symbol)
-                cache_type = f"{market_type}_{data_type}"
-                max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
-
-        cached_at = datetime.fromisoformat(metadata['cached_at'])
-        age = datetime.now() - cached_at
-
-        is_valid = age.total_seconds() < max_age_hours * 3600
+        ttl_seconds = self._cache_ttl_seconds(metadata, max_age_hours, symbol, data_type)
+        age = datetime.now() - datetime.fromisoformat(metadata['cached_at'])
+        is_valid = age.total_seconds() < ttl_seconds
 
         if is_valid:
             market_type = self._determine_market_type(metadata.get('symbol', ''))
             cache_type = f"{market_type}_{metadata.get('data_type', 'stock_data')}"
             desc = self.cache_config.get(cache_type, {}).get('description', '数据')
-            logger.info(f"✅ 缓存有效: {desc} - {metadata.get('symbol')} (剩余 {max_age_hours - age.total_seconds()/3600:.1f}h)")
+            logger.info(f"✅ 缓存有效: {desc} - {metadata.get('symbol')} (剩余 {(ttl_seconds - age.total_seconds())/3600:.1f}h)")
 
         return is_valid
     
@@ -290,6 +360,7 @@ class StockDataCache:
                                                source=data_source,
                                                market=market_type,
                                                skipped=True)
+            self.skipped_count += 1
             logger.info(f"🚫 股票数据因内容过长被跳过缓存: {symbol} -> {cache_key}")
             return cache_key
 
@@ -333,14 +404,33 @@ class StockDataCache:
     
     def load_stock_data(self, cache_key: str) -> Optional[Union[pd.DataFrame, str]]:
         """从缓存加载股票数据"""
+        return self._load_with_memory_cache(cache_key, self._read_stock_file)
+
+    def _load_with_memory_cache(self, cache_key: str, read_file) -> Optional[Any]:
+        """先查L1内存缓存，未命中时读取缓存文件并按条目的剩余有效期写入L1（过期条目仍然返回，但不进入L1）"""
+        data = self.memory_cache.get(cache_key)
+        if data is not None:
+            self.index.touch(cache_key)
+            return data
+
         metadata = self._load_metadata(cache_key)
         if not metadata:
             return None
-        
+
         cache_path = Path(metadata['file_path'])
         if not cache_path.exists():
             return None
-        
+        self.index.touch(cache_key)
+
+        data = read_file(metadata, cache_path)
+        if data is not None:
+            staleness = self.get_cache_staleness(cache_key)
+            if staleness is not None:
+                self.memory_cache.put(cache_key, data, -staleness)
+        return data
+
+    @staticmethod
+    def _read_stock_file(metadata: Dict[str, Any], cache_path: Path) -> Optional[Union[pd.DataFrame, str]]:
         try:
             if metadata['file_format'] == 'csv':
                 return pd.read_csv(cache_path, index_col=0)
@@ -350,6 +440,15 @@ class StockDataCache:
         except Exception as e:
             logger.error(f"⚠️ 加载缓存数据失败: {e}")
             return None
+
+    @staticmethod
+    def _read_text_file(cache_path: Path, desc: str) -> Optional[str]:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except Exception as e:
+            logger.error(f"⚠️ 加载{desc}缓存数据失败: {e}")
+            return None
     
     def find_cached_stock_data(self, symbol: str, start_date: str = None,
                               end_date: str = None, data_source: str = None,
@@ -362,18 +461,13 @@ class StockDataCache:
             start_date: 开始日期
             end_date: 结束日期
             data_source: 数据源
-            max_age_hours: 最大缓存时间（小时），None时使用智能配置
+            max_age_hours: 最大缓存时间（小时），None时按交易日历计算
 
         Returns:
             cache_key: 如果找到有效缓存则返回缓存键，否则返回None
         """
         market_type = self._determine_market_type(symbol)
 
-        # 如果没有指定TTL，使用智能配置
-        if max_age_hours is None:
-            cache_type = f"{market_type}_stock_data"
-            max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
-
         # 生成查找键
         search_key = self._generate_cache_key("stock_data", symbol,
                                             start_date=start_date,
@@ -410,6 +504,36 @@ class StockDataCache:
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol}")
         return None
     
+    def find_stale_stock_data(self, symbol: str, start_date: str = None,
+                              end_date: str = None, data_source: str = None,
+                              max_stale_seconds: float = 0) -> Optional[str]:
+        """
+        查找已过期但仍在宽限期内的缓存（只按精确键查找）
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            data_source: 数据源
+            max_stale_seconds: 过期后仍可使用的最长时间（秒）
+
+        Returns:
+            cache_key: 找到宽限期内的过期缓存时返回缓存键，否则返回None
+        """
+        if max_stale_seconds <= 0:
+            return None
+
+        cache_key = self._generate_cache_key("stock_data", symbol,
+                                           start_date=start_date,
+                                           end_date=end_date,
+                                           source=data_source,
+                                           market=self._determine_market_type(symbol))
+        staleness = self.get_cache_staleness(cache_key, symbol=symbol, data_type='stock_data')
+        if staleness is None or staleness > max_stale_seconds:
+            return None
+        logger.info(f"⏳ 找到宽限期内的过期缓存: {symbol} -> {cache_key} (已过期 {max(staleness, 0)/3600:.1f}h)")
+        return cache_key
+
     def save_news_data(self, symbol: str, news_data: str, 
                       start_date: str = None, end_date: str = None,
                       data_source: str = "unknown") -> str:
@@ -422,6 +546,7 @@ class StockDataCache:
                                                end_date=end_date,
                                                source=data_source,
                                                skipped=True)
+            self.skipped_count += 1
             logger.info(f"🚫 新闻数据因内容过长被跳过缓存: {symbol} -> {cache_key}")
             return cache_key
 
@@ -450,6 +575,11 @@ class StockDataCache:
         logger.info(f"📰 新闻数据已缓存: {symbol} ({data_source}) -> {cache_key}")
         return cache_key
     
+    def load_news_data(self, cache_key: str) -> Optional[str]:
+        """从缓存加载新闻数据"""
+        return self._load_with_memory_cache(
+            cache_key, lambda metadata, cache_path: self._read_text_file(cache_path, "新闻"))
+    
     def save_fundamentals_data(self, symbol: str, fundamentals_data: str,
                               data_source: str = "unknown") -> str:
         """保存基本面数据到缓存"""
@@ -462,6 +592,7 @@ class StockDataCache:
                                                market=market_type,
                                                date=datetime.now().strftime("%Y-%m-%d"),
                                                skipped=True)
+            self.skipped_count += 1
             logger.info(f"🚫 基本面数据因内容过长被跳过缓存: {symbol} -> {cache_key}")
             return cache_key
 
@@ -493,20 +624,8 @@ class StockDataCache:
     
     def load_fundamentals_data(self, cache_key: str) -> Optional[str]:
         """从缓存加载基本面数据"""
-        metadata = self._load_metadata(cache_key)
-        if not metadata:
-            return None
-        
-        cache_path = Path(metadata['file_path'])
-        if not cache_path.exists():
-            return None
-        
-        try:
-            with open(cache_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"⚠️ 加载基本面缓存数据失败: {e}")
-            return None
+        return self._load_with_memory_cache(
+            cache_key, lambda metadata, cache_path: self._read_text_file(cache_path, "基本面"))
     
     def find_cached_fundamentals_data(self, symbol: str, data_source: str = None,
                                     max_age_hours: int = None) -> Optional[str]:
@@ -516,18 +635,13 @@ class StockDataCache:
         Args:
             symbol: 股票代码
             data_source: 数据源（如 "openai", "finnhub"）
-            max_age_hours: 最大缓存时间（小时），None时使用智能配置
+            max_age_hours: 最大缓存时间（小时），None时按交易日历计算
         
         Returns:
             cache_key: 如果找到有效缓存则返回缓存键，否则返回None
         """
         market_type = self._determine_market_type(symbol)
         
-        # 如果没有指定TTL，使用智能配置
-        if max_age_hours is None:
-            cache_type = f"{market_type}_fundamentals"
-            max_age_hours = self.cache_config.get(cache_type, {}).get('ttl_hours', 24)
-        
         # 查找匹配的缓存
         for metadata_file in self.metadata_dir.glob(f"*_meta.json"):
             try:
@@ -551,71 +665,47 @@ class StockDataCache:
         logger.error(f"❌ 未找到有效的{desc}缓存: {symbol} ({data_source})")
         return None
     
-    def clear_old_cache(self, max_age_days: int = 7):
-        """清理过期缓存"""
-        cutoff_time = datetime.now() - timedelta(days=max_age_days)
+    def clear_old_cache(self, max_age_days: int = 7) -> int:
+        """清理过期缓存（按索引中的写入时间，不再逐个解析元数据文件）"""
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).timestamp()
         cleared_count = 0
         
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                cached_at = datetime.fromisoformat(metadata['cached_at'])
-                if cached_at < cutoff_time:
-                    # 删除数据文件
-                    data_file = Path(metadata['file_path'])
-                    if data_file.exists():
-                        data_file.unlink()
-                    
-                    # 删除元数据文件
-                    metadata_file.unlink()
-                    cleared_count += 1
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ 清理缓存时出错: {e}")
+        for cache_key, entry in self.index.items():
+            if entry['created'] < cutoff and self.index.remove(cache_key):
+                self.memory_cache.invalidate(cache_key)
+                cleared_count += 1
+        self.index.flush()
         
         logger.info(f"🧹 已清理 {cleared_count} 个过期缓存文件")
+        return cleared_count
     
     def get_cache_stats(self) -> Dict[str, Any]:
-        """获取缓存统计信息"""
-        stats = {
-            'total_files': 0,
-            'stock_data_count': 0,
-            'news_count': 0,
-            'fundamentals_count': 0,
-            'total_size_mb': 0,
-            'skipped_count': 0  # 新增：跳过的缓存数量
+        """获取缓存统计信息（由索引计数得到）"""
+        index_stats = self.index.stats()
+        return {
+            'total_files': index_stats['entries'],
+            'stock_data_count': self.index.count('stock_data'),
+            'news_count': self.index.count('news'),
+            'fundamentals_count': self.index.count('fundamentals'),
+            'total_size_mb': round(index_stats['total_bytes'] / (1024 * 1024), 2),
+            'skipped_count': self.skipped_count,  # 本进程中因内容过长跳过写入的次数
+            'quota_mb': round(index_stats['quota_bytes'] / (1024 * 1024), 2),
+            'eviction_policy': index_stats['policy'],
+            'evictions': index_stats['evictions'],
         }
-        
-        for metadata_file in self.metadata_dir.glob("*_meta.json"):
-            try:
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                data_type = metadata.get('data_type', 'unknown')
-                if data_type == 'stock_data':
-                    stats['stock_data_count'] += 1
-                elif data_type == 'news':
-                    stats['news_count'] += 1
-                elif data_type == 'fundamentals':
-                    stats['fundamentals_count'] += 1
-                
-                # 检查是否为跳过的缓存（没有实际文件）
-                data_file = Path(metadata.get('file_path', ''))
-                if not data_file.exists():
-                    stats['skipped_count'] += 1
-                else:
-                    # 计算文件大小
-                    stats['total_size_mb'] += data_file.stat().st_size / (1024 * 1024)
-                
-                stats['total_files'] += 1
-                
-            except Exception:
-                continue
-        
-        stats['total_size_mb'] = round(stats['total_size_mb'], 2)
-        return stats
+
+    def list_cache_entries(self, data_type: str = None) -> List[Dict[str, Any]]:
+        """缓存条目列表（来自索引），按写入时间倒序"""
+        entries = []
+        for cache_key, entry in self.index.items(data_type):
+            item = dict(entry.get('info', {}))
+            if item.get('file_path'):
+                item['file_path'] = str(self.index.resolve_path(item['file_path']))
+            item.update(cache_key=cache_key, data_type=entry.get('data_type'), size=entry.get('size', 0),
+                        last_access=entry.get('last_access'), hits=entry.get('hits', 0))
+            entries.append(item)
+        entries.sort(key=lambda item: item.get('cached_at') or '', reverse=True)
+        return entries
 
     def get_content_length_config_status(self) -> Dict[str, Any]:
         """获取内容长度配置状态"""
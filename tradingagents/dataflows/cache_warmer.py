@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+盘前缓存预热
+
+每个交易日开盘前，按市场的自选股列表预先获取行情、股票基本信息和最新财务报表，
+开盘后的第一次分析直接命中缓存：
+
+- A股行情：主数据源为Tushare时按交易日批量调用 daily（每个交易日一次调用返回全市场行情），
+  否则逐只经数据源管理器获取；
+- 美股行情：yf.download 一次获取多只股票；
+- 港股行情：没有批量接口，逐只经港股统一接口获取（写入分析时读取的同一缓存）；
+- A股基本信息：Tushare股票列表一次获取，get_stock_info 直接从中查找；
+- A股财务报表：经 FinancialStatementStore 缓存最新报告期，随后生成基本面报告。
+
+批量获取的行情先放入 PointInTimeHistory，再让数据提供器只从批量获取所用的数据源取数
+（美股只用Yahoo Finance、不经过Finnhub，A股只用Tushare、不按健康度换数据源）：提供器从中切片，
+并按分析时读取的缓存键写入缓存。批量获取失败或切片没有数据的股票经提供器原来的获取方法逐只获取。
+所有接口请求经 RateLimiter 限速。
+
+预热的条目按交易日历有效到开盘，开盘后在过期宽限期（TRADINGAGENTS_CACHE_STALE_GRACE_HOURS）内
+直接返回并在后台刷新。
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import pandas as pd
+
+from .data_context import AnalysisDataContext
+from .point_in_time import PointInTimeHistory
+from .trading_calendar import ExchangeCalendar, get_trading_calendar
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+MARKETS = ("china", "hk", "us")
+
+
+def parse_symbols(value) -> List[str]:
+    """解析逗号或空白分隔的股票代码（也接受列表），去重并保持顺序"""
+    if not value:
+        return []
+    items = re.split(r"[,\s]+", value) if isinstance(value, str) else value
+    symbols = []
+    for item in items:
+        symbol = str(item).strip()
+        if symbol and symbol not in symbols:
+            symbols.append(symbol)
+    return symbols
+
+
+def load_watchlists(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    读取各市场的自选股列表
+
+    Args:
+        path: JSON文件 {"china": [...], "hk": [...], "us": [...]}，
+            默认读取环境变量 TRADINGAGENTS_WARM_WATCHLIST_FILE；
+            没有文件时读取 TRADINGAGENTS_WARM_WATCHLIST_CHINA / _HK / _US（逗号分隔）
+    """
+    path = path or os.getenv("TRADINGAGENTS_WARM_WATCHLIST_FILE")
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        return {market: parse_symbols(payload.get(market)) for market in MARKETS}
+    return {market: parse_symbols(os.getenv(f"TRADINGAGENTS_WARM_WATCHLIST_{market.upper()}", ""))
+            for market in MARKETS}
+
+
+def warm_lookback_days() -> List[int]:
+    """预热的行情窗口（环境变量 TRADINGAGENTS_WARM_LOOKBACK_DAYS，逗号分隔的天数）"""
+    return [int(days) for days in parse_symbols(os.getenv("TRADINGAGENTS_WARM_LOOKBACK_DAYS", "30"))]
+
+
+def warm_calls_per_minute() -> float:
+    """预热时每分钟最多发出的请求数（环境变量 TRADINGAGENTS_WARM_CALLS_PER_MINUTE）"""
+    return float(os.getenv("TRADINGAGENTS_WARM_CALLS_PER_MINUTE", "60"))
+
+
+def warm_lead_minutes() -> int:
+    """后台服务在开盘前多少分钟预热（环境变量 TRADINGAGENTS_WARM_LEAD_MINUTES）"""
+    return int(os.getenv("TRADINGAGENTS_WARM_LEAD_MINUTES", "30"))
+
+
+class RateLimiter:
+    """按固定间隔放行请求（线程安全）"""
+
+    def __init__(self, calls_per_minute: float):
+        self.interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.waited = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next_at - now)
+            self._next_at = max(now, self._next_at) + self.interval
+            self.calls += 1
+            self.waited += delay
+        if delay:
+            time.sleep(delay)
+
+
+@dataclass
+class WarmTask:
+    """一项预热任务的结果"""
+    name: str
+    warmed: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    requests: int = 0
+    seconds: float = 0.0
+    note: str = ""
+
+
+@dataclass
+class WarmReport:
+    """一个市场一次预热的结果"""
+    market: str
+    session_date: str
+    tasks: List[WarmTask] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        lines = [f"🔥 {self.market} 缓存预热（交易日 {self.session_date}）: 耗时{self.seconds:.1f}秒"]
+        for task in self.tasks:
+            line = (f"  - {task.name}: 成功{len(task.warmed)}, 失败{len(task.failed)}, "
+                    f"请求{task.requests}次, 耗时{task.seconds:.1f}秒")
+            if task.failed:
+                line += f", 失败: {', '.join(task.failed)}"
+            if task.note:
+                line += f" ({task.note})"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def split_download(data: pd.DataFrame, tickers: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """把 yf.download(group_by="ticker") 的多只股票结果拆成每只股票的行情表"""
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                continue
+            frame = data[ticker]
+        elif len(tickers) == 1:
+            frame = data
+        else:
+            continue
+        frame = frame.dropna(how="all")
+        if not frame.empty:
+            frames[ticker] = frame.copy()
+    return frames
+
+
+def completed_trading_days(calendar: ExchangeCalendar, start: date, end: date,
+                           now: Optional[datetime] = None) -> List[date]:
+    """[start, end] 中已经收盘的交易日"""
+    local_now = (now or datetime.now(timezone.utc)).astimezone(calendar.tz)
+    day_closed = local_now.time() >= calendar.sessions[-1][1]
+    days = []
+    day = start
+    while day <= end:
+        if calendar.is_trading_day(day) and (day < local_now.date() or (day == local_now.date() and day_closed)):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class CacheWarmer:
+    """按自选股列表预热各市场的缓存"""
+
+    def __init__(self, watchlists: Dict[str, Iterable[str]], lookback_days: Sequence[int] = (30,),
+                 calls_per_minute: Optional[float] = None, us_batch_size: int = 50):
+        """
+        Args:
+            watchlists: 市场（china / hk / us）-> 股票代码
+            lookback_days: 预热的行情窗口天数，窗口为 [交易日 - N天, 交易日]，与分析时请求的区间一致
+            calls_per_minute: 每分钟最多发出的请求数
+            us_batch_size: 每次 yf.download 获取的股票数
+        """
+        self.watchlists = {market: parse_symbols(symbols) for market, symbols in watchlists.items()
+                           if market in MARKETS and symbols}
+        self.lookback_days = sorted(set(lookback_days)) or [30]
+        self.limiter = RateLimiter(warm_calls_per_minute() if calls_per_minute is None else calls_per_minute)
+        self.us_batch_size = us_batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_env(cls, watchlist_file: Optional[str] = None) -> "CacheWarmer":
+        return cls(load_watchlists(watchlist_file), lookback_days=warm_lookback_days())
+
+    @property
+    def markets(self) -> List[str]:
+        return [market for market in MARKETS if self.watchlists.get(market)]
+
+    @staticmethod
+    def session_date(market: str, now: Optional[datetime] = None) -> date:
+        """要预热的交易日：下一个交易日的开盘日期（开盘前运行时为当天）"""
+        return get_trading_calendar(market).next_session_open(now).date()
+
+    # ---- 预热 ----
+
+    def warm_all(self, session_date: Optional[date] = None) -> List[WarmReport]:
+        return [self.warm_market(market, session_date) for market in self.markets]
+
+    def warm_market(self, market: str, session_date: Optional[date] = None) -> WarmReport:
+        """预热一个市场，返回每项任务的结果和耗时"""
+        started = time.time()
+        symbols = self.watchlists.get(market, [])
+        session = session_date or self.session_date(market)
+        report = WarmReport(market, session.isoformat())
+        logger.info(f"🔥 开始预热{market}缓存: {len(symbols)}只股票, 交易日{session}")
+
+        if market == "china":
+            report.tasks.append(self._timed(self._warm_china_info, symbols))
+        report.tasks.append(self._timed(self._warm_bars, market, symbols, session))
+        if market == "china":
+            report.tasks.append(self._timed(self._warm_china_financials, symbols))
+
+        report.seconds = time.time() - started
+        logger.info(report.summary())
+        return report
+
+    @staticmethod
+    def _timed(warm: Callable[..., WarmTask], *args) -> WarmTask:
+        started = time.time()
+        task = warm(*args)
+        task.seconds = time.time() - started
+        return task
+
+    def _throttle(self, task: WarmTask) -> Callable[[], None]:
+        def _wait():
+            self.limiter.wait()
+            task.requests += 1
+        return _wait
+
+    # ---- 行情 ----
+
+    def _warm_bars(self, market: str, symbols: List[str], session: date) -> WarmTask:
+        """批量获取行情后，按分析请求的窗口经数据提供器写入缓存"""
+        task = WarmTask("bars")
+        history = PointInTimeHistory(session.isoformat(), session.isoformat(),
+                                     lookback_days=max(self.lookback_days), static_datasets=())
+        preloaded = self._preload_bars(market, symbols, history, task)
+        if preloaded:
+            task.note = f"批量获取{len(preloaded)}只"
+
+        end_date = session.isoformat()
+        with AnalysisDataContext(f"cache_warm_{market}", history=history).activate():
+            for symbol in symbols:
+                ok = True
+                for days in self.lookback_days:
+                    start_date = (session - timedelta(days=days)).isoformat()
+                    try:
+                        warmed = symbol in preloaded and self._cache_preloaded_bars(market, symbol, start_date,
+                                                                                    end_date)
+                        if not warmed:
+                            self._throttle(task)()
+                            warmed = self._fetch_bars(market, symbol, start_date, end_date)
+                        ok = warmed and ok
+                    except Exception as e:
+                        logger.warning(f"⚠️ 预热{symbol}行情失败: {e}")
+                        ok = False
+                (task.warmed if ok else task.failed).append(symbol)
+        return task
+
+    def _cache_preloaded_bars(self, market: str, symbol: str, start_date: str, end_date: str) -> bool:
+        """只从预加载行情所属的数据源获取（从history切片，不发请求），写入分析时读取的缓存"""
+        if market == "china":
+            from .data_source_manager import ChinaDataSource
+            from .optimized_china_data import get_optimized_china_data_provider
+            result = get_optimized_china_data_provider().get_stock_data_result(
+                symbol, start_date, end_date, force_refresh=True, source=ChinaDataSource.TUSHARE)
+            return result.ok
+
+        from .optimized_us_data import get_optimized_us_data_provider
+        return get_optimized_us_data_provider().refresh_from_yfinance(symbol, start_date, end_date) is not None
+
+    def _fetch_bars(self, market: str, symbol: str, start_date: str, end_date: str) -> bool:
+        if market == "china":
+            from .optimized_china_data import get_optimized_china_data_provider
+            result = get_optimized_china_data_provider().get_stock_data_result(
+                symbol, start_date, end_date, force_refresh=True)
+            return result.ok
+
+        if market == "hk":
+            from .interface import get_hk_stock_data_unified
+            text = get_hk_stock_data_unified(symbol, start_date, end_date, force_refresh=True)
+        else:
+            from .optimized_us_data import get_optimized_us_data_provider
+            text = get_optimized_us_data_provider().get_stock_data(symbol, start_date, end_date, force_refresh=True)
+        return bool(text) and "❌" not in text
+
+    def _preload_bars(self, market: str, symbols: List[str], history: PointInTimeHistory,
+                      task: WarmTask) -> Set[str]:
+        """批量获取完整窗口的行情放入history，返回已预加载的股票"""
+        if market == "us":
+            frames = self._download_yfinance(symbols, history.load_start, history.load_end, task)
+            for ticker, frame in frames.items():
+                history.preload("yfinance_daily", ticker, frame)
+            return {symbol for symbol in symbols if symbol.upper() in frames}
+
+        if market == "china":
+            frames = self._download_tushare(symbols, history, task)
+            for symbol, frame in frames.items():
+                history.preload("tushare_daily", symbol, frame)
+            return set(frames)
+        return set()
+
+    def _download_yfinance(self, symbols: List[str], start_date: str, end_date: str,
+                           task: WarmTask) -> Dict[str, pd.DataFrame]:
+        import yfinance as yf
+
+        tickers = [symbol.upper() for symbol in symbols]
+        frames = {}
+        for i in range(0, len(tickers), self.us_batch_size):
+            batch = tickers[i:i + self.us_batch_size]
+            self._throttle(task)()
+            try:
+                data = yf.download(batch, start=start_date, end=end_date, group_by="ticker",
+                                   auto_adjust=True, actions=True, progress=False, threads=False)
+            except Exception as e:
+                logger.warning(f"⚠️ yf.download批量获取失败，改为逐只获取: {e}")
+                continue
+            frames.update(split_download(data, batch))
+        return frames
+
+    def _download_tushare(self, symbols: List[str], history: PointInTimeHistory,
+                          task: WarmTask) -> Dict[str, pd.DataFrame]:
+        """主数据源为Tushare时按交易日批量获取；其他数据源没有批量接口"""
+        from .data_source_manager import ChinaDataSource, get_data_source_manager
+        if get_data_source_manager().current_source != ChinaDataSource.TUSHARE:
+            return {}
+
+        from .tushare_adapter import get_tushare_adapter
+        calendar = get_trading_calendar("china")
+        trade_dates = completed_trading_days(calendar, date.fromisoformat(history.load_start),
+                                             date.fromisoformat(history.end_date))
+        return get_tushare_adapter().get_stock_data_by_trade_dates(
+            symbols, [day.strftime("%Y%m%d") for day in trade_dates], throttle=self._throttle(task))
+
+    # ---- A股基本信息和财务报表 ----
+
+    def _warm_china_info(self, symbols: List[str]) -> WarmTask:
+        """一次获取Tushare股票列表（缓存24小时），get_stock_info 从中查找"""
+        task = WarmTask("security_info")
+        from .tushare_utils import get_tushare_provider
+        provider = get_tushare_provider()
+        if not provider.connected:
+            task.note = "Tushare未连接，跳过"
+            return task
+
+        self._throttle(task)()
+        provider.get_stock_list()
+        for symbol in symbols:
+            # 股票列表已加载，这里不再逐只调用接口
+            info = provider.get_stock_info(symbol)
+            (task.warmed if info.get('name') and info['name'] != f'股票{symbol}' else task.failed).append(symbol)
+        return task
+
+    def _warm_china_financials(self, symbols: List[str]) -> WarmTask:
+        """获取最新报告期的财务报表（与基本面报告相同，优先AKShare），再生成基本面报告"""
+        task = WarmTask("financials")
+        from .akshare_utils import get_akshare_provider
+        from .optimized_china_data import get_optimized_china_data_provider
+        from .tushare_utils import get_tushare_provider
+
+        akshare = get_akshare_provider()
+        tushare = get_tushare_provider()
+        for symbol in symbols:
+            self._throttle(task)()
+            try:
+                statements = akshare.get_financial_data(symbol) if akshare.connected else {}
+                if not _has_statements(statements) and tushare.connected:
+                    statements = tushare.get_financial_data(symbol)
+                if not _has_statements(statements):
+                    task.failed.append(symbol)
+                    continue
+                report = get_optimized_china_data_provider().get_fundamentals_data(symbol, force_refresh=True)
+                (task.warmed if report and "❌" not in report else task.failed).append(symbol)
+            except Exception as e:
+                logger.warning(f"⚠️ 预热{symbol}财务数据失败: {e}")
+                task.failed.append(symbol)
+        return task
+
+    # ---- 后台服务 ----
+
+    def run_forever(self, lead_minutes: Optional[int] = None,
+                    on_report: Optional[Callable[[WarmReport], None]] = None):
+        """每个交易日开盘前 lead_minutes 分钟预热各市场，直到调用 stop()"""
+        lead = timedelta(minutes=warm_lead_minutes() if lead_minutes is None else lead_minutes)
+        warmed_sessions: Dict[str, datetime] = {}
+        logger.info(f"🔥 缓存预热服务启动: 市场{self.markets}, 开盘前{lead.total_seconds() / 60:.0f}分钟预热")
+
+        while not self._stop.is_set():
+            now = datetime.now(timezone.utc)
+            wake_at = now + timedelta(hours=1)
+            for market in self.markets:
+                open_at = get_trading_calendar(market).next_session_open(now)
+                if warmed_sessions.get(market) == open_at:
+                    # 本交易日已预热，开盘后再计算下一个交易日
+                    wake_at = min(wake_at, open_at)
+                    continue
+                if now >= open_at - lead:
+                    report = self.warm_market(market, open_at.date())
+                    warmed_sessions[market] = open_at
+                    if on_report:
+                        on_report(report)
+                    wake_at = min(wake_at, open_at)
+                else:
+                    wake_at = min(wake_at, open_at - lead)
+            self._stop.wait(max(1.0, (wake_at - datetime.now(timezone.utc)).total_seconds()))
+        logger.info("🔥 缓存预热服务已停止")
+
+    def start(self, lead_minutes: Optional[int] = None,
+              on_report: Optional[Callable[[WarmReport], None]] = None) -> threading.Thread:
+        """在后台线程中运行预热服务"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, args=(lead_minutes, on_report),
+                                            name="cache-warmer", daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+
+def _has_statements(statements) -> bool:
+    return bool(statements) and any(not value.empty if hasattr(value, 'empty') else bool(value)
+                                    for value in statements.values())
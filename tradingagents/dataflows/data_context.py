@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+单次分析的数据上下文
+
+一次分析中，股票验证阶段（StockDataPreparer）和各分析师的工具会多次请求相同的数据
+（股票信息、同一区间的历史行情等）。AnalysisDataContext 在验证阶段创建，经由
+TradingAgentsGraph 传递给工具调用，在分析生命周期内记住每个数据接口的返回结果，
+保证每个 (股票, 数据集, 区间) 在一次分析中最多获取一次。
+
+上下文通过 contextvars 激活，LangGraph 节点线程和工具线程池都会继承当前上下文，
+不同会话的并发分析互不干扰。
+
+回测时上下文带有模拟交易日期（as_of）和整个回测共享的历史数据（见 point_in_time），
+数据接口的日期参数不会超过as_of，行情从预加载的完整历史中切片。
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+_current_data_context: contextvars.ContextVar = contextvars.ContextVar(
+    "tradingagents_data_context", default=None
+)
+
+
+def _is_cacheable(result: Any) -> bool:
+    """失败结果不记入上下文，后续调用可以重试"""
+    if result is None:
+        return False
+    if isinstance(result, str):
+        return bool(result) and "❌" not in result[:200]
+    return True
+
+
+class _Entry:
+    """一个数据集结果，带完成事件用于合并并发请求"""
+
+    __slots__ = ("event", "value", "ok")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class AnalysisDataContext:
+    """单次分析的数据记忆表"""
+
+    def __init__(self, analysis_id: str = None, as_of: Optional[str] = None, history=None):
+        """
+        Args:
+            analysis_id: 分析ID
+            as_of: 回测的模拟交易日期（YYYY-MM-DD），数据接口不会取到该日期之后的数据
+            history: 回测共享的PointInTimeHistory，行情和静态数据在多个日期间复用
+        """
+        self.analysis_id = analysis_id or f"ctx_{int(time.time() * 1000)}"
+        self.as_of = as_of
+        self.history = history
+        self.created_at = time.time()
+        self._entries: Dict[Tuple, _Entry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(dataset: str, args: tuple, kwargs: dict) -> Tuple:
+        """生成 (数据集, 参数) 形式的记忆键"""
+        def normalize(value: Any) -> Hashable:
+            if isinstance(value, str):
+                return value.strip()
+            if isinstance(value, (list, tuple)):
+                return tuple(normalize(v) for v in value)
+            if isinstance(value, dict):
+                return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+            try:
+                hash(value)
+                return value
+            except TypeError:
+                return repr(value)
+
+        return (dataset, normalize(args), normalize(kwargs))
+
+    def get_or_fetch(self, dataset: str, fetcher: Callable, *args, **kwargs) -> Any:
+        """
+        返回记忆的结果，不存在时调用fetcher获取
+
+        同一个键的并发请求只会触发一次获取，其余请求等待其结果。
+        """
+        if self.history is not None and self.history.is_static(dataset):
+            # 与日期无关的数据（股票基本信息等）在整个回测中只获取一次
+            return self.history.get_static(dataset, fetcher, *args, **kwargs)
+
+        key = self.make_key(dataset, args, kwargs)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = _Entry()
+                self._entries[key] = entry
+
+        if not owner:
+            entry.event.wait()
+            if entry.ok:
+                with self._lock:
+                    self.hits += 1
+                logger.debug(f"♻️ [数据上下文] 复用 {dataset}{args}")
+                return entry.value
+            # 前一次获取失败，直接重新获取（不记忆）
+            return fetcher(*args, **kwargs)
+
+        with self._lock:
+            self.misses += 1
+        try:
+            value = fetcher(*args, **kwargs)
+            entry.value = value
+            entry.ok = _is_cacheable(value)
+            return value
+        finally:
+            if not entry.ok:
+                with self._lock:
+                    self._entries.pop(key, None)
+            entry.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取命中统计"""
+        with self._lock:
+            return {
+                "analysis_id": self.analysis_id,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self):
+        """清空记忆的数据"""
+        with self._lock:
+            self._entries.clear()
+
+    @contextmanager
+    def activate(self):
+        """在当前执行上下文中激活该数据上下文"""
+        token = _current_data_context.set(self)
+        try:
+            yield self
+        finally:
+            _current_data_context.reset(token)
+
+    def iterate(self, iterable):
+        """在激活该数据上下文的情况下逐项迭代（用于graph.stream等惰性生成器）"""
+        with self.activate():
+            yield from iterable
+
+
+def get_current_data_context() -> Optional[AnalysisDataContext]:
+    """获取当前激活的数据上下文，没有时返回None"""
+    return _current_data_context.get()
+
+
+# 按时间点截断的日期参数名
+_POINT_IN_TIME_PARAMS = ("start_date", "end_date", "curr_date", "trade_date")
+
+
+def clamp_date(value: Any, as_of: Optional[str]) -> Any:
+    """把晚于as_of的YYYY-MM-DD日期截断为as_of，其他值原样返回"""
+    if not as_of or not isinstance(value, str) or len(value) < 10:
+        return value
+    return as_of if value[:10] > as_of else value
+
+
+def _clamp_arguments(signature: Optional[inspect.Signature], as_of: str, args: tuple, kwargs: dict):
+    """截断调用参数中晚于模拟交易日期的日期，避免回测看到未来数据"""
+    if signature is None:
+        return args, kwargs
+    try:
+        bound = signature.bind_partial(*args, **kwargs)
+    except TypeError:
+        return args, kwargs
+    changed = False
+    for name in _POINT_IN_TIME_PARAMS:
+        if name in bound.arguments:
+            clamped = clamp_date(bound.arguments[name], as_of)
+            if clamped != bound.arguments[name]:
+                logger.debug(f"⏱️ [数据上下文] {name}={bound.arguments[name]} 晚于回测日期，截断为 {as_of}")
+                bound.arguments[name] = clamped
+                changed = True
+    if not changed:
+        return args, kwargs
+    return bound.args, bound.kwargs
+
+
+def analysis_memoized(dataset: str):
+    """
+    数据接口装饰器：存在激活的数据上下文时，在本次分析内记住返回结果
+
+    Args:
+        dataset: 数据集名称，作为记忆键的一部分
+    """
+    def decorator(func: Callable) -> Callable:
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            signature = None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            context = _current_data_context.get()
+            if context is None:
+                return func(*args, **kwargs)
+            if context.as_of:
+                args, kwargs = _clamp_arguments(signature, context.as_of, args, kwargs)
+            return context.get_or_fetch(dataset, func, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -5,11 +5,17 @@
 """
 
 import os
+import threading
 import time
+from functools import partial
 from typing import Dict, List, Optional, Any
 from enum import Enum
 import warnings
-import pandas as pd
+
+from .data_types import FetchStatus, StockDataResult
+from .hedged_request import HedgeBudget, hedged_call, hedging_enabled
+from .point_in_time import history_frame
+from .source_health import SourceHealthRegistry
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -20,6 +26,9 @@ warnings.filterwarnings('ignore')
 from tradingagents.utils.logging_init import setup_dataflow_logging
 logger = setup_dataflow_logging()
 
+# 对冲请求时多个线程共享同一个空数据源列表
+_EMPTY_SOURCES_LOCK = threading.Lock()
+
 
 class ChinaDataSource(Enum):
     """中国股票数据源枚举"""
@@ -35,11 +44,24 @@ class ChinaDataSource(Enum):
 class DataSourceManager:
     """数据源管理器"""
 
+    # 备用数据源优先级: AKShare > Tushare > BaoStock > TDX
+    FALLBACK_ORDER = [
+        ChinaDataSource.AKSHARE,
+        ChinaDataSource.TUSHARE,
+        ChinaDataSource.BAOSTOCK,
+        ChinaDataSource.TDX
+    ]
+
     def __init__(self):
         """初始化数据源管理器"""
         self.default_source = self._get_default_source()
         self.available_sources = self._check_available_sources()
         self.current_source = self.default_source
+        # 各数据源的熔断器和健康度
+        self.health = SourceHealthRegistry()
+        # 对冲请求：主数据源超过P90耗时未返回时同时请求下一个健康的数据源
+        self.hedging = hedging_enabled()
+        self.hedge_budget = HedgeBudget(float(os.getenv('TRADINGAGENTS_HEDGE_BUDGET_RATIO', '0.1')))
 
         logger.info(f"📊 数据源管理器初始化完成")
         logger.info(f"   默认数据源: {self.default_source.value}")
@@ -79,8 +101,7 @@ class DataSourceManager:
         self.current_source = ChinaDataSource.TUSHARE
 
         try:
-            result = self._get_tushare_data(symbol, start_date, end_date)
-            return result
+            return self._get_tushare_data(symbol, start_date, end_date).to_text()
         finally:
             # 恢复原始数据源
             self.current_source = original_source
@@ -306,6 +327,20 @@ class DataSourceManager:
         Returns:
             str: 格式化的股票数据
         """
+        return self.get_stock_data_result(symbol, start_date, end_date).to_text()
+
+    def get_stock_data_result(self, symbol: str, start_date: str = None, end_date: str = None) -> StockDataResult:
+        """
+        获取股票数据（结构化结果），当前数据源失败时按优先级降级
+
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            StockDataResult: 行情表、最新行情摘要和获取状态
+        """
         # 记录详细的输入参数
         logger.info(f"📊 [数据获取] 开始获取股票数据",
                    extra={
@@ -318,153 +353,208 @@ class DataSourceManager:
 
         # 添加详细的股票代码追踪日志
         logger.info(f"🔍 [股票代码追踪] DataSourceManager.get_stock_data 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
         logger.info(f"🔍 [股票代码追踪] 当前数据源: {self.current_source.value}")
 
         start_time = time.time()
 
-        try:
-            # 根据数据源调用相应的获取方法
-            if self.current_source == ChinaDataSource.TUSHARE:
-                logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}'")
-                result = self._get_tushare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.AKSHARE:
-                result = self._get_akshare_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.BAOSTOCK:
-                result = self._get_baostock_data(symbol, start_date, end_date)
-            elif self.current_source == ChinaDataSource.TDX:
-                result = self._get_tdx_data(symbol, start_date, end_date)
-            else:
-                result = f"❌ 不支持的数据源: {self.current_source.value}"
+        # 主数据源和备用数据源按健康度排序，熔断中的数据源排在最后
+        sources = self._ordered_sources()
+        primary = sources[0]
+        if primary != self.current_source:
+            logger.info(f"🔀 [数据获取] {self.current_source.value}健康度较低，优先使用{primary.value}")
 
-            # 记录详细的输出结果
-            duration = time.time() - start_time
-            result_length = len(result) if result else 0
-            is_success = result and "❌" not in result and "错误" not in result
-
-            if is_success:
-                logger.info(f"✅ [数据获取] 成功获取股票数据",
-                           extra={
-                               'symbol': symbol,
-                               'start_date': start_date,
-                               'end_date': end_date,
-                               'data_source': self.current_source.value,
-                               'duration': duration,
-                               'result_length': result_length,
-                               'result_preview': result[:200] + '...' if result_length > 200 else result,
-                               'event_type': 'data_fetch_success'
-                           })
-                return result
-            else:
-                logger.warning(f"⚠️ [数据获取] 数据质量异常，尝试降级到其他数据源",
-                              extra={
-                                  'symbol': symbol,
-                                  'start_date': start_date,
-                                  'end_date': end_date,
-                                  'data_source': self.current_source.value,
-                                  'duration': duration,
-                                  'result_length': result_length,
-                                  'result_preview': result[:200] + '...' if result_length > 200 else result,
-                                  'event_type': 'data_fetch_warning'
-                              })
-
-                # 数据质量异常时也尝试降级到其他数据源
-                fallback_result = self._try_fallback_sources(symbol, start_date, end_date)
-                if fallback_result and "❌" not in fallback_result and "错误" not in fallback_result:
-                    logger.info(f"✅ [数据获取] 降级成功获取数据")
-                    return fallback_result
-                else:
-                    logger.error(f"❌ [数据获取] 所有数据源都无法获取有效数据")
-                    return result  # 返回原始结果（包含错误信息）
+        empty_sources = []
+        if self.hedging and len(sources) > 1:
+            result, attempted = self._fetch_hedged(sources, symbol, start_date, end_date, empty_sources)
+        else:
+            result = self._fetch_with_health(primary, symbol, start_date, end_date, empty_sources)
+            attempted = [primary]
+        if result is None:
+            result = StockDataResult.failure(symbol, start_date, end_date, primary.value,
+                                             f"❌ 数据源{primary.value}处于熔断状态")
+
+        # 记录详细的输出结果
+        duration = time.time() - start_time
+        rows = len(result.frame) if result.frame is not None else 0
+
+        if result.ok:
+            logger.info(f"✅ [数据获取] 成功获取股票数据",
+                       extra={
+                           'symbol': symbol,
+                           'start_date': start_date,
+                           'end_date': end_date,
+                           'data_source': result.source,
+                           'duration': duration,
+                           'rows': rows,
+                           'event_type': 'data_fetch_success'
+                       })
+            return result
+
+        logger.warning(f"⚠️ [数据获取] 数据质量异常，尝试降级到其他数据源",
+                      extra={
+                          'symbol': symbol,
+                          'start_date': start_date,
+                          'end_date': end_date,
+                          'data_source': primary.value,
+                          'duration': duration,
+                          'status': result.status.value,
+                          'result_preview': result.message,
+                          'event_type': 'data_fetch_warning'
+                      })
+
+        # 数据质量异常时也尝试降级到其他数据源
+        remaining = [s for s in sources if s not in attempted]
+        fallback_result = self._try_fallback_sources(symbol, start_date, end_date, remaining, empty_sources)
+        if fallback_result.ok:
+            logger.info(f"✅ [数据获取] 降级成功获取数据")
+            return fallback_result
+
+        logger.error(f"❌ [数据获取] 所有数据源都无法获取有效数据")
+        if result.status == FetchStatus.ERROR and empty_sources:
+            # 有数据源正常返回了空数据，说明该股票在这个区间本身没有数据
+            return StockDataResult.from_frame(symbol, start_date, end_date, empty_sources[0][0].value, None)
+        return result  # 返回原始结果（包含错误信息）
+
+    def get_stock_data_result_from(self, source: ChinaDataSource, symbol: str, start_date: str,
+                                   end_date: str) -> StockDataResult:
+        """
+        只从指定数据源获取（不按健康度调整顺序，也不降级），
+        用于已知数据在哪个数据源的场景，例如缓存预热时行情已批量预加载
 
+        Returns:
+            StockDataResult；数据源处于熔断状态时返回失败结果
+        """
+        result = self._fetch_with_health(source, symbol, start_date, end_date, [])
+        if result is None:
+            return StockDataResult.failure(symbol, start_date, end_date, source.value,
+                                           f"❌ 数据源{source.value}处于熔断状态")
+        return result
+
+    def _ordered_sources(self) -> List[ChinaDataSource]:
+        """当前数据源在前、其余按备用优先级，再按熔断状态和健康分重新排序"""
+        preferred = [self.current_source] + [s for s in self.FALLBACK_ORDER
+                                             if s != self.current_source and s in self.available_sources]
+        return self.health.order(preferred)
+
+    def _fetch_hedged(self, sources: List[ChinaDataSource], symbol: str, start_date: str, end_date: str,
+                      empty_sources: list):
+        """
+        对冲请求：主数据源超过其P90耗时还没有返回时，同时请求下一个健康的数据源，取先返回的有效结果
+
+        Returns:
+            (StockDataResult, 已请求的数据源列表)；都没有有效结果时返回主数据源的结果
+        """
+        primary = sources[0]
+        candidates = [primary] + [s for s in sources[1:] if self.health.is_available(s)]
+        hedge_delay = self.health.latency_percentile(primary, 0.9)
+        calls = [(source, partial(self._fetch_with_health, source, symbol, start_date, end_date, empty_sources))
+                 for source in candidates]
+        outcome = hedged_call(calls, hedge_delay, lambda result: result is not None and result.ok,
+                              self.hedge_budget)
+        if outcome.winner is not None and outcome.winner != primary:
+            logger.info(f"🏁 [数据获取] 对冲请求{outcome.winner.value}先于{primary.value}返回数据")
+        return outcome.result, outcome.attempted
+
+    def _fetch_with_health(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str,
+                           empty_sources: list) -> Optional[StockDataResult]:
+        """
+        调用数据源并记录耗时和成败
+
+        返回空数据的数据源先不计入失败（可能是股票本身没有数据），记录到 empty_sources，
+        之后有其他数据源返回数据时再计为失败。
+
+        Returns:
+            StockDataResult；数据源处于熔断状态时返回None
+        """
+        if not self.health.allow_request(source):
+            logger.info(f"⏭️ 数据源{source.value}处于熔断状态，跳过")
+            return None
+
+        start_time = time.time()
+        try:
+            result = self._fetch_from_source(source, symbol, start_date, end_date)
         except Exception as e:
             duration = time.time() - start_time
-            logger.error(f"❌ [数据获取] 异常失败: {e}",
+            logger.error(f"❌ [数据获取] {source.value}异常失败: {e}",
                         extra={
                             'symbol': symbol,
                             'start_date': start_date,
                             'end_date': end_date,
-                            'data_source': self.current_source.value,
+                            'data_source': source.value,
                             'duration': duration,
                             'error': str(e),
                             'event_type': 'data_fetch_exception'
                         }, exc_info=True)
-            return self._try_fallback_sources(symbol, start_date, end_date)
+            self.health.record_failure(source, duration)
+            return StockDataResult.failure(symbol, start_date, end_date, source.value,
+                                           f"❌ {source.value}获取{symbol}数据失败: {e}")
+
+        duration = time.time() - start_time
+        if result.ok:
+            self.health.record_success(source, duration)
+            # 其他数据源能返回数据，之前返回空数据的数据源计为失败
+            with _EMPTY_SOURCES_LOCK:
+                previously_empty = list(empty_sources)
+                empty_sources.clear()
+            for empty_source, empty_duration in previously_empty:
+                self.health.record_failure(empty_source, empty_duration)
+        elif result.status == FetchStatus.EMPTY:
+            self.health.release(source)
+            with _EMPTY_SOURCES_LOCK:
+                empty_sources.append((source, duration))
+        else:
+            self.health.record_failure(source, duration)
+        return result
+
+    def get_source_health(self) -> Dict[str, Dict[str, Any]]:
+        """各数据源的熔断状态、健康分、错误率和延迟"""
+        return self.health.snapshot()
+
+    def _fetch_from_source(self, source: ChinaDataSource, symbol: str, start_date: str, end_date: str) -> StockDataResult:
+        """调用指定数据源的获取方法"""
+        if source == ChinaDataSource.TUSHARE:
+            logger.info(f"🔍 [股票代码追踪] 调用 Tushare 数据源，传入参数: symbol='{symbol}'")
+            return self._get_tushare_data(symbol, start_date, end_date)
+        elif source == ChinaDataSource.AKSHARE:
+            return self._get_akshare_data(symbol, start_date, end_date)
+        elif source == ChinaDataSource.BAOSTOCK:
+            return self._get_baostock_data(symbol, start_date, end_date)
+        elif source == ChinaDataSource.TDX:
+            return self._get_tdx_data(symbol, start_date, end_date)
+        return StockDataResult.failure(symbol, start_date, end_date, source.value,
+                                       f"❌ 不支持的数据源: {source.value}")
     
-    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> str:
+    def _get_tushare_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
         """使用Tushare获取数据 - 直接调用适配器，避免循环调用"""
         logger.debug(f"📊 [Tushare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
-
-        # 添加详细的股票代码追踪日志
         logger.info(f"🔍 [股票代码追踪] _get_tushare_data 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
-        logger.info(f"🔍 [DataSourceManager详细日志] _get_tushare_data 开始执行")
-        logger.info(f"🔍 [DataSourceManager详细日志] 当前数据源: {self.current_source.value}")
 
         start_time = time.time()
         try:
             # 直接调用适配器，避免循环调用interface
             from .tushare_adapter import get_tushare_adapter
-            logger.info(f"🔍 [股票代码追踪] 调用 tushare_adapter，传入参数: symbol='{symbol}'")
-            logger.info(f"🔍 [DataSourceManager详细日志] 开始调用tushare_adapter...")
 
             adapter = get_tushare_adapter()
-            data = adapter.get_stock_data(symbol, start_date, end_date)
+            data = history_frame("tushare_daily", symbol, start_date, end_date, adapter.get_stock_data)
 
+            stock_name = None
             if data is not None and not data.empty:
                 # 获取股票基本信息
                 stock_info = adapter.get_stock_info(symbol)
-                stock_name = stock_info.get('name', f'股票{symbol}') if stock_info else f'股票{symbol}'
-
-                # 计算最新价格和涨跌幅
-                latest_data = data.iloc[-1]
-                latest_price = latest_data.get('close', 0)
-                prev_close = data.iloc[-2].get('close', latest_price) if len(data) > 1 else latest_price
-                change = latest_price - prev_close
-                change_pct = (change / prev_close * 100) if prev_close != 0 else 0
-
-                # 格式化数据报告
-                result = f"📊 {stock_name}({symbol}) - Tushare数据\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-
-                result += f"💰 最新价格: ¥{latest_price:.2f}\n"
-                result += f"📈 涨跌额: {change:+.2f} ({change_pct:+.2f}%)\n\n"
-
-                # 添加统计信息
-                result += f"📊 价格统计:\n"
-                result += f"   最高价: ¥{data['high'].max():.2f}\n"
-                result += f"   最低价: ¥{data['low'].min():.2f}\n"
-                result += f"   平均价: ¥{data['close'].mean():.2f}\n"
-                # 防御性获取成交量数据
-                volume_value = self._get_volume_safely(data)
-                result += f"   成交量: {volume_value:,.0f}股\n"
+                stock_name = stock_info.get('name') if stock_info else None
 
-                return result
-            else:
-                result = f"❌ 未获取到{symbol}的有效数据"
+            result = StockDataResult.from_frame(symbol, start_date, end_date, ChinaDataSource.TUSHARE.value, data,
+                                                name=stock_name, empty_message=f"❌ 未获取到{symbol}的有效数据")
 
             duration = time.time() - start_time
-            logger.info(f"🔍 [DataSourceManager详细日志] interface调用完成，耗时: {duration:.3f}秒")
-            logger.info(f"🔍 [股票代码追踪] get_china_stock_data_tushare 返回结果前200字符: {result[:200] if result else 'None'}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果类型: {type(result)}")
-            logger.info(f"🔍 [DataSourceManager详细日志] 返回结果长度: {len(result) if result else 0}")
-
-            logger.debug(f"📊 [Tushare] 调用完成: 耗时={duration:.2f}s, 结果长度={len(result) if result else 0}")
-
+            logger.debug(f"📊 [Tushare] 调用完成: 耗时={duration:.2f}s, 状态={result.status.value}")
             return result
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ [Tushare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            logger.error(f"❌ [DataSourceManager详细日志] 异常类型: {type(e).__name__}")
-            logger.error(f"❌ [DataSourceManager详细日志] 异常信息: {str(e)}")
-            import traceback
-            logger.error(f"❌ [DataSourceManager详细日志] 异常堆栈: {traceback.format_exc()}")
             raise
     
-    def _get_akshare_data(self, symbol: str, start_date: str, end_date: str) -> str:
+    def _get_akshare_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
         """使用AKShare获取数据"""
         logger.debug(f"📊 [AKShare] 调用参数: symbol={symbol}, start_date={start_date}, end_date={end_date}")
 
@@ -473,145 +563,64 @@ class DataSourceManager:
             # 这里需要实现AKShare的统一接口
             from .akshare_utils import get_akshare_provider
             provider = get_akshare_provider()
-            data = provider.get_stock_data(symbol, start_date, end_date)
+            data = history_frame("akshare_daily", symbol, start_date, end_date, provider.get_stock_data)
 
             duration = time.time() - start_time
-
-            if data is not None and not data.empty:
-                result = f"股票代码: {symbol}\n"
-                result += f"数据期间: {start_date} 至 {end_date}\n"
-                result += f"数据条数: {len(data)}条\n\n"
-
-                # 显示最新3天数据，确保在各种显示环境下都能完整显示
-                display_rows = min(3, len(data))
-                result += f"最新{display_rows}天数据:\n"
-
-                # 使用pandas选项确保显示完整数据
-                with pd.option_context('display.max_rows', None,
-                                     'display.max_columns', None,
-                                     'display.width', None,
-                                     'display.max_colwidth', None):
-                    result += data.tail(display_rows).to_string(index=False)
-
-                # 如果数据超过3天，也显示一些统计信息
-                if len(data) > 3:
-                    latest_price = data.iloc[-1]['收盘'] if '收盘' in data.columns else data.iloc[-1].get('close', 'N/A')
-                    first_price = data.iloc[0]['收盘'] if '收盘' in data.columns else data.iloc[0].get('close', 'N/A')
-                    if latest_price != 'N/A' and first_price != 'N/A':
-                        try:
-                            change = float(latest_price) - float(first_price)
-                            change_pct = (change / float(first_price)) * 100
-                            result += f"\n\n📊 期间统计:\n"
-                            result += f"期间涨跌: {change:+.2f} ({change_pct:+.2f}%)\n"
-                            result += f"最高价: {data['最高'].max() if '最高' in data.columns else data.get('high', pd.Series()).max():.2f}\n"
-                            result += f"最低价: {data['最低'].min() if '最低' in data.columns else data.get('low', pd.Series()).min():.2f}"
-                        except (ValueError, TypeError):
-                            pass
-
-                logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(data)}, 结果长度={len(result)}")
-                return result
+            result = StockDataResult.from_frame(symbol, start_date, end_date, ChinaDataSource.AKSHARE.value, data)
+            if result.ok:
+                logger.debug(f"📊 [AKShare] 调用成功: 耗时={duration:.2f}s, 数据条数={len(data)}")
             else:
-                result = f"❌ 未能获取{symbol}的股票数据"
                 logger.warning(f"⚠️ [AKShare] 数据为空: 耗时={duration:.2f}s")
-                return result
+            return result
 
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ [AKShare] 调用失败: {e}, 耗时={duration:.2f}s", exc_info=True)
-            return f"❌ AKShare获取{symbol}数据失败: {e}"
+            return StockDataResult.failure(symbol, start_date, end_date, ChinaDataSource.AKSHARE.value,
+                                           f"❌ AKShare获取{symbol}数据失败: {e}")
     
-    def _get_baostock_data(self, symbol: str, start_date: str, end_date: str) -> str:
+    def _get_baostock_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
         """使用BaoStock获取数据"""
         # 这里需要实现BaoStock的统一接口
         from .baostock_utils import get_baostock_provider
         provider = get_baostock_provider()
-        data = provider.get_stock_data(symbol, start_date, end_date)
-        
-        if data is not None and not data.empty:
-            result = f"股票代码: {symbol}\n"
-            result += f"数据期间: {start_date} 至 {end_date}\n"
-            result += f"数据条数: {len(data)}条\n\n"
-
-            # 显示最新3天数据，确保在各种显示环境下都能完整显示
-            display_rows = min(3, len(data))
-            result += f"最新{display_rows}天数据:\n"
-
-            # 使用pandas选项确保显示完整数据
-            with pd.option_context('display.max_rows', None,
-                                 'display.max_columns', None,
-                                 'display.width', None,
-                                 'display.max_colwidth', None):
-                result += data.tail(display_rows).to_string(index=False)
-            return result
-        else:
-            return f"❌ 未能获取{symbol}的股票数据"
+        data = history_frame("baostock_daily", symbol, start_date, end_date, provider.get_stock_data)
+        return StockDataResult.from_frame(symbol, start_date, end_date, ChinaDataSource.BAOSTOCK.value, data)
     
-    def _get_tdx_data(self, symbol: str, start_date: str, end_date: str) -> str:
-        """使用TDX获取数据 (已弃用)"""
+    def _get_tdx_data(self, symbol: str, start_date: str, end_date: str) -> StockDataResult:
+        """使用TDX获取数据 (已弃用，只返回文本)"""
         logger.warning(f"⚠️ 警告: 正在使用已弃用的TDX数据源")
         from .tdx_utils import get_china_stock_data
-        return get_china_stock_data(symbol, start_date, end_date)
+        text = get_china_stock_data(symbol, start_date, end_date)
+        return StockDataResult.from_text(symbol, start_date, end_date, ChinaDataSource.TDX.value, text)
     
-    def _get_volume_safely(self, data) -> float:
-        """安全地获取成交量数据，支持多种列名"""
-        try:
-            # 支持多种可能的成交量列名
-            volume_columns = ['volume', 'vol', 'turnover', 'trade_volume']
-
-            for col in volume_columns:
-                if col in data.columns:
-                    logger.info(f"✅ 找到成交量列: {col}")
-                    return data[col].sum()
-
-            # 如果都没找到，记录警告并返回0
-            logger.warning(f"⚠️ 未找到成交量列，可用列: {list(data.columns)}")
-            return 0
-
-        except Exception as e:
-            logger.error(f"❌ 获取成交量失败: {e}")
-            return 0
-
-    def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str) -> str:
-        """尝试备用数据源 - 避免递归调用"""
+    def _try_fallback_sources(self, symbol: str, start_date: str, end_date: str,
+                              sources: Optional[List[ChinaDataSource]] = None,
+                              empty_sources: Optional[list] = None) -> StockDataResult:
+        """尝试备用数据源 - 避免递归调用，按健康度顺序并跳过熔断中的数据源"""
         logger.error(f"🔄 {self.current_source.value}失败，尝试备用数据源...")
 
-        # 备用数据源优先级: AKShare > Tushare > BaoStock > TDX
-        fallback_order = [
-            ChinaDataSource.AKSHARE,
-            ChinaDataSource.TUSHARE,
-            ChinaDataSource.BAOSTOCK,
-            ChinaDataSource.TDX
-        ]
-
-        for source in fallback_order:
-            if source != self.current_source and source in self.available_sources:
-                try:
-                    logger.info(f"🔄 尝试备用数据源: {source.value}")
-
-                    # 直接调用具体的数据源方法，避免递归
-                    if source == ChinaDataSource.TUSHARE:
-                        result = self._get_tushare_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.AKSHARE:
-                        result = self._get_akshare_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.BAOSTOCK:
-                        result = self._get_baostock_data(symbol, start_date, end_date)
-                    elif source == ChinaDataSource.TDX:
-                        result = self._get_tdx_data(symbol, start_date, end_date)
-                    else:
-                        logger.warning(f"⚠️ 未知数据源: {source.value}")
-                        continue
+        if sources is None:
+            sources = [s for s in self._ordered_sources() if s != self.current_source]
+        if empty_sources is None:
+            empty_sources = []
 
-                    if "❌" not in result:
-                        logger.info(f"✅ 备用数据源{source.value}获取成功")
-                        return result
-                    else:
-                        logger.warning(f"⚠️ 备用数据源{source.value}返回错误结果")
+        for source in sources:
+            logger.info(f"🔄 尝试备用数据源: {source.value}")
+
+            # 直接调用具体的数据源方法，避免递归
+            result = self._fetch_with_health(source, symbol, start_date, end_date, empty_sources)
+            if result is None:
+                continue
 
-                except Exception as e:
-                    logger.error(f"❌ 备用数据源{source.value}也失败: {e}")
-                    continue
+            if result.ok:
+                logger.info(f"✅ 备用数据源{source.value}获取成功")
+                return result
+            else:
+                logger.warning(f"⚠️ 备用数据源{source.value}返回错误结果")
         
-        return f"❌ 所有数据源都无法获取{symbol}的数据"
+        return StockDataResult.failure(symbol, start_date, end_date, "fallback",
+                                       f"❌ 所有数据源都无法获取{symbol}的数据")
     
     def get_stock_info(self, symbol: str) -> Dict:
         """获取股票基本信息，支持降级机制"""
@@ -620,9 +629,9 @@ class DataSourceManager:
         # 首先尝试当前数据源
         try:
             if self.current_source == ChinaDataSource.TUSHARE:
-                from .interface import get_china_stock_info_tushare
-                info_str = get_china_stock_info_tushare(symbol)
-                result = self._parse_stock_info_string(info_str, symbol)
+                # 直接使用适配器返回的结构化信息，不经过文本格式化和解析
+                from .tushare_adapter import get_tushare_adapter
+                result = get_tushare_adapter().get_stock_info(symbol) or {}
 
                 # 检查是否获取到有效信息
                 if result.get('name') and result['name'] != f'股票{symbol}':
@@ -668,9 +677,8 @@ class DataSourceManager:
 
                 # 根据数据源类型获取股票信息
                 if source == ChinaDataSource.TUSHARE:
-                    from .interface import get_china_stock_info_tushare
-                    info_str = get_china_stock_info_tushare(symbol)
-                    result = self._parse_stock_info_string(info_str, symbol)
+                    from .tushare_adapter import get_tushare_adapter
+                    result = get_tushare_adapter().get_stock_info(symbol) or {}
                 elif source == ChinaDataSource.AKSHARE:
                     result = self._get_akshare_stock_info(symbol)
                 elif source == ChinaDataSource.BAOSTOCK:
@@ -785,35 +793,6 @@ class DataSourceManager:
             logger.error(f"❌ [股票信息] BaoStock获取失败: {e}")
             return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'baostock', 'error': str(e)}
 
-    def _parse_stock_info_string(self, info_str: str, symbol: str) -> Dict:
-        """解析股票信息字符串为字典"""
-        try:
-            info = {'symbol': symbol, 'source': self.current_source.value}
-            lines = info_str.split('\n')
-            
-            for line in lines:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    key = key.strip()
-                    value = value.strip()
-                    
-                    if '股票名称' in key:
-                        info['name'] = value
-                    elif '所属行业' in key:
-                        info['industry'] = value
-                    elif '所属地区' in key:
-                        info['area'] = value
-                    elif '上市市场' in key:
-                        info['market'] = value
-                    elif '上市日期' in key:
-                        info['list_date'] = value
-            
-            return info
-            
-        except Exception as e:
-            logger.error(f"⚠️ 解析股票信息失败: {e}")
-            return {'symbol': symbol, 'name': f'股票{symbol}', 'source': self.current_source.value}
-
 
 # 全局数据源管理器实例
 _data_source_manager = None
@@ -847,20 +826,26 @@ def get_china_stock_data_unified(symbol: str, start_date: str, end_date: str) ->
     logger.info(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
     logger.info(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
 
-    manager = get_data_source_manager()
-    logger.info(f"🔍 [股票代码追踪] 调用 manager.get_stock_data，传入参数: symbol='{symbol}', start_date='{start_date}', end_date='{end_date}'")
-    result = manager.get_stock_data(symbol, start_date, end_date)
-    # 分析返回结果的详细信息
-    if result:
-        lines = result.split('\n')
-        data_lines = [line for line in lines if '2025-' in line and symbol in line]
-        logger.info(f"🔍 [股票代码追踪] 返回结果统计: 总行数={len(lines)}, 数据行数={len(data_lines)}, 结果长度={len(result)}字符")
-        logger.info(f"🔍 [股票代码追踪] 返回结果前500字符: {result[:500]}")
-        if len(data_lines) > 0:
-            logger.info(f"🔍 [股票代码追踪] 数据行示例: 第1行='{data_lines[0][:100]}', 最后1行='{data_lines[-1][:100]}'")
-    else:
-        logger.info(f"🔍 [股票代码追踪] 返回结果: None")
-    return result
+    result = get_china_stock_data_result(symbol, start_date, end_date)
+    rows = len(result.frame) if result.frame is not None else 0
+    logger.info(f"🔍 [股票代码追踪] 返回结果: 数据源={result.source}, 状态={result.status.value}, 数据行数={rows}")
+    # 只在工具边界格式化为文本
+    return result.to_text()
+
+
+def get_china_stock_data_result(symbol: str, start_date: str, end_date: str) -> StockDataResult:
+    """
+    统一的中国股票数据获取接口（结构化结果，供数据流内部使用）
+
+    Args:
+        symbol: 股票代码
+        start_date: 开始日期
+        end_date: 结束日期
+
+    Returns:
+        StockDataResult: 行情表、最新行情摘要和获取状态
+    """
+    return get_data_source_manager().get_stock_data_result(symbol, start_date, end_date)
 
 
 def get_china_stock_info_unified(symbol: str) -> Dict:
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+数据流层之间传递的结构化结果
+
+数据源返回行情表、最新行情摘要和状态码，缓存也保存这种结构；
+只有在交给LLM的工具边界才调用 to_text() 格式化为文本，
+下游代码不再从格式化文本中解析价格、名称，也不再通过查找"❌"判断成败。
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+from io import StringIO
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .point_in_time import frame_dates
+
+
+class FetchStatus(Enum):
+    """数据获取状态"""
+    OK = "ok"
+    EMPTY = "empty"    # 数据源正常返回但没有数据
+    ERROR = "error"    # 调用失败
+
+
+# 不同数据源行情表中的列名
+_CLOSE_COLUMNS = ("close", "收盘")
+_HIGH_COLUMNS = ("high", "最高")
+_LOW_COLUMNS = ("low", "最低")
+_VOLUME_COLUMNS = ("volume", "vol", "turnover", "trade_volume", "成交量")
+
+# 文本中表示失败的标记（只用于包装仍然返回文本的旧数据源）
+_ERROR_MARKERS = ("❌",)
+
+
+def _first_column(frame: pd.DataFrame, candidates) -> Optional[str]:
+    return next((c for c in candidates if c in frame.columns), None)
+
+
+@dataclass
+class StockQuote:
+    """区间行情摘要：最新收盘价、较前一交易日的涨跌以及区间统计"""
+    symbol: str
+    name: Optional[str] = None
+    date: Optional[str] = None
+    price: Optional[float] = None
+    prev_close: Optional[float] = None
+    change: Optional[float] = None
+    change_pct: Optional[float] = None
+    period_change: Optional[float] = None
+    period_change_pct: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    average: Optional[float] = None
+    volume: Optional[float] = None
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, symbol: str, name: Optional[str] = None) -> "StockQuote":
+        """从行情表计算摘要（兼容英文列名和AKShare的中文列名）"""
+        quote = cls(symbol=symbol, name=name)
+        if frame is None or frame.empty:
+            return quote
+
+        dates = frame_dates(frame)
+        if dates is not None and pd.notna(dates.iloc[-1]):
+            quote.date = dates.iloc[-1].strftime("%Y-%m-%d")
+
+        close_column = _first_column(frame, _CLOSE_COLUMNS)
+        if close_column:
+            closes = pd.to_numeric(frame[close_column], errors="coerce")
+            quote.price = float(closes.iloc[-1])
+            quote.prev_close = float(closes.iloc[-2]) if len(closes) > 1 else quote.price
+            quote.change = quote.price - quote.prev_close
+            quote.change_pct = (quote.change / quote.prev_close * 100) if quote.prev_close else 0.0
+            first = float(closes.iloc[0])
+            quote.period_change = quote.price - first
+            quote.period_change_pct = (quote.period_change / first * 100) if first else 0.0
+            quote.average = float(closes.mean())
+
+        high_column = _first_column(frame, _HIGH_COLUMNS)
+        if high_column:
+            quote.high = float(pd.to_numeric(frame[high_column], errors="coerce").max())
+        low_column = _first_column(frame, _LOW_COLUMNS)
+        if low_column:
+            quote.low = float(pd.to_numeric(frame[low_column], errors="coerce").min())
+        volume_column = _first_column(frame, _VOLUME_COLUMNS)
+        quote.volume = float(pd.to_numeric(frame[volume_column], errors="coerce").sum()) if volume_column else 0.0
+        return quote
+
+
+@dataclass
+class StockDataResult:
+    """一次行情获取的结果"""
+    symbol: str
+    start_date: Optional[str]
+    end_date: Optional[str]
+    source: str
+    status: FetchStatus
+    frame: Optional[pd.DataFrame] = field(default=None, repr=False)
+    quote: Optional[StockQuote] = None
+    message: Optional[str] = None
+    # 只返回文本的旧数据源（如TDX）的原始文本
+    text: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == FetchStatus.OK
+
+    # ---- 构造 ----
+
+    @classmethod
+    def from_frame(cls, symbol: str, start_date: str, end_date: str, source: str,
+                   frame: Optional[pd.DataFrame], name: Optional[str] = None,
+                   empty_message: Optional[str] = None) -> "StockDataResult":
+        if frame is None or frame.empty:
+            return cls(symbol, start_date, end_date, source, FetchStatus.EMPTY,
+                       message=empty_message or f"❌ 未能获取{symbol}的股票数据")
+        return cls(symbol, start_date, end_date, source, FetchStatus.OK, frame=frame,
+                   quote=StockQuote.from_frame(frame, symbol, name))
+
+    @classmethod
+    def failure(cls, symbol: str, start_date: str, end_date: str, source: str, message: str) -> "StockDataResult":
+        return cls(symbol, start_date, end_date, source, FetchStatus.ERROR, message=message)
+
+    @classmethod
+    def from_text(cls, symbol: str, start_date: str, end_date: str, source: str, text: str) -> "StockDataResult":
+        """包装只返回文本的数据源"""
+        if not text or any(marker in text for marker in _ERROR_MARKERS):
+            return cls.failure(symbol, start_date, end_date, source, text or f"❌ 未能获取{symbol}的股票数据")
+        return cls(symbol, start_date, end_date, source, FetchStatus.OK, text=text)
+
+    # ---- 工具边界的文本格式 ----
+
+    def to_text(self) -> str:
+        """格式化为交给LLM的文本（各数据源保持原来的报告格式）"""
+        if not self.ok:
+            return self.message or f"❌ 未能获取{self.symbol}的股票数据"
+        if self.text is not None:
+            return self.text
+        formatter = _FORMATTERS.get(self.source, _format_table)
+        return formatter(self)
+
+    # ---- 缓存序列化 ----
+
+    def to_json(self) -> str:
+        frame_json = None
+        if self.frame is not None:
+            frame = self.frame.copy()
+            for column in frame.columns:
+                if pd.api.types.is_datetime64_any_dtype(frame[column]):
+                    values = frame[column]
+                    date_only = (values.dropna() == values.dropna().dt.normalize()).all()
+                    frame[column] = values.dt.strftime("%Y-%m-%d" if date_only else "%Y-%m-%d %H:%M:%S")
+            frame_json = frame.to_json(orient="split", index=False, force_ascii=False)
+        return json.dumps({
+            "symbol": self.symbol,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+            "source": self.source,
+            "status": self.status.value,
+            "quote": asdict(self.quote) if self.quote else None,
+            "message": self.message,
+            "text": self.text,
+            "frame": frame_json,
+        }, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, payload: str) -> "StockDataResult":
+        data: Dict[str, Any] = json.loads(payload)
+        frame = None
+        if data.get("frame"):
+            frame = pd.read_json(StringIO(data["frame"]), orient="split", dtype=False, convert_dates=False)
+        return cls(
+            symbol=data["symbol"],
+            start_date=data.get("start_date"),
+            end_date=data.get("end_date"),
+            source=data["source"],
+            status=FetchStatus(data["status"]),
+            frame=frame,
+            quote=StockQuote(**data["quote"]) if data.get("quote") else None,
+            message=data.get("message"),
+            text=data.get("text"),
+        )
+
+
+def _format_tushare(result: StockDataResult) -> str:
+    quote = result.quote
+    stock_name = quote.name or f'股票{result.symbol}'
+    text = f"📊 {stock_name}({result.symbol}) - Tushare数据\n"
+    text += f"数据期间: {result.start_date} 至 {result.end_date}\n"
+    text += f"数据条数: {len(result.frame)}条\n\n"
+
+    text += f"💰 最新价格: ¥{quote.price:.2f}\n"
+    text += f"📈 涨跌额: {quote.change:+.2f} ({quote.change_pct:+.2f}%)\n\n"
+
+    text += f"📊 价格统计:\n"
+    text += f"   最高价: ¥{quote.high:.2f}\n"
+    text += f"   最低价: ¥{quote.low:.2f}\n"
+    text += f"   平均价: ¥{quote.average:.2f}\n"
+    text += f"   成交量: {quote.volume:,.0f}股\n"
+    return text
+
+
+def _format_table(result: StockDataResult, with_stats: bool = False) -> str:
+    data = result.frame
+    text = f"股票代码: {result.symbol}\n"
+    text += f"数据期间: {result.start_date} 至 {result.end_date}\n"
+    text += f"数据条数: {len(data)}条\n\n"
+
+    # 显示最新3天数据，确保在各种显示环境下都能完整显示
+    display_rows = min(3, len(data))
+    text += f"最新{display_rows}天数据:\n"
+    with pd.option_context('display.max_rows', None,
+                           'display.max_columns', None,
+                           'display.width', None,
+                           'display.max_colwidth', None):
+        text += data.tail(display_rows).to_string(index=False)
+
+    # 如果数据超过3天，也显示一些统计信息
+    quote = result.quote
+    if with_stats and len(data) > 3 and quote and quote.period_change is not None \
+            and quote.high is not None and quote.low is not None:
+        text += f"\n\n📊 期间统计:\n"
+        text += f"期间涨跌: {quote.period_change:+.2f} ({quote.period_change_pct:+.2f}%)\n"
+        text += f"最高价: {quote.high:.2f}\n"
+        text += f"最低价: {quote.low:.2f}"
+    return text
+
+
+_FORMATTERS = {
+    "tushare": _format_tushare,
+    "akshare": lambda result: _format_table(result, with_stats=True),
+    "baostock": _format_table,
+}
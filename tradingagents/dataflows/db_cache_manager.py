@@ -9,6 +9,7 @@ import json
 import pickle
 import hashlib
 from datetime import datetime, timedelta
+from io import StringIO
 from typing import Optional, Dict, Any, List, Union
 import pandas as pd
 
@@ -16,9 +17,11 @@ import pandas as pd
 from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('agents')
 
+from tradingagents.config.connection_registry import get_mongo_client, get_redis_client
+from .payload_codec import decode_payload, encode_payload, payload_codec
+
 # MongoDB
 try:
-    from pymongo import MongoClient
     from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
     MONGODB_AVAILABLE = True
 except ImportError:
@@ -27,7 +30,6 @@ except ImportError:
 
 # Redis
 try:
-    import redis
     from redis.exceptions import ConnectionError as RedisConnectionError
     REDIS_AVAILABLE = True
 except ImportError:
@@ -81,11 +83,8 @@ class DatabaseCacheManager:
             return
         
         try:
-            self.mongodb_client = MongoClient(
-                self.mongodb_url,
-                serverSelectionTimeoutMS=5000,  # 5秒超时
-                connectTimeoutMS=5000
-            )
+            # 使用进程共享的连接池
+            self.mongodb_client = get_mongo_client(self.mongodb_url)
             # 测试连接
             self.mongodb_client.admin.command('ping')
             self.mongodb_db = self.mongodb_client[self.mongodb_db_name]
@@ -106,13 +105,8 @@ class DatabaseCacheManager:
             return
         
         try:
-            self.redis_client = redis.from_url(
-                self.redis_url,
-                db=self.redis_db,
-                socket_timeout=5,
-                socket_connect_timeout=5,
-                decode_responses=True
-            )
+            # 使用进程共享的连接池（缓存内容是压缩后的二进制，不解码为字符串）
+            self.redis_client = get_redis_client(self.redis_url, db=self.redis_db, decode_responses=False)
             # 测试连接
             self.redis_client.ping()
             
@@ -161,6 +155,30 @@ class DatabaseCacheManager:
         except Exception as e:
             logger.error(f"⚠️ MongoDB索引创建失败: {e}")
     
+    @staticmethod
+    def _encode_redis(redis_data: Dict[str, Any]) -> bytes:
+        """Redis中的条目：JSON压缩后加上编解码器标记"""
+        return encode_payload(json.dumps(redis_data, ensure_ascii=False))
+
+    @staticmethod
+    def _decode_redis(raw: Union[bytes, str]) -> Dict[str, Any]:
+        """解码Redis条目（兼容压缩前写入的JSON字符串）"""
+        return json.loads(decode_payload(raw))
+
+    @staticmethod
+    def _pack_doc_data(doc: Dict[str, Any], text: str):
+        """MongoDB文档的data字段保存压缩后的二进制，codec字段记录编解码器"""
+        payload = encode_payload(text)
+        doc["data"] = payload
+        doc["codec"] = payload_codec(payload)
+
+    @staticmethod
+    def _doc_data(doc: Dict[str, Any]) -> str:
+        """读取MongoDB文档的data字段（没有codec字段的是压缩前写入的文本）"""
+        if doc.get("codec"):
+            return decode_payload(doc["data"]).decode("utf-8")
+        return doc["data"]
+
     def _generate_cache_key(self, data_type: str, symbol: str, **kwargs) -> str:
         """生成缓存键"""
         params_str = f"{data_type}_{symbol}"
@@ -217,11 +235,12 @@ class DatabaseCacheManager:
         
         # 处理数据格式
         if isinstance(data, pd.DataFrame):
-            doc["data"] = data.to_json(orient='records', date_format='iso')
+            text = data.to_json(orient='records', date_format='iso')
             doc["data_format"] = "dataframe_json"
         else:
-            doc["data"] = str(data)
+            text = str(data)
             doc["data_format"] = "text"
+        self._pack_doc_data(doc, text)
         
         # 保存到MongoDB（持久化）
         if self.mongodb_db is not None:
@@ -236,7 +255,7 @@ class DatabaseCacheManager:
         if self.redis_client:
             try:
                 redis_data = {
-                    "data": doc["data"],
+                    "data": text,
                     "data_format": doc["data_format"],
                     "symbol": symbol,
                     "data_source": data_source,
@@ -245,7 +264,7 @@ class DatabaseCacheManager:
                 self.redis_client.setex(
                     cache_key,
                     6 * 3600,  # 6小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
+                    self._encode_redis(redis_data)
                 )
                 logger.info(f"⚡ 股票数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
@@ -261,11 +280,11 @@ class DatabaseCacheManager:
             try:
                 redis_data = self.redis_client.get(cache_key)
                 if redis_data:
-                    data_dict = json.loads(redis_data)
+                    data_dict = self._decode_redis(redis_data)
                     logger.info(f"⚡ 从Redis加载数据: {cache_key}")
                     
                     if data_dict["data_format"] == "dataframe_json":
-                        return pd.read_json(data_dict["data"], orient='records')
+                        return pd.read_json(StringIO(data_dict["data"]), orient='records')
                     else:
                         return data_dict["data"]
             except Exception as e:
@@ -279,12 +298,13 @@ class DatabaseCacheManager:
                 
                 if doc:
                     logger.info(f"💾 从MongoDB加载数据: {cache_key}")
+                    text = self._doc_data(doc)
                     
                     # 同时更新到Redis缓存
                     if self.redis_client:
                         try:
                             redis_data = {
-                                "data": doc["data"],
+                                "data": text,
                                 "data_format": doc["data_format"],
                                 "symbol": doc["symbol"],
                                 "data_source": doc["data_source"],
@@ -293,16 +313,16 @@ class DatabaseCacheManager:
                             self.redis_client.setex(
                                 cache_key,
                                 6 * 3600,
-                                json.dumps(redis_data, ensure_ascii=False)
+                                self._encode_redis(redis_data)
                             )
                             logger.info(f"⚡ 数据已同步到Redis缓存")
                         except Exception as e:
                             logger.error(f"⚠️ Redis同步失败: {e}")
                     
                     if doc["data_format"] == "dataframe_json":
-                        return pd.read_json(doc["data"], orient='records')
+                        return pd.read_json(StringIO(text), orient='records')
                     else:
-                        return doc["data"]
+                        return text
                         
             except Exception as e:
                 logger.error(f"⚠️ MongoDB加载失败: {e}")
@@ -373,10 +393,10 @@ class DatabaseCacheManager:
             "start_date": start_date,
             "end_date": end_date,
             "data_source": data_source,
-            "data": news_data,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        self._pack_doc_data(doc, news_data)
 
         # 保存到MongoDB
         if self.mongodb_db is not None:
@@ -399,7 +419,7 @@ class DatabaseCacheManager:
                 self.redis_client.setex(
                     cache_key,
                     24 * 3600,  # 24小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
+                    self._encode_redis(redis_data)
                 )
                 logger.info(f"⚡ 新闻数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
@@ -424,10 +444,10 @@ class DatabaseCacheManager:
             "data_type": "fundamentals_data",
             "analysis_date": analysis_date,
             "data_source": data_source,
-            "data": fundamentals_data,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        self._pack_doc_data(doc, fundamentals_data)
 
         # 保存到MongoDB
         if self.mongodb_db is not None:
@@ -451,7 +471,7 @@ class DatabaseCacheManager:
                 self.redis_client.setex(
                     cache_key,
                     24 * 3600,  # 24小时过期
-                    json.dumps(redis_data, ensure_ascii=False)
+                    self._encode_redis(redis_data)
                 )
                 logger.info(f"⚡ 基本面数据已缓存到Redis: {symbol} -> {cache_key}")
             except Exception as e:
@@ -512,14 +532,15 @@ class DatabaseCacheManager:
         return cleared_count
 
     def close(self):
-        """关闭数据库连接"""
+        """释放数据库连接（连接池由连接注册表统一管理，进程退出时关闭）"""
         if self.mongodb_client:
-            self.mongodb_client.close()
-            logger.info(f"🔒 MongoDB连接已关闭")
+            self.mongodb_client = None
+            self.mongodb_db = None
+            logger.info(f"🔒 MongoDB连接已释放")
 
         if self.redis_client:
-            self.redis_client.close()
-            logger.info(f"🔒 Redis连接已关闭")
+            self.redis_client = None
+            logger.info(f"🔒 Redis连接已释放")
 
 
 # 全局数据库缓存实例
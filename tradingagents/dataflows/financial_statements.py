@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+按报告期缓存的财务报表
+
+财务报表只在上市公司披露新的定期报告时才会变化，而基本面分析每次都会重新拉取
+主要指标、资产负债表、利润表和现金流量表。FinancialStatementStore 以
+(数据源, 股票代码, 报告期) 为键保存报表：
+
+- 同一报告期内，一旦数据中已经包含该期报告，就一直视为新鲜，直到下一个报告期开始（键随之变化）；
+- 该期报告还没有披露时，在法定披露截止日之前按 recheck_hours 间隔重新检查，
+  截止日之后不再期待新数据；
+- 几张报表通过线程池并发获取，同一个键的并发请求只会触发一次获取；
+- 部分报表获取失败时，已获取的报表照常缓存，缺失的报表按 partial_retry_minutes 间隔单独重新获取；
+  数据源正常返回但为空的报表（如新上市公司）单独记录，不按短间隔重试。
+
+A股定期报告的法定披露截止日：一季报 4月30日、半年报 8月31日、三季报 10月31日、年报次年4月30日。
+
+回测时（数据上下文带有模拟交易日期）报告期按模拟交易日期计算，返回的报表去掉
+该日期时还未到披露截止日的报告期，回测看不到未来披露的财务数据。
+"""
+
+import os
+import pickle
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 报告期（月, 日）-> 法定披露截止日（月, 日, 年份偏移）
+_DISCLOSURE_DEADLINES = {
+    (3, 31): (4, 30, 0),
+    (6, 30): (8, 31, 0),
+    (9, 30): (10, 31, 0),
+    (12, 31): (4, 30, 1),
+}
+
+# 报表中可能表示报告期的列
+_PERIOD_COLUMNS = ("end_date", "REPORT_DATE", "报告期")
+
+_PERIOD_PATTERN = re.compile(r"^(\d{4})-?(\d{2})-?(\d{2})")
+
+StatementFetcher = Callable[[], Any]
+
+
+def current_report_period(today: Optional[date] = None) -> str:
+    """当前日期所在的最近一个已结束的报告期（YYYYMMDD）"""
+    today = today or date.today()
+    for month, day in ((12, 31), (9, 30), (6, 30), (3, 31)):
+        period_end = date(today.year, month, day)
+        if period_end <= today:
+            return period_end.strftime("%Y%m%d")
+    return f"{today.year - 1}1231"
+
+
+def disclosure_deadline(period: str) -> datetime:
+    """报告期对应的法定披露截止时间（截止日当天结束）"""
+    period_end = datetime.strptime(period, "%Y%m%d")
+    month, day, year_offset = _DISCLOSURE_DEADLINES.get((period_end.month, period_end.day), (period_end.month, period_end.day, 0))
+    return datetime(period_end.year + year_offset, month, day, 23, 59, 59)
+
+
+def latest_disclosed_period(today: Optional[date] = None) -> str:
+    """法定披露截止日已过、所有公司都应已披露的最近报告期"""
+    today = today or date.today()
+    period = current_report_period(today)
+    while disclosure_deadline(period).date() >= today:
+        period = _previous_period(period)
+    return period
+
+
+def simulated_today() -> Optional[date]:
+    """回测上下文中的模拟交易日期，不在回测中时返回None"""
+    from .data_context import get_current_data_context
+    context = get_current_data_context()
+    if context is None or not context.as_of:
+        return None
+    return date.fromisoformat(str(context.as_of)[:10])
+
+
+def _previous_period(period: str) -> str:
+    period_end = datetime.strptime(period, "%Y%m%d").date()
+    return current_report_period(date.fromordinal(period_end.toordinal() - 1))
+
+
+def _normalize_period(value: Any) -> Optional[str]:
+    match = _PERIOD_PATTERN.match(str(value))
+    return "".join(match.groups()) if match else None
+
+
+def latest_reported_period(statements: Dict[str, Any]) -> Optional[str]:
+    """报表数据中出现的最新报告期，无法识别时返回None
+
+    兼容AKShare主要指标（报告期是列名）、东方财富报表（REPORT_DATE列）
+    以及Tushare的记录列表（end_date字段）。
+    """
+    periods = []
+    for value in statements.values():
+        if isinstance(value, pd.DataFrame):
+            periods.extend(_normalize_period(c) for c in value.columns if re.fullmatch(r"\d{8}", str(c)))
+            for column in _PERIOD_COLUMNS:
+                if column in value.columns:
+                    periods.extend(_normalize_period(v) for v in value[column].dropna())
+        elif isinstance(value, list):
+            periods.extend(_normalize_period(record.get("end_date", "")) for record in value
+                           if isinstance(record, dict))
+    periods = [p for p in periods if p]
+    return max(periods) if periods else None
+
+
+def statements_as_of(statements: Dict[str, Any], cutoff_period: str) -> Dict[str, Any]:
+    """去掉晚于 cutoff_period 的报告期（报告期列、报告期行和记录），格式与 latest_reported_period 相同"""
+    filtered = {}
+    for name, value in statements.items():
+        if isinstance(value, pd.DataFrame):
+            later = [c for c in value.columns
+                     if re.fullmatch(r"\d{8}", str(c)) and _normalize_period(c) > cutoff_period]
+            value = value.drop(columns=later)
+            for column in _PERIOD_COLUMNS:
+                if column in value.columns:
+                    periods = value[column].map(_normalize_period)
+                    value = value[periods.isna() | (periods <= cutoff_period)]
+        elif isinstance(value, list):
+            value = [record for record in value if not isinstance(record, dict)
+                     or not _normalize_period(record.get("end_date", ""))
+                     or _normalize_period(record.get("end_date", "")) <= cutoff_period]
+        filtered[name] = value
+    return filtered
+
+
+class FinancialStatementStore:
+    """按 (数据源, 股票代码, 报告期) 缓存财务报表，内存 + 磁盘两级"""
+
+    def __init__(self, cache_dir: Optional[str] = None, recheck_hours: float = 24, max_workers: int = 4,
+                 partial_retry_minutes: float = 10):
+        if cache_dir is None:
+            cache_dir = Path(__file__).parent / "data_cache" / "financial_statements"
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.recheck_seconds = recheck_hours * 3600
+        self.partial_retry_seconds = partial_retry_minutes * 60
+        self.max_workers = max_workers
+
+        self._entries: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+    # ---- 新鲜度 ----
+
+    def is_fresh(self, entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """判断缓存的报表是否仍然新鲜"""
+        now = time.time() if now is None else now
+        period = entry["period"]
+        reported = entry.get("reported_period")
+        if reported and reported >= period:
+            return True
+
+        deadline = disclosure_deadline(period).timestamp()
+        if entry["fetched_at"] > deadline:
+            # 截止日之后获取的数据不会再有该期的新报告
+            return True
+        return now < min(entry["fetched_at"] + self.recheck_seconds, deadline)
+
+    def missing_statements(self, entry: Dict[str, Any], fetchers: Dict[str, StatementFetcher],
+                           now: Optional[float] = None) -> List[str]:
+        """缓存中缺少（获取失败，不含数据源返回为空的报表）、并且已经到了重试时间的报表"""
+        now = time.time() if now is None else now
+        empty = entry.get("empty", ())
+        missing = [name for name in fetchers if name not in entry["statements"] and name not in empty]
+        if missing and now >= entry.get("retried_at", entry["fetched_at"]) + self.partial_retry_seconds:
+            return missing
+        return []
+
+    # ---- 读取 ----
+
+    def get(self, source: str, symbol: str, fetchers: Dict[str, StatementFetcher],
+            period: Optional[str] = None, today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        获取财务报表，缓存新鲜时直接返回
+
+        Args:
+            source: 数据源名称
+            symbol: 股票代码
+            fetchers: 报表名称 -> 获取函数，返回None或空数据表示该报表为空（如新上市公司），
+                不再按短间隔重试；抛出异常表示获取失败，按 partial_retry_minutes 重试
+            period: 报告期（YYYYMMDD），默认为当前所在的报告期
+            today: 当前日期（测试用），默认为回测的模拟交易日期或当天
+
+        Returns:
+            Dict: 报表名称 -> 报表数据，只包含获取成功且不为空的报表；
+            回测中只包含模拟交易日期时已过披露截止日的报告期
+        """
+        as_of = simulated_today()
+        statements = self._get(source, symbol, fetchers, period, today or as_of)
+        if as_of is None:
+            return statements
+        return statements_as_of(statements, latest_disclosed_period(as_of))
+
+    def _get(self, source: str, symbol: str, fetchers: Dict[str, StatementFetcher],
+             period: Optional[str], today: Optional[date]) -> Dict[str, Any]:
+        key = (source, symbol, period or current_report_period(today))
+        entry = self._load(key)
+        if entry is not None and self.is_fresh(entry) and not self.missing_statements(entry, fetchers):
+            logger.debug(f"📦 财务报表缓存命中: {source} {symbol} {key[2]}")
+            return entry["statements"]
+
+        with self._key_lock(key):
+            # 等锁期间其他线程可能已经完成获取
+            entry = self._load(key)
+            if entry is not None and self.is_fresh(entry):
+                missing = self.missing_statements(entry, fetchers)
+                if missing:
+                    return self._fetch_missing(key, symbol, entry, {name: fetchers[name] for name in missing})
+                return entry["statements"]
+
+            statements, empty = self._fetch_all(symbol, fetchers)
+            if not statements and (not empty or (entry is not None and entry["statements"])):
+                if entry is not None:
+                    logger.warning(f"⚠️ {symbol}财务报表获取失败，使用{key[2]}报告期的旧缓存")
+                    return entry["statements"]
+                return {}
+
+            entry = {
+                "period": key[2],
+                "reported_period": latest_reported_period(statements),
+                "fetched_at": time.time(),
+                "statements": statements,
+                "empty": empty,
+            }
+            self._save(key, entry)
+            logger.info(f"💾 财务报表已缓存: {source} {symbol} 报告期{key[2]}, "
+                        f"最新披露{entry['reported_period'] or '未知'}")
+            return statements
+
+    def _fetch_missing(self, key: Tuple[str, str, str], symbol: str, entry: Dict[str, Any],
+                       fetchers: Dict[str, StatementFetcher]) -> Dict[str, Any]:
+        """只重新获取缓存中缺失的报表，与已有报表合并"""
+        fetched, empty = self._fetch_all(symbol, fetchers)
+        statements = {**entry["statements"], **fetched}
+        empty = sorted(set(entry.get("empty", ())) | set(empty))
+        still_missing = [name for name in fetchers if name not in statements and name not in empty]
+        entry = dict(entry, statements=statements, reported_period=latest_reported_period(statements),
+                     empty=empty, retried_at=time.time())
+        self._save(key, entry)
+        if still_missing:
+            logger.warning(f"⚠️ {symbol}财务报表仍缺少{still_missing}，{self.partial_retry_seconds / 60:.0f}分钟后重试")
+        else:
+            logger.info(f"💾 财务报表已补齐: {key[0]} {symbol} 报告期{key[2]}")
+        return statements
+
+    def _fetch_all(self, symbol: str,
+                   fetchers: Dict[str, StatementFetcher]) -> Tuple[Dict[str, Any], List[str]]:
+        """并发获取所有报表，返回（获取成功的报表，数据源返回为空的报表名称）；获取失败的报表两者都不包含"""
+        statements = {}
+        empty = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(fetchers)) or 1) as executor:
+            futures = {name: executor.submit(fetch) for name, fetch in fetchers.items()}
+            for name, future in futures.items():
+                try:
+                    value = future.result()
+                except Exception as e:
+                    logger.debug(f"❌ 获取{symbol}{name}失败: {e}")
+                    continue
+                if value is None or (hasattr(value, "__len__") and len(value) == 0):
+                    logger.debug(f"⚠️ {symbol}{name}为空")
+                    empty.append(name)
+                    continue
+                statements[name] = value
+        return statements, empty
+
+    def _key_lock(self, key: Tuple[str, str, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # ---- 存储 ----
+
+    def _path(self, key: Tuple[str, str, str]) -> Path:
+        source, symbol, period = key
+        safe_symbol = re.sub(r"[^\w.-]", "_", symbol)
+        return self.cache_dir / source / f"{safe_symbol}_{period}.pkl"
+
+    def _load(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ 财务报表缓存读取失败 {path.name}: {e}")
+            return None
+        self._entries[key] = entry
+        return entry
+
+    def _save(self, key: Tuple[str, str, str], entry: Dict[str, Any]):
+        self._entries[key] = entry
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ 财务报表缓存保存失败 {path.name}: {e}")
+
+
+_store: Optional[FinancialStatementStore] = None
+_store_lock = threading.Lock()
+
+
+def get_financial_statement_store() -> FinancialStatementStore:
+    """获取进程内共享的财务报表缓存"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FinancialStatementStore()
+        return _store
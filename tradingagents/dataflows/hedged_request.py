@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+对冗余数据源的对冲请求（hedged request）
+
+主数据源在其P90耗时内还没有返回时，把同一个请求发给下一个健康的数据源，
+取最先返回的有效结果，其余请求作废（还没开始的直接取消，已经在运行的在后台结束后丢弃结果）。
+额外请求受 HedgeBudget 限制：每个请求积累 ratio 个令牌，最多积累 burst 个，每次对冲消耗一个，
+避免上游整体变慢时请求量翻倍。
+
+每个数据源使用各自的线程池，挂起的请求只占用所属数据源的线程；
+等待超过 call_timeout 时放弃仍未返回的请求，调用方按顺序尝试其余数据源。
+不对冲（hedge_delay 为None）时直接在调用线程中请求主数据源，不经过线程池。
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+def hedge_workers_per_source() -> int:
+    """每个数据源的对冲请求线程数（环境变量 TRADINGAGENTS_HEDGE_WORKERS_PER_SOURCE）"""
+    return max(1, int(os.getenv('TRADINGAGENTS_HEDGE_WORKERS_PER_SOURCE', '4')))
+
+
+def hedge_call_timeout() -> float:
+    """对冲请求最长等待秒数（环境变量 TRADINGAGENTS_HEDGE_CALL_TIMEOUT，0表示不限制）"""
+    return float(os.getenv('TRADINGAGENTS_HEDGE_CALL_TIMEOUT', '60'))
+
+
+def hedging_enabled() -> bool:
+    """是否开启对冲请求（环境变量 TRADINGAGENTS_DATA_SOURCE_HEDGING）"""
+    return os.getenv('TRADINGAGENTS_DATA_SOURCE_HEDGING', 'false').lower() in ('true', '1', 'yes', 'on')
+
+
+class HedgeBudget:
+    """额外请求的令牌桶（线程安全）"""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 3.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            return self._tokens
+
+
+@dataclass
+class HedgeOutcome:
+    """对冲请求结果：winner 为返回有效结果的数据源，没有有效结果时为None，result 为主数据源的结果"""
+    winner: Optional[Hashable]
+    result: Any
+    attempted: List[Hashable] = field(default_factory=list)
+    hedged: bool = False
+
+
+_executors: Dict[Hashable, ThreadPoolExecutor] = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(source: Hashable) -> ThreadPoolExecutor:
+    """数据源各自的线程池"""
+    with _executor_lock:
+        executor = _executors.get(source)
+        if executor is None:
+            name = getattr(source, "value", source)
+            executor = _executors[source] = ThreadPoolExecutor(max_workers=hedge_workers_per_source(),
+                                                               thread_name_prefix=f"hedged-fetch-{name}")
+        return executor
+
+
+def _call_inline(key: Hashable, fn: Callable[[], Any], is_valid: Callable[[Any], bool]) -> HedgeOutcome:
+    try:
+        result = fn()
+    except Exception as e:
+        logger.warning(f"⚠️ {key}请求失败: {e}")
+        result = None
+    return HedgeOutcome(key if is_valid(result) else None, result, [key])
+
+
+def hedged_call(calls: Sequence[Tuple[Hashable, Callable[[], Any]]], hedge_delay: Optional[float],
+                is_valid: Callable[[Any], bool], budget: HedgeBudget, max_hedges: int = 1,
+                call_timeout: Optional[float] = None) -> HedgeOutcome:
+    """
+    依次发出对冲请求，返回最先得到的有效结果
+
+    Args:
+        calls: [(数据源, 无参调用)]，第一个为主数据源，其余按优先级排列
+        hedge_delay: 主数据源多久没有返回就发出下一个请求；None表示不对冲
+        is_valid: 判断结果是否有效
+        budget: 额外请求预算
+        max_hedges: 最多额外发出的请求数
+        call_timeout: 最长等待秒数，超过时放弃未返回的请求；默认读取 TRADINGAGENTS_HEDGE_CALL_TIMEOUT
+
+    Returns:
+        HedgeOutcome；所有已发出的请求都没有有效结果（或等待超时）时 winner 为None，
+        调用方可以继续按顺序尝试 attempted 之外的数据源
+    """
+    budget.record_request()
+    if hedge_delay is None or max_hedges <= 0 or len(calls) < 2:
+        return _call_inline(calls[0][0], calls[0][1], is_valid)
+
+    call_timeout = hedge_call_timeout() if call_timeout is None else call_timeout
+    give_up_at = time.time() + call_timeout if call_timeout > 0 else None
+    pending = list(calls)
+    futures = {}
+    results = {}
+    attempted = []
+    hedged = False
+
+    def _submit():
+        key, fn = pending.pop(0)
+        attempted.append(key)
+        # 在调用线程的上下文副本中执行，保留分析数据上下文等 ContextVar
+        futures[_get_executor(key).submit(contextvars.copy_context().run, fn)] = key
+
+    _submit()
+    primary = attempted[0]
+    can_hedge = True
+    deadline = time.time() + hedge_delay
+
+    while futures:
+        waits = []
+        if can_hedge and pending:
+            waits.append(deadline - time.time())
+        if give_up_at is not None:
+            waits.append(give_up_at - time.time())
+        timeout = max(0.0, min(waits)) if waits else None
+        done, _ = wait(list(futures), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        if not done and give_up_at is not None and time.time() >= give_up_at:
+            logger.warning(f"⏱️ {', '.join(str(key) for key in futures.values())}超过{call_timeout:.0f}秒未返回，放弃等待")
+            for future in futures:
+                future.cancel()
+            break
+
+        if not done:
+            # 已经超过对冲等待时间
+            if budget.try_acquire():
+                logger.info(f"⏱️ {attempted[-1]}超过{hedge_delay:.2f}秒未返回，对冲请求{pending[0][0]}")
+                _submit()
+                hedged = True
+                max_hedges -= 1
+                can_hedge = max_hedges > 0
+                deadline = time.time() + hedge_delay
+            else:
+                logger.debug(f"⏱️ 对冲预算不足，继续等待{attempted[-1]}")
+                can_hedge = False
+            continue
+
+        for future in done:
+            key = futures.pop(future)
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ {key}请求失败: {e}")
+                results[key] = None
+            if is_valid(results[key]):
+                for loser in futures:
+                    loser.cancel()
+                if key != primary:
+                    logger.info(f"🏁 对冲请求{key}先返回有效结果")
+                return HedgeOutcome(key, results[key], attempted, hedged)
+
+    return HedgeOutcome(None, results.get(primary), attempted, hedged)
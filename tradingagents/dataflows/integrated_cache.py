@@ -33,6 +33,9 @@ class IntegratedCacheManager:
         
         # 初始化原有缓存系统（作为备用）
         self.legacy_cache = StockDataCache(cache_dir)
+
+        # 进程内L1内存缓存（按字节数限制容量），与传统缓存共用，位于所有后端之前
+        self.memory_cache = self.legacy_cache.memory_cache
         
         # 尝试初始化自适应缓存系统
         self.adaptive_cache = None
@@ -85,7 +88,7 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date or "",
@@ -95,13 +98,15 @@ class IntegratedCacheManager:
             )
         else:
             # 使用传统缓存系统
-            return self.legacy_cache.save_stock_data(
+            cache_key = self.legacy_cache.save_stock_data(
                 symbol=symbol,
                 data=data,
                 start_date=start_date,
                 end_date=end_date,
                 data_source=data_source
             )
+        self.memory_cache.invalidate(cache_key)
+        return cache_key
     
     def load_stock_data(self, cache_key: str) -> Optional[Any]:
         """
@@ -113,12 +118,24 @@ class IntegratedCacheManager:
         Returns:
             股票数据或None
         """
-        if self.use_adaptive:
-            # 使用自适应缓存系统
-            return self.adaptive_cache.load_data(cache_key)
-        else:
-            # 使用传统缓存系统
-            return self.legacy_cache.load_stock_data(cache_key)
+        return self._load(cache_key, self.legacy_cache.load_stock_data)
+
+    def _load(self, cache_key: str, legacy_loader) -> Optional[Any]:
+        """先查L1内存缓存，未命中时从后端加载并按后端条目的剩余有效期写入L1"""
+        if not self.use_adaptive:
+            # 传统缓存系统自己读写L1
+            return legacy_loader(cache_key)
+
+        data = self.memory_cache.get(cache_key)
+        if data is not None:
+            return data
+
+        entry = self.adaptive_cache.load_entry(cache_key)
+        if not entry:
+            return None
+        data, ttl_seconds = entry
+        self.memory_cache.put(cache_key, data, ttl_seconds)
+        return data
     
     def find_cached_stock_data(self, symbol: str, start_date: str = None, 
                               end_date: str = None, data_source: str = "default") -> Optional[str]:
@@ -136,13 +153,7 @@ class IntegratedCacheManager:
         """
         if self.use_adaptive:
             # 使用自适应缓存系统
-            return self.adaptive_cache.find_cached_data(
-                symbol=symbol,
-                start_date=start_date or "",
-                end_date=end_date or "",
-                data_source=data_source,
-                data_type="stock_data"
-            )
+            return self._find_adaptive(symbol, start_date or "", end_date or "", data_source, "stock_data")
         else:
             # 使用传统缓存系统
             return self.legacy_cache.find_cached_stock_data(
@@ -152,43 +163,54 @@ class IntegratedCacheManager:
                 data_source=data_source
             )
     
+    def _find_adaptive(self, symbol: str, start_date: str, end_date: str, data_source: str,
+                       data_type: str) -> Optional[str]:
+        """查找自适应缓存中的有效条目，找到时顺便写入L1，随后的加载不再反序列化"""
+        cache_key = self.adaptive_cache._get_cache_key(symbol, start_date, end_date, data_source, data_type)
+        if self.memory_cache.contains(cache_key):
+            return cache_key
+
+        entry = self.adaptive_cache.load_entry(cache_key)
+        if not entry:
+            return None
+        self.memory_cache.put(cache_key, *entry)
+        return cache_key
+    
     def save_news_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存新闻数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="news_data"
             )
         else:
-            return self.legacy_cache.save_news_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_news_data(symbol, data, data_source=data_source)
+        self.memory_cache.invalidate(cache_key)
+        return cache_key
     
     def load_news_data(self, cache_key: str) -> Optional[Any]:
         """加载新闻数据"""
-        if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
-        else:
-            return self.legacy_cache.load_news_data(cache_key)
+        return self._load(cache_key, self.legacy_cache.load_news_data)
     
     def save_fundamentals_data(self, symbol: str, data: Any, data_source: str = "default") -> str:
         """保存基本面数据"""
         if self.use_adaptive:
-            return self.adaptive_cache.save_data(
+            cache_key = self.adaptive_cache.save_data(
                 symbol=symbol,
                 data=data,
                 data_source=data_source,
                 data_type="fundamentals_data"
             )
         else:
-            return self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+            cache_key = self.legacy_cache.save_fundamentals_data(symbol, data, data_source)
+        self.memory_cache.invalidate(cache_key)
+        return cache_key
     
     def load_fundamentals_data(self, cache_key: str) -> Optional[Any]:
         """加载基本面数据"""
-        if self.use_adaptive:
-            return self.adaptive_cache.load_data(cache_key)
-        else:
-            return self.legacy_cache.load_fundamentals_data(cache_key)
+        return self._load(cache_key, self.legacy_cache.load_fundamentals_data)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
@@ -201,6 +223,7 @@ class IntegratedCacheManager:
             
             return {
                 "cache_system": "adaptive",
+                "memory_cache": self.memory_cache.stats(),
                 "adaptive_cache": adaptive_stats,
                 "legacy_cache": legacy_stats,
                 "database_available": self.db_manager.is_database_available(),
@@ -212,6 +235,7 @@ class IntegratedCacheManager:
             legacy_stats = self.legacy_cache.get_cache_stats()
             return {
                 "cache_system": "legacy",
+                "memory_cache": self.memory_cache.stats(),
                 "legacy_cache": legacy_stats,
                 "database_available": False,
                 "mongodb_available": False,
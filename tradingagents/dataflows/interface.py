@@ -2,8 +2,6 @@ from typing import Annotated, Dict
 import time
 import os
 from .reddit_utils import fetch_top_from_category
-from .chinese_finance_utils import get_chinese_social_sentiment
-from .googlenews_utils import *
 from .finnhub_utils import get_data_in_range
 
 # 导入统一日志系统
@@ -11,59 +9,43 @@ from tradingagents.utils.logging_init import setup_dataflow_logging
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
+from tradingagents.utils.lazy_import import lazy_exports
 logger = get_logger('agents')
 logger = setup_dataflow_logging()
 
-# 导入港股工具
-try:
-    from .hk_stock_utils import get_hk_stock_data, get_hk_stock_info
-    HK_STOCK_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ 港股工具不可用: {e}")
-    HK_STOCK_AVAILABLE = False
-
-# 导入AKShare港股工具
-try:
-    from .akshare_utils import get_hk_stock_data_akshare, get_hk_stock_info_akshare
-    AKSHARE_HK_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ AKShare港股工具不可用: {e}")
-    AKSHARE_HK_AVAILABLE = False
-
-# 尝试导入yfinance相关模块，如果失败则跳过
-try:
-    from .yfin_utils import *
-    YFIN_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance工具不可用: {e}")
-    YFIN_AVAILABLE = False
-
-try:
-    from .stockstats_utils import *
-    STOCKSTATS_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ stockstats工具不可用: {e}")
-    STOCKSTATS_AVAILABLE = False
 from dateutil.relativedelta import relativedelta
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import importlib
+import importlib.util
 import json
 import os
 import pandas as pd
-from tqdm import tqdm
-from openai import OpenAI
-
-# 尝试导入yfinance，如果失败则设置为None
-try:
-    import yfinance as yf
-    YF_AVAILABLE = True
-except ImportError as e:
-    logger.warning(f"⚠️ yfinance库不可用: {e}")
-    yf = None
-    YF_AVAILABLE = False
+
+# 港股、yfinance、stockstats、googlenews、OpenAI等依赖较重，在使用它们的函数里按需导入；
+# 以下名称仍可作为本模块属性访问（例如 interface.get_chinese_social_sentiment）
+__getattr__ = lazy_exports(__name__, globals(), {
+    "get_chinese_social_sentiment": ".chinese_finance_utils",
+    "getNewsData": ".googlenews_utils",
+    "YFinanceUtils": ".yfin_utils",
+    "StockstatsUtils": ".stockstats_utils",
+})
 from .config import get_config, set_config, DATA_DIR
+from .data_context import analysis_memoized
+from .hedged_request import HedgeBudget, hedged_call, hedging_enabled
+from .source_health import SourceHealthRegistry
+
 
+def _optional_import(module: str, name: str, label: str):
+    """按需导入可选数据源函数，依赖缺失时返回None"""
+    try:
+        return getattr(importlib.import_module(module, __package__), name)
+    except ImportError as e:
+        logger.warning(f"⚠️ {label}不可用: {e}")
+        return None
 
+
+@analysis_memoized("finnhub_news")
 def get_finnhub_news(
     ticker: Annotated[
         str,
@@ -337,6 +319,7 @@ def get_simfin_income_statements(
     )
 
 
+@analysis_memoized("google_news")
 def get_google_news(
     query: Annotated[str, "Query to search with"],
     curr_date: Annotated[str, "Curr date in yyyy-mm-dd format"],
@@ -370,6 +353,7 @@ def get_google_news(
     before = before.strftime("%Y-%m-%d")
 
     logger.info(f"[Google新闻] 开始获取新闻，查询: {query}, 时间范围: {before} 至 {curr_date}")
+    from .googlenews_utils import getNewsData
     news_results = getNewsData(query, before, curr_date)
 
     news_str = ""
@@ -410,6 +394,7 @@ def get_reddit_global_news(
     curr_date = datetime.strptime(before, "%Y-%m-%d")
 
     total_iterations = (start_date - curr_date).days + 1
+    from tqdm import tqdm
     pbar = tqdm(desc=f"Getting Global News on {start_date}", total=total_iterations)
 
     while curr_date <= start_date:
@@ -439,6 +424,7 @@ def get_reddit_global_news(
     return f"## Global News Reddit, from {before} to {curr_date}:\n{news_str}"
 
 
+@analysis_memoized("reddit_company_news")
 def get_reddit_company_news(
     ticker: Annotated[str, "ticker symbol of the company"],
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
@@ -464,6 +450,7 @@ def get_reddit_company_news(
     curr_date = datetime.strptime(before, "%Y-%m-%d")
 
     total_iterations = (start_date - curr_date).days + 1
+    from tqdm import tqdm
     pbar = tqdm(
         desc=f"Getting Company News for {ticker} on {start_date}",
         total=total_iterations,
@@ -498,6 +485,7 @@ def get_reddit_company_news(
     return f"##{ticker} News Reddit, from {before} to {curr_date}:\n\n{news_str}"
 
 
+@analysis_memoized("stock_indicators")
 def get_stock_stats_indicators_window(
     symbol: Annotated[str, "ticker symbol of the company"],
     indicator: Annotated[str, "technical indicator to get the analysis and report of"],
@@ -647,6 +635,7 @@ def get_stockstats_indicator(
     curr_date = curr_date.strftime("%Y-%m-%d")
 
     try:
+        from .stockstats_utils import StockstatsUtils
         indicator_value = StockstatsUtils.get_stock_stats(
             symbol,
             indicator,
@@ -704,23 +693,23 @@ def get_YFin_data_window(
     )
 
 
+@analysis_memoized("us_stock_data")
 def get_YFin_data_online(
     symbol: Annotated[str, "ticker symbol of the company"],
     start_date: Annotated[str, "Start date in yyyy-mm-dd format"],
     end_date: Annotated[str, "End date in yyyy-mm-dd format"],
 ):
-    # 检查yfinance是否可用
-    if not YF_AVAILABLE or yf is None:
+    # 检查yfinance是否可用（实际导入在 yfinance_history 中进行）
+    if importlib.util.find_spec("yfinance") is None:
+        logger.warning("⚠️ yfinance库不可用")
         return "yfinance库不可用，无法获取美股数据"
 
     datetime.strptime(start_date, "%Y-%m-%d")
     datetime.strptime(end_date, "%Y-%m-%d")
 
-    # Create ticker object
-    ticker = yf.Ticker(symbol.upper())
-
-    # Fetch historical data for the specified date range
-    data = ticker.history(start=start_date, end=end_date)
+    # Fetch historical data for the specified date range（回测中从预加载的历史切片）
+    from .point_in_time import history_frame, yfinance_history
+    data = history_frame("yfinance_daily", symbol.upper(), start_date, end_date, yfinance_history)
 
     # Check if data is empty
     if data.empty:
@@ -784,7 +773,9 @@ def get_YFin_data(
     return filtered_data
 
 
+@analysis_memoized("stock_news_openai")
 def get_stock_news_openai(ticker, curr_date):
+    from openai import OpenAI
     config = get_config()
     client = OpenAI(base_url=config["backend_url"])
 
@@ -819,7 +810,9 @@ def get_stock_news_openai(ticker, curr_date):
     return response.output[1].content[0].text
 
 
+@analysis_memoized("global_news_openai")
 def get_global_news_openai(curr_date):
+    from openai import OpenAI
     config = get_config()
     client = OpenAI(base_url=config["backend_url"])
 
@@ -854,6 +847,7 @@ def get_global_news_openai(curr_date):
     return response.output[1].content[0].text
 
 
+@analysis_memoized("us_fundamentals_finnhub")
 def get_fundamentals_finnhub(ticker, curr_date):
     """
     使用Finnhub API获取股票基本面数据作为OpenAI的备选方案
@@ -994,6 +988,7 @@ def get_fundamentals_finnhub(ticker, curr_date):
         return f"Finnhub基本面数据获取失败: {str(e)}"
 
 
+@analysis_memoized("us_fundamentals")
 def get_fundamentals_openai(ticker, curr_date):
     """
     获取股票基本面数据，优先使用OpenAI，失败时回退到Finnhub API
@@ -1037,6 +1032,7 @@ def get_fundamentals_openai(ticker, curr_date):
         
         logger.debug(f"📊 [DEBUG] 尝试使用OpenAI获取 {ticker} 的基本面数据...")
         
+        from openai import OpenAI
         client = OpenAI(base_url=config["backend_url"])
 
         response = client.responses.create(
@@ -1201,6 +1197,7 @@ def get_china_stock_info_tushare(
 
 # ==================== 统一数据源接口 ====================
 
+@analysis_memoized("china_stock_data")
 def get_china_stock_data_unified(
     ticker: Annotated[str, "中国股票代码，如：000001、600036等"],
     start_date: Annotated[str, "开始日期，格式：YYYY-MM-DD"],
@@ -1236,16 +1233,17 @@ def get_china_stock_data_unified(
     start_time = time.time()
 
     try:
-        from .data_source_manager import get_china_stock_data_unified
+        from .data_source_manager import get_china_stock_data_result
 
-        result = get_china_stock_data_unified(ticker, start_date, end_date)
+        data = get_china_stock_data_result(ticker, start_date, end_date)
+        # 工具边界：在这里把结构化结果格式化为交给LLM的文本
+        result = data.to_text()
 
         # 记录详细的输出结果
         duration = time.time() - start_time
         result_length = len(result) if result else 0
-        is_success = result and "❌" not in result and "错误" not in result
 
-        if is_success:
+        if data.ok:
             logger.info(f"✅ [统一接口] 中国股票数据获取成功",
                        extra={
                            'function': 'get_china_stock_data_unified',
@@ -1287,6 +1285,7 @@ def get_china_stock_data_unified(
         return f"❌ 获取{ticker}股票数据失败: {e}"
 
 
+@analysis_memoized("china_stock_info")
 def get_china_stock_info_unified(
     ticker: Annotated[str, "中国股票代码，如：000001、600036等"]
 ) -> str:
@@ -1391,48 +1390,101 @@ def get_current_china_data_source() -> str:
 
 # ==================== 港股数据接口 ====================
 
-def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str = None) -> str:
+# 港股数据源（AKShare、Yahoo Finance）的耗时统计和对冲请求预算
+_hk_source_health = SourceHealthRegistry()
+_hk_hedge_budget = HedgeBudget(float(os.getenv('TRADINGAGENTS_HEDGE_BUDGET_RATIO', '0.1')))
+
+
+def _is_valid_hk_result(result) -> bool:
+    return bool(result) and "❌" not in result
+
+
+def _fetch_hk_source(name: str, fetch, symbol: str, start_date: str, end_date: str):
+    """调用港股数据源并记录耗时，失败时返回None"""
+    start_time = time.time()
+    try:
+        result = fetch(symbol, start_date, end_date)
+    except Exception as e:
+        logger.error(f"⚠️ {name}港股数据获取失败: {e}")
+        _hk_source_health.record_failure(name, time.time() - start_time)
+        return None
+
+    if _is_valid_hk_result(result):
+        logger.info(f"✅ {name}港股数据获取成功: {symbol}")
+        _hk_source_health.record_success(name, time.time() - start_time)
+    else:
+        logger.error(f"⚠️ {name}返回错误结果，尝试备用方案")
+        _hk_source_health.record_failure(name, time.time() - start_time)
+    return result
+
+
+# 港股统一接口结果的缓存数据源名（AKShare / Yahoo Finance 的结果都按此缓存）
+HK_CACHE_SOURCE = "hk_unified"
+
+
+@analysis_memoized("hk_stock_data")
+def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str = None,
+                              force_refresh: bool = False) -> str:
     """
-    获取港股数据的统一接口
+    获取港股数据的统一接口 - 优先使用缓存
 
     Args:
         symbol: 港股代码 (如: 0700.HK)
         start_date: 开始日期 (YYYY-MM-DD)
         end_date: 结束日期 (YYYY-MM-DD)
+        force_refresh: 是否跳过缓存重新获取（盘前预热使用）
 
     Returns:
         str: 格式化的港股数据
     """
+    from .cache_manager import get_cache
+
+    cache = get_cache()
+    if not force_refresh:
+        cache_key = cache.find_cached_stock_data(symbol, start_date, end_date, data_source=HK_CACHE_SOURCE)
+        cached_data = cache.load_stock_data(cache_key) if cache_key else None
+        if cached_data:
+            logger.info(f"⚡ 从缓存加载港股数据: {symbol}")
+            return cached_data
+
+    result = _fetch_hk_stock_data(symbol, start_date, end_date)
+    if _is_valid_hk_result(result):
+        cache.save_stock_data(symbol, result, start_date, end_date, data_source=HK_CACHE_SOURCE)
+    return result
+
+
+def _fetch_hk_stock_data(symbol: str, start_date: str = None, end_date: str = None) -> str:
+    """依次（或对冲）请求港股数据源，最后使用FINNHUB"""
     try:
         logger.info(f"🇭🇰 获取港股数据: {symbol}")
 
-        # 优先使用AKShare港股数据（国内数据源，港股支持更好，更稳定）
-        if AKSHARE_HK_AVAILABLE:
-            try:
-                logger.info(f"🔄 优先使用AKShare获取港股数据: {symbol}")
-                result = get_hk_stock_data_akshare(symbol, start_date, end_date)
-                if result and "❌" not in result:
-                    logger.info(f"✅ AKShare港股数据获取成功: {symbol}")
-                    return result
-                else:
-                    logger.error(f"⚠️ AKShare返回错误结果，尝试备用方案")
-            except Exception as e:
-                logger.error(f"⚠️ AKShare港股数据获取失败: {e}")
-
-        # 备用方案1：使用Yahoo Finance港股工具
-        if HK_STOCK_AVAILABLE:
-            try:
-                logger.info(f"🔄 使用Yahoo Finance备用方案获取港股数据: {symbol}")
-                result = get_hk_stock_data(symbol, start_date, end_date)
-                if result and "❌" not in result:
-                    logger.info(f"✅ Yahoo Finance港股数据获取成功: {symbol}")
-                    return result
-                else:
-                    logger.error(f"⚠️ Yahoo Finance返回错误结果")
-            except Exception as e:
-                logger.error(f"⚠️ Yahoo Finance港股数据获取失败: {e}")
+        get_hk_stock_data_akshare = _optional_import(".akshare_utils", "get_hk_stock_data_akshare", "AKShare港股工具")
+        get_hk_stock_data = _optional_import(".hk_stock_utils", "get_hk_stock_data", "港股工具")
+
+        # 优先使用AKShare港股数据（国内数据源，港股支持更好，更稳定），Yahoo Finance作为备用
+        hk_sources = []
+        if get_hk_stock_data_akshare is not None:
+            hk_sources.append(("AKShare", get_hk_stock_data_akshare))
+        if get_hk_stock_data is not None:
+            hk_sources.append(("Yahoo Finance", get_hk_stock_data))
+
+        calls = [(name, lambda name=name, fetch=fetch: _fetch_hk_source(name, fetch, symbol, start_date, end_date))
+                 for name, fetch in hk_sources]
+        if hedging_enabled() and len(calls) > 1:
+            # 对冲请求：AKShare超过其P90耗时未返回时同时请求Yahoo Finance
+            outcome = hedged_call(calls, _hk_source_health.latency_percentile(calls[0][0], 0.9),
+                                  _is_valid_hk_result, _hk_hedge_budget)
+            if outcome.winner is not None:
+                return outcome.result
+            calls = [call for call in calls if call[0] not in outcome.attempted]
+
+        for name, call in calls:
+            logger.info(f"🔄 使用{name}获取港股数据: {symbol}")
+            result = call()
+            if _is_valid_hk_result(result):
+                return result
 
-        # 备用方案2：使用FINNHUB（付费用户可用）
+        # 最后的备用方案：使用FINNHUB（付费用户可用）
         try:
             from .optimized_us_data import get_us_stock_data_cached
             logger.info(f"🔄 使用FINNHUB获取港股数据: {symbol}")
@@ -1452,6 +1504,7 @@ def get_hk_stock_data_unified(symbol: str, start_date: str = None, end_date: str
         return f"❌ 获取港股{symbol}数据失败: {e}"
 
 
+@analysis_memoized("hk_stock_info")
 def get_hk_stock_info_unified(symbol: str) -> Dict:
     """
     获取港股信息的统一接口
@@ -1463,8 +1516,11 @@ def get_hk_stock_info_unified(symbol: str) -> Dict:
         Dict: 港股信息
     """
     try:
+        get_hk_stock_info_akshare = _optional_import(".akshare_utils", "get_hk_stock_info_akshare", "AKShare港股工具")
+        get_hk_stock_info = _optional_import(".hk_stock_utils", "get_hk_stock_info", "港股工具")
+
         # 优先使用AKShare（国内数据源，港股支持更好）
-        if AKSHARE_HK_AVAILABLE:
+        if get_hk_stock_info_akshare is not None:
             try:
                 logger.info(f"🔄 优先使用AKShare获取港股信息: {symbol}")
                 result = get_hk_stock_info_akshare(symbol)
@@ -1477,7 +1533,7 @@ def get_hk_stock_info_unified(symbol: str) -> Dict:
                 logger.error(f"⚠️ AKShare港股信息获取失败: {e}")
 
         # 备用方案1：使用Yahoo Finance港股工具
-        if HK_STOCK_AVAILABLE:
+        if get_hk_stock_info is not None:
             try:
                 logger.info(f"🔄 使用Yahoo Finance备用方案获取港股信息: {symbol}")
                 result = get_hk_stock_info(symbol)
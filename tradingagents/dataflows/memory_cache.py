@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+进程内L1内存缓存
+按字节数（而不是条目数）限制容量的LRU缓存，放在Redis/MongoDB/文件缓存前面，
+同一进程内重复读取同一条缓存时不再反序列化。每个条目的过期时间与后端条目一致。
+"""
+
+import os
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import pandas as pd
+
+
+def l1_cache_max_bytes() -> int:
+    """L1内存缓存容量（环境变量 TRADINGAGENTS_L1_CACHE_MB，默认64MB）"""
+    return int(float(os.getenv("TRADINGAGENTS_L1_CACHE_MB", "64")) * 1024 * 1024)
+
+
+def estimate_size(value: Any) -> int:
+    """估算对象占用的内存字节数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class MemoryLRUCache:
+    """按字节数限制容量的LRU缓存（线程安全）"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[Any]:
+        """读取条目，不存在或已过期时返回None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, _, expires_at = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # 返回副本，调用方修改DataFrame不会影响缓存
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def contains(self, key: Hashable, now: Optional[float] = None) -> bool:
+        """条目存在且未过期（不计入命中统计）"""
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[2] > now
+
+    def put(self, key: Hashable, value: Any, ttl_seconds: float, now: Optional[float] = None) -> bool:
+        """
+        写入条目，超过容量时淘汰最久未使用的条目
+
+        Returns:
+            是否写入；已过期或单个条目超过总容量时不写入
+        """
+        if value is None or ttl_seconds <= 0:
+            return False
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return False
+
+        now = time.time() if now is None else now
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self._bytes + size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            self._entries[key] = (value.copy() if isinstance(value, pd.DataFrame) else value,
+                                  size, now + ttl_seconds)
+            self._bytes += size
+        return True
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -8,9 +8,12 @@ import os
 import time
 import random
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
+from .background_refresh import get_background_refresher
 from .cache_manager import get_cache
 from .config import get_config
+from .data_context import get_current_data_context
+from .data_types import StockDataResult
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -38,7 +41,14 @@ class OptimizedChinaDataProvider:
             time.sleep(wait_time)
         
         self.last_api_call = time.time()
+
+    def _stale_grace_seconds(self) -> float:
+        """过期缓存的宽限期（秒），宽限期内直接返回过期数据并在后台刷新，0表示关闭"""
+        return float(self.config.get("cache_stale_grace_hours", 0) or 0) * 3600
     
+    # 缓存中结构化行情结果的数据源标识
+    RESULT_CACHE_SOURCE = "unified_result"
+
     def get_stock_data(self, symbol: str, start_date: str, end_date: str, 
                       force_refresh: bool = False) -> str:
         """
@@ -53,75 +63,122 @@ class OptimizedChinaDataProvider:
         Returns:
             格式化的股票数据字符串
         """
+        result = self.get_stock_data_result(symbol, start_date, end_date, force_refresh)
+        if result.ok:
+            return result.to_text()
+
+        # 尝试从旧缓存获取数据
+        old_cache = self._try_get_old_cache(symbol, start_date, end_date)
+        if old_cache:
+            logger.info(f"📁 使用过期缓存数据: {symbol}")
+            return old_cache
+
+        # 生成备用数据
+        return self._generate_fallback_data(symbol, start_date, end_date, result.message or "数据源API调用失败")
+
+    def get_stock_data_result(self, symbol: str, start_date: str, end_date: str,
+                              force_refresh: bool = False, source=None) -> StockDataResult:
+        """
+        获取A股数据的结构化结果 - 优先使用缓存
+
+        缓存中保存的是StockDataResult（行情表和行情摘要），不是格式化后的文本。
+
+        Args:
+            source: 只从指定数据源（ChinaDataSource）获取，不降级；默认按数据源管理器的顺序获取
+
+        Returns:
+            StockDataResult，获取失败时status不是OK
+        """
         logger.info(f"📈 获取A股数据: {symbol} ({start_date} 到 {end_date})")
         
         # 检查缓存（除非强制刷新）
         if not force_refresh:
-            cache_key = self.cache.find_cached_stock_data(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date,
-                data_source="tdx"
-            )
-            
-            if cache_key:
-                cached_data = self.cache.load_stock_data(cache_key)
-                if cached_data:
-                    logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
-                    return cached_data
-        
-        # 缓存未命中，从Tushare数据接口获取
-        logger.info(f"🌐 从Tushare数据接口获取数据: {symbol}")
+            cached = self._load_cached_result(symbol, start_date, end_date)
+            if cached is not None:
+                logger.info(f"⚡ 从缓存加载A股数据: {symbol}")
+                return cached
+
+            # 宽限期内的过期缓存直接返回，在后台刷新
+            stale = self._load_cached_result(symbol, start_date, end_date,
+                                             max_stale_seconds=self._stale_grace_seconds())
+            if stale is not None:
+                logger.info(f"⚡ 使用过期缓存并在后台刷新A股数据: {symbol}")
+                get_background_refresher().submit(("china_stock_data", symbol, start_date, end_date),
+                                                  self._fetch_stock_data_result, symbol, start_date, end_date)
+                return stale
+
+        return self._fetch_stock_data_result(symbol, start_date, end_date, source)
+
+    def _fetch_stock_data_result(self, symbol: str, start_date: str, end_date: str,
+                                 source=None) -> StockDataResult:
+        """从统一数据源接口获取结构化结果并写入缓存"""
+        logger.info(f"🌐 从统一数据源接口获取数据: {symbol}")
         
         try:
             # API限制处理
             self._wait_for_rate_limit()
             
-            # 调用统一数据源接口（默认Tushare，支持备用数据源）
-            from .data_source_manager import get_china_stock_data_unified
+            # 调用统一数据源接口（支持备用数据源）
+            from .data_source_manager import get_china_stock_data_result, get_data_source_manager
 
-            formatted_data = get_china_stock_data_unified(
-                symbol=symbol,
-                start_date=start_date,
-                end_date=end_date
-            )
+            if source is None:
+                result = get_china_stock_data_result(symbol, start_date, end_date)
+            else:
+                result = get_data_source_manager().get_stock_data_result_from(source, symbol, start_date, end_date)
 
             # 检查是否获取成功
-            if "❌" in formatted_data or "错误" in formatted_data:
-                logger.error(f"❌ 数据源API调用失败: {symbol}")
-                # 尝试从旧缓存获取数据
-                old_cache = self._try_get_old_cache(symbol, start_date, end_date)
-                if old_cache:
-                    logger.info(f"📁 使用过期缓存数据: {symbol}")
-                    return old_cache
-
-                # 生成备用数据
-                return self._generate_fallback_data(symbol, start_date, end_date, "数据源API调用失败")
+            if not result.ok:
+                logger.error(f"❌ 数据源API调用失败: {symbol} ({result.status.value})")
+                return result
             
             # 保存到缓存
             self.cache.save_stock_data(
                 symbol=symbol,
-                data=formatted_data,
+                data=result.to_json(),
                 start_date=start_date,
                 end_date=end_date,
-                data_source="unified"  # 使用统一数据源标识
+                data_source=self.RESULT_CACHE_SOURCE
             )
             
             logger.info(f"✅ A股数据获取成功: {symbol}")
-            return formatted_data
+            return result
             
         except Exception as e:
-            error_msg = f"Tushare数据接口调用异常: {str(e)}"
+            error_msg = f"数据源接口调用异常: {str(e)}"
             logger.error(f"❌ {error_msg}")
-            
-            # 尝试从旧缓存获取数据
-            old_cache = self._try_get_old_cache(symbol, start_date, end_date)
-            if old_cache:
-                logger.info(f"📁 使用过期缓存数据: {symbol}")
-                return old_cache
-            
-            # 生成备用数据
-            return self._generate_fallback_data(symbol, start_date, end_date, error_msg)
+            return StockDataResult.failure(symbol, start_date, end_date, "unified", error_msg)
+
+    def _load_cached_result(self, symbol: str, start_date: str, end_date: str,
+                            max_stale_seconds: Optional[float] = None) -> Optional[StockDataResult]:
+        """加载同一日期区间的结构化缓存结果，指定 max_stale_seconds 时查找宽限期内的过期缓存"""
+        if max_stale_seconds is None:
+            cache_key = self.cache.find_cached_stock_data(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                data_source=self.RESULT_CACHE_SOURCE
+            )
+        else:
+            cache_key = self.cache.find_stale_stock_data(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                data_source=self.RESULT_CACHE_SOURCE,
+                max_stale_seconds=max_stale_seconds
+            )
+        if not cache_key:
+            return None
+        payload = self.cache.load_stock_data(cache_key)
+        if not isinstance(payload, str):
+            return None
+        try:
+            result = StockDataResult.from_json(payload)
+        except (ValueError, KeyError, TypeError):
+            return None
+        # 同一股票其他日期区间的缓存不能直接使用
+        if (result.start_date, result.end_date) != (start_date, end_date):
+            return None
+        return result
     
     def get_fundamentals_data(self, symbol: str, force_refresh: bool = False) -> str:
         """
@@ -135,10 +192,16 @@ class OptimizedChinaDataProvider:
             格式化的基本面数据字符串
         """
         logger.info(f"📊 获取A股基本面数据: {symbol}")
-        
+
+        # 回测中按模拟交易日期生成报告，缓存按日期区分，不与实时报告混用
+        context = get_current_data_context()
+        as_of = str(context.as_of)[:10] if context is not None and context.as_of else None
+        report_source = f"tdx_analysis@{as_of}" if as_of else "tdx_analysis"
+
         # 检查缓存（除非强制刷新）
         if not force_refresh:
             # 查找基本面数据缓存
+            stale_key = None
             for metadata_file in self.cache.metadata_dir.glob(f"*_meta.json"):
                 try:
                     import json
@@ -147,7 +210,8 @@ class OptimizedChinaDataProvider:
                     
                     if (metadata.get('symbol') == symbol and 
                         metadata.get('data_type') == 'fundamentals' and
-                        metadata.get('market_type') == 'china'):
+                        metadata.get('market_type') == 'china' and
+                        self._is_report_source(metadata.get('data_source'), report_source)):
                         
                         cache_key = metadata_file.stem.replace('_meta', '')
                         if self.cache.is_cache_valid(cache_key, symbol=symbol, data_type='fundamentals'):
@@ -155,27 +219,41 @@ class OptimizedChinaDataProvider:
                             if cached_data:
                                 logger.info(f"⚡ 从缓存加载A股基本面数据: {symbol}")
                                 return cached_data
+                        elif stale_key is None:
+                            staleness = self.cache.get_cache_staleness(cache_key, symbol=symbol, data_type='fundamentals')
+                            if staleness is not None and staleness <= self._stale_grace_seconds():
+                                stale_key = cache_key
                 except Exception:
                     continue
+
+            # 宽限期内的过期缓存直接返回，在后台重新生成（回测报告不会过时，不走此路径）
+            if stale_key and not as_of:
+                cached_data = self.cache.load_stock_data(stale_key)
+                if cached_data:
+                    logger.info(f"⚡ 使用过期缓存并在后台刷新A股基本面数据: {symbol}")
+                    get_background_refresher().submit(("china_fundamentals", symbol),
+                                                      self.get_fundamentals_data, symbol, force_refresh=True)
+                    return cached_data
         
         # 缓存未命中，生成基本面分析
         logger.debug(f"🔍 生成A股基本面分析: {symbol}")
         
         try:
             # 先获取股票数据
-            current_date = datetime.now().strftime('%Y-%m-%d')
-            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            analysis_date = datetime.strptime(as_of, '%Y-%m-%d') if as_of else datetime.now()
+            current_date = analysis_date.strftime('%Y-%m-%d')
+            start_date = (analysis_date - timedelta(days=30)).strftime('%Y-%m-%d')
             
-            stock_data = self.get_stock_data(symbol, start_date, current_date)
+            stock_data = self.get_stock_data_result(symbol, start_date, current_date)
             
             # 生成基本面分析报告
-            fundamentals_data = self._generate_fundamentals_report(symbol, stock_data)
+            fundamentals_data = self._generate_fundamentals_report(symbol, stock_data, analysis_date)
             
             # 保存到缓存
             self.cache.save_fundamentals_data(
                 symbol=symbol,
                 fundamentals_data=fundamentals_data,
-                data_source="tdx_analysis"
+                data_source=report_source
             )
             
             logger.info(f"✅ A股基本面数据生成成功: {symbol}")
@@ -186,74 +264,44 @@ class OptimizedChinaDataProvider:
             logger.error(f"❌ {error_msg}")
             return self._generate_fallback_fundamentals(symbol, error_msg)
     
-    def _generate_fundamentals_report(self, symbol: str, stock_data: str) -> str:
-        """基于股票数据生成真实的基本面分析报告"""
+    @staticmethod
+    def _is_report_source(data_source: Optional[str], report_source: str) -> bool:
+        """缓存的报告是否对应当前日期：回测报告必须同一模拟日期，实时报告不使用回测报告"""
+        data_source = str(data_source or '')
+        if '@' in report_source:
+            return data_source == report_source
+        return '@' not in data_source
+
+    def _generate_fundamentals_report(self, symbol: str, stock_data: Union[StockDataResult, str],
+                                      analysis_date: Optional[datetime] = None) -> str:
+        """基于股票数据生成真实的基本面分析报告，analysis_date 默认为当前时间"""
+        analysis_date = analysis_date or datetime.now()
 
-        # 添加详细的股票代码追踪日志
         logger.debug(f"🔍 [股票代码追踪] _generate_fundamentals_report 接收到的股票代码: '{symbol}' (类型: {type(symbol)})")
-        logger.debug(f"🔍 [股票代码追踪] 股票代码长度: {len(str(symbol))}")
-        logger.debug(f"🔍 [股票代码追踪] 股票代码字符: {list(str(symbol))}")
-        logger.debug(f"🔍 [股票代码追踪] 接收到的股票数据前200字符: {stock_data[:200] if stock_data else 'None'}")
 
-        # 从股票数据中提取信息
+        if isinstance(stock_data, str):
+            # 兼容直接传入格式化文本的调用方
+            stock_data = StockDataResult.from_text(symbol, None, None, "text", stock_data)
+
+        # 从结构化行情摘要中取得信息
+        quote = stock_data.quote if stock_data.ok else None
         company_name = "未知公司"
-        current_price = "N/A"
-        volume = "N/A"
-        change_pct = "N/A"
+        current_price = f"¥{quote.price:.2f}" if quote and quote.price is not None else "N/A"
+        change_pct = f"{quote.change_pct:+.2f}%" if quote and quote.change_pct is not None else "N/A"
+        volume = f"{quote.volume:,.0f}" if quote and quote.volume else "N/A"
 
-        # 首先尝试从统一接口获取股票基本信息
+        # 股票名称来自统一接口的结构化股票信息，其次是行情摘要
         try:
-            logger.debug(f"🔍 [股票代码追踪] 尝试获取{symbol}的基本信息...")
-            from .interface import get_china_stock_info_unified
+            from .data_source_manager import get_china_stock_info_unified
             stock_info = get_china_stock_info_unified(symbol)
-            logger.debug(f"🔍 [股票代码追踪] 获取到的股票信息: {stock_info}")
-
-            if "股票名称:" in stock_info:
-                lines = stock_info.split('\n')
-                for line in lines:
-                    if "股票名称:" in line:
-                        company_name = line.split(':')[1].strip()
-                        logger.debug(f"🔍 [股票代码追踪] 从统一接口获取到股票名称: {company_name}")
-                        break
+            name = stock_info.get('name') if isinstance(stock_info, dict) else None
+            if name and not str(name).startswith('股票'):
+                company_name = name
+                logger.debug(f"🔍 [股票代码追踪] 从统一接口获取到股票名称: {company_name}")
         except Exception as e:
             logger.warning(f"⚠️ 获取股票基本信息失败: {e}")
-
-        # 然后从股票数据中提取价格信息
-        if "股票名称:" in stock_data:
-            lines = stock_data.split('\n')
-            for line in lines:
-                if "股票名称:" in line and company_name == "未知公司":
-                    company_name = line.split(':')[1].strip()
-                elif "当前价格:" in line:
-                    current_price = line.split(':')[1].strip()
-                elif "涨跌幅:" in line:
-                    change_pct = line.split(':')[1].strip()
-                elif "成交量:" in line:
-                    volume = line.split(':')[1].strip()
-
-        # 尝试从股票数据表格中提取最新价格信息
-        if current_price == "N/A" and stock_data:
-            try:
-                lines = stock_data.split('\n')
-                for i, line in enumerate(lines):
-                    if "最新数据:" in line and i + 1 < len(lines):
-                        # 查找数据行
-                        for j in range(i + 1, min(i + 5, len(lines))):
-                            data_line = lines[j].strip()
-                            if data_line and not data_line.startswith('日期') and not data_line.startswith('-'):
-                                # 尝试解析数据行
-                                parts = data_line.split()
-                                if len(parts) >= 4:
-                                    try:
-                                        # 假设格式: 日期 股票代码 开盘 收盘 最高 最低 成交量 成交额...
-                                        current_price = parts[3]  # 收盘价
-                                        logger.debug(f"🔍 [股票代码追踪] 从数据表格提取到收盘价: {current_price}")
-                                        break
-                                    except (IndexError, ValueError):
-                                        continue
-                        break
-            except Exception as e:
-                logger.debug(f"🔍 [股票代码追踪] 解析股票数据表格失败: {e}")
+        if company_name == "未知公司" and quote and quote.name:
+            company_name = quote.name
 
         # 根据股票代码判断行业和基本信息
         logger.debug(f"🔍 [股票代码追踪] 调用 _get_industry_info，传入参数: '{symbol}'")
@@ -289,7 +337,7 @@ class OptimizedChinaDataProvider:
 - **当前股价**: {current_price}
 - **涨跌幅**: {change_pct}
 - **成交量**: {volume}
-- **分析日期**: {datetime.now().strftime('%Y年%m月%d日')}{data_source_note}
+- **分析日期**: {analysis_date.strftime('%Y年%m月%d日')}{data_source_note}
 
 ## 💰 财务数据分析
 
@@ -1077,7 +1125,9 @@ class OptimizedChinaDataProvider:
                         
                         cache_key = metadata_file.stem.replace('_meta', '')
                         cached_data = self.cache.load_stock_data(cache_key)
-                        if cached_data:
+                        if cached_data and isinstance(cached_data, str):
+                            if metadata.get('data_source') == self.RESULT_CACHE_SOURCE:
+                                cached_data = StockDataResult.from_json(cached_data).to_text()
                             return cached_data + "\n\n⚠️ 注意: 使用的是过期缓存数据"
                 except Exception:
                     continue
@@ -11,8 +11,11 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 import yfinance as yf
 import pandas as pd
+from .background_refresh import get_background_refresher
 from .cache_manager import get_cache
 from .config import get_config
+from .data_context import analysis_memoized
+from .point_in_time import history_frame, yfinance_history
 
 # 导入日志模块
 from tradingagents.utils.logging_manager import get_logger
@@ -41,6 +44,10 @@ class OptimizedUSDataProvider:
             time.sleep(wait_time)
         
         self.last_api_call = time.time()
+
+    def _stale_grace_seconds(self) -> float:
+        """过期缓存的宽限期（秒），宽限期内直接返回过期数据并在后台刷新，0表示关闭"""
+        return float(self.config.get("cache_stale_grace_hours", 0) or 0) * 3600
     
     def get_stock_data(self, symbol: str, start_date: str, end_date: str, 
                       force_refresh: bool = False) -> str:
@@ -82,8 +89,28 @@ class OptimizedUSDataProvider:
                 if cached_data:
                     logger.info(f"⚡ 从缓存加载美股数据: {symbol}")
                     return cached_data
-        
-        # 缓存未命中，从API获取 - 优先使用FINNHUB
+
+            # 宽限期内的过期缓存直接返回，在后台刷新
+            for data_source in ("finnhub", "yfinance"):
+                stale_key = self.cache.find_stale_stock_data(
+                    symbol=symbol,
+                    start_date=start_date,
+                    end_date=end_date,
+                    data_source=data_source,
+                    max_stale_seconds=self._stale_grace_seconds()
+                )
+                cached_data = self.cache.load_stock_data(stale_key) if stale_key else None
+                if cached_data:
+                    logger.info(f"⚡ 使用过期缓存并在后台刷新美股数据: {symbol}")
+                    get_background_refresher().submit(("us_stock_data", symbol, start_date, end_date),
+                                                      self._fetch_stock_data, symbol, start_date, end_date)
+                    return cached_data
+
+        return self._fetch_stock_data(symbol, start_date, end_date)
+
+    def _fetch_stock_data(self, symbol: str, start_date: str, end_date: str) -> str:
+        """从API获取美股数据并写入缓存"""
+        # 从API获取 - 优先使用FINNHUB
         formatted_data = None
         data_source = None
 
@@ -145,9 +172,8 @@ class OptimizedUSDataProvider:
                     logger.info(f"🇺🇸 从Yahoo Finance API获取美股数据: {symbol}")
                     self._wait_for_rate_limit()
 
-                    # 获取数据
-                    ticker = yf.Ticker(symbol.upper())
-                    data = ticker.history(start=start_date, end=end_date)
+                    # 获取数据（回测中从预加载的历史切片）
+                    data = history_frame("yfinance_daily", symbol.upper(), start_date, end_date, yfinance_history)
 
                     if data.empty:
                         error_msg = f"未找到股票 '{symbol}' 在 {start_date} 到 {end_date} 期间的数据"
@@ -179,6 +205,28 @@ class OptimizedUSDataProvider:
 
         return formatted_data
     
+    def refresh_from_yfinance(self, symbol: str, start_date: str, end_date: str) -> Optional[str]:
+        """
+        只从Yahoo Finance获取美股数据（不经过Finnhub）并写入缓存，
+        分析上下文中有预加载的历史时直接切片（缓存预热批量下载后使用）
+
+        Returns:
+            格式化的股票数据字符串，没有数据时返回None
+        """
+        data = history_frame("yfinance_daily", symbol.upper(), start_date, end_date, yfinance_history)
+        if data is None or data.empty:
+            return None
+
+        formatted_data = self._format_stock_data(symbol, data, start_date, end_date)
+        self.cache.save_stock_data(
+            symbol=symbol,
+            data=formatted_data,
+            start_date=start_date,
+            end_date=end_date,
+            data_source="yfinance"
+        )
+        return formatted_data
+
     def _format_stock_data(self, symbol: str, data: pd.DataFrame, 
                           start_date: str, end_date: str) -> str:
         """格式化股票数据为字符串"""
@@ -354,6 +402,7 @@ def get_optimized_us_data_provider() -> OptimizedUSDataProvider:
     return _us_data_provider
 
 
+@analysis_memoized("us_stock_data_cached")
 def get_us_stock_data_cached(symbol: str, start_date: str, end_date: str, 
                            force_refresh: bool = False) -> str:
     """
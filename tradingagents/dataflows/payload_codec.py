@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Redis / MongoDB 缓存内容的压缩编码
+
+编码后的内容以 b"TAC\\x01" 开头，随后是编解码器标记（长度 + 名称）和压缩后的数据：
+
+- zstd:      zstd压缩（需要安装 zstandard：pip install -e ".[compression]"）
+- zstd:<id>: 使用训练好的zstd字典压缩（字典按id保存在字典目录中，解压时按id查找）
+- zlib:      未安装 zstandard 时使用标准库zlib
+- raw:       内容太短，不压缩
+
+没有这个前缀的内容是压缩功能上线前写入的旧条目，原样返回，仍然可以读取。
+"""
+
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+MAGIC = b"TAC\x01"
+# 短于这个字节数的内容不压缩
+MIN_COMPRESS_BYTES = 256
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# 字典不放在缓存目录中，清理缓存时不会被删除
+DEFAULT_DICT_DIR = Path(__file__).resolve().parents[2] / "data" / "zstd_dicts"
+
+
+def compression_codec() -> str:
+    """配置的压缩算法（环境变量 TRADINGAGENTS_CACHE_COMPRESSION: zstd / zlib / none）"""
+    codec = os.getenv("TRADINGAGENTS_CACHE_COMPRESSION", "zstd").lower()
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        return "zlib"
+    return codec if codec in ("zstd", "zlib", "none") else "zstd"
+
+
+def dictionary_dir() -> Path:
+    return Path(os.getenv("TRADINGAGENTS_CACHE_DICT_DIR", str(DEFAULT_DICT_DIR)))
+
+
+class _Dictionaries:
+    """按id缓存的zstd字典；压缩使用字典目录中最新的字典"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_dir: Optional[Path] = None
+        self._by_id: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._current: Optional[int] = None
+        # 已经为其重新扫描过目录但仍未找到的字典id
+        self._rescanned = set()
+
+    def _ensure_loaded(self):
+        directory = dictionary_dir()
+        if self._loaded_dir == directory:
+            return
+        self._by_id.clear()
+        self._current = None
+        if ZSTD_AVAILABLE and directory.exists():
+            files = sorted(directory.glob("*.dict"), key=lambda path: path.stat().st_mtime)
+            for path in files:
+                try:
+                    dictionary = zstandard.ZstdCompressionDict(path.read_bytes())
+                    self._by_id[dictionary.dict_id()] = dictionary
+                    self._current = dictionary.dict_id()
+                except Exception as e:
+                    logger.warning(f"⚠️ 加载zstd字典失败 {path}: {e}")
+        self._loaded_dir = directory
+
+    def current(self) -> Optional["zstandard.ZstdCompressionDict"]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_id.get(self._current) if self._current is not None else None
+
+    def get(self, dict_id: int) -> Optional["zstandard.ZstdCompressionDict"]:
+        with self._lock:
+            self._ensure_loaded()
+            if dict_id not in self._by_id and dict_id not in self._rescanned:
+                # 字典可能是其他进程启动后新训练的：每个未知id只重新扫描一次目录
+                self._rescanned.add(dict_id)
+                self._loaded_dir = None
+                self._ensure_loaded()
+            return self._by_id.get(dict_id)
+
+    def reload(self):
+        with self._lock:
+            self._loaded_dir = None
+            self._rescanned.clear()
+
+
+_dictionaries = _Dictionaries()
+
+
+def _frame(tag: str, body: bytes) -> bytes:
+    tag_bytes = tag.encode("ascii")
+    return MAGIC + bytes([len(tag_bytes)]) + tag_bytes + body
+
+
+def _unframe(payload: bytes) -> Tuple[str, bytes]:
+    tag_length = payload[len(MAGIC)]
+    start = len(MAGIC) + 1
+    return payload[start:start + tag_length].decode("ascii"), payload[start + tag_length:]
+
+
+def encode_payload(data: Union[bytes, str], codec: Optional[str] = None) -> bytes:
+    """压缩内容并加上编解码器标记"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    codec = codec or compression_codec()
+
+    if codec == "none" or len(data) < MIN_COMPRESS_BYTES:
+        return _frame("raw", data)
+    if codec == "zstd":
+        dictionary = _dictionaries.current()
+        if dictionary is not None:
+            compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dictionary)
+            return _frame(f"zstd:{dictionary.dict_id()}", compressor.compress(data))
+        return _frame("zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data))
+    return _frame("zlib", zlib.compress(data, ZLIB_LEVEL))
+
+
+def decode_payload(payload: Union[bytes, str]) -> bytes:
+    """
+    解压内容；没有编解码器标记的旧条目原样返回
+
+    Raises:
+        ValueError: 未知的编解码器，或解压需要的字典不存在
+    """
+    if isinstance(payload, str):
+        return payload.encode("utf-8")
+    payload = bytes(payload)
+    if not payload.startswith(MAGIC):
+        return payload
+
+    tag, body = _unframe(payload)
+    if tag == "raw":
+        return body
+    if tag == "zlib":
+        return zlib.decompress(body)
+    if tag.startswith("zstd"):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("缓存内容使用zstd压缩，但未安装zstandard")
+        if tag == "zstd":
+            return zstandard.ZstdDecompressor().decompress(body)
+        dict_id = int(tag.split(":", 1)[1])
+        dictionary = _dictionaries.get(dict_id)
+        if dictionary is None:
+            raise ValueError(f"缺少zstd字典: {dict_id}")
+        return zstandard.ZstdDecompressor(dict_data=dictionary).decompress(body)
+    raise ValueError(f"未知的缓存编解码器: {tag}")
+
+
+def payload_codec(payload: Union[bytes, str]) -> str:
+    """内容的编解码器标记；旧条目返回 legacy"""
+    if isinstance(payload, str) or not bytes(payload).startswith(MAGIC):
+        return "legacy"
+    return _unframe(bytes(payload))[0]
+
+
+def train_dictionary(samples: Iterable[Union[bytes, str]], dict_size: int = 112640) -> Optional[int]:
+    """
+    用样本（如缓存的报告文本）训练zstd字典并保存到字典目录，之后写入的缓存使用该字典压缩
+
+    Returns:
+        字典id；未安装zstandard或样本不足时返回None
+    """
+    if not ZSTD_AVAILABLE:
+        logger.warning("⚠️ 未安装zstandard，无法训练字典")
+        return None
+    samples = [sample.encode("utf-8") if isinstance(sample, str) else sample for sample in samples]
+    try:
+        dictionary = zstandard.train_dictionary(dict_size, samples)
+    except Exception as e:
+        logger.warning(f"⚠️ 训练zstd字典失败（样本数{len(samples)}）: {e}")
+        return None
+
+    directory = dictionary_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{dictionary.dict_id()}.dict").write_bytes(dictionary.as_bytes())
+    _dictionaries.reload()
+    logger.info(f"📚 已训练zstd字典: id={dictionary.dict_id()}, 样本{len(samples)}个, 大小{len(dictionary.as_bytes())}字节")
+    return dictionary.dict_id()
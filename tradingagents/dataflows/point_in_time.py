@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+回测用的时间点数据
+
+回测在一段日期上逐日运行分析，相邻日期请求的行情窗口大部分重叠。PointInTimeHistory
+在第一次请求某只股票的行情时加载整个回测区间（含回看窗口）的完整历史，之后每个模拟交易日
+只从内存中切片，并且切片不会超过该日期（不会看到未来数据）。
+
+行情获取点通过 history_frame() 接入：没有激活回测历史时直接调用原来的获取函数。
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from .data_context import AnalysisDataContext, clamp_date, get_current_data_context
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 与模拟日期无关、整个回测只需获取一次的数据集
+DEFAULT_STATIC_DATASETS = ("china_stock_info", "hk_stock_info")
+
+# 行情表中可能的日期列
+_DATE_COLUMNS = ("date", "Date", "trade_date", "日期", "datetime", "time")
+
+FrameLoader = Callable[[str, str, str], Optional[pd.DataFrame]]
+
+
+def frame_dates(frame: pd.DataFrame) -> Optional[pd.Series]:
+    """取出行情表每行的日期（DatetimeIndex或日期列），无法识别时返回None"""
+    if isinstance(frame.index, pd.DatetimeIndex):
+        index = frame.index.tz_localize(None) if frame.index.tz is not None else frame.index
+        return pd.Series(index.normalize(), index=frame.index)
+    for column in _DATE_COLUMNS:
+        if column in frame.columns:
+            dates = pd.to_datetime(frame[column].astype(str), errors="coerce")
+            if dates.dt.tz is not None:
+                dates = dates.dt.tz_localize(None)
+            return dates.dt.normalize()
+    return None
+
+
+def slice_frame(frame: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+    """按日期闭区间 [start_date, end_date] 切片"""
+    dates = frame_dates(frame)
+    if dates is None:
+        return frame
+    mask = (dates >= pd.Timestamp(start_date)) & (dates <= pd.Timestamp(end_date))
+    return frame.loc[mask.values].copy()
+
+
+class PointInTimeHistory:
+    """回测期间共享的完整行情历史和静态数据"""
+
+    def __init__(self, start_date: str, end_date: str, lookback_days: int = 365,
+                 static_datasets: Iterable[str] = DEFAULT_STATIC_DATASETS):
+        """
+        Args:
+            start_date: 回测第一个交易日
+            end_date: 回测最后一个交易日
+            lookback_days: 预加载的回看天数，需覆盖分析师请求的最长窗口
+            static_datasets: 整个回测只获取一次的数据集
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.load_start = (datetime.strptime(start_date, "%Y-%m-%d") - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
+        # 多加载一天，兼容结束日期不含当天的数据源（如yfinance）
+        self.load_end = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+        self.static_datasets = frozenset(static_datasets)
+        self._frames: Dict[Tuple[str, str], Optional[pd.DataFrame]] = {}
+        self._loading: Dict[Tuple[str, str], threading.Event] = {}
+        self._lock = threading.Lock()
+        self._static = AnalysisDataContext("backtest_static")
+        self.loads = 0
+        self.slices = 0
+        self.fallbacks = 0
+
+    # ---- 静态数据 ----
+
+    def is_static(self, dataset: str) -> bool:
+        return dataset in self.static_datasets
+
+    def get_static(self, dataset: str, fetcher: Callable, *args, **kwargs) -> Any:
+        return self._static.get_or_fetch(dataset, fetcher, *args, **kwargs)
+
+    # ---- 行情 ----
+
+    def _load(self, key: Tuple[str, str], loader: FrameLoader) -> Optional[pd.DataFrame]:
+        """加载完整历史，同一股票并发请求只加载一次"""
+        with self._lock:
+            if key in self._frames:
+                return self._frames[key]
+            event = self._loading.get(key)
+            owner = event is None
+            if owner:
+                event = self._loading[key] = threading.Event()
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                return self._frames.get(key)
+
+        frame = None
+        try:
+            frame = loader(key[1], self.load_start, self.load_end)
+            if frame is not None and (frame.empty or frame_dates(frame) is None):
+                frame = None
+            if frame is not None:
+                logger.info(f"📚 [回测数据] 预加载 {key[0]} {key[1]}: "
+                            f"{self.load_start} ~ {self.load_end}，{len(frame)}条")
+        except Exception as e:
+            logger.warning(f"⚠️ [回测数据] 预加载 {key[0]} {key[1]} 失败: {e}")
+        finally:
+            with self._lock:
+                self._frames[key] = frame
+                self.loads += 1
+                self._loading.pop(key, None)
+            event.set()
+        return frame
+
+    def preload(self, dataset: str, symbol: str, frame: pd.DataFrame):
+        """放入已经批量获取的完整历史（覆盖 load_start ~ load_end），之后的请求直接切片"""
+        if frame is None or frame.empty or frame_dates(frame) is None:
+            return
+        with self._lock:
+            self._frames[(dataset, symbol)] = frame
+            self.loads += 1
+
+    def frame(self, dataset: str, symbol: str, start_date: str, end_date: str,
+              loader: FrameLoader, as_of: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        返回 [start_date, min(end_date, as_of)] 的行情切片
+
+        请求超出预加载范围或预加载失败时，直接用loader获取该窗口（仍截断到as_of）。
+        """
+        end_date = clamp_date(end_date, as_of)
+        start_date = clamp_date(start_date, as_of)
+
+        if start_date < self.load_start or end_date > self.end_date:
+            with self._lock:
+                self.fallbacks += 1
+            return loader(symbol, start_date, end_date)
+
+        frame = self._load((dataset, symbol), loader)
+        if frame is None:
+            with self._lock:
+                self.fallbacks += 1
+            return loader(symbol, start_date, end_date)
+
+        with self._lock:
+            self.slices += 1
+        return slice_frame(frame, start_date, end_date)
+
+    def prices(self, dataset: str, symbol: str, loader: FrameLoader) -> Optional[pd.DataFrame]:
+        """完整的预加载行情（供回测计算收益，不受as_of限制）"""
+        return self._load((dataset, symbol), loader)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "slices": self.slices,
+                "fallbacks": self.fallbacks,
+                "static": self._static.stats(),
+            }
+
+
+def yfinance_history(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """Yahoo Finance日线（end_date不含当天，与yfinance一致）"""
+    import yfinance as yf
+
+    return yf.Ticker(symbol).history(start=start_date, end=end_date)
+
+
+def history_frame(dataset: str, symbol: str, start_date: str, end_date: str,
+                  loader: FrameLoader) -> Optional[pd.DataFrame]:
+    """
+    行情获取点：回测中从预加载历史切片，否则直接调用loader
+
+    Args:
+        dataset: 行情数据集名称（区分不同数据源的表结构）
+        symbol: 股票代码
+        start_date: 开始日期
+        end_date: 结束日期
+        loader: 原来的获取函数 loader(symbol, start_date, end_date) -> DataFrame
+    """
+    context = get_current_data_context()
+    if context is None:
+        return loader(symbol, start_date, end_date)
+    if context.history is None:
+        as_of = context.as_of
+        return loader(symbol, clamp_date(start_date, as_of), clamp_date(end_date, as_of))
+    return context.history.frame(dataset, symbol, start_date, end_date, loader, as_of=context.as_of)
@@ -1,12 +1,18 @@
 import requests
 import time
 import json
+import threading
 from datetime import datetime, timedelta
 from contextlib import contextmanager
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Dict, List, Optional
 import os
 import re
 
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
 ticker_to_company = {
     "AAPL": "Apple",
     "MSFT": "Microsoft",
@@ -49,6 +55,172 @@ ticker_to_company = {
 }
 
 
+@lru_cache(maxsize=None)
+def _company_pattern(query: str) -> "re.Pattern":
+    """公司名称和股票代码的预编译匹配模式（与逐词re.search等价）"""
+    company = ticker_to_company[query]
+    search_terms = company.split(" OR ") if "OR" in company else [company]
+    search_terms.append(query)
+    return re.compile("|".join(f"(?:{term})" for term in search_terms), re.IGNORECASE)
+
+
+def _post_date(created_utc) -> str:
+    return datetime.utcfromtimestamp(created_utc).strftime("%Y-%m-%d")
+
+
+def _mentions(pattern: "re.Pattern", post: Dict) -> bool:
+    return bool(pattern.search(post["title"]) or pattern.search(post["content"]))
+
+
+class RedditIndex:
+    """
+    按日期分区的Reddit帖子索引
+
+    一次性读取原始的 {category}/{subreddit}.jsonl，按发帖日期写成分区文件
+    {index_dir}/{category}/{date}.json，每个分区内按子版块保存已按点赞数排序的帖子；
+    公司新闻帖子在入库时用预编译模式标记提到的股票代码。
+    查询某天只读取这一天的分区文件，回看N天只读取N个分区。
+    每个进程首次查询某类别时检查原始文件的大小和修改时间，有变化则重建该类别的分区。
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, data_path: str, index_dir: Optional[str] = None):
+        self.data_path = data_path
+        self.index_dir = index_dir or os.getenv("TRADINGAGENTS_REDDIT_INDEX_DIR") or os.path.join(data_path, ".index")
+        self._lock = threading.Lock()
+        self._manifests: Dict[str, Dict] = {}
+
+    # ---- 入库 ----
+
+    def _source_signature(self, category: str) -> Dict:
+        category_dir = os.path.join(self.data_path, category)
+        entries = os.listdir(category_dir)
+        files = {}
+        for name in entries:
+            if name.endswith(".jsonl"):
+                stat = os.stat(os.path.join(category_dir, name))
+                files[name] = [stat.st_size, stat.st_mtime_ns]
+        # 原接口按类别目录下的全部条目数计算每个子版块的配额，这里保持一致
+        return {"version": self.INDEX_VERSION, "entries": len(entries),
+                "subreddits": [name for name in entries if name.endswith(".jsonl")], "files": files}
+
+    def _manifest_path(self, category: str) -> str:
+        return os.path.join(self.index_dir, category, "manifest.json")
+
+    def ensure(self, category: str) -> Dict:
+        """确保类别的分区是最新的，返回其清单"""
+        with self._lock:
+            manifest = self._manifests.get(category)
+            if manifest is not None:
+                return manifest
+
+            signature = self._source_signature(category)
+            try:
+                with open(self._manifest_path(category), "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = None
+
+            if manifest is None or manifest.get("signature") != signature:
+                manifest = self._build(category, signature)
+            self._manifests[category] = manifest
+            return manifest
+
+    def _build(self, category: str, signature: Dict) -> Dict:
+        """读取类别下的全部原始文件并写入按日期分区的索引"""
+        start = time.time()
+        tag_tickers = "company" in category
+        patterns = {ticker: _company_pattern(ticker) for ticker in ticker_to_company} if tag_tickers else {}
+        partitions: Dict[str, Dict[str, List[Dict]]] = {}
+
+        for subreddit in signature["subreddits"]:
+            with open(os.path.join(self.data_path, category, subreddit), "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    parsed_line = json.loads(line)
+                    post = {
+                        "title": parsed_line["title"],
+                        "content": parsed_line["selftext"],
+                        "url": parsed_line["url"],
+                        "upvotes": parsed_line["ups"],
+                        "posted_date": _post_date(parsed_line["created_utc"]),
+                    }
+                    if tag_tickers:
+                        post["tickers"] = [t for t, pattern in patterns.items() if _mentions(pattern, post)]
+                    partitions.setdefault(post["posted_date"], {}).setdefault(subreddit, []).append(post)
+
+        category_dir = os.path.join(self.index_dir, category)
+        os.makedirs(category_dir, exist_ok=True)
+        for name in os.listdir(category_dir):
+            if name.endswith(".json"):
+                os.remove(os.path.join(category_dir, name))
+        for date, by_subreddit in partitions.items():
+            for posts in by_subreddit.values():
+                posts.sort(key=lambda x: x["upvotes"], reverse=True)
+            with open(os.path.join(category_dir, f"{date}.json"), "w", encoding="utf-8") as f:
+                json.dump(by_subreddit, f, ensure_ascii=False)
+
+        manifest = {"signature": signature, "dates": sorted(partitions)}
+        tmp_path = self._manifest_path(category) + f".{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self._manifest_path(category))
+        logger.info(f"📚 [Reddit索引] {category}: {len(partitions)}个日期分区，耗时{time.time() - start:.1f}秒")
+        return manifest
+
+    # ---- 查询 ----
+
+    def _partition(self, category: str, date: str) -> Dict[str, List[Dict]]:
+        try:
+            with open(os.path.join(self.index_dir, category, f"{date}.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def top_posts(self, category: str, date: str, max_limit: int, query: Optional[str] = None) -> List[Dict]:
+        """与fetch_top_from_category相同的结果，只读取当天的分区"""
+        manifest = self.ensure(category)
+        entries = manifest["signature"]["entries"]
+        if max_limit < entries:
+            raise ValueError(
+                "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
+            )
+        limit_per_subreddit = max_limit // entries
+
+        partition = self._partition(category, date)
+        filter_company = "company" in category and query
+        if filter_company and query not in ticker_to_company:
+            # 与逐行扫描一致：未登记的股票代码没有公司名称可匹配
+            raise KeyError(query)
+
+        all_content = []
+        for subreddit in manifest["signature"]["subreddits"]:
+            posts = partition.get(subreddit, [])
+            if filter_company:
+                posts = [post for post in posts if query in post.get("tickers", ())]
+            for post in posts[:limit_per_subreddit]:
+                post = dict(post)
+                post.pop("tickers", None)
+                all_content.append(post)
+        return all_content
+
+
+_indexes: Dict[str, RedditIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_reddit_index(data_path: str) -> RedditIndex:
+    """获取数据目录对应的共享索引"""
+    key = os.path.abspath(data_path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = RedditIndex(data_path)
+        return index
+
+
 def fetch_top_from_category(
     category: Annotated[
         str, "Category to fetch top post from. Collection of subreddits."
@@ -61,20 +233,30 @@ def fetch_top_from_category(
         "Path to the data folder. Default is 'reddit_data'.",
     ] = "reddit_data",
 ):
+    try:
+        return get_reddit_index(data_path).top_posts(category, date, max_limit, query)
+    except (OSError, PermissionError) as e:
+        # 索引目录不可写等情况下退回逐行扫描原始文件
+        logger.warning(f"⚠️ [Reddit索引] 索引不可用，扫描原始文件: {e}")
+        return _scan_top_from_category(category, date, max_limit, query, data_path)
+
+
+def _scan_top_from_category(category, date, max_limit, query=None, data_path="reddit_data"):
+    """不使用索引，逐行扫描原始文件"""
     base_path = data_path
 
     all_content = []
+    entries = os.listdir(os.path.join(base_path, category))
 
-    if max_limit < len(os.listdir(os.path.join(base_path, category))):
+    if max_limit < len(entries):
         raise ValueError(
             "REDDIT FETCHING ERROR: max limit is less than the number of files in the category. Will not be able to fetch any posts"
         )
 
-    limit_per_subreddit = max_limit // len(
-        os.listdir(os.path.join(base_path, category))
-    )
+    limit_per_subreddit = max_limit // len(entries)
+    pattern = _company_pattern(query) if "company" in category and query else None
 
-    for data_file in os.listdir(os.path.join(base_path, category)):
+    for data_file in entries:
         # check if data_file is a .jsonl file
         if not data_file.endswith(".jsonl"):
             continue
@@ -82,7 +264,7 @@ def fetch_top_from_category(
         all_content_curr_subreddit = []
 
         with open(os.path.join(base_path, category, data_file), "rb") as f:
-            for i, line in enumerate(f):
+            for line in f:
                 # skip empty lines
                 if not line.strip():
                     continue
@@ -90,33 +272,10 @@ def fetch_top_from_category(
                 parsed_line = json.loads(line)
 
                 # select only lines that are from the date
-                post_date = datetime.utcfromtimestamp(
-                    parsed_line["created_utc"]
-                ).strftime("%Y-%m-%d")
+                post_date = _post_date(parsed_line["created_utc"])
                 if post_date != date:
                     continue
 
-                # if is company_news, check that the title or the content has the company's name (query) mentioned
-                if "company" in category and query:
-                    search_terms = []
-                    if "OR" in ticker_to_company[query]:
-                        search_terms = ticker_to_company[query].split(" OR ")
-                    else:
-                        search_terms = [ticker_to_company[query]]
-
-                    search_terms.append(query)
-
-                    found = False
-                    for term in search_terms:
-                        if re.search(
-                            term, parsed_line["title"], re.IGNORECASE
-                        ) or re.search(term, parsed_line["selftext"], re.IGNORECASE):
-                            found = True
-                            break
-
-                    if not found:
-                        continue
-
                 post = {
                     "title": parsed_line["title"],
                     "content": parsed_line["selftext"],
@@ -125,6 +284,10 @@ def fetch_top_from_category(
                     "posted_date": post_date,
                 }
 
+                # if is company_news, check that the title or the content has the company's name (query) mentioned
+                if pattern is not None and not _mentions(pattern, post):
+                    continue
+
                 all_content_curr_subreddit.append(post)
 
         # sort all_content_curr_subreddit by upvote_ratio in descending order
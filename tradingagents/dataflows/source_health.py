@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+数据源健康度与熔断器
+
+每个数据源维护一个熔断器（closed / open / half-open）和最近调用的滚动窗口（耗时、成败）：
+
+- closed：正常调用；连续失败达到阈值或窗口内错误率过高时打开；
+- open：直接跳过，不再消耗超时时间；冷却时间过后转为 half-open；
+- half-open：只放行一个探测请求，成功则关闭，失败则重新打开并加倍冷却时间。
+
+SourceHealthRegistry.order() 按熔断状态和健康分（成功率 × 延迟因子）对主数据源和备用数据源排序，
+健康分相近（同一档）时保持配置的优先级；冷却结束待探测的数据源回到配置的位置，由下一个请求探测。
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+class CircuitState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class SourceHealth:
+    """单个数据源的熔断器和滚动统计"""
+
+    def __init__(self, name: str, window: int = 20, failure_threshold: int = 3,
+                 error_rate_threshold: float = 0.5, min_calls: int = 5,
+                 cooldown_seconds: float = 60, max_cooldown_seconds: float = 600,
+                 latency_scale_seconds: float = 5.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown_seconds
+        self.max_cooldown = max_cooldown_seconds
+        self.latency_scale = latency_scale_seconds
+
+        self.state = CircuitState.CLOSED
+        self.cooldown = cooldown_seconds
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        # (成功与否, 耗时秒数)
+        self._calls = deque(maxlen=window)
+
+    # ---- 统计 ----
+
+    @property
+    def error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        return sum(1 for ok, _ in self._calls if not ok) / len(self._calls)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        """窗口内调用耗时的分位数，没有样本时返回None"""
+        latencies = sorted(latency for _, latency in self._calls)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, max(0, int(round(q * (len(latencies) - 1)))))
+        return latencies[index]
+
+    def score(self) -> float:
+        """
+        健康分（0~1）：成功率 × 延迟因子
+
+        耗时中位数不超过 latency_scale_seconds 时延迟因子为1，超过后按比例降低；
+        样本不足 min_calls 时为1（保持配置的优先级）。
+        """
+        if self.state == CircuitState.OPEN:
+            return 0.0
+        if len(self._calls) < self.min_calls:
+            return 1.0
+        median = self.latency_percentile(0.5) or 0.0
+        latency_factor = min(1.0, self.latency_scale / median) if median > 0 else 1.0
+        return (1 - self.error_rate) * latency_factor
+
+    def probe_due(self, now: Optional[float] = None) -> bool:
+        """熔断冷却已结束，等待探测请求"""
+        now = time.time() if now is None else now
+        return self.state == CircuitState.OPEN and now - self.opened_at >= self.cooldown
+
+    # ---- 熔断器 ----
+
+    def allow_request(self, now: Optional[float] = None) -> bool:
+        """是否允许调用；open状态冷却结束后转为half-open并放行一个探测请求"""
+        now = time.time() if now is None else now
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            if now - self.opened_at < self.cooldown:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"🔌 数据源{self.name}熔断冷却结束，放行探测请求")
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def available(self, now: Optional[float] = None) -> bool:
+        """是否可以调用（不改变熔断器状态）"""
+        if self.state == CircuitState.OPEN:
+            return self.probe_due(now)
+        if self.state == CircuitState.HALF_OPEN:
+            return not self._probe_in_flight
+        return True
+
+    def record_success(self, latency: float):
+        self._calls.append((True, latency))
+        self.consecutive_failures = 0
+        if self.state != CircuitState.CLOSED:
+            logger.info(f"✅ 数据源{self.name}探测成功，熔断器关闭")
+        self.state = CircuitState.CLOSED
+        self.cooldown = self.base_cooldown
+        self._probe_in_flight = False
+
+    def record_failure(self, latency: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._calls.append((False, latency))
+        self.consecutive_failures += 1
+
+        if self.state == CircuitState.HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open(now)
+        elif self.state == CircuitState.CLOSED and (
+                self.consecutive_failures >= self.failure_threshold or
+                (len(self._calls) >= self.min_calls and self.error_rate >= self.error_rate_threshold)):
+            self._open(now)
+
+    def release(self):
+        """调用结果无法判断数据源是否正常（如股票本身没有数据）时释放探测名额"""
+        if self.state == CircuitState.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def _open(self, now: float):
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self._probe_in_flight = False
+        logger.warning(f"🔌 数据源{self.name}熔断打开: 连续失败{self.consecutive_failures}次, "
+                       f"错误率{self.error_rate:.0%}, {self.cooldown:.0f}秒后探测")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.state.value,
+            'score': round(self.score(), 3),
+            'error_rate': round(self.error_rate, 3),
+            'latency_p50': self.latency_percentile(0.5),
+            'latency_p90': self.latency_percentile(0.9),
+            'calls': len(self._calls),
+            'consecutive_failures': self.consecutive_failures,
+        }
+
+
+class SourceHealthRegistry:
+    """一组数据源的健康度（线程安全）"""
+
+    def __init__(self, **health_options):
+        self._options = health_options
+        self._health: Dict[Hashable, SourceHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, source: Hashable) -> SourceHealth:
+        health = self._health.get(source)
+        if health is None:
+            name = getattr(source, 'value', str(source))
+            health = self._health[source] = SourceHealth(name, **self._options)
+        return health
+
+    def allow_request(self, source: Hashable) -> bool:
+        with self._lock:
+            return self._get(source).allow_request()
+
+    def is_available(self, source: Hashable) -> bool:
+        with self._lock:
+            return self._get(source).available()
+
+    def record_success(self, source: Hashable, latency: float):
+        with self._lock:
+            self._get(source).record_success(latency)
+
+    def record_failure(self, source: Hashable, latency: float):
+        with self._lock:
+            self._get(source).record_failure(latency)
+
+    def release(self, source: Hashable):
+        with self._lock:
+            self._get(source).release()
+
+    def latency_percentile(self, source: Hashable, q: float) -> Optional[float]:
+        with self._lock:
+            return self._get(source).latency_percentile(q)
+
+    def order(self, sources: Iterable[Hashable]) -> List[Hashable]:
+        """按熔断状态和健康分排序；健康分按0.1分档，同一档内保持传入的优先级"""
+        sources = list(sources)
+        now = time.time()
+        keys = {}
+        with self._lock:
+            for index, source in enumerate(sources):
+                health = self._get(source)
+                if health.probe_due(now):
+                    # 待探测的数据源放回配置的位置，让下一个请求探测是否恢复
+                    keys[source] = (False, -1.0, index)
+                else:
+                    keys[source] = (health.state == CircuitState.OPEN, -round(health.score(), 1), index)
+        return sorted(sources, key=keys.__getitem__)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {health.name: health.snapshot() for health in self._health.values()}
@@ -181,11 +181,12 @@ class StockDataService:
     
     def _cache_to_mongodb(self, data: Any) -> bool:
         """将数据缓存到MongoDB"""
-        if not self.db_manager or not self.db_manager.mongodb_db:
+        db = self.db_manager.mongodb_db if self.db_manager else None
+        if db is None:
             return False
         
         try:
-            collection = self.db_manager.mongodb_db['stock_basic_info']
+            collection = db['stock_basic_info']
             
             if isinstance(data, list):
                 # 批量插入
@@ -23,13 +23,13 @@ except ImportError:
     DB_MANAGER_AVAILABLE = False
     logger.warning(f"⚠️ 数据库缓存管理器不可用，尝试文件缓存")
 
-# 导入MongoDB股票信息查询
-try:
-    import os
-    from pymongo import MongoClient
-    MONGODB_AVAILABLE = True
-except ImportError:
-    MONGODB_AVAILABLE = False
+# 导入MongoDB股票信息查询（客户端由连接注册表按需创建）
+import os
+from importlib.util import find_spec
+from tradingagents.config.connection_registry import get_mongo_client
+
+MONGODB_AVAILABLE = find_spec("pymongo") is not None
+if not MONGODB_AVAILABLE:
     logger.warning(f"⚠️ pymongo未安装，无法从MongoDB获取股票名称")
 
 try:
@@ -534,11 +534,8 @@ def _get_mongodb_connection():
             else:
                 connection_string = f"mongodb://{config['host']}:{config['port']}/"
             
-            # 创建客户端
-            _mongodb_client = MongoClient(
-                connection_string,
-                serverSelectionTimeoutMS=3000  # 3秒超时
-            )
+            # 使用进程共享的连接池
+            _mongodb_client = get_mongo_client(connection_string)
             
             # 测试连接
             _mongodb_client.admin.command('ping')
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+交易所交易日历
+
+缓存的行情只有在下一个交易时段开始后才可能变化。ExchangeCalendar 描述A股（上交所/深交所）、
+港交所和美股（NYSE/NASDAQ）的交易时段与休市日，并据此计算缓存的过期时间：
+
+- 交易时段内获取的数据按较短的盘中TTL过期；
+- 收盘后的结算窗口内（数据源整理当日日线）获取的数据在结算窗口结束时过期；
+- 其余时间（收盘后、午间休市、周末和节假日）获取的数据一直有效到下一次开盘。
+
+休市日来源：
+- 安装了 exchange_calendars 时直接使用其 XSHG/XHKG/XNYS 日历；
+- A股使用AKShare的历史交易日列表（后台刷新并保存到磁盘，未加载完成前按工作日处理）；
+- 美股使用 pandas 的节假日规则（NYSE休市日）；
+- 港股只包含固定日期的公众假期（农历节假日需要 exchange_calendars）。
+"""
+
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+try:
+    import exchange_calendars
+    EXCHANGE_CALENDARS_AVAILABLE = True
+except ImportError:
+    EXCHANGE_CALENDARS_AVAILABLE = False
+
+# 盘中TTL（秒）：只有这些数据类型按交易日历计算有效期，其余类型仍使用固定TTL
+INTRADAY_TTL_SECONDS = {
+    'stock_data': 5 * 60,
+    'fundamentals': 30 * 60,
+}
+
+# 按交易日历计算的TTL上限，避免长假期间缓存过久
+MAX_CALENDAR_TTL_SECONDS = 7 * 24 * 3600
+
+_CALENDAR_DIR = Path(__file__).parent / "data_cache" / "trading_calendar"
+
+
+def market_of(symbol: str) -> str:
+    """根据股票代码判断所属市场：china / hk / us"""
+    symbol = str(symbol).upper()
+    if re.match(r'^\d{6}(\.(SH|SS|SZ|BJ))?$', symbol):
+        return 'china'
+    if symbol.endswith('.HK') or re.match(r'^\d{4,5}$', symbol):
+        return 'hk'
+    return 'us'
+
+
+class ExchangeCalendar:
+    """单个交易所的交易时段与休市日"""
+
+    def __init__(self, market: str, timezone: str, sessions: List[Tuple[time, time]],
+                 holidays: Iterable[date] = (), trading_days: Iterable[date] = None,
+                 settle_minutes: int = 30):
+        """
+        Args:
+            market: 市场名称
+            timezone: 交易所时区
+            sessions: 每个交易日的连续交易时段（如A股上午、下午两段）
+            holidays: 工作日中的休市日
+            trading_days: 完整的交易日列表，提供时优先于 holidays（覆盖范围以外按工作日处理）
+            settle_minutes: 收盘后数据源整理当日数据的时间
+        """
+        self.market = market
+        self.tz = ZoneInfo(timezone)
+        self.sessions = sessions
+        self.holidays: Set[date] = set(holidays)
+        self.settle = timedelta(minutes=settle_minutes)
+        self._trading_days: Set[date] = set()
+        self._covered: Optional[Tuple[date, date]] = None
+        if trading_days:
+            self.set_trading_days(trading_days)
+
+    def set_trading_days(self, trading_days: Iterable[date]):
+        """设置完整的交易日列表"""
+        days = set(trading_days)
+        if days:
+            self._trading_days = days
+            self._covered = (min(days), max(days))
+
+    # ---- 交易日 ----
+
+    def is_trading_day(self, day: date) -> bool:
+        if self._covered and self._covered[0] <= day <= self._covered[1]:
+            return day in self._trading_days
+        return day.weekday() < 5 and day not in self.holidays
+
+    def next_trading_day(self, day: date) -> date:
+        """严格晚于 day 的下一个交易日"""
+        day += timedelta(days=1)
+        while not self.is_trading_day(day):
+            day += timedelta(days=1)
+        return day
+
+    def previous_trading_day(self, day: date) -> date:
+        """严格早于 day 的上一个交易日"""
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+    # ---- 交易时段 ----
+
+    def _session_bounds(self, day: date) -> List[Tuple[datetime, datetime]]:
+        return [(datetime.combine(day, start, self.tz), datetime.combine(day, end, self.tz))
+                for start, end in self.sessions]
+
+    def _localize(self, moment: Optional[datetime]) -> datetime:
+        if moment is None:
+            return datetime.now(self.tz)
+        # 不带时区的时间视为本机时间（与缓存元数据中的 datetime.now() 一致）
+        return moment.astimezone(self.tz)
+
+    def is_open(self, moment: Optional[datetime] = None) -> bool:
+        """当前是否处于连续交易时段"""
+        local = self._localize(moment)
+        if not self.is_trading_day(local.date()):
+            return False
+        return any(start <= local < end for start, end in self._session_bounds(local.date()))
+
+    def next_open(self, moment: Optional[datetime] = None) -> datetime:
+        """严格晚于 moment 的下一次开盘（含午间休市后的开盘）"""
+        local = self._localize(moment)
+        day = local.date()
+        if self.is_trading_day(day):
+            for start, _ in self._session_bounds(day):
+                if start > local:
+                    return start
+        return self._session_bounds(self.next_trading_day(day))[0][0]
+
+    def next_session_open(self, moment: Optional[datetime] = None) -> datetime:
+        """严格晚于 moment 的下一个交易日开盘（不含午间休市后的开盘）"""
+        open_at = self.next_open(moment)
+        while open_at.time() != self.sessions[0][0]:
+            open_at = self.next_open(open_at)
+        return open_at
+
+    def last_close(self, moment: Optional[datetime] = None) -> datetime:
+        """不晚于 moment 的最近一次收盘"""
+        local = self._localize(moment)
+        day = local.date()
+        if self.is_trading_day(day):
+            closes = [end for _, end in self._session_bounds(day) if end <= local]
+            if closes:
+                return closes[-1]
+        return self._session_bounds(self.previous_trading_day(day))[-1][1]
+
+    # ---- 缓存过期 ----
+
+    def cache_expiry(self, cached_at: datetime, intraday_ttl: float) -> datetime:
+        """
+        计算在 cached_at 获取的数据何时过期
+
+        Args:
+            cached_at: 数据获取时间
+            intraday_ttl: 交易时段内的有效期（秒）
+
+        Returns:
+            datetime: 带交易所时区的过期时间
+        """
+        local = self._localize(cached_at)
+        if self.is_open(local):
+            return local + timedelta(seconds=intraday_ttl)
+
+        # 只有全天收盘后才需要等待数据源整理日线，午间休市直接有效到下午开盘
+        last_close = self.last_close(local)
+        if last_close == self._session_bounds(last_close.date())[-1][1] and local < last_close + self.settle:
+            return last_close + self.settle
+        return self.next_open(local)
+
+
+def _time(value: str) -> time:
+    return datetime.strptime(value, "%H:%M").time()
+
+
+def _us_holidays(start_year: int, end_year: int) -> Set[date]:
+    """NYSE休市日（pandas节假日规则）"""
+    from pandas.tseries.holiday import (
+        AbstractHolidayCalendar, GoodFriday, Holiday, USLaborDay, USMartinLutherKingJr,
+        USMemorialDay, USPresidentsDay, USThanksgivingDay, nearest_workday, sunday_to_monday,
+    )
+
+    class NYSEHolidayCalendar(AbstractHolidayCalendar):
+        rules = [
+            Holiday('NewYearsDay', month=1, day=1, observance=sunday_to_monday),
+            USMartinLutherKingJr,
+            USPresidentsDay,
+            GoodFriday,
+            USMemorialDay,
+            Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+            Holiday('IndependenceDay', month=7, day=4, observance=nearest_workday),
+            USLaborDay,
+            USThanksgivingDay,
+            Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+        ]
+
+    holidays = NYSEHolidayCalendar().holidays(start=f"{start_year}-01-01", end=f"{end_year}-12-31")
+    return {d.date() for d in holidays}
+
+
+def _hk_fixed_holidays(start_year: int, end_year: int) -> Set[date]:
+    """港股固定日期的公众假期（周日顺延到周一）"""
+    holidays = set()
+    for year in range(start_year, end_year + 1):
+        for month, day in ((1, 1), (5, 1), (7, 1), (10, 1), (12, 25), (12, 26)):
+            holiday = date(year, month, day)
+            if holiday.weekday() == 6:
+                holiday += timedelta(days=1)
+            holidays.add(holiday)
+    return holidays
+
+
+def _exchange_calendar_days(code: str, start_year: int, end_year: int) -> List[date]:
+    calendar = exchange_calendars.get_calendar(code)
+    sessions = calendar.sessions_in_range(f"{start_year}-01-01", f"{end_year}-12-31")
+    return [d.date() for d in sessions]
+
+
+def _build_calendar(market: str) -> ExchangeCalendar:
+    this_year = date.today().year
+    years = (this_year - 1, this_year + 1)
+
+    if market == 'china':
+        calendar = ExchangeCalendar('china', 'Asia/Shanghai',
+                                    [(_time("09:30"), _time("11:30")), (_time("13:00"), _time("15:00"))],
+                                    settle_minutes=60)
+    elif market == 'hk':
+        calendar = ExchangeCalendar('hk', 'Asia/Hong_Kong',
+                                    [(_time("09:30"), _time("12:00")), (_time("13:00"), _time("16:00"))],
+                                    holidays=_hk_fixed_holidays(*years))
+    else:
+        calendar = ExchangeCalendar('us', 'America/New_York', [(_time("09:30"), _time("16:00"))],
+                                    holidays=_us_holidays(*years))
+
+    if EXCHANGE_CALENDARS_AVAILABLE:
+        code = {'china': 'XSHG', 'hk': 'XHKG', 'us': 'XNYS'}[market]
+        try:
+            calendar.set_trading_days(_exchange_calendar_days(code, *years))
+            return calendar
+        except Exception as e:
+            logger.warning(f"⚠️ exchange_calendars加载{code}日历失败: {e}")
+
+    if market == 'china':
+        _load_china_trading_days(calendar)
+    return calendar
+
+
+def _load_china_trading_days(calendar: ExchangeCalendar):
+    """从磁盘加载A股交易日列表，缺失或未覆盖当年时在后台从AKShare刷新"""
+    path = _CALENDAR_DIR / "china_trading_days.json"
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            days = [date.fromisoformat(d) for d in json.load(f)]
+        calendar.set_trading_days(days)
+        if days and max(days).year >= date.today().year:
+            return
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"⚠️ 读取A股交易日历失败: {e}")
+
+    def _refresh():
+        try:
+            import akshare as ak
+            frame = ak.tool_trade_date_hist_sina()
+            days = [d if isinstance(d, date) else date.fromisoformat(str(d)[:10]) for d in frame['trade_date']]
+            calendar.set_trading_days(days)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([d.isoformat() for d in days], f)
+            os.replace(tmp_path, path)
+            logger.info(f"📅 A股交易日历已更新: {len(days)}个交易日")
+        except Exception as e:
+            logger.warning(f"⚠️ 从AKShare获取A股交易日历失败，暂按工作日处理: {e}")
+
+    threading.Thread(target=_refresh, name="china-calendar-refresh", daemon=True).start()
+
+
+_calendars: Dict[str, ExchangeCalendar] = {}
+_calendars_lock = threading.Lock()
+
+
+def get_trading_calendar(market: str) -> ExchangeCalendar:
+    """获取市场的交易日历（进程内共享）"""
+    with _calendars_lock:
+        if market not in _calendars:
+            _calendars[market] = _build_calendar(market)
+        return _calendars[market]
+
+
+def calendar_ttl_seconds(symbol: str, data_type: str, cached_at: Optional[datetime] = None) -> Optional[int]:
+    """
+    按交易日历计算缓存有效期
+
+    Args:
+        symbol: 股票代码
+        data_type: 数据类型（stock_data / fundamentals / ...）
+        cached_at: 数据获取时间，默认为现在
+
+    Returns:
+        Optional[int]: 从 cached_at 起的有效秒数；数据类型不按交易日历过期时返回None
+    """
+    intraday_ttl = INTRADAY_TTL_SECONDS.get(data_type)
+    if intraday_ttl is None:
+        return None
+
+    cached_at = cached_at or datetime.now()
+    calendar = get_trading_calendar(market_of(symbol))
+    expiry = calendar.cache_expiry(cached_at, intraday_ttl)
+    ttl = expiry.timestamp() - cached_at.timestamp()
+    return int(max(1, min(ttl, MAX_CALENDAR_TTL_SECONDS)))
@@ -7,7 +7,7 @@ Tushare数据适配器
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Callable, List, Dict, Optional, Tuple, Union
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -107,6 +107,19 @@ class TushareDataAdapter:
             logger.error(f"❌ 获取{symbol}数据失败: {e}")
             return pd.DataFrame()
     
+    def get_stock_data_by_trade_dates(self, symbols: List[str], trade_dates: List[str],
+                                      throttle: Optional[Callable[[], None]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        按交易日批量获取多只股票的日线（每个交易日一次接口调用）
+
+        Returns:
+            Dict: 股票代码 -> 与 get_stock_data 格式一致的日线，获取失败时为空字典
+        """
+        if not self.provider or not self.provider.connected:
+            return {}
+        frames = self.provider.get_daily_by_trade_dates(symbols, trade_dates, throttle)
+        return {symbol: self._standardize_data(frame) for symbol, frame in frames.items()}
+
     def _get_daily_data(self, symbol: str, start_date: str = None, end_date: str = None) -> pd.DataFrame:
         """获取日线数据"""
 
@@ -122,8 +135,8 @@ class TushareDataAdapter:
                 cache_key = self.cache_manager.find_cached_stock_data(
                     symbol=symbol,
                     start_date=start_date,
-                    end_date=end_date,
-                    max_age_hours=24  # 日线数据缓存24小时
+                    end_date=end_date
+                    # 日线数据按交易日历过期，有效到下一次开盘
                 )
 
                 if cache_key:
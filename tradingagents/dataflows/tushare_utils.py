@@ -8,7 +8,7 @@ import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Union
+from typing import Callable, List, Dict, Optional, Tuple, Union
 import warnings
 import time
 
@@ -39,6 +39,11 @@ except ImportError:
 
 class TushareProvider:
     """Tushare数据提供器"""
+
+    # 内存中股票列表的有效期，与股票列表缓存一致
+    STOCK_LIST_TTL_SECONDS = 24 * 3600
+    # 内存中没有股票列表时，间隔这么久再检查一次文件缓存
+    STOCK_LIST_RECHECK_SECONDS = 600
     
     def __init__(self, token: str = None, enable_cache: bool = True):
         """
@@ -51,6 +56,10 @@ class TushareProvider:
         self.connected = False
         self.enable_cache = enable_cache and CACHE_AVAILABLE
         self.api = None
+        # 股票列表（get_stock_list），get_stock_info 优先从中查找
+        self._stock_list = None
+        self._stock_list_loaded_at = 0.0
+        self._stock_list_checked_at = 0.0
         
         # 初始化缓存管理器
         self.cache_manager = None
@@ -113,6 +122,7 @@ class TushareProvider:
                         # 检查是否为DataFrame且不为空
                         if hasattr(cached_data, 'empty') and not cached_data.empty:
                             logger.info(f"📦 从缓存获取股票列表: {len(cached_data)}条")
+                            self._remember_stock_list(cached_data)
                             return cached_data
                         elif isinstance(cached_data, str) and cached_data.strip():
                             logger.info(f"📦 从缓存获取股票列表: 字符串格式")
@@ -129,6 +139,7 @@ class TushareProvider:
             
             if stock_list is not None and not stock_list.empty:
                 logger.info(f"✅ 获取股票列表成功: {len(stock_list)}条")
+                self._remember_stock_list(stock_list)
                 
                 # 缓存数据
                 if self.enable_cache and self.cache_manager:
@@ -244,13 +255,7 @@ class TushareProvider:
             if data is not None and not data.empty:
                 # 数据预处理
                 logger.info(f"🔍 [Tushare详细日志] 开始数据预处理...")
-                data = data.sort_values('trade_date')
-                data['trade_date'] = pd.to_datetime(data['trade_date'])
-
-                # 计算前复权价格（基于pct_chg重新计算连续价格）
-                logger.info(f"🔍 [Tushare详细日志] 开始计算前复权价格...")
-                data = self._calculate_forward_adjusted_prices(data)
-                logger.info(f"🔍 [Tushare详细日志] 前复权价格计算完成")
+                data = self._prepare_daily_data(data)
 
                 logger.info(f"🔍 [Tushare详细日志] 数据预处理完成")
 
@@ -286,6 +291,58 @@ class TushareProvider:
             logger.error(f"❌ [Tushare详细日志] 异常堆栈: {traceback.format_exc()}")
             return pd.DataFrame()
 
+    def get_daily_by_trade_dates(self, symbols: List[str], trade_dates: List[str],
+                                 throttle: Optional[Callable[[], None]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        按交易日批量获取多只股票的日线
+
+        每个交易日调用一次 daily(trade_date=...)，返回当日全市场行情，从中取出需要的股票。
+        接口调用次数只与交易日数量有关，股票多时比逐只调用 get_stock_daily 少得多。
+
+        Args:
+            symbols: 股票代码
+            trade_dates: 交易日（YYYYMMDD 或 YYYY-MM-DD）
+            throttle: 每次接口调用前调用（用于限速）
+
+        Returns:
+            Dict: 股票代码 -> 与 get_stock_daily 相同处理（排序、前复权）的日线；
+            任一交易日获取失败时返回空字典（缺少交易日会使前复权价格错位），由调用方逐只获取
+        """
+        if not self.connected or not symbols or not trade_dates:
+            return {}
+
+        ts_codes = {self._normalize_symbol(symbol): symbol for symbol in symbols}
+        parts = []
+        for trade_date in trade_dates:
+            if throttle:
+                throttle()
+            try:
+                data = self.api.daily(trade_date=trade_date.replace('-', ''))
+            except Exception as e:
+                logger.warning(f"⚠️ 获取{trade_date}全市场日线失败，放弃批量获取: {e}")
+                return {}
+            if data is not None and not data.empty:
+                parts.append(data[data['ts_code'].isin(ts_codes)])
+
+        if not parts:
+            return {}
+        combined = pd.concat(parts, ignore_index=True)
+        frames = {ts_codes[ts_code]: self._prepare_daily_data(frame)
+                  for ts_code, frame in combined.groupby('ts_code')}
+        logger.info(f"✅ 按交易日批量获取日线: {len(trade_dates)}个交易日, {len(frames)}/{len(symbols)}只股票")
+        return frames
+
+    def _prepare_daily_data(self, data: pd.DataFrame) -> pd.DataFrame:
+        """日线预处理：按日期排序并计算前复权价格"""
+        data = data.sort_values('trade_date')
+        data['trade_date'] = pd.to_datetime(data['trade_date'])
+
+        # 计算前复权价格（基于pct_chg重新计算连续价格）
+        logger.info(f"🔍 [Tushare详细日志] 开始计算前复权价格...")
+        data = self._calculate_forward_adjusted_prices(data)
+        logger.info(f"🔍 [Tushare详细日志] 前复权价格计算完成")
+        return data
+
     def _calculate_forward_adjusted_prices(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         基于pct_chg计算前复权价格
@@ -376,6 +433,11 @@ class TushareProvider:
             ts_code = self._normalize_symbol(symbol)
             logger.info(f"🔍 [股票代码追踪] _normalize_symbol 返回结果: '{ts_code}'")
 
+            # 优先从股票列表中查找，避免逐只调用 stock_basic
+            listed = self._find_in_stock_list(symbol, ts_code)
+            if listed:
+                return listed
+
             # 获取股票基本信息
             logger.info(f"🔍 [股票代码追踪] 调用 Tushare API stock_basic，传入参数: ts_code='{ts_code}'")
             basic_info = self.api.stock_basic(
@@ -406,13 +468,60 @@ class TushareProvider:
             logger.error(f"❌ 获取{symbol}股票信息失败: {e}")
             return {'symbol': symbol, 'name': f'股票{symbol}', 'source': 'unknown'}
     
-    def get_financial_data(self, symbol: str, period: str = "20231231") -> Dict:
+    def _remember_stock_list(self, stock_list: pd.DataFrame):
+        if isinstance(stock_list, pd.DataFrame) and not stock_list.empty and 'ts_code' in stock_list.columns:
+            self._stock_list = stock_list
+            self._stock_list_loaded_at = time.time()
+
+    def _cached_stock_list(self) -> Optional[pd.DataFrame]:
+        """内存中的股票列表；没有时从文件缓存加载（不调用接口），缓存预热会批量获取股票列表"""
+        now = time.time()
+        if self._stock_list is not None and now - self._stock_list_loaded_at < self.STOCK_LIST_TTL_SECONDS:
+            return self._stock_list
+        self._stock_list = None
+        if not (self.enable_cache and self.cache_manager) or now - self._stock_list_checked_at < self.STOCK_LIST_RECHECK_SECONDS:
+            return None
+
+        self._stock_list_checked_at = now
+        try:
+            cache_key = self.cache_manager.find_cached_stock_data(
+                symbol="tushare_stock_list",
+                data_source="tushare",
+                max_age_hours=24
+            )
+            if cache_key:
+                self._remember_stock_list(self.cache_manager.load_stock_data(cache_key))
+        except Exception as e:
+            logger.debug(f"读取缓存的股票列表失败: {e}")
+        return self._stock_list
+
+    def _find_in_stock_list(self, symbol: str, ts_code: str) -> Optional[Dict]:
+        stock_list = self._cached_stock_list()
+        if stock_list is None:
+            return None
+        rows = stock_list[stock_list['ts_code'] == ts_code]
+        if rows.empty:
+            return None
+        info = rows.iloc[0]
+        logger.debug(f"📦 从股票列表获取{symbol}基本信息")
+        return {
+            'symbol': symbol,
+            'ts_code': ts_code,
+            'name': info['name'],
+            'area': info.get('area', ''),
+            'industry': info.get('industry', ''),
+            'market': info.get('market', ''),
+            'list_date': info.get('list_date', ''),
+            'source': 'tushare'
+        }
+
+    def get_financial_data(self, symbol: str, period: Optional[str] = None) -> Dict:
         """
         获取财务数据
         
         Args:
             symbol: 股票代码
-            period: 报告期（YYYYMMDD）
+            period: 报告期（YYYYMMDD），默认为披露截止日已过的最近报告期（回测中按模拟交易日期计算）
             
         Returns:
             Dict: 财务数据
@@ -421,47 +530,39 @@ class TushareProvider:
             return {}
         
         try:
+            from .financial_statements import get_financial_statement_store, latest_disclosed_period, simulated_today
+
             ts_code = self._normalize_symbol(symbol)
-            
-            financials = {}
-            
-            # 获取资产负债表
-            try:
-                balance_sheet = self.api.balancesheet(
+            # 回测中按模拟交易日期取已披露的报告期
+            period = period or latest_disclosed_period(simulated_today())
+
+            def _records(frame):
+                return frame.to_dict('records') if frame is not None and not frame.empty else []
+
+            # 三张报表并发获取，同一报告期的数据缓存到该期报告披露
+            financials = get_financial_statement_store().get("tushare", ts_code, {
+                # 资产负债表
+                'balance_sheet': lambda: _records(self.api.balancesheet(
                     ts_code=ts_code,
                     period=period,
                     fields='ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,total_assets,total_liab,total_hldr_eqy_exc_min_int'
-                )
-                financials['balance_sheet'] = balance_sheet.to_dict('records') if balance_sheet is not None and not balance_sheet.empty else []
-            except Exception as e:
-                logger.error(f"⚠️ 获取资产负债表失败: {e}")
-                financials['balance_sheet'] = []
-            
-            # 获取利润表
-            try:
-                income_statement = self.api.income(
+                )),
+                # 利润表
+                'income_statement': lambda: _records(self.api.income(
                     ts_code=ts_code,
                     period=period,
                     fields='ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,total_revenue,total_cogs,operate_profit,total_profit,n_income'
-                )
-                financials['income_statement'] = income_statement.to_dict('records') if income_statement is not None and not income_statement.empty else []
-            except Exception as e:
-                logger.error(f"⚠️ 获取利润表失败: {e}")
-                financials['income_statement'] = []
-            
-            # 获取现金流量表
-            try:
-                cash_flow = self.api.cashflow(
+                )),
+                # 现金流量表
+                'cash_flow': lambda: _records(self.api.cashflow(
                     ts_code=ts_code,
                     period=period,
                     fields='ts_code,ann_date,f_ann_date,end_date,report_type,comp_type,net_profit,finan_exp,c_fr_sale_sg,c_paid_goods_s'
-                )
-                financials['cash_flow'] = cash_flow.to_dict('records') if cash_flow is not None and not cash_flow.empty else []
-            except Exception as e:
-                logger.error(f"⚠️ 获取现金流量表失败: {e}")
-                financials['cash_flow'] = []
-            
-            return financials
+                )),
+            }, period=period)
+
+            # 保持原来的结构：获取失败的报表为空列表
+            return {name: financials.get(name, []) for name in ('balance_sheet', 'income_statement', 'cash_flow')}
             
         except Exception as e:
             logger.error(f"❌ 获取{symbol}财务数据失败: {e}")
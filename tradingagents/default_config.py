@@ -17,8 +17,30 @@ DEFAULT_CONFIG = {
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
     "max_recur_limit": 100,
+    # Debate context settings (token budgets for report/history context in debate prompts)
+    "debate_context_budget_tokens": 6000,
+    "judge_context_budget_tokens": 12000,
+    "report_digest_tokens": 800,
+    "debate_history_budget_ratio": 0.4,
     # Tool settings
     "online_tools": True,
+    # State log settings (eval_results/{ticker}/TradingAgentsStrategy_logs/full_states_log.jsonl)
+    "state_log_compress": False,
+    "keep_state_log_in_memory": False,
+    # Memory settings: persisted ChromaDB directory ("" keeps memories in process memory);
+    # memory_server ("host:port") shares memories across workers through a ChromaDB server
+    "memory_persist_dir": os.getenv(
+        "TRADINGAGENTS_MEMORY_DIR",
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data", "memory")),
+    ),
+    "memory_server": os.getenv("TRADINGAGENTS_MEMORY_SERVER", ""),
+    # Checkpoint settings: "" (disabled), "sqlite", "redis", "mongodb", "memory" or "auto"
+    "checkpoint_backend": os.getenv("TRADINGAGENTS_CHECKPOINT_BACKEND", ""),
+    "checkpoint_db_path": None,
+    "checkpoint_keep_completed": False,
+    # Stale-while-revalidate: price/fundamentals cache entries expired less than this many hours ago
+    # are served immediately and refreshed in the background (0 disables)
+    "cache_stale_grace_hours": float(os.getenv("TRADINGAGENTS_CACHE_STALE_GRACE_HOURS", "24")),
 
     # Note: Database and cache configuration is now managed by .env file and config.database_manager
     # No database/cache settings in default config to avoid configuration conflicts
@@ -1,16 +1,25 @@
 # TradingAgents/graph/__init__.py
 
-from .trading_graph import TradingAgentsGraph
-from .conditional_logic import ConditionalLogic
-from .setup import GraphSetup
-from .propagation import Propagator
-from .reflection import Reflector
-from .signal_processing import SignalProcessor
-
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
+from tradingagents.utils.lazy_import import lazy_dir, lazy_exports
 logger = get_logger("default")
 
+# 图相关类按需导入，避免 import tradingagents.graph 时加载全部LLM和数据依赖
+_EXPORTS = {
+    "TradingAgentsGraph": ".trading_graph",
+    "ConditionalLogic": ".conditional_logic",
+    "GraphSetup": ".setup",
+    "Propagator": ".propagation",
+    "Reflector": ".reflection",
+    "SignalProcessor": ".signal_processing",
+    "GraphEventStream": ".streaming",
+    "BacktestRunner": ".backtest",
+}
+
+__getattr__ = lazy_exports(__name__, globals(), _EXPORTS)
+__dir__ = lazy_dir(globals(), _EXPORTS)
+
 __all__ = [
     "TradingAgentsGraph",
     "ConditionalLogic",
@@ -18,4 +27,6 @@ __all__ = [
     "Propagator",
     "Reflector",
     "SignalProcessor",
+    "GraphEventStream",
+    "BacktestRunner",
 ]
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+时间点回测
+
+在一段日期上逐日运行分析，每个模拟交易日只能看到该日期及之前的数据：
+- 整个回测共享一份PointInTimeHistory，每只股票的行情只加载一次，各日期从中切片
+- 股票基本信息等静态数据整个回测只获取一次
+- 开启反思时按日期顺序运行，某日的收益在下一个分析日（收益实现时）之前写入记忆；
+  关闭反思时各日期互不依赖，可以多线程并发运行（每个线程使用独立的分析图）
+- 结束后汇总策略收益、基准收益、胜率、最大回撤等指标
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from tradingagents.dataflows.data_context import AnalysisDataContext
+from tradingagents.dataflows.point_in_time import FrameLoader, PointInTimeHistory, frame_dates, yfinance_history
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+# 决策动作对应的目标仓位
+_ACTION_POSITIONS = {"买入": 1, "buy": 1, "卖出": -1, "sell": -1}
+
+_CLOSE_COLUMNS = ("close", "Close", "收盘")
+
+# 为计算最后一个交易日的收益，多加载的自然日天数
+_TRAILING_DAYS = 15
+
+
+def default_price_source(symbol: str) -> Tuple[str, FrameLoader]:
+    """
+    按市场选择行情数据集和加载函数
+
+    与分析师工具使用同一个数据集名称，回测计算收益用的行情和工具切片共用一次加载。
+    """
+    from tradingagents.utils.stock_utils import StockUtils
+
+    if StockUtils.is_china_stock(symbol):
+        from tradingagents.dataflows.data_source_manager import ChinaDataSource, get_data_source_manager
+
+        if get_data_source_manager().current_source != ChinaDataSource.TUSHARE:
+            from tradingagents.dataflows.akshare_utils import get_akshare_provider
+            return "akshare_daily", get_akshare_provider().get_stock_data
+        from tradingagents.dataflows.tushare_adapter import get_tushare_adapter
+        return "tushare_daily", get_tushare_adapter().get_stock_data
+    return "yfinance_daily", yfinance_history
+
+
+def close_series(frame: pd.DataFrame) -> pd.Series:
+    """从行情表取出按日期索引的收盘价"""
+    dates = frame_dates(frame)
+    column = next((c for c in _CLOSE_COLUMNS if c in frame.columns), None)
+    if dates is None or column is None:
+        raise ValueError(f"行情数据缺少日期或收盘价列: {list(frame.columns)}")
+    closes = pd.Series(pd.to_numeric(frame[column], errors="coerce").values, index=pd.DatetimeIndex(dates.values))
+    closes = closes[~closes.index.duplicated(keep="last")].dropna()
+    return closes.sort_index()
+
+
+@dataclass
+class BacktestDay:
+    """一个模拟交易日的结果"""
+    trade_date: str
+    action: Optional[str] = None
+    decision: Any = None
+    position: int = 0
+    period_return: Optional[float] = None
+    strategy_return: Optional[float] = None
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class BacktestReport:
+    """回测结果"""
+    symbol: str
+    days: List[BacktestDay] = field(default_factory=list)
+    summary: Dict[str, Any] = field(default_factory=dict)
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [asdict(day) for day in self.days]
+        for row in rows:
+            row.pop("decision", None)
+        return pd.DataFrame(rows)
+
+
+class BacktestRunner:
+    """时间点回测运行器"""
+
+    def __init__(self, graph_factory: Callable[[], Any], symbol: str, start_date: str, end_date: str,
+                 trade_dates: Optional[List[str]] = None, price_loader: Optional[FrameLoader] = None,
+                 price_dataset: Optional[str] = None, lookback_days: int = 365, reflect: bool = True,
+                 allow_short: bool = False, max_workers: int = 1):
+        """
+        Args:
+            graph_factory: 创建TradingAgentsGraph的函数（并发运行时每个线程调用一次）
+            symbol: 股票代码
+            start_date: 回测开始日期
+            end_date: 回测结束日期
+            trade_dates: 指定的模拟交易日，默认使用区间内的全部交易日
+            price_loader: 行情加载函数 loader(symbol, start, end) -> DataFrame，默认按市场选择
+            price_dataset: 行情数据集名称，与price_loader一起传入
+            lookback_days: 预加载的回看天数
+            reflect: 是否在收益实现后调用reflect_and_remember（开启时按顺序运行）
+            allow_short: 卖出信号是否建立空头仓位，默认只平仓
+            max_workers: 关闭反思时的并发日期数
+        """
+        self.graph_factory = graph_factory
+        self.symbol = symbol
+        self.start_date = start_date
+        self.end_date = end_date
+        self.trade_dates = trade_dates
+        if price_loader is None:
+            price_dataset, price_loader = default_price_source(symbol)
+        self.price_dataset = price_dataset or "backtest_prices"
+        self.price_loader = price_loader
+        self.reflect = reflect
+        self.allow_short = allow_short
+        self.max_workers = max(1, max_workers)
+
+        history_end = (datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=_TRAILING_DAYS)).strftime("%Y-%m-%d")
+        self.history = PointInTimeHistory(start_date, history_end, lookback_days=lookback_days)
+        self._local = threading.local()
+
+    # ---- 行情 ----
+
+    def _closes(self) -> pd.Series:
+        frame = self.history.prices(self.price_dataset, self.symbol, self.price_loader)
+        if frame is None:
+            raise ValueError(f"无法加载 {self.symbol} 的行情数据，不能回测")
+        return close_series(frame)
+
+    def _dates(self, closes: pd.Series) -> List[str]:
+        if self.trade_dates:
+            return sorted(str(d)[:10] for d in self.trade_dates)
+        in_range = closes.index[(closes.index >= pd.Timestamp(self.start_date)) &
+                                (closes.index <= pd.Timestamp(self.end_date))]
+        return [d.strftime("%Y-%m-%d") for d in in_range]
+
+    @staticmethod
+    def _close_on_or_before(closes: pd.Series, date: str) -> Optional[float]:
+        window = closes[closes.index <= pd.Timestamp(date)]
+        return float(window.iloc[-1]) if len(window) else None
+
+    def _period_returns(self, closes: pd.Series, dates: List[str]) -> Dict[str, Optional[float]]:
+        """每个决策日到下一个决策日（最后一天到下一个交易日）的收益"""
+        returns = {}
+        for i, date in enumerate(dates):
+            start = self._close_on_or_before(closes, date)
+            if i + 1 < len(dates):
+                end = self._close_on_or_before(closes, dates[i + 1])
+            else:
+                later = closes[closes.index > pd.Timestamp(date)]
+                end = float(later.iloc[0]) if len(later) else None
+            returns[date] = (end / start - 1) if start and end is not None else None
+        return returns
+
+    # ---- 运行 ----
+
+    def _graph(self):
+        graph = getattr(self._local, "graph", None)
+        if graph is None:
+            graph = self._local.graph = self.graph_factory()
+        return graph
+
+    def _analyze(self, date: str) -> BacktestDay:
+        context = AnalysisDataContext(f"backtest_{self.symbol}_{date}", as_of=date, history=self.history)
+        start = time.perf_counter()
+        try:
+            _, decision = self._graph().propagate(self.symbol, date, data_context=context)
+            action = decision.get("action") if isinstance(decision, dict) else str(decision)
+            return BacktestDay(trade_date=date, action=action, decision=decision,
+                               duration=time.perf_counter() - start)
+        except Exception as e:
+            logger.error(f"❌ [回测] {self.symbol} {date} 分析失败: {e}")
+            return BacktestDay(trade_date=date, error=str(e), duration=time.perf_counter() - start)
+
+    def _reflect(self, day: BacktestDay):
+        if day.error or day.period_return is None:
+            return
+        try:
+            self._graph().reflect_and_remember(day.period_return)
+        except Exception as e:
+            logger.warning(f"⚠️ [回测] {day.trade_date} 反思失败: {e}")
+
+    def run(self) -> BacktestReport:
+        """运行回测并返回逐日结果和汇总"""
+        run_start = time.perf_counter()
+        closes = self._closes()
+        dates = self._dates(closes)
+        returns = self._period_returns(closes, dates)
+        logger.info(f"📈 [回测] {self.symbol}: {len(dates)}个交易日 ({self.start_date} ~ {self.end_date})")
+
+        if self.reflect or self.max_workers == 1:
+            days = []
+            for date in dates:
+                # 上一个决策日的收益在今天收盘时实现，先写入记忆再分析今天
+                if self.reflect and days:
+                    self._reflect(days[-1])
+                day = self._analyze(date)
+                day.period_return = returns[date]
+                days.append(day)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="backtest") as executor:
+                days = list(executor.map(self._analyze, dates))
+            for day in days:
+                day.period_return = returns[day.trade_date]
+
+        self._apply_positions(days)
+        report = BacktestReport(symbol=self.symbol, days=days)
+        report.summary = self._summarize(days, closes, time.perf_counter() - run_start)
+        logger.info(f"📈 [回测] 完成: {report.summary}")
+        return report
+
+    def _apply_positions(self, days: List[BacktestDay]):
+        position = 0
+        for day in days:
+            if day.error is None:
+                target = _ACTION_POSITIONS.get(str(day.action).strip().lower(), None)
+                if target is not None:
+                    position = target if (target > 0 or self.allow_short) else 0
+            day.position = position
+            if day.period_return is not None:
+                day.strategy_return = position * day.period_return
+
+    def _summarize(self, days: List[BacktestDay], closes: pd.Series, elapsed: float) -> Dict[str, Any]:
+        strategy = [d.strategy_return for d in days if d.strategy_return is not None]
+        benchmark = [d.period_return for d in days if d.period_return is not None]
+
+        equity, peak, max_drawdown = 1.0, 1.0, 0.0
+        for value in strategy:
+            equity *= 1 + value
+            peak = max(peak, equity)
+            max_drawdown = max(max_drawdown, 1 - equity / peak)
+
+        benchmark_equity = 1.0
+        for value in benchmark:
+            benchmark_equity *= 1 + value
+
+        active = [d for d in days if d.position != 0 and d.strategy_return is not None]
+        actions: Dict[str, int] = {}
+        for day in days:
+            key = day.action if day.error is None else "error"
+            actions[key] = actions.get(key, 0) + 1
+
+        durations = [d.duration for d in days]
+        return {
+            "symbol": self.symbol,
+            "trade_days": len(days),
+            "cumulative_return": equity - 1,
+            "benchmark_return": benchmark_equity - 1,
+            "excess_return": equity - benchmark_equity,
+            "max_drawdown": max_drawdown,
+            "win_rate": (sum(1 for d in active if d.strategy_return > 0) / len(active)) if active else None,
+            "exposure": len(active) / len(days) if days else 0.0,
+            "actions": actions,
+            "errors": sum(1 for d in days if d.error),
+            "avg_analysis_seconds": sum(durations) / len(durations) if durations else 0.0,
+            "elapsed_seconds": elapsed,
+            "data": self.history.stats(),
+        }
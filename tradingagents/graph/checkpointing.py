@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+分析检查点
+为分析图创建LangGraph检查点存储，每个节点完成后保存一次状态，按分析ID（thread_id）区分：
+分析在某个节点失败或进程重启后，可以从最后一个完成的节点继续，不必重新运行分析师、工具调用和辩论。
+
+支持的后端（checkpoint_backend配置）：
+- "sqlite": 本地SQLite文件（需要 langgraph-checkpoint-sqlite）
+- "redis": Redis（需要 langgraph-checkpoint-redis 以及启用 RediSearch/RedisJSON 的Redis）
+- "mongodb": MongoDB（需要 langgraph-checkpoint-mongodb）
+- "memory": 进程内存，只能在同一进程内恢复
+- "auto": 依次尝试已启用的Redis、MongoDB，然后是SQLite，都不可用时使用内存
+- 空值: 不使用检查点
+"""
+
+import atexit
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+CHECKPOINT_BACKENDS = ("sqlite", "redis", "mongodb", "memory", "auto")
+
+
+def default_checkpoint_path() -> str:
+    """默认的SQLite检查点文件路径"""
+    project_root = Path(__file__).parent.parent.parent
+    return os.getenv("TRADINGAGENTS_CHECKPOINT_DB",
+                     str(project_root / "data" / "checkpoints" / "analysis_checkpoints.sqlite"))
+
+
+def _env_enabled(name: str) -> bool:
+    return os.getenv(name, "false").lower() == "true"
+
+
+# 每个SQLite文件在进程内只打开一个连接，所有分析图共用，进程退出时关闭
+_sqlite_savers: Dict[str, Any] = {}
+_sqlite_lock = threading.Lock()
+
+
+def _create_sqlite(config: Dict[str, Any]):
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    path = str(Path(config.get("checkpoint_db_path") or default_checkpoint_path()).resolve())
+    with _sqlite_lock:
+        saver = _sqlite_savers.get(path)
+        if saver is None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            # 分析在后台线程中运行，连接需要跨线程使用（SqliteSaver内部自带锁）
+            saver = SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+            _sqlite_savers[path] = saver
+            logger.info(f"💾 [检查点] 使用SQLite检查点: {path}")
+    return saver
+
+
+@atexit.register
+def close_sqlite_checkpointers():
+    """关闭进程内共用的SQLite检查点连接"""
+    with _sqlite_lock:
+        savers = list(_sqlite_savers.values())
+        _sqlite_savers.clear()
+    for saver in savers:
+        try:
+            saver.conn.close()
+        except Exception as e:
+            logger.warning(f"⚠️ [检查点] 关闭SQLite连接失败: {e}")
+
+
+def _create_redis(config: Dict[str, Any]):
+    from langgraph.checkpoint.redis import RedisSaver
+    from tradingagents.config.connection_registry import get_redis_client
+
+    saver = RedisSaver(redis_client=get_redis_client())
+    saver.setup()
+    logger.info("💾 [检查点] 使用Redis检查点")
+    return saver
+
+
+def _create_mongodb(config: Dict[str, Any]):
+    from langgraph.checkpoint.mongodb import MongoDBSaver
+    from tradingagents.config.connection_registry import get_mongo_client
+
+    db_name = os.getenv("MONGODB_DATABASE_NAME", "tradingagents")
+    saver = MongoDBSaver(get_mongo_client(), db_name=db_name)
+    logger.info(f"💾 [检查点] 使用MongoDB检查点: {db_name}")
+    return saver
+
+
+def _create_memory(config: Dict[str, Any]):
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    logger.info("💾 [检查点] 使用内存检查点（仅支持同一进程内恢复）")
+    return InMemorySaver()
+
+
+_FACTORIES = {
+    "sqlite": _create_sqlite,
+    "redis": _create_redis,
+    "mongodb": _create_mongodb,
+    "memory": _create_memory,
+}
+
+
+def create_checkpointer(config: Dict[str, Any]) -> Optional[Any]:
+    """
+    根据配置创建检查点存储
+
+    Args:
+        config: 分析配置，读取checkpoint_backend和checkpoint_db_path
+
+    Returns:
+        检查点存储，未启用检查点时返回None
+    """
+    backend = (config.get("checkpoint_backend") or "").lower()
+    if not backend:
+        return None
+    if backend not in CHECKPOINT_BACKENDS:
+        logger.warning(f"⚠️ [检查点] 未知的检查点后端 '{backend}'，不使用检查点")
+        return None
+
+    if backend == "auto":
+        candidates = []
+        if _env_enabled("REDIS_ENABLED"):
+            candidates.append("redis")
+        if _env_enabled("MONGODB_ENABLED"):
+            candidates.append("mongodb")
+        candidates.append("sqlite")
+    else:
+        candidates = [backend]
+
+    for candidate in candidates:
+        try:
+            return _FACTORIES[candidate](config)
+        except ImportError as e:
+            logger.warning(f"⚠️ [检查点] {candidate}检查点不可用（缺少依赖）: {e}")
+        except Exception as e:
+            logger.warning(f"⚠️ [检查点] {candidate}检查点初始化失败: {e}")
+
+    # 持久化后端都不可用时退回内存检查点，至少支持同一进程内的失败重试
+    return _create_memory(config)
+
+
+def checkpoint_thread_id(analysis_id: str, stock_symbol: str, analysis_date: str) -> str:
+    """
+    检查点的thread_id
+
+    由会话中持久化的分析ID、股票代码和分析日期组成：进程重启后用同一个分析ID
+    重新提交同一只股票、同一日期的分析时，仍然对应原来的检查点。
+    """
+    return f"{analysis_id}:{str(stock_symbol).strip().upper()}:{analysis_date}"
+
+
+def checkpoint_exists(config: Dict[str, Any], thread_id: str) -> bool:
+    """
+    持久化检查点中是否有该thread_id的状态，不需要构建分析图
+
+    内存检查点只在创建它的分析图内有效，这里总是返回False。
+    """
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    if not thread_id:
+        return False
+    checkpointer = create_checkpointer(config)
+    if checkpointer is None or isinstance(checkpointer, InMemorySaver):
+        return False
+    try:
+        return checkpointer.get_tuple({"configurable": {"thread_id": thread_id}}) is not None
+    except Exception as e:
+        logger.warning(f"⚠️ [检查点] 读取检查点失败 {thread_id}: {e}")
+        return False
+
+
+# 可以重试的中断：网络、超时和限流（按异常类名和HTTP状态码判断，不依赖具体的LLM SDK）
+_TRANSIENT_NAME_MARKERS = ("timeout", "connection", "ratelimit", "toomanyrequests", "serviceunavailable")
+_TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """异常（或引起它的异常）是否是网络、超时或限流等暂时性错误"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+        if any(marker in type(error).__name__.lower() for marker in _TRANSIENT_NAME_MARKERS):
+            return True
+        status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status in _TRANSIENT_STATUS_CODES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def delete_checkpoints(checkpointer, analysis_id: str):
+    """删除某次分析的全部检查点（分析成功完成后调用）"""
+    try:
+        checkpointer.delete_thread(analysis_id)
+    except NotImplementedError:
+        pass
+    except Exception as e:
+        logger.warning(f"⚠️ [检查点] 删除检查点失败 {analysis_id}: {e}")
@@ -1,6 +1,6 @@
 # TradingAgents/graph/propagation.py
 
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
 
 # 导入统一日志系统
 from tradingagents.utils.logging_init import get_logger
@@ -43,11 +43,23 @@ class Propagator:
             "fundamentals_report": "",
             "sentiment_report": "",
             "news_report": "",
+            "report_digests": {},
         }
 
-    def get_graph_args(self) -> Dict[str, Any]:
-        """Get arguments for the graph invocation."""
+    def get_graph_args(self, callbacks: Optional[List[Any]] = None,
+                       analysis_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get arguments for the graph invocation.
+
+        Args:
+            callbacks: 可选的LangChain回调处理器列表
+            analysis_id: 分析ID，启用检查点时作为thread_id区分每次分析的检查点
+        """
+        config = {"recursion_limit": self.max_recur_limit}
+        if callbacks:
+            config["callbacks"] = list(callbacks)
+        if analysis_id:
+            config["configurable"] = {"thread_id": analysis_id}
         return {
             "stream_mode": "values",
-            "config": {"recursion_limit": self.max_recur_limit},
+            "config": config,
         }
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+分析状态日志
+每次分析结束追加一条记录（一行JSON），不再每次重写整个full_states_log.json：
+
+- 写入代价只与本条记录大小有关，长时间回测不会出现平方级I/O
+- 可选gzip压缩，每条记录是一个独立的gzip成员，整个文件仍是合法的.gz文件
+- 旁边的索引文件记录每个交易日期的偏移量，读取单个日期时直接定位
+"""
+
+import gzip
+import json
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+JOURNAL_NAME = "full_states_log.jsonl"
+INDEX_SUFFIX = ".idx"
+
+# 同一进程内对同一日志文件的追加需要串行（回测可能并发运行多个日期）
+_append_locks: Dict[str, threading.Lock] = {}
+_append_locks_guard = threading.Lock()
+
+
+def _append_lock(path: Path) -> threading.Lock:
+    key = str(path.resolve())
+    with _append_locks_guard:
+        return _append_locks.setdefault(key, threading.Lock())
+
+
+def journal_path(directory, compress: bool = False) -> Path:
+    """日志文件路径"""
+    name = JOURNAL_NAME + (".gz" if compress else "")
+    return Path(directory) / name
+
+
+def _encode(record: Dict[str, Any], compress: bool) -> bytes:
+    line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+    return gzip.compress(line) if compress else line
+
+
+def _decode(data: bytes, compress: bool) -> Dict[str, Any]:
+    if compress:
+        # 只解压从偏移量开始的第一个gzip成员
+        data = zlib.decompressobj(wbits=31).decompress(data)
+    return json.loads(data.decode("utf-8"))
+
+
+class StateJournal:
+    """追加写入的分析状态日志"""
+
+    def __init__(self, directory, compress: bool = False):
+        """
+        Args:
+            directory: 日志目录（通常为 eval_results/{ticker}/TradingAgentsStrategy_logs）
+            compress: 是否对每条记录做gzip压缩
+        """
+        self.directory = Path(directory)
+        self.compress = compress
+        self.path = journal_path(self.directory, compress)
+        self.index_path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+
+    def append(self, trade_date, record: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        追加一条记录
+
+        Returns:
+            (偏移量, 长度)
+        """
+        payload = _encode(record, self.compress)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with _append_lock(self.path):
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(payload)
+            entry = {"trade_date": str(trade_date), "offset": offset, "length": len(payload)}
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return offset, len(payload)
+
+
+class StateJournalReader:
+    """
+    按交易日期随机读取状态日志
+
+    优先使用索引文件；索引缺失或落后于日志（例如写入中途进程退出）时扫描日志重建索引。
+    同一日期有多条记录时以最后一条为准。
+    """
+
+    def __init__(self, directory, compress: Optional[bool] = None):
+        """
+        Args:
+            directory: 日志目录
+            compress: 是否为压缩日志，None时根据存在的文件判断
+        """
+        if compress is None:
+            compress = journal_path(directory, True).exists() and not journal_path(directory, False).exists()
+        self.journal = StateJournal(directory, compress)
+        self.path = self.journal.path
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+
+    def _load_index(self) -> Dict[str, Tuple[int, int]]:
+        if not self.path.exists():
+            return {}
+
+        size = self.path.stat().st_size
+        index: Dict[str, Tuple[int, int]] = {}
+        end = 0
+        try:
+            with open(self.journal.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    entry = json.loads(line)
+                    index[entry["trade_date"]] = (entry["offset"], entry["length"])
+                    end = max(end, entry["offset"] + entry["length"])
+        except (OSError, ValueError, KeyError):
+            index, end = {}, 0
+
+        if end != size:
+            logger.info(f"📒 [状态日志] 索引与日志不一致，重新扫描: {self.path}")
+            index = self._scan()
+        return index
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """扫描日志建立索引"""
+        index: Dict[str, Tuple[int, int]] = {}
+        for offset, length, record in self._records():
+            index[str(record.get("trade_date"))] = (offset, length)
+        return index
+
+    def _records(self) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+        with open(self.path, "rb") as f:
+            data = f.read()
+        offset = 0
+        while offset < len(data):
+            if self.journal.compress:
+                decompressor = zlib.decompressobj(wbits=31)
+                try:
+                    line = decompressor.decompress(data[offset:])
+                except zlib.error:
+                    break
+                if not decompressor.eof:
+                    break  # 最后一条记录不完整
+                length = len(data) - offset - len(decompressor.unused_data)
+            else:
+                newline = data.find(b"\n", offset)
+                if newline < 0:
+                    break
+                line = data[offset:newline + 1]
+                length = len(line)
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                break
+            yield offset, length, record
+            offset += length
+
+    @property
+    def index(self) -> Dict[str, Tuple[int, int]]:
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def dates(self) -> List[str]:
+        """已记录的交易日期（按写入顺序）"""
+        return sorted(self.index, key=lambda date: self.index[date][0])
+
+    def get(self, trade_date) -> Optional[Dict[str, Any]]:
+        """读取某个交易日期的记录，不存在时返回None"""
+        location = self.index.get(str(trade_date))
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return _decode(f.read(length), self.journal.compress)
+
+    def __contains__(self, trade_date) -> bool:
+        return str(trade_date) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """按写入顺序遍历全部记录（包括同一日期的旧记录）"""
+        if not self.path.exists():
+            return
+        for _, _, record in self._records():
+            yield record
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """转换为旧版full_states_log.json的结构 {交易日期: 状态}"""
+        return {date: self.get(date) for date in self.dates()}
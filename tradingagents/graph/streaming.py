@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+分析图增量事件流
+把LangGraph的tasks/messages流转换为类型化的增量事件，调用方不必再比较完整状态：
+
+- NodeStarted / NodeFinished: 节点开始和结束
+- ReportDelta: 报告章节新增的内容（辩论历史只给出新追加的部分）
+- ToolCall: 模型发起的工具调用
+- LLMToken: 模型流式输出的文本片段
+- AnalysisCompleted: 分析结束，携带最终状态和处理后的交易信号
+"""
+
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar, Dict, Iterator, List, Optional, Tuple
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('agents')
+
+
+# 顶层报告字段
+REPORT_FIELDS = (
+    "market_report",
+    "sentiment_report",
+    "news_report",
+    "fundamentals_report",
+    "investment_plan",
+    "trader_investment_plan",
+    "final_trade_decision",
+)
+
+# 辩论状态中按报告章节推送的字段，章节名为 "<状态>.<字段>"
+DEBATE_FIELDS = {
+    "investment_debate_state": ("bull_history", "bear_history", "judge_decision"),
+    "risk_debate_state": ("risky_history", "safe_history", "neutral_history", "judge_decision"),
+}
+
+
+@dataclass
+class GraphEvent:
+    """增量事件基类"""
+
+    kind: ClassVar[str] = "event"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（浅拷贝，不复制状态和消息对象）"""
+        data = {"kind": self.kind}
+        data.update({f.name: getattr(self, f.name) for f in fields(self)})
+        return data
+
+
+@dataclass
+class NodeStarted(GraphEvent):
+    kind: ClassVar[str] = "node_started"
+    node: str
+    task_id: str = ""
+
+
+@dataclass
+class NodeFinished(GraphEvent):
+    kind: ClassVar[str] = "node_finished"
+    node: str
+    task_id: str = ""
+    duration: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class ReportDelta(GraphEvent):
+    """
+    报告章节增量
+
+    delta为本次新增的文本；replace为True表示章节被整体改写，
+    此时delta就是章节的完整内容。text始终是章节当前的完整内容。
+    """
+    kind: ClassVar[str] = "report_delta"
+    section: str
+    node: str
+    delta: str
+    text: str
+    replace: bool = False
+
+
+@dataclass
+class ToolCall(GraphEvent):
+    kind: ClassVar[str] = "tool_call"
+    node: str
+    name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    call_id: str = ""
+
+
+@dataclass
+class LLMToken(GraphEvent):
+    kind: ClassVar[str] = "llm_token"
+    node: str
+    text: str
+    message_id: str = ""
+
+
+@dataclass
+class AnalysisCompleted(GraphEvent):
+    kind: ClassVar[str] = "analysis_completed"
+    final_state: Dict[str, Any]
+    decision: Any = None
+
+
+def _section_values(update: Dict[str, Any]) -> Iterator[Tuple[str, str]]:
+    """从节点写入中取出报告章节及其当前内容"""
+    for name in REPORT_FIELDS:
+        value = update.get(name)
+        if isinstance(value, str) and value:
+            yield name, value
+    for state_name, names in DEBATE_FIELDS.items():
+        state = update.get(state_name)
+        if not isinstance(state, dict):
+            continue
+        for name in names:
+            value = state.get(name)
+            if isinstance(value, str) and value:
+                yield f"{state_name}.{name}", value
+
+
+def _chunk_text(message: Any) -> str:
+    content = getattr(message, "content", "")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            str(item.get("text", "")) if isinstance(item, dict) else str(item)
+            for item in content
+        )
+    return ""
+
+
+class GraphEventStream:
+    """
+    在编译好的分析图上执行一次流式运行，迭代得到增量事件
+
+    迭代结束后final_state为图的最终状态。
+    """
+
+    def __init__(self, graph, input_state: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+                 stream_tokens: bool = True):
+        """
+        Args:
+            graph: 编译好的LangGraph图
+            input_state: 初始状态
+            config: 图运行配置（recursion_limit、callbacks等）
+            stream_tokens: 是否推送LLM文本片段。开启后模型以流式方式调用
+        """
+        self.graph = graph
+        self.input_state = input_state
+        self.config = config or {}
+        self.stream_tokens = stream_tokens
+        self.final_state: Optional[Dict[str, Any]] = None
+        self._sections: Dict[str, str] = {}
+        self._started: Dict[str, float] = {}
+
+    def _stream_modes(self) -> List[str]:
+        modes = ["tasks", "values"]
+        if self.stream_tokens:
+            modes.append("messages")
+        return modes
+
+    def __iter__(self) -> Iterator[GraphEvent]:
+        for mode, chunk in self.graph.stream(self.input_state, config=self.config,
+                                             stream_mode=self._stream_modes()):
+            if mode == "values":
+                self.final_state = chunk
+            elif mode == "tasks":
+                yield from self._task_events(chunk)
+            elif mode == "messages":
+                yield from self._token_events(*chunk)
+
+    def _task_events(self, task: Dict[str, Any]) -> Iterator[GraphEvent]:
+        node = task.get("name", "")
+        task_id = task.get("id", "")
+
+        if "result" not in task:
+            self._started[task_id] = time.perf_counter()
+            yield NodeStarted(node=node, task_id=task_id)
+            return
+
+        # 不同LangGraph版本中result为字典或(通道, 值)列表
+        result = task.get("result") or {}
+        update = dict(result) if not isinstance(result, dict) else result
+
+        for message in update.get("messages") or []:
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                yield ToolCall(node=node, name=tool_call.get("name", ""),
+                               args=tool_call.get("args") or {}, call_id=tool_call.get("id") or "")
+
+        for section, text in _section_values(update):
+            previous = self._sections.get(section, "")
+            if text == previous:
+                continue
+            self._sections[section] = text
+            if previous and text.startswith(previous):
+                yield ReportDelta(section=section, node=node, delta=text[len(previous):], text=text)
+            else:
+                yield ReportDelta(section=section, node=node, delta=text, text=text,
+                                  replace=bool(previous))
+
+        started = self._started.pop(task_id, None)
+        duration = time.perf_counter() - started if started is not None else 0.0
+        error = task.get("error")
+        yield NodeFinished(node=node, task_id=task_id, duration=duration,
+                           error=str(error) if error else None)
+
+    def _token_events(self, message: Any, metadata: Dict[str, Any]) -> Iterator[GraphEvent]:
+        # messages流中也会出现工具结果和人工消息，这里只转发模型输出
+        if getattr(message, "type", "") not in ("ai", "AIMessageChunk"):
+            return
+        text = _chunk_text(message)
+        if text:
+            yield LLMToken(node=metadata.get("langgraph_node", ""), text=text,
+                           message_id=getattr(message, "id", None) or "")
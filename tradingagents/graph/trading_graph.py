@@ -2,14 +2,10 @@
 
 import os
 from pathlib import Path
-import json
+import uuid
 from datetime import date
 from typing import Dict, Any, Tuple, List, Optional
 
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_google_genai import ChatGoogleGenerativeAI
-from tradingagents.llm_adapters import ChatDashScope, ChatDashScopeOpenAI, ChatGoogleOpenAI
 
 from langgraph.prebuilt import ToolNode
 
@@ -28,13 +24,17 @@ from tradingagents.agents.utils.agent_states import (
     InvestDebateState,
     RiskDebateState,
 )
-from tradingagents.dataflows.interface import set_config
+from tradingagents.dataflows.config import set_config
+from tradingagents.dataflows.data_context import AnalysisDataContext
 
+from .checkpointing import create_checkpointer, delete_checkpoints
 from .conditional_logic import ConditionalLogic
 from .setup import GraphSetup
 from .propagation import Propagator
 from .reflection import Reflector
 from .signal_processing import SignalProcessor
+from .state_journal import StateJournal
+from .streaming import AnalysisCompleted, GraphEventStream
 
 
 class TradingAgentsGraph:
@@ -45,6 +45,8 @@ class TradingAgentsGraph:
         selected_analysts=["market", "social", "news", "fundamentals"],
         debug=False,
         config: Dict[str, Any] = None,
+        deep_thinking_llm=None,
+        quick_thinking_llm=None,
     ):
         """Initialize the trading agents graph and components.
 
@@ -52,6 +54,9 @@ class TradingAgentsGraph:
             selected_analysts: List of analyst types to include
             debug: Whether to run in debug mode
             config: Configuration dictionary. If None, uses default config
+            deep_thinking_llm: 预先创建的深度思考模型（如离线基准测试的桩模型），
+                与quick_thinking_llm同时传入时不再按llm_provider创建LLM
+            quick_thinking_llm: 预先创建的快速思考模型
         """
         self.debug = debug
         self.config = config or DEFAULT_CONFIG
@@ -66,11 +71,17 @@ class TradingAgentsGraph:
         )
 
         # Initialize LLMs
-        if self.config["llm_provider"].lower() == "openai":
+        if deep_thinking_llm is not None and quick_thinking_llm is not None:
+            logger.info(f"🔧 使用外部传入的LLM实例: {quick_thinking_llm.__class__.__name__}")
+            self.deep_thinking_llm = deep_thinking_llm
+            self.quick_thinking_llm = quick_thinking_llm
+        elif self.config["llm_provider"].lower() == "openai":
+            from langchain_openai import ChatOpenAI
             self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
         elif self.config["llm_provider"] == "siliconflow":
             # SiliconFlow支持：使用OpenAI兼容API
+            from langchain_openai import ChatOpenAI
             siliconflow_api_key = os.getenv('SILICONFLOW_API_KEY')
             if not siliconflow_api_key:
                 raise ValueError("使用SiliconFlow需要设置SILICONFLOW_API_KEY环境变量")
@@ -93,6 +104,7 @@ class TradingAgentsGraph:
             )
         elif self.config["llm_provider"] == "openrouter":
             # OpenRouter支持：优先使用OPENROUTER_API_KEY，否则使用OPENAI_API_KEY
+            from langchain_openai import ChatOpenAI
             openrouter_api_key = os.getenv('OPENROUTER_API_KEY') or os.getenv('OPENAI_API_KEY')
             if not openrouter_api_key:
                 raise ValueError("使用OpenRouter需要设置OPENROUTER_API_KEY或OPENAI_API_KEY环境变量")
@@ -110,13 +122,16 @@ class TradingAgentsGraph:
                 api_key=openrouter_api_key
             )
         elif self.config["llm_provider"] == "ollama":
+            from langchain_openai import ChatOpenAI
             self.deep_thinking_llm = ChatOpenAI(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatOpenAI(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
         elif self.config["llm_provider"].lower() == "anthropic":
+            from langchain_anthropic import ChatAnthropic
             self.deep_thinking_llm = ChatAnthropic(model=self.config["deep_think_llm"], base_url=self.config["backend_url"])
             self.quick_thinking_llm = ChatAnthropic(model=self.config["quick_think_llm"], base_url=self.config["backend_url"])
         elif self.config["llm_provider"].lower() == "google":
             # 使用 Google OpenAI 兼容适配器，解决工具调用格式不匹配问题
+            from tradingagents.llm_adapters import ChatGoogleOpenAI
             logger.info(f"🔧 使用Google AI OpenAI 兼容适配器 (解决工具调用问题)")
             google_api_key = os.getenv('GOOGLE_API_KEY')
             if not google_api_key:
@@ -141,6 +156,7 @@ class TradingAgentsGraph:
               "dashscope" in self.config["llm_provider"].lower() or
               "阿里百炼" in self.config["llm_provider"]):
             # 使用 OpenAI 兼容适配器，支持原生 Function Calling
+            from tradingagents.llm_adapters import ChatDashScopeOpenAI
             logger.info(f"🔧 使用阿里百炼 OpenAI 兼容适配器 (支持原生工具调用)")
             self.deep_thinking_llm = ChatDashScopeOpenAI(
                 model=self.config["deep_think_llm"],
@@ -183,6 +199,7 @@ class TradingAgentsGraph:
             logger.info(f"✅ [DeepSeek] 已启用token统计功能")
         elif self.config["llm_provider"].lower() == "custom_openai":
             # 自定义OpenAI端点配置
+            from langchain_openai import ChatOpenAI
             custom_api_key = os.getenv('CUSTOM_OPENAI_API_KEY')
             if not custom_api_key:
                 raise ValueError("使用自定义OpenAI端点需要设置CUSTOM_OPENAI_API_KEY环境变量")
@@ -213,6 +230,7 @@ class TradingAgentsGraph:
             logger.info(f"✅ [自定义OpenAI] 快速思考模型: {self.config['quick_think_llm']}")
         elif self.config["llm_provider"].lower() == "volcengine":
             # 火山引擎配置
+            from langchain_openai import ChatOpenAI
             volcengine_api_key = os.getenv('VOLCENGINE_API_KEY')
             if not volcengine_api_key:
                 raise ValueError("使用火山引擎需要设置VOLCENGINE_API_KEY环境变量")
@@ -290,10 +308,15 @@ class TradingAgentsGraph:
         # State tracking
         self.curr_state = None
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
+        self.data_context = None
+        self.log_states_dict = {}  # date to full state dict（仅在keep_state_log_in_memory开启时填充）
+
+        # 检查点存储（checkpoint_backend为空时不启用），用于失败或重启后恢复分析
+        self.checkpointer = create_checkpointer(self.config)
+        self.analysis_id = None
 
         # Set up the graph
-        self.graph = self.graph_setup.setup_graph(selected_analysts)
+        self.graph = self.graph_setup.setup_graph(selected_analysts, checkpointer=self.checkpointer)
 
     def _create_tool_nodes(self) -> Dict[str, ToolNode]:
         """Create tool nodes for different data sources."""
@@ -342,9 +365,118 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def propagate(self, company_name, trade_date, data_context: Optional[AnalysisDataContext] = None,
+                  callbacks: Optional[List[Any]] = None, analysis_id: Optional[str] = None):
+        """Run the trading agents graph for a company on a specific date.
+
+        Args:
+            company_name: 股票代码
+            trade_date: 分析日期
+            data_context: 本次分析的数据上下文。传入股票验证阶段使用的上下文时，
+                预获取的数据会被分析师工具直接复用；为None时为本次分析新建一个。
+            callbacks: 附加到本次图执行的LangChain回调（如性能统计）
+            analysis_id: 分析ID。启用检查点时每个节点完成后按该ID保存状态，
+                失败后可通过resume(analysis_id)继续；未传入时自动生成
+        """
+        init_agent_state, data_context = self._prepare_run(company_name, trade_date, data_context)
+        analysis_id = self._analysis_id(analysis_id)
+        args = self.propagator.get_graph_args(callbacks=callbacks, analysis_id=analysis_id)
+
+        with data_context.activate():
+            if self.debug:
+                # Debug mode with tracing
+                trace = []
+                for chunk in self.graph.stream(init_agent_state, **args):
+                    if len(chunk["messages"]) == 0:
+                        pass
+                    else:
+                        chunk["messages"][-1].pretty_print()
+                        trace.append(chunk)
+
+                final_state = trace[-1]
+            else:
+                # Standard mode without tracing
+                final_state = self.graph.invoke(init_agent_state, **args)
+
+        return final_state, self._finish_run(company_name, trade_date, final_state, data_context, analysis_id)
+
+    def resume(self, analysis_id: str, data_context: Optional[AnalysisDataContext] = None,
+               callbacks: Optional[List[Any]] = None):
+        """从检查点继续一次未完成的分析
+
+        已完成的节点（分析师报告、工具调用、辩论轮次）不会重新运行，从最后一个完成的节点之后继续。
+
+        Args:
+            analysis_id: propagate时使用的分析ID
+            data_context: 本次运行的数据上下文，为None时新建
+            callbacks: 附加到本次图执行的LangChain回调
+
+        Returns:
+            与propagate相同的(最终状态, 交易信号)
+
+        Raises:
+            ValueError: 未启用检查点或没有该分析的检查点
+        """
+        if self.checkpointer is None:
+            raise ValueError("未启用检查点（checkpoint_backend为空），无法恢复分析")
+
+        args = self.propagator.get_graph_args(callbacks=callbacks, analysis_id=analysis_id)
+        snapshot = self.graph.get_state(args["config"])
+        if not snapshot.values:
+            raise ValueError(f"没有找到分析 {analysis_id} 的检查点")
+
+        company_name = snapshot.values["company_of_interest"]
+        trade_date = snapshot.values["trade_date"]
+        self.ticker = company_name
+        self.analysis_id = analysis_id
+        data_context = self._ensure_data_context(data_context)
+
+        if snapshot.next:
+            logger.info(f"♻️ [检查点] 恢复分析 {analysis_id}: {company_name} {trade_date}，"
+                        f"从 {', '.join(snapshot.next)} 继续")
+            with data_context.activate():
+                final_state = self.graph.invoke(None, **args)
+        else:
+            logger.info(f"♻️ [检查点] 分析 {analysis_id} 已运行完成，直接使用检查点中的最终状态")
+            final_state = snapshot.values
+
+        return final_state, self._finish_run(company_name, trade_date, final_state, data_context, analysis_id)
+
+    def has_checkpoint(self, analysis_id: str) -> bool:
+        """是否存在该分析ID的检查点"""
+        if self.checkpointer is None or not analysis_id:
+            return False
+        config = self.propagator.get_graph_args(analysis_id=analysis_id)["config"]
+        try:
+            return bool(self.graph.get_state(config).values)
+        except Exception as e:
+            logger.warning(f"⚠️ [检查点] 读取检查点失败 {analysis_id}: {e}")
+            return False
 
+    def stream_events(self, company_name, trade_date, data_context: Optional[AnalysisDataContext] = None,
+                      callbacks: Optional[List[Any]] = None, stream_tokens: bool = True,
+                      analysis_id: Optional[str] = None):
+        """流式运行分析，逐个产出增量事件（见 tradingagents.graph.streaming）
+
+        参数与propagate相同。最后一个事件为AnalysisCompleted，携带最终状态和处理后的交易信号。
+
+        Args:
+            stream_tokens: 是否推送LLM文本片段。流式调用时部分适配器不会记录token用量，
+                需要精确统计成本时可关闭
+        """
+        init_agent_state, data_context = self._prepare_run(company_name, trade_date, data_context)
+        analysis_id = self._analysis_id(analysis_id)
+        config = self.propagator.get_graph_args(callbacks=callbacks, analysis_id=analysis_id)["config"]
+
+        stream = GraphEventStream(self.graph, init_agent_state, config=config, stream_tokens=stream_tokens)
+        yield from data_context.iterate(stream)
+
+        final_state = stream.final_state
+        decision = self._finish_run(company_name, trade_date, final_state, data_context, analysis_id)
+        yield AnalysisCompleted(final_state=final_state, decision=decision)
+
+    def _prepare_run(self, company_name, trade_date, data_context: Optional[AnalysisDataContext]):
+        """创建初始状态和本次分析的数据上下文"""
         # 添加详细的接收日志
         logger.debug(f"🔍 [GRAPH DEBUG] ===== TradingAgentsGraph.propagate 接收参数 =====")
         logger.debug(f"🔍 [GRAPH DEBUG] 接收到的company_name: '{company_name}' (类型: {type(company_name)})")
@@ -360,22 +492,27 @@ class TradingAgentsGraph:
         )
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的company_of_interest: '{init_agent_state.get('company_of_interest', 'NOT_FOUND')}'")
         logger.debug(f"🔍 [GRAPH DEBUG] 初始状态中的trade_date: '{init_agent_state.get('trade_date', 'NOT_FOUND')}'")
-        args = self.propagator.get_graph_args()
-
-        if self.debug:
-            # Debug mode with tracing
-            trace = []
-            for chunk in self.graph.stream(init_agent_state, **args):
-                if len(chunk["messages"]) == 0:
-                    pass
-                else:
-                    chunk["messages"][-1].pretty_print()
-                    trace.append(chunk)
-
-            final_state = trace[-1]
-        else:
-            # Standard mode without tracing
-            final_state = self.graph.invoke(init_agent_state, **args)
+
+        return init_agent_state, self._ensure_data_context(data_context)
+
+    def _ensure_data_context(self, data_context: Optional[AnalysisDataContext]) -> AnalysisDataContext:
+        """本次分析的数据上下文，工具调用在其中复用已获取的数据"""
+        if data_context is None:
+            data_context = AnalysisDataContext()
+        self.data_context = data_context
+        return data_context
+
+    def _analysis_id(self, analysis_id: Optional[str]) -> Optional[str]:
+        """启用检查点时每次运行都需要一个分析ID"""
+        if analysis_id is None and self.checkpointer is not None:
+            analysis_id = f"analysis_{uuid.uuid4().hex}"
+        self.analysis_id = analysis_id
+        return analysis_id
+
+    def _finish_run(self, company_name, trade_date, final_state, data_context: AnalysisDataContext,
+                    analysis_id: Optional[str] = None):
+        """记录最终状态并返回处理后的交易信号"""
+        logger.info(f"📦 [数据上下文] 本次分析数据复用统计: {data_context.stats()}")
 
         # Store current state for reflection
         self.curr_state = final_state
@@ -383,12 +520,16 @@ class TradingAgentsGraph:
         # Log state
         self._log_state(trade_date, final_state)
 
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"], company_name)
+        # 分析已完成，检查点不再需要
+        if self.checkpointer is not None and analysis_id and not self.config.get("checkpoint_keep_completed", False):
+            delete_checkpoints(self.checkpointer, analysis_id)
+
+        # Return processed signal
+        return self.process_signal(final_state["final_trade_decision"], company_name)
 
     def _log_state(self, trade_date, final_state):
-        """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        """Append the final state to the per-ticker state journal."""
+        record = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -418,15 +559,12 @@ class TradingAgentsGraph:
             "final_trade_decision": final_state["final_trade_decision"],
         }
 
-        # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
-        directory.mkdir(parents=True, exist_ok=True)
+        if self.config.get("keep_state_log_in_memory", False):
+            self.log_states_dict[str(trade_date)] = record
 
-        with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log.json",
-            "w",
-        ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+        # 追加写入一条记录，历史记录通过 StateJournalReader 按日期读取
+        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+        StateJournal(directory, compress=self.config.get("state_log_compress", False)).append(trade_date, record)
 
     def reflect_and_remember(self, returns_losses):
         """Reflect on decisions and update memory based on returns."""
@@ -1,6 +1,14 @@
 # LLM Adapters for TradingAgents
-from .dashscope_adapter import ChatDashScope
-from .dashscope_openai_adapter import ChatDashScopeOpenAI
-from .google_openai_adapter import ChatGoogleOpenAI
+# 适配器依赖各自的LLM SDK，按需导入，只在实际使用对应提供商时才加载
+from tradingagents.utils.lazy_import import lazy_dir, lazy_exports
+
+_EXPORTS = {
+    "ChatDashScope": ".dashscope_adapter",
+    "ChatDashScopeOpenAI": ".dashscope_openai_adapter",
+    "ChatGoogleOpenAI": ".google_openai_adapter",
+}
+
+__getattr__ = lazy_exports(__name__, globals(), _EXPORTS)
+__dir__ = lazy_dir(globals(), _EXPORTS)
 
 __all__ = ["ChatDashScope", "ChatDashScopeOpenAI", "ChatGoogleOpenAI"]
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+按需导入工具
+包的 __init__ 通过模块级 __getattr__（PEP 562）在第一次访问时才导入子模块，
+避免 import 包时就加载 LLM SDK、yfinance、chromadb 等重型依赖
+"""
+
+import importlib
+from typing import Any, Callable, Dict, Iterable
+
+
+def lazy_exports(package: str, namespace: Dict[str, Any], exports: Dict[str, str]) -> Callable[[str], Any]:
+    """
+    为包生成模块级 __getattr__
+
+    Args:
+        package: 包名，通常传 __name__
+        namespace: 包的全局命名空间，通常传 globals()，导入结果会缓存在这里
+        exports: 导出名称到模块的映射，例如 {"ChatDashScope": ".dashscope_adapter"}
+
+    Returns:
+        可以直接赋值给 __getattr__ 的函数
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = exports.get(name)
+        if module_name is None:
+            # "from package import submodule" 由导入系统自行处理，这里只负责登记的导出名称
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        # 相对导入以所在包为基准，普通模块（非包）的 __package__ 是其上级包
+        module = importlib.import_module(module_name, namespace.get("__package__") or package)
+        value = getattr(module, name)
+        namespace[name] = value
+        return value
+
+    return __getattr__
+
+
+def lazy_dir(namespace: Dict[str, Any], exports: Iterable[str]) -> Callable[[], list]:
+    """生成模块级 __dir__，让 dir() 和自动补全能看到按需导出的名称"""
+
+    def __dir__() -> list:
+        return sorted(set(namespace) | set(exports))
+
+    return __dir__
@@ -59,7 +59,8 @@ class StockDataPreparer:
         self.default_period_days = default_period_days  # 默认历史数据时长（天）
     
     def prepare_stock_data(self, stock_code: str, market_type: str = "auto",
-                          period_days: int = None, analysis_date: str = None) -> StockDataPreparationResult:
+                          period_days: int = None, analysis_date: str = None,
+                          data_context=None) -> StockDataPreparationResult:
         """
         预获取和验证股票数据
 
@@ -68,6 +69,8 @@ class StockDataPreparer:
             market_type: 市场类型 ("A股", "港股", "美股", "auto")
             period_days: 历史数据时长（天），默认使用类初始化时的值
             analysis_date: 分析日期，默认为今天
+            data_context: 本次分析的数据上下文(AnalysisDataContext)，
+                预获取的数据会记入其中供后续智能体复用
 
         Returns:
             StockDataPreparationResult: 数据准备结果
@@ -91,6 +94,9 @@ class StockDataPreparer:
             logger.debug(f"📊 [数据准备] 自动检测市场类型: {market_type}")
 
         # 3. 预获取数据并验证
+        if data_context is not None:
+            with data_context.activate():
+                return self._prepare_data_by_market(stock_code, market_type, period_days, analysis_date)
         return self._prepare_data_by_market(stock_code, market_type, period_days, analysis_date)
     
     def _validate_format(self, stock_code: str, market_type: str) -> StockDataPreparationResult:
@@ -692,7 +698,8 @@ def get_stock_preparer(default_period_days: int = 30) -> StockDataPreparer:
 
 
 def prepare_stock_data(stock_code: str, market_type: str = "auto",
-                      period_days: int = None, analysis_date: str = None) -> StockDataPreparationResult:
+                      period_days: int = None, analysis_date: str = None,
+                      data_context=None) -> StockDataPreparationResult:
     """
     便捷函数：预获取和验证股票数据
 
@@ -701,12 +708,14 @@ def prepare_stock_data(stock_code: str, market_type: str = "auto",
         market_type: 市场类型 ("A股", "港股", "美股", "auto")
         period_days: 历史数据时长（天），默认30天
         analysis_date: 分析日期，默认为今天
+        data_context: 本次分析的数据上下文(AnalysisDataContext)，可选
 
     Returns:
         StockDataPreparationResult: 数据准备结果
     """
     preparer = get_stock_preparer()
-    return preparer.prepare_stock_data(stock_code, market_type, period_days, analysis_date)
+    return preparer.prepare_stock_data(stock_code, market_type, period_days, analysis_date,
+                                       data_context=data_context)
 
 
 def is_stock_data_ready(stock_code: str, market_type: str = "auto",
@@ -9,6 +9,7 @@ import os
 import sys
 from pathlib import Path
 import datetime
+import threading
 import time
 from dotenv import load_dotenv
 
@@ -258,6 +259,24 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def start_memory_warmup():
+    """在后台打开持久化记忆并预创建集合（每个进程只运行一次）"""
+    if os.getenv("MEMORY_ENABLED", "true").lower() != "true":
+        return None
+
+    def _warm_up():
+        try:
+            from tradingagents.agents.utils.memory import warm_start_memories
+            from tradingagents.default_config import DEFAULT_CONFIG
+            warm_start_memories(DEFAULT_CONFIG)
+        except Exception as e:
+            logger.warning(f"⚠️ [记忆预热] 预热失败，首次分析时再初始化: {e}")
+
+    thread = threading.Thread(target=_warm_up, name="memory-warmup", daemon=True)
+    thread.start()
+    return thread
+
 def initialize_session_state():
     """初始化会话状态"""
     if 'analysis_results' not in st.session_state:
@@ -363,6 +382,9 @@ def main():
     # 初始化会话状态
     initialize_session_state()
 
+    # 预热记忆存储
+    start_memory_warmup()
+
     # 自定义CSS - 调整侧边栏宽度
     st.markdown("""
     <style>
@@ -792,6 +814,11 @@ def main():
             logger.debug(f"🔍 [APP DEBUG] 股票代码: '{form_data['stock_symbol']}'")
             logger.debug(f"🔍 [APP DEBUG] 市场类型: '{form_data['market_type']}'")
 
+        # 从检查点继续失败的分析：使用原分析ID和原分析参数重新提交
+        resume_request = st.session_state.pop('resume_analysis_request', None)
+        if resume_request:
+            form_data = resume_request
+
         # 检查是否提交了表单
         if form_data.get('submitted', False) and not st.session_state.get('analysis_running', False):
             # 只有在没有分析运行时才处理新的提交
@@ -816,9 +843,10 @@ def main():
                 st.session_state.analysis_results = None
                 logger.info("🧹 [新分析] 清空旧的分析结果")
 
-                # 生成分析ID
+                # 生成分析ID；从检查点继续时沿用原分析ID，对应原来的检查点
                 import uuid
-                analysis_id = f"analysis_{uuid.uuid4().hex[:8]}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                analysis_id = form_data.get('resume_analysis_id') or \
+                    f"analysis_{uuid.uuid4().hex[:8]}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
                 # 保存分析ID和表单配置到session state和cookie
                 form_config = st.session_state.get('form_config', {})
@@ -835,7 +863,14 @@ def main():
                     analysis_id=analysis_id,
                     analysts=form_data['analysts'],
                     research_depth=form_data['research_depth'],
-                    llm_provider=config['llm_provider']
+                    llm_provider=config['llm_provider'],
+                    run_params={
+                        'stock_symbol': form_data['stock_symbol'],
+                        'market_type': form_data.get('market_type', '美股'),
+                        'analysis_date': form_data['analysis_date'],
+                        'analysts': form_data['analysts'],
+                        'research_depth': form_data['research_depth'],
+                    }
                 )
 
                 # 创建进度回调函数
@@ -899,7 +934,8 @@ def main():
                             market_type=form_data.get('market_type', '美股'),
                             llm_model=config['llm_model'],
                             progress_callback=progress_callback,
-                            custom_openai_config=custom_openai_config
+                            custom_openai_config=custom_openai_config,
+                            analysis_id=analysis_id
                         )
 
                         # 标记分析完成并保存结果（不访问session state）
@@ -969,6 +1005,19 @@ def main():
 
                 elif actual_status == 'failed':
                     st.error(f"❌ 分析失败: {current_analysis_id}")
+
+                    # 失败或进程重启中断的分析有检查点时，可以从最后完成的步骤继续
+                    run_params = (progress_data or {}).get('run_params')
+                    resumable_key = f"resumable_{current_analysis_id}"
+                    if resumable_key not in st.session_state:
+                        from utils.analysis_runner import has_resumable_checkpoint
+                        st.session_state[resumable_key] = has_resumable_checkpoint(current_analysis_id, run_params)
+                    if st.session_state[resumable_key] and st.button("♻️ 从中断处继续分析", key=f"resume_{current_analysis_id}"):
+                        st.session_state[resumable_key] = False
+                        st.session_state.resume_analysis_request = {
+                            **run_params, 'submitted': True, 'resume_analysis_id': current_analysis_id
+                        }
+                        st.rerun()
                 else:
                     st.warning(f"⚠️ 分析状态未知: {current_analysis_id}")
 
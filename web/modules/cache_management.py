@@ -71,8 +71,8 @@ def main():
         
         if st.button("🗑️ 清理过期缓存", type="secondary"):
             with st.spinner("正在清理过期缓存..."):
-                cache.clear_old_cache(max_age_days)
-            st.success(f"✅ 已清理 {max_age_days} 天前的缓存")
+                cleared_count = cache.clear_old_cache(max_age_days)
+            st.success(f"✅ 已清理 {max_age_days} 天前的缓存（{cleared_count}个）")
             st.rerun()
     
     # 主要内容区域
@@ -120,6 +120,12 @@ def main():
                 value=f"{stats['fundamentals_count']}个",
                 help="缓存的基本面数据文件数量"
             )
+
+            # 容量配额
+            if stats.get('quota_mb'):
+                st.progress(min(stats['total_size_mb'] / stats['quota_mb'], 1.0),
+                            text=f"容量配额: {stats['total_size_mb']} / {stats['quota_mb']} MB "
+                                 f"({stats['eviction_policy'].upper()}淘汰，已淘汰{stats['evictions']}个)")
             
         except Exception as e:
             st.error(f"获取缓存统计失败: {e}")
@@ -254,32 +260,24 @@ def main():
         }[x]
     )
     
-    # 显示缓存文件列表
+    # 显示缓存文件列表（来自缓存索引，不再逐个读取元数据文件）
     try:
-        metadata_files = list(cache.metadata_dir.glob("*_meta.json"))
+        entries = cache.list_cache_entries(data_type)
         
-        if metadata_files:
-            import json
+        if cache.get_cache_stats()['total_files']:
             from datetime import datetime
             
             cache_items = []
-            for metadata_file in metadata_files:
-                try:
-                    with open(metadata_file, 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                    
-                    if metadata.get('data_type') == data_type:
-                        cached_at = datetime.fromisoformat(metadata['cached_at'])
-                        cache_items.append({
-                            'symbol': metadata.get('symbol', 'N/A'),
-                            'data_source': metadata.get('data_source', 'N/A'),
-                            'cached_at': cached_at.strftime('%Y-%m-%d %H:%M:%S'),
-                            'start_date': metadata.get('start_date', 'N/A'),
-                            'end_date': metadata.get('end_date', 'N/A'),
-                            'file_path': metadata.get('file_path', 'N/A')
-                        })
-                except Exception:
-                    continue
+            for entry in entries:
+                cached_at = datetime.fromisoformat(entry['cached_at']) if entry.get('cached_at') else None
+                cache_items.append({
+                    'symbol': entry.get('symbol') or 'N/A',
+                    'data_source': entry.get('data_source') or 'N/A',
+                    'cached_at': cached_at.strftime('%Y-%m-%d %H:%M:%S') if cached_at else 'N/A',
+                    'start_date': entry.get('start_date') or 'N/A',
+                    'end_date': entry.get('end_date') or 'N/A',
+                    'file_path': entry.get('file_path') or 'N/A'
+                })
             
             if cache_items:
                 # 按缓存时间排序
@@ -24,6 +24,8 @@ load_dotenv(project_root / ".env", override=True)
 from tradingagents.utils.logging_init import setup_web_logging
 logger = setup_web_logging()
 
+from tradingagents.graph.checkpointing import checkpoint_exists, checkpoint_thread_id, is_transient_error
+
 # 添加配置管理器
 try:
     from tradingagents.config.config_manager import token_tracker
@@ -97,7 +99,31 @@ def extract_risk_assessment(state):
         logger.info(f"提取风险评估数据时出错: {e}")
         return None
 
-def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, market_type="美股", progress_callback=None, custom_openai_config=None):
+def checkpoint_config(base_config=None):
+    """Web分析使用的配置副本，默认启用检查点，失败或重启后可以从最后完成的节点继续"""
+    from tradingagents.default_config import DEFAULT_CONFIG
+
+    config = dict(base_config or DEFAULT_CONFIG)
+    config["checkpoint_backend"] = config.get("checkpoint_backend") or "auto"
+    return config
+
+
+def has_resumable_checkpoint(analysis_id, run_params):
+    """
+    失败或被中断的分析是否可以从检查点继续
+
+    Args:
+        analysis_id: 会话中持久化的分析ID
+        run_params: 进度数据中保存的分析参数（stock_symbol、analysis_date等）
+    """
+    if not analysis_id or not run_params:
+        return False
+    thread_id = checkpoint_thread_id(analysis_id, run_params.get('stock_symbol', ''),
+                                     run_params.get('analysis_date', ''))
+    return checkpoint_exists(checkpoint_config(), thread_id)
+
+
+def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, llm_provider, llm_model, market_type="美股", progress_callback=None, custom_openai_config=None, analysis_id=None):
     """执行股票分析
 
     Args:
@@ -109,6 +135,8 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         llm_model: 大模型名称
         progress_callback: 进度回调函数，用于更新UI状态
         custom_openai_config: 自定义OpenAI端点配置 (仅当llm_provider为custom_openai时使用)
+        analysis_id: 会话中持久化的分析ID，与股票代码、分析日期一起组成检查点键。
+            同一ID重新提交同一分析且已有未完成的检查点时从中断处继续
     """
 
     def update_progress(message, step=None, total_steps=None):
@@ -123,6 +151,10 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
     # 1. 数据预获取和验证阶段
     update_progress("🔍 验证股票代码并预获取数据...", 1, 10)
 
+    # 本次分析的数据上下文，验证阶段预获取的数据由后续分析师直接复用
+    from tradingagents.dataflows.data_context import AnalysisDataContext
+    data_context = AnalysisDataContext(session_id)
+
     try:
         from tradingagents.utils.stock_validator import prepare_stock_data
 
@@ -131,7 +163,8 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
             stock_code=stock_symbol,
             market_type=market_type,
             period_days=30,  # 可以根据research_depth调整
-            analysis_date=analysis_date
+            analysis_date=analysis_date,
+            data_context=data_context
         )
 
         if not preparation_result.is_valid:
@@ -237,7 +270,7 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
 
         # 创建配置
         update_progress("配置分析参数...")
-        config = DEFAULT_CONFIG.copy()
+        config = checkpoint_config(DEFAULT_CONFIG)
         config["llm_provider"] = llm_provider
         config["deep_think_llm"] = llm_model
         config["quick_think_llm"] = llm_model
@@ -484,7 +517,21 @@ def run_stock_analysis(stock_symbol, analysis_date, analysts, research_depth, ll
         logger.debug(f"🔍 [RUNNER DEBUG]   symbol: '{formatted_symbol}'")
         logger.debug(f"🔍 [RUNNER DEBUG]   date: '{analysis_date}'")
 
-        state, decision = graph.propagate(formatted_symbol, analysis_date)
+        thread_id = checkpoint_thread_id(analysis_id, stock_symbol, analysis_date) if analysis_id else None
+        if graph.has_checkpoint(thread_id):
+            update_progress("♻️ 发现未完成的分析检查点，从中断处继续...")
+            state, decision = graph.resume(thread_id, data_context=data_context)
+        else:
+            try:
+                state, decision = graph.propagate(formatted_symbol, analysis_date, data_context=data_context,
+                                                  analysis_id=thread_id)
+            except Exception as e:
+                # 网络、超时或限流中断时重试一次：已完成的节点都有检查点，只重新运行失败的节点及之后的部分
+                if not is_transient_error(e) or not graph.has_checkpoint(graph.analysis_id):
+                    raise
+                logger.warning(f"⚠️ [检查点] 分析中断: {e}，从最后完成的节点重试")
+                update_progress("♻️ 分析中断，从最后完成的步骤重试...")
+                state, decision = graph.resume(graph.analysis_id, data_context=data_context)
 
         # 调试信息
         logger.debug(f"🔍 [DEBUG] 分析完成，decision类型: {type(decision)}")
@@ -46,7 +46,8 @@ def safe_serialize(obj):
 class AsyncProgressTracker:
     """异步进度跟踪器"""
     
-    def __init__(self, analysis_id: str, analysts: List[str], research_depth: int, llm_provider: str):
+    def __init__(self, analysis_id: str, analysts: List[str], research_depth: int, llm_provider: str,
+                 run_params: Optional[Dict[str, Any]] = None):
         self.analysis_id = analysis_id
         self.analysts = analysts
         self.research_depth = research_depth
@@ -75,6 +76,9 @@ class AsyncProgressTracker:
             'start_time': self.start_time,
             'steps': self.analysis_steps
         }
+        if run_params:
+            # 保存分析参数，失败或重启后可以用同一分析ID从检查点继续
+            self.progress_data['run_params'] = run_params
         
         # 尝试初始化Redis，失败则使用文件
         self.redis_client = None
@@ -128,7 +132,7 @@ class AsyncProgressTracker:
                 logger.info(f"📊 [异步进度] Redis已禁用，使用文件存储")
                 return False
 
-            import redis
+            from tradingagents.config.connection_registry import build_redis_url, get_redis_client
 
             # 从环境变量获取Redis配置
             redis_host = os.getenv('REDIS_HOST', 'localhost')
@@ -136,22 +140,11 @@ class AsyncProgressTracker:
             redis_password = os.getenv('REDIS_PASSWORD', None)
             redis_db = int(os.getenv('REDIS_DB', 0))
 
-            # 创建Redis连接
-            if redis_password:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    password=redis_password,
-                    db=redis_db,
-                    decode_responses=True
-                )
-            else:
-                self.redis_client = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    db=redis_db,
-                    decode_responses=True
-                )
+            # 使用进程共享的Redis连接池
+            self.redis_client = get_redis_client(
+                build_redis_url(redis_host, redis_port, redis_password, redis_db),
+                decode_responses=True
+            )
 
             # 测试连接
             self.redis_client.ping()
@@ -583,7 +576,7 @@ def get_progress_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
         # 如果Redis启用，先尝试Redis
         if redis_enabled:
             try:
-                import redis
+                from tradingagents.config.connection_registry import build_redis_url, get_redis_client
 
                 # 从环境变量获取Redis配置
                 redis_host = os.getenv('REDIS_HOST', 'localhost')
@@ -591,22 +584,11 @@ def get_progress_by_id(analysis_id: str) -> Optional[Dict[str, Any]]:
                 redis_password = os.getenv('REDIS_PASSWORD', None)
                 redis_db = int(os.getenv('REDIS_DB', 0))
 
-                # 创建Redis连接
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
+                # 使用进程共享的Redis连接池
+                redis_client = get_redis_client(
+                    build_redis_url(redis_host, redis_port, redis_password, redis_db),
+                    decode_responses=True
+                )
 
                 key = f"progress:{analysis_id}"
                 data = redis_client.get(key)
@@ -647,7 +629,7 @@ def get_latest_analysis_id() -> Optional[str]:
         # 如果Redis启用，先尝试从Redis获取
         if redis_enabled:
             try:
-                import redis
+                from tradingagents.config.connection_registry import build_redis_url, get_redis_client
 
                 # 从环境变量获取Redis配置
                 redis_host = os.getenv('REDIS_HOST', 'localhost')
@@ -655,22 +637,11 @@ def get_latest_analysis_id() -> Optional[str]:
                 redis_password = os.getenv('REDIS_PASSWORD', None)
                 redis_db = int(os.getenv('REDIS_DB', 0))
 
-                # 创建Redis连接
-                if redis_password:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        password=redis_password,
-                        db=redis_db,
-                        decode_responses=True
-                    )
-                else:
-                    redis_client = redis.Redis(
-                        host=redis_host,
-                        port=redis_port,
-                        db=redis_db,
-                        decode_responses=True
-                    )
+                # 使用进程共享的Redis连接池
+                redis_client = get_redis_client(
+                    build_redis_url(redis_host, redis_port, redis_password, redis_db),
+                    decode_responses=True
+                )
 
                 # 获取所有progress键
                 keys = redis_client.keys("progress:*")
@@ -16,7 +16,7 @@ from tradingagents.utils.logging_manager import get_logger
 logger = get_logger('web')
 
 # 导入报告导出器
-from .report_exporter import save_modular_reports_to_results_dir, save_report_to_results_dir, ReportExporter
+from .report_exporter import save_modular_reports_to_results_dir, save_report_to_results_dir, report_exporter
 
 def _format_team_decision_content(content: Dict[str, Any], module_key: str) -> str:
     """格式化团队决策内容"""
@@ -63,7 +63,8 @@ class AutoSaver:
     def __init__(self):
         self.enabled = True  # 默认启用
         self.save_formats = ['markdown']  # 默认保存markdown格式
-        self.report_exporter = ReportExporter()
+        # 与导出按钮共用同一个导出器，预渲染结果可以直接被下载复用
+        self.report_exporter = report_exporter
 
     def is_enabled(self) -> bool:
         """检查自动保存是否启用"""
@@ -84,6 +85,13 @@ class AutoSaver:
         Returns:
             保存结果信息
         """
+        # 分析完成后在后台预渲染常用格式，用户点击下载时直接命中缓存
+        if results:
+            try:
+                self.report_exporter.prerender(results)
+            except Exception as e:
+                logger.warning(f"⚠️ 后台预渲染提交失败: {e}")
+
         if not self.is_enabled():
             logger.debug("🔇 自动保存已禁用，跳过保存")
             return {'enabled': False}
@@ -276,7 +284,7 @@ def render_auto_save_settings():
             save_docx = st.checkbox(
                 "📝 Word文档",
                 value='docx' in st.session_state.get('auto_save_formats', ['markdown']),
-                help="适合进一步编辑和格式化" + ("" if ReportExporter().pandoc_available else " (需要pandoc)")
+                help="适合进一步编辑和格式化" + ("" if report_exporter.pandoc_available else " (需要pandoc)")
             )
             
             # 显示总是保存的项目
@@ -289,7 +297,7 @@ def render_auto_save_settings():
             formats.append('markdown')
         if save_json:
             formats.append('json')
-        if save_docx and ReportExporter().pandoc_available:
+        if save_docx and report_exporter.pandoc_available:
             formats.append('docx')
         
         st.session_state.auto_save_formats = formats
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+报告导出缓存和后台渲染
+按分析结果内容和导出格式的哈希缓存渲染好的文件，渲染在后台线程池中执行：
+- 同一份结果同一格式只渲染一次，重复点击下载直接返回缓存
+- 多个请求同时导出同一份报告时合并为一次渲染
+- 分析完成后可以提前在后台渲染常用格式
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# 导入日志模块
+from tradingagents.utils.logging_manager import get_logger
+logger = get_logger('web')
+
+# 报告模板变化时递增，使旧缓存失效
+RENDER_VERSION = "1"
+
+# 导出格式对应的缓存文件扩展名
+FORMAT_EXTENSIONS = {"markdown": "md", "docx": "docx", "pdf": "pdf"}
+
+
+def export_cache_quota_bytes() -> int:
+    """磁盘导出缓存容量配额（环境变量 TRADINGAGENTS_EXPORT_CACHE_QUOTA_MB，0表示不限制）"""
+    return int(float(os.getenv("TRADINGAGENTS_EXPORT_CACHE_QUOTA_MB", "256")) * 1024 * 1024)
+
+
+def export_cache_max_age_seconds() -> float:
+    """磁盘导出缓存文件的最长保留时间（环境变量 TRADINGAGENTS_EXPORT_CACHE_MAX_AGE_DAYS，0表示不限制）"""
+    return float(os.getenv("TRADINGAGENTS_EXPORT_CACHE_MAX_AGE_DAYS", "30")) * 86400
+
+
+def results_fingerprint(results: Dict[str, Any], format_type: str) -> str:
+    """计算分析结果在指定格式下的内容哈希"""
+    payload = json.dumps(results, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha256()
+    digest.update(f"{RENDER_VERSION}:{format_type}:".encode("utf-8"))
+    digest.update(payload.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def snapshot_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """复制一份结果交给后台线程，避免渲染期间结果被页面修改"""
+    try:
+        return copy.deepcopy(results)
+    except Exception:
+        return results
+
+
+class ExportCache:
+    """导出文件缓存：内存LRU + 磁盘目录（写入时按容量配额和保留时间清理，读取时更新文件时间）"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_memory_items: Optional[int] = None,
+                 quota_bytes: Optional[int] = None, max_age_seconds: Optional[float] = None):
+        if cache_dir is None:
+            project_root = Path(__file__).parent.parent.parent
+            cache_dir = os.getenv("TRADINGAGENTS_EXPORT_CACHE_DIR", str(project_root / "data" / "export_cache"))
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_items = max_memory_items or int(os.getenv("EXPORT_CACHE_MEMORY_ITEMS", "32"))
+        self.quota_bytes = export_cache_quota_bytes() if quota_bytes is None else quota_bytes
+        self.max_age_seconds = export_cache_max_age_seconds() if max_age_seconds is None else max_age_seconds
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, format_type: str) -> Path:
+        extension = FORMAT_EXTENSIONS.get(format_type, "bin")
+        return self.cache_dir / key[:2] / f"{key}.{extension}"
+
+    def _remember(self, key: str, data: bytes):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str, format_type: str) -> Optional[bytes]:
+        """读取缓存，内存未命中时读磁盘"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return data
+
+        path = self._path(key, format_type)
+        try:
+            data = path.read_bytes()
+            # 按最近使用时间淘汰
+            os.utime(path)
+        except OSError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key: str, format_type: str, data: bytes):
+        """写入缓存，磁盘写入失败时只保留内存缓存"""
+        self._remember(key, data)
+        path = self._path(key, format_type)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ [导出缓存] 写入磁盘失败: {e}")
+            return
+        self.prune(protect=path)
+
+    def prune(self, protect: Optional[Path] = None) -> int:
+        """删除超过保留时间的文件，总大小超过配额时从最久未使用的文件开始删除，返回删除的文件数"""
+        if not self.quota_bytes and not self.max_age_seconds:
+            return 0
+        files = []
+        for path in self.cache_dir.glob("*/*"):
+            if path.suffix == ".tmp" or path == protect:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(key=lambda item: item[0])
+
+        total = sum(size for _, size, _ in files)
+        if protect is not None:
+            try:
+                total += protect.stat().st_size
+            except OSError:
+                pass
+        expire_before = time.time() - self.max_age_seconds if self.max_age_seconds else None
+        removed = 0
+        for mtime, size, path in files:
+            expired = expire_before is not None and mtime < expire_before
+            if not expired and (not self.quota_bytes or total <= self.quota_bytes):
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"🧹 [导出缓存] 清理{removed}个旧文件")
+        return removed
+
+
+class ExportRenderPool:
+    """后台渲染线程池，按内容哈希合并重复渲染"""
+
+    def __init__(self, cache: Optional[ExportCache] = None, max_workers: Optional[int] = None):
+        self.cache = cache or ExportCache()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv("EXPORT_RENDER_WORKERS", "2")),
+            thread_name_prefix="report-render",
+        )
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "renders": 0, "joined": 0, "failures": 0}
+
+    def submit(self, key: str, format_type: str, render: Callable[[], bytes]) -> Future:
+        """
+        提交渲染任务
+
+        缓存命中时返回已完成的Future；同一key正在渲染时返回同一个Future
+        """
+        cached = self.cache.get(key, format_type)
+        if cached is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+            future: Future = Future()
+            future.set_result(cached)
+            return future
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                self._stats["joined"] += 1
+                return future
+            self._stats["renders"] += 1
+            future = self._executor.submit(self._run, key, format_type, render)
+            self._pending[key] = future
+            return future
+
+    def _run(self, key: str, format_type: str, render: Callable[[], bytes]) -> bytes:
+        try:
+            data = render()
+            self.cache.put(key, format_type, data)
+            return data
+        except Exception:
+            with self._lock:
+                self._stats["failures"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def render(self, key: str, format_type: str, render: Callable[[], bytes],
+               timeout: Optional[float] = None) -> bytes:
+        """提交渲染并等待结果，渲染失败时抛出原异常"""
+        return self.submit(key, format_type, render).result(timeout=timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending"] = len(self._pending)
+        return stats
+
+
+_render_pool: Optional[ExportRenderPool] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_export_render_pool() -> ExportRenderPool:
+    """获取进程共享的渲染线程池"""
+    global _render_pool
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = ExportRenderPool()
+    return _render_pool
@@ -4,21 +4,121 @@
 """
 
 import streamlit as st
+import heapq
 import json
+import os
+import threading
 import time
 import hashlib
-import os
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
 class FileSessionManager:
-    """基于文件的会话管理器"""
+    """
+    基于文件的会话管理器
+
+    会话文件按指纹命名（{fingerprint}.json），按指纹直接定位文件，不需要遍历目录。
+    内存中维护 指纹 -> 过期时间 的索引（启动时只扫描一次文件修改时间，不解析文件内容），
+    以及按过期时间排序的堆，由后台清理线程定期删除过期文件；页面加载时的开销与累积的会话数量无关。
+    """
     
-    def __init__(self):
-        self.data_dir = Path("./data/sessions")
+    def __init__(self, data_dir: str = "./data/sessions", max_age_hours: float = 24,
+                 sweep_interval: float = 600):
+        """
+        Args:
+            data_dir: 会话文件目录
+            max_age_hours: 会话有效期（小时）
+            sweep_interval: 后台清理间隔（秒），0表示不启动清理线程
+        """
+        self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.max_age_hours = 24  # 会话有效期24小时
+        self.max_age_hours = max_age_hours  # 会话有效期（默认24小时）
+
+        self._lock = threading.Lock()
+        self._expires: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._latest: Optional[str] = None
+        self._build_index()
+
+        self._stop_event = threading.Event()
+        self._sweeper = None
+        if sweep_interval > 0:
+            self._sweeper = threading.Thread(target=self._sweep_loop, args=(sweep_interval,),
+                                             name="file-session-sweeper", daemon=True)
+            self._sweeper.start()
+
+    # ---- 过期索引 ----
+
+    @property
+    def _max_age_seconds(self) -> float:
+        return self.max_age_hours * 3600
+
+    def _build_index(self):
+        """启动时扫描一次会话目录，只读取文件修改时间"""
+        try:
+            with os.scandir(self.data_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json"):
+                        try:
+                            self._track(entry.name[:-5], entry.stat().st_mtime)
+                        except OSError:
+                            continue
+        except OSError:
+            pass
+        self._sweep()
+
+    def _track(self, fingerprint: str, updated_at: float):
+        """记录会话的最后更新时间（调用方负责加锁或在初始化阶段调用）"""
+        expires_at = updated_at + self._max_age_seconds
+        self._expires[fingerprint] = expires_at
+        heapq.heappush(self._heap, (expires_at, fingerprint))
+        if self._latest is None or expires_at >= self._expires.get(self._latest, 0):
+            self._latest = fingerprint
+
+    def _untrack(self, fingerprint: str):
+        self._expires.pop(fingerprint, None)
+        if self._latest == fingerprint:
+            self._latest = max(self._expires, key=self._expires.get) if self._expires else None
+
+    def _sweep(self, now: Optional[float] = None) -> int:
+        """删除已过期的会话文件，返回删除的数量"""
+        now = time.time() if now is None else now
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, fingerprint = heapq.heappop(self._heap)
+                # 堆中可能有会话更新前的旧记录，以索引中的过期时间为准
+                if self._expires.get(fingerprint) == expires_at:
+                    self._untrack(fingerprint)
+                    expired.append(fingerprint)
+        for fingerprint in expired:
+            try:
+                self._get_session_file_path(fingerprint).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+        return len(expired)
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop_event.wait(interval):
+            try:
+                self._sweep()
+            except Exception:
+                pass  # 清理失败不影响主要功能
+
+    def stop(self):
+        """停止后台清理线程"""
+        self._stop_event.set()
+
+    def _newest_fingerprint(self) -> Optional[str]:
+        """最近更新且未过期的会话指纹"""
+        with self._lock:
+            fingerprint = self._latest
+            if fingerprint is not None and self._expires.get(fingerprint, 0) > time.time():
+                return fingerprint
+        return None
         
     def _get_browser_fingerprint(self) -> str:
         """生成浏览器指纹"""
@@ -28,23 +128,9 @@ class FileSessionManager:
             if hasattr(st.session_state, 'file_session_fingerprint'):
                 return st.session_state.file_session_fingerprint
 
-            # 方法2：查找最近的session文件（24小时内）
-            current_time = time.time()
-            recent_files = []
-
-            for session_file in self.data_dir.glob("*.json"):
-                try:
-                    file_age = current_time - session_file.stat().st_mtime
-                    if file_age < (24 * 3600):  # 24小时内的文件
-                        recent_files.append((session_file, file_age))
-                except:
-                    continue
-
-            if recent_files:
-                # 使用最新的session文件
-                recent_files.sort(key=lambda x: x[1])  # 按文件年龄排序
-                newest_file = recent_files[0][0]
-                fingerprint = newest_file.stem
+            # 方法2：使用最近的session文件（24小时内），从过期索引中直接取得
+            fingerprint = self._newest_fingerprint()
+            if fingerprint:
                 # 保存到session_state以便后续使用
                 st.session_state.file_session_fingerprint = fingerprint
                 return fingerprint
@@ -66,20 +152,9 @@ class FileSessionManager:
         return self.data_dir / f"{fingerprint}.json"
     
     def _cleanup_old_sessions(self):
-        """清理过期的会话文件"""
+        """清理过期的会话文件（由后台线程定期调用，也可手动调用）"""
         try:
-            current_time = time.time()
-            max_age_seconds = self.max_age_hours * 3600
-            
-            for session_file in self.data_dir.glob("*.json"):
-                try:
-                    # 检查文件修改时间
-                    file_age = current_time - session_file.stat().st_mtime
-                    if file_age > max_age_seconds:
-                        session_file.unlink()
-                except Exception:
-                    continue
-                    
+            self._sweep()
         except Exception:
             pass  # 清理失败不影响主要功能
     
@@ -88,9 +163,6 @@ class FileSessionManager:
                            form_config: Dict[str, Any] = None):
         """保存分析状态和表单配置"""
         try:
-            # 清理过期文件
-            self._cleanup_old_sessions()
-
             fingerprint = self._get_browser_fingerprint()
             session_file = self._get_session_file_path(fingerprint)
 
@@ -108,9 +180,13 @@ class FileSessionManager:
             if form_config:
                 session_data["form_config"] = form_config
             
-            # 保存到文件
-            with open(session_file, 'w', encoding='utf-8') as f:
+            # 保存到文件（先写临时文件再替换，避免读到写了一半的文件）
+            tmp_file = session_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(session_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, session_file)
+            with self._lock:
+                self._track(fingerprint, session_data["last_update"])
 
             # 同时保存到session state
             st.session_state.current_analysis_id = analysis_id
@@ -131,19 +207,20 @@ class FileSessionManager:
             fingerprint = self._get_browser_fingerprint()
             session_file = self._get_session_file_path(fingerprint)
 
-            # 检查文件是否存在
-            if not session_file.exists():
-                return None
-
             # 读取会话数据
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
+            try:
+                with open(session_file, 'r', encoding='utf-8') as f:
+                    session_data = json.load(f)
+            except FileNotFoundError:
+                return None
 
             # 检查是否过期
             timestamp = session_data.get("timestamp", 0)
-            if time.time() - timestamp > (self.max_age_hours * 3600):
+            if time.time() - timestamp > self._max_age_seconds:
                 # 过期了，删除文件
-                session_file.unlink()
+                with self._lock:
+                    self._untrack(fingerprint)
+                session_file.unlink(missing_ok=True)
                 return None
 
             return session_data
@@ -159,8 +236,9 @@ class FileSessionManager:
             session_file = self._get_session_file_path(fingerprint)
             
             # 删除文件
-            if session_file.exists():
-                session_file.unlink()
+            with self._lock:
+                self._untrack(fingerprint)
+            session_file.unlink(missing_ok=True)
             
             # 清除session state
             keys_to_remove = ['current_analysis_id', 'analysis_running', 'last_stock_symbol', 'last_market_type', 'session_fingerprint']
@@ -185,10 +263,11 @@ class FileSessionManager:
                 "session_state_keys": [k for k in st.session_state.keys() if 'analysis' in k.lower() or 'session' in k.lower()]
             }
             
-            # 统计会话文件数量
-            session_files = list(self.data_dir.glob("*.json"))
-            debug_info["total_session_files"] = len(session_files)
-            debug_info["session_files"] = [f.name for f in session_files]
+            # 统计会话文件数量（来自过期索引）
+            with self._lock:
+                session_names = [f"{name}.json" for name in self._expires]
+            debug_info["total_session_files"] = len(session_names)
+            debug_info["session_files"] = session_names
             
             if session_file.exists():
                 try:
@@ -26,7 +26,7 @@ class RedisSessionManager:
             if redis_enabled != 'true':
                 return False
 
-            import redis
+            from tradingagents.config.connection_registry import build_redis_url, get_redis_client
 
             # 从环境变量获取Redis配置
             redis_host = os.getenv('REDIS_HOST', 'localhost')
@@ -34,15 +34,10 @@ class RedisSessionManager:
             redis_password = os.getenv('REDIS_PASSWORD', None)
             redis_db = int(os.getenv('REDIS_DB', 0))
             
-            # 创建Redis连接
-            self.redis_client = redis.Redis(
-                host=redis_host,
-                port=redis_port,
-                password=redis_password,
-                db=redis_db,
-                decode_responses=True,
-                socket_timeout=5,
-                socket_connect_timeout=5
+            # 使用进程共享的Redis连接池
+            self.redis_client = get_redis_client(
+                build_redis_url(redis_host, redis_port, redis_password, redis_db),
+                decode_responses=True
             )
             
             # 测试连接
@@ -28,6 +28,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+from .export_cache import get_export_render_pool, results_fingerprint, snapshot_results
+
 # 导入Docker适配器
 try:
     from .docker_pdf_adapter import (
@@ -83,6 +85,12 @@ class ReportExporter:
         self.pandoc_available = PANDOC_AVAILABLE
         self.is_docker = DOCKER_ADAPTER_AVAILABLE and is_docker_environment()
 
+        # 渲染结果按内容哈希缓存，渲染在后台线程池执行
+        self.render_pool = get_export_render_pool()
+        # 上次成功的PDF引擎（None表示pandoc默认引擎），下次优先尝试
+        self._pdf_engine = None
+        self._pdf_engine_found = False
+
         # 记录初始化状态
         logger.info(f"📋 ReportExporter初始化:")
         logger.info(f"  - export_available: {self.export_available}")
@@ -454,6 +462,9 @@ class ReportExporter:
             ('weasyprint', '现代HTML转PDF引擎'),
             (None, '使用pandoc默认引擎')  # 不指定引擎，让pandoc自己选择
         ]
+        # 上次成功的引擎排在最前，避免每次都先试一遍失败的引擎
+        if self._pdf_engine_found:
+            pdf_engines.sort(key=lambda item: item[0] != self._pdf_engine)
 
         last_error = None
 
@@ -497,6 +508,8 @@ class ReportExporter:
                     # 清理临时文件
                     os.unlink(output_file)
 
+                    self._pdf_engine = engine
+                    self._pdf_engine_found = True
                     logger.info(f"✅ PDF生成成功，使用引擎: {engine or '默认'}")
                     return pdf_content
                 else:
@@ -533,6 +546,52 @@ class ReportExporter:
 """
         raise Exception(error_msg)
     
+    def _render_uncached(self, results: Dict[str, Any], format_type: str) -> bytes:
+        """实际渲染指定格式的报告（在后台线程中执行，不能调用streamlit）"""
+        if format_type == 'markdown':
+            return self.generate_markdown_report(results).encode('utf-8')
+        if format_type == 'docx':
+            return self.generate_docx_report(results)
+        if format_type == 'pdf':
+            return self.generate_pdf_report(results)
+        raise ValueError(f"不支持的导出格式: {format_type}")
+
+    def render_report(self, results: Dict[str, Any], format_type: str) -> bytes:
+        """获取渲染好的报告，相同内容和格式只渲染一次"""
+        key = results_fingerprint(results, format_type)
+        snapshot = snapshot_results(results)
+        return self.render_pool.render(key, format_type, lambda: self._render_uncached(snapshot, format_type))
+
+    def prerender(self, results: Dict[str, Any], formats: Optional[list] = None) -> Dict[str, Any]:
+        """
+        在后台预渲染常用格式，分析完成时调用，之后的下载直接命中缓存
+
+        Args:
+            results: 格式化后的分析结果
+            formats: 要预渲染的格式，默认读取 EXPORT_PRERENDER_FORMATS（markdown,docx）
+
+        Returns:
+            格式到Future的映射
+        """
+        if not results or not self.export_available:
+            return {}
+
+        if formats is None:
+            formats = [f.strip() for f in os.getenv("EXPORT_PRERENDER_FORMATS", "markdown,docx").split(",") if f.strip()]
+        if not self.pandoc_available:
+            formats = [f for f in formats if f == 'markdown']
+
+        snapshot = snapshot_results(results)
+        futures = {}
+        for format_type in formats:
+            key = results_fingerprint(snapshot, format_type)
+            futures[format_type] = self.render_pool.submit(
+                key, format_type,
+                lambda fmt=format_type: self._render_uncached(snapshot, fmt)
+            )
+        logger.info(f"🖨️ 已提交后台预渲染: {formats}")
+        return futures
+
     def export_report(self, results: Dict[str, Any], format_type: str) -> Optional[bytes]:
         """导出报告为指定格式"""
 
@@ -552,9 +611,9 @@ class ReportExporter:
 
             if format_type == 'markdown':
                 logger.info("📝 生成Markdown报告...")
-                content = self.generate_markdown_report(results)
-                logger.info(f"✅ Markdown报告生成成功，长度: {len(content)} 字符")
-                return content.encode('utf-8')
+                content = self.render_report(results, 'markdown')
+                logger.info(f"✅ Markdown报告生成成功，大小: {len(content)} 字节")
+                return content
 
             elif format_type == 'docx':
                 logger.info("📄 生成Word文档...")
@@ -562,7 +621,7 @@ class ReportExporter:
                     logger.error("❌ pandoc不可用，无法生成Word文档")
                     st.error("❌ pandoc不可用，无法生成Word文档")
                     return None
-                content = self.generate_docx_report(results)
+                content = self.render_report(results, 'docx')
                 logger.info(f"✅ Word文档生成成功，大小: {len(content)} 字节")
                 return content
 
@@ -572,7 +631,7 @@ class ReportExporter:
                     logger.error("❌ pandoc不可用，无法生成PDF文档")
                     st.error("❌ pandoc不可用，无法生成PDF文档")
                     return None
-                content = self.generate_pdf_report(results)
+                content = self.render_report(results, 'pdf')
                 logger.info(f"✅ PDF文档生成成功，大小: {len(content)} 字节")
                 return content
 
@@ -591,6 +650,19 @@ class ReportExporter:
 report_exporter = ReportExporter()
 
 
+def _write_text_if_changed(file_path: Path, content: str) -> bool:
+    """内容与已有文件相同时跳过写入，返回是否实际写入"""
+    encoded = content.encode('utf-8')
+    try:
+        if file_path.stat().st_size == len(encoded) and file_path.read_bytes() == encoded:
+            return False
+    except OSError:
+        pass
+    with open(file_path, 'wb') as f:
+        f.write(encoded)
+    return True
+
+
 def save_modular_reports_to_results_dir(results: Dict[str, Any], stock_symbol: str) -> Dict[str, str]:
     """保存分模块报告到results目录（CLI版本格式）"""
     try:
@@ -686,20 +758,21 @@ def save_modular_reports_to_results_dir(results: Dict[str, Any], stock_symbol: s
                     report_content = f"# {module_info['title']}\n\n"
                     # 特殊处理团队决策报告的字典结构
                     if module_key in ['investment_debate_state', 'risk_debate_state']:
-                        report_content += self._format_team_decision_content(content, module_key)
+                        report_content += report_exporter._format_team_decision_content(content, module_key)
                     else:
                         for sub_key, sub_value in content.items():
                             report_content += f"## {sub_key.replace('_', ' ').title()}\n\n{sub_value}\n\n"
                 else:
                     report_content = f"# {module_info['title']}\n\n{str(content)}"
 
-                # 保存文件
+                # 保存文件（内容未变化时不重复写入）
                 file_path = reports_dir / module_info['filename']
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(report_content)
+                if _write_text_if_changed(file_path, report_content):
+                    logger.info(f"✅ 保存模块报告: {file_path}")
+                else:
+                    logger.debug(f"模块报告未变化，跳过写入: {file_path}")
 
                 saved_files[module_key] = str(file_path)
-                logger.info(f"✅ 保存模块报告: {file_path}")
 
         # 如果有决策信息，也保存最终决策报告
         decision = results.get('decision', {})
@@ -717,11 +790,10 @@ def save_modular_reports_to_results_dir(results: Dict[str, Any], stock_symbol: s
                 decision_content += f"{str(decision)}\n\n"
 
             decision_file = reports_dir / "final_trade_decision.md"
-            with open(decision_file, 'w', encoding='utf-8') as f:
-                f.write(decision_content)
+            if _write_text_if_changed(decision_file, decision_content):
+                logger.info(f"✅ 保存最终决策: {decision_file}")
 
             saved_files['final_trade_decision'] = str(decision_file)
-            logger.info(f"✅ 保存最终决策: {decision_file}")
 
         logger.info(f"✅ 分模块报告保存完成，共保存 {len(saved_files)} 个文件")
         logger.info(f"📁 保存目录: {reports_dir}")